@@ -13,7 +13,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime as dt
+import io
+import os
+import shutil
+import tempfile
 
+from oslo_config import cfg
+from oslo_db.sqlalchemy import engines
+from subunit import iso8601
+from subunit import v2
+
+from rally.common.db.sqlalchemy import api as db_api
+from rally.common.db.sqlalchemy import models
+from rally.common.io import subunit_v2
 from rally.common import utils
 from rally.task import atomic
 from rally.task import scenario
@@ -48,3 +61,140 @@ class CalculateAtomic(scenario.Scenario, utils.RandomNameGeneratorMixin):
             for _ in range(number_of_atomics):
                 with atomic.ActionTimer(atomic_inst, tmp_name):
                     pass
+
+
+@scenario.configure(name="RallyProfile.parse_subunit_stream")
+class ParseSubunitStream(scenario.Scenario):
+
+    @staticmethod
+    def _generate_stream(number_of_tests, tests_per_class, traceback_chunks):
+        """Generate a synthetic subunit v2 stream.
+
+        Every third test fails with a traceback of the given number of
+        chunks, every third test is skipped and every tenth test class is
+        skipped as a whole.
+        """
+        output = io.BytesIO()
+        stream = v2.StreamResultToBytes(output)
+        mime_type = "text/plain; charset=utf8"
+        timestamp = dt.datetime(2017, 1, 1, tzinfo=iso8601.UTC)
+        for i in range(number_of_tests):
+            class_number = i // tests_per_class
+            class_id = "tests.module_%d.TestCase%d" % (
+                class_number // 10, class_number)
+            test_id = "%s.test_%d[id-%d,smoke]" % (class_id, i, i)
+            stream.status(test_id=test_id, test_status="exists",
+                          timestamp=timestamp)
+            if class_number % 10 == 9:
+                if i % tests_per_class == tests_per_class - 1:
+                    stream.status(test_id=class_id, test_status="skip",
+                                  file_name="reason",
+                                  file_bytes=b"The class is skipped.",
+                                  mime_type=mime_type, timestamp=timestamp)
+                continue
+            stream.status(test_id=test_id, test_status="inprogress",
+                          timestamp=timestamp)
+            timestamp += dt.timedelta(milliseconds=10)
+            status = ("success", "fail", "skip")[i % 3]
+            if status == "fail":
+                for j in range(traceback_chunks):
+                    stream.status(test_id=test_id, file_name="traceback",
+                                  file_bytes=b"Traceback line %d\n" % j,
+                                  mime_type=mime_type, timestamp=timestamp)
+            stream.status(test_id=test_id, test_status=status,
+                          timestamp=timestamp)
+        output.seek(0)
+        return output
+
+    def run(self, number_of_tests, tests_per_class=10, traceback_chunks=10):
+        """Parse a synthetic subunit v2 stream.
+
+        :param number_of_tests: int number of tests in the stream
+        :param tests_per_class: int number of tests in each test class
+        :param traceback_chunks: int number of chunks of each traceback
+        """
+        stream = self._generate_stream(number_of_tests, tests_per_class,
+                                       traceback_chunks)
+        with atomic.ActionTimer(self, "parse_%s_tests" % number_of_tests):
+            results = subunit_v2.parse(stream)
+            results.totals
+
+
+@scenario.configure(name="RallyProfile.serialize_workload_results")
+class SerializeWorkloadResults(scenario.Scenario):
+
+    @staticmethod
+    def _generate_data(number_of_iterations, atomics_per_iteration):
+        """Generate synthetic raw iterations of a workload."""
+        return [{"timestamp": 1500000000.0 + i,
+                 "duration": 1.0,
+                 "idle_duration": 0.0,
+                 "error": [],
+                 "output": {"additive": [], "complete": []},
+                 "atomic_actions": [{"name": "action_%d" % j,
+                                     "started_at": 1500000000.0 + i,
+                                     "finished_at": 1500000001.0 + i,
+                                     "children": []}
+                                    for j in range(atomics_per_iteration)]}
+                for i in range(number_of_iterations)]
+
+    def run(self, number_of_iterations, atomics_per_iteration=5):
+        """Serialize a workload with synthetic results.
+
+        The serialization of the workload model is compared with the
+        recursive copying of all raw iterations.
+
+        :param number_of_iterations: int number of iterations of workload
+        :param atomics_per_iteration: int number of atomic actions of each
+            iteration
+        """
+        workload = models.Workload(uuid="workload", args={}, context={},
+                                   statistics={"atomics": {}})
+        workload.data = self._generate_data(number_of_iterations,
+                                            atomics_per_iteration)
+        with atomic.ActionTimer(
+                self, "serialize_%s_iterations" % number_of_iterations):
+            db_api.serialize_data(workload)
+        with atomic.ActionTimer(
+                self, "copy_%s_iterations" % number_of_iterations):
+            db_api.serialize_data(workload.data)
+
+
+@scenario.configure(name="RallyProfile.write_workload_data")
+class WriteWorkloadData(scenario.Scenario):
+
+    def run(self, number_of_chunks, chunk_size=100, tuning=True):
+        """Write chunks of workload data to a new SQLite database.
+
+        Each chunk is written in a separate transaction like results of a
+        running workload.
+
+        :param number_of_chunks: int number of chunks to write
+        :param chunk_size: int number of iterations in each chunk
+        :param tuning: whether apply the SQLite tuning profile or not
+        """
+        tmp_dir = tempfile.mkdtemp()
+        engine = engines.create_engine(
+            "sqlite:///%s" % os.path.join(tmp_dir, "rally.sqlite"))
+        cfg.CONF.set_override("tuning", tuning, "sqlite")
+        try:
+            tuning = db_api._tune_sqlite(engine)
+        finally:
+            cfg.CONF.clear_override("tuning", "sqlite")
+        try:
+            table = models.WorkloadData.__table__
+            table.create(engine)
+            data = SerializeWorkloadResults._generate_data(chunk_size, 5)
+            values = db_api.Connection._workload_data_values(
+                "task", "workload", 0, {"raw": data})
+            with atomic.ActionTimer(self, "write_%s_chunks_%s" % (
+                    number_of_chunks, "tuned" if tuning else "default")):
+                for i in range(number_of_chunks):
+                    values["chunk_order"] = i
+                    with engine.begin() as conn:
+                        conn.execute(table.insert(), values)
+        finally:
+            if tuning:
+                tuning.close()
+            engine.dispose()
+            shutil.rmtree(tmp_dir)
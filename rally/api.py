@@ -14,6 +14,9 @@
 #    under the License.
 
 import collections
+import datetime as dt
+import gzip
+import json
 import os
 import re
 import sys
@@ -26,8 +29,10 @@ import jsonschema
 from oslo_config import cfg
 import requests
 from requests.packages import urllib3
+import six
 
 from rally.common import opts
+from rally.common import streaming_algorithms as streaming
 from rally.common.i18n import _, _LI, _LE
 from rally.common import logging
 from rally.common import objects
@@ -269,14 +274,17 @@ class _Task(APIGroup):
         return [task.to_dict() for task in objects.Task.list(**filters)]
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/get", method="GET")
-    def get(self, task_id, detailed=False):
+    def get(self, task_id, detailed=False, load_data=True):
         """Get task data
 
         :param task_id: Task UUID
         :param detailed: whether return detailed information(including
             subtasks and workloads) or not.
+        :param load_data: whether return raw iterations of workloads or
+            only their summaries. Makes sense only for detailed mode.
         """
-        return objects.Task.get(task_id, detailed=detailed).to_dict()
+        return objects.Task.get(task_id, detailed=detailed,
+                                data="full" if load_data else None).to_dict()
 
     # TODO(andreykurilin): move it to some kind of utils
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/render_template",
@@ -531,6 +539,93 @@ class _Task(APIGroup):
             objects.Task.delete_by_uuid(
                 task_uuid, status=consts.TaskStatus.FINISHED)
 
+    @api_wrapper(path=API_REQUEST_PREFIX + "/task/compact", method="POST")
+    def compact(self, older_than, sample_size=1000, archive_dir=None):
+        """Compact raw results of old tasks.
+
+        Raw iterations of workloads of finished tasks which were created
+        more than `older_than` days ago are replaced by a uniform random
+        sample of them. Statistics, SLA and hooks results of workloads are
+        kept as is, so trends and reports can be built for compacted tasks
+        as well (charts of iterations are built by the sample then).
+
+        :param older_than: the minimal age of tasks in days
+        :param sample_size: the maximal number of iterations left in the
+            database per workload
+        :param archive_dir: directory to save all the raw iterations of
+            compacted workloads to before they are removed. Each workload is
+            saved to a gzipped file with one JSON-encoded iteration per line.
+        :returns: list of dicts with UUIDs of compacted tasks, the number of
+            compacted workloads and removed iterations
+        """
+        created_before = dt.datetime.utcnow() - dt.timedelta(days=older_than)
+        if archive_dir and not os.path.isdir(archive_dir):
+            os.makedirs(archive_dir)
+
+        result = []
+        for task in objects.Task.list():
+            if (task["status"] not in (consts.TaskStatus.ABORTED,
+                                       consts.TaskStatus.FINISHED,
+                                       consts.TaskStatus.CRASHED)
+                    or task["created_at"] >= created_before):
+                continue
+            task = objects.Task.get(task["uuid"], detailed=True,
+                                    data="lazy")
+            compacted = {"uuid": task["uuid"], "workloads": 0,
+                         "removed_iterations": 0}
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    removed = self._compact_workload(workload, sample_size,
+                                                     archive_dir)
+                    if removed is not None:
+                        compacted["workloads"] += 1
+                        compacted["removed_iterations"] += removed
+            if compacted["workloads"]:
+                LOG.info("%d workload(s) of task %s have been compacted.",
+                         compacted["workloads"], task["uuid"])
+                result.append(compacted)
+        return result
+
+    @staticmethod
+    def _compact_workload(workload, sample_size, archive_dir=None):
+        """Leave a sample of raw iterations of the workload in DB.
+
+        :returns: the number of removed iterations or None if the workload
+            has not been compacted
+        """
+        compaction = workload["statistics"].get("compaction")
+        if compaction:
+            stored = compaction["stored_iterations"]
+            archive = compaction["archive"]
+        else:
+            stored = workload["total_iteration_count"]
+            archive = None
+        if stored <= sample_size:
+            return None
+
+        # NOTE(agent): the sample of the workload does not depend
+        #   on how many times compaction is started for it.
+        sample = streaming.ReservoirSampling(sample_size,
+                                             seed=workload["uuid"])
+        if archive_dir and not archive:
+            # NOTE(agent): archives contain all the iterations,
+            #   so iterations of compacted workloads are not archived again.
+            archive = os.path.join(archive_dir,
+                                   "%s.jsonl.gz" % workload["uuid"])
+            with gzip.open(archive + ".tmp", "wb") as f:
+                for itr in workload["data"]:
+                    sample.add(itr)
+                    f.write(json.dumps(itr).encode("utf-8") + b"\n")
+            os.rename(archive + ".tmp", archive)
+        else:
+            for itr in workload["data"]:
+                sample.add(itr)
+
+        raw = sorted(sample.result(), key=lambda x: x["timestamp"])
+        objects.Workload.compact_workload_data(workload["uuid"],
+                                               {"raw": raw}, archive=archive)
+        return sample.count - len(raw)
+
     @api_wrapper(path=API_REQUEST_PREFIX + "/task/import_results",
                  method="POST")
     def import_results(self, deployment, task_results, tags=None):
@@ -577,23 +672,29 @@ class _Task(APIGroup):
 
         return task_inst.to_dict()
 
-    @api_wrapper(path=API_REQUEST_PREFIX + "/task/export",
-                 method="POST")
-    def export(self, tasks_uuids, output_type, output_dest=None):
+    def _export(self, tasks_uuids, output_type, output_dest=None):
         """Generate a report for a task or a few tasks.
 
+        Unlike export, printed output and contents of files of streaming
+        reporters are returned as iterables of strings, which are generated
+        while raw iterations are loaded from the database.
+
         :param tasks_uuids: List of tasks UUIDs
         :param output_type: Plugin name of task reporter
         :param output_dest: Destination for task report
         """
 
-        tasks_results = []
-        for task_uuid in tasks_uuids:
-            tasks_results.append(self.get(task_id=task_uuid, detailed=True))
-
         reporter_cls = texporter.TaskExporter.get(output_type)
         reporter_cls.validate(output_dest)
 
+        tasks_results = []
+        for task_uuid in tasks_uuids:
+            # NOTE(agent): streaming reporters load raw iterations from
+            #   the database by chunks while the report is generated
+            tasks_results.append(objects.Task.get(
+                task_uuid, detailed=True,
+                data="lazy" if reporter_cls.STREAMING else "full").to_dict())
+
         LOG.info("Building '%s' report for the following task(s): "
                  "'%s'.", output_type, "', '".join(tasks_uuids))
         result = texporter.TaskExporter.make(reporter_cls,
@@ -603,6 +704,25 @@ class _Task(APIGroup):
         LOG.info("The report has been successfully built.")
         return result
 
+    @api_wrapper(path=API_REQUEST_PREFIX + "/task/export",
+                 method="POST")
+    def export(self, tasks_uuids, output_type, output_dest=None):
+        """Generate a report for a task or a few tasks.
+
+        :param tasks_uuids: List of tasks UUIDs
+        :param output_type: Plugin name of task reporter
+        :param output_dest: Destination for task report
+        """
+        report = self._export(tasks_uuids=tasks_uuids,
+                              output_type=output_type,
+                              output_dest=output_dest)
+        if not isinstance(report.get("print", ""), six.string_types):
+            report["print"] = "".join(report["print"])
+        for path, content in report.get("files", {}).items():
+            if not isinstance(content, six.string_types):
+                report["files"][path] = "".join(content)
+        return report
+
 
 class _Verifier(APIGroup):
 
@@ -1106,16 +1226,15 @@ class _Verification(APIGroup):
             run_args["concurrency"] = concurrency
 
         verification = self._get(verification_uuid)
-        tests = verification.tests
 
         if failed:
-            tests = [t for t, r in tests.items() if r["status"] == "fail"]
+            tests = list(verification.get_tests(status="fail"))
             if not tests:
                 raise exceptions.RallyException(
                     "There are no failed tests from verification (UUID=%s)."
                     % verification_uuid)
         else:
-            tests = tests.keys()
+            tests = verification.tests.keys()
 
         deployment = (deployment_id if deployment_id
                       else verification.deployment_uuid)
@@ -1149,9 +1268,10 @@ class _Verification(APIGroup):
         :param tags: Tags to filter verifications by
         :param status: Status to filter verifications by
         """
-        return [item.to_dict() for item in objects.Verification.list(
-            verifier_id, deployment_id=deployment_id,
-            tags=tags, status=status)]
+        return [item.to_dict(include_tests=False)
+                for item in objects.Verification.list(
+                    verifier_id, deployment_id=deployment_id,
+                    tags=tags, status=status)]
 
     @api_wrapper(path=API_REQUEST_PREFIX + "/verification/delete",
                  method="DELETE")
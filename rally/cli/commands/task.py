@@ -41,6 +41,7 @@ from rally import consts
 from rally import exceptions
 from rally import plugins
 from rally.task import atomic
+from rally.task import distributed
 from rally.task.processing import charts
 from rally.task.processing import plot
 from rally.task.processing import utils as putils
@@ -284,6 +285,32 @@ class TaskCommands(object):
 
         print("Task %s successfully stopped." % task_id)
 
+    @cliutils.args("--host", type=str, dest="host",
+                   help="The address to listen on for coordinators. "
+                        "Defaults to [distributed]agent_host option.")
+    @cliutils.args("--port", type=int, dest="port",
+                   help="The port to listen on for coordinators. "
+                        "Defaults to [distributed]agent_port option.")
+    @cliutils.args("--once", action="store_true", dest="once",
+                   help="Stop the agent after the first workload.")
+    @plugins.ensure_plugins_are_loaded
+    def agent(self, api, host=None, port=None, once=False):
+        """Start an agent which generates load of distributed runners.
+
+        The agent registers itself in the database and runs shards of
+        workloads which use the "distributed" runner.
+
+        :param host: the address to listen on
+        :param port: the port to listen on
+        :param once: stop after the first workload
+        """
+        agent = distributed.Agent(host=host, port=port)
+        print("Agent %s is waiting for workloads." % agent.name)
+        try:
+            agent.serve(once=once)
+        except KeyboardInterrupt:
+            print("Agent %s is stopped." % agent.name)
+
     @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task")
     @envutils.with_default_task_id
     def status(self, api, task_id=None):
@@ -422,6 +449,8 @@ class TaskCommands(object):
             }
             rows = duration_stats["atomics"]
             rows.append(duration_stats["total"])
+            if "corrected_total" in duration_stats:
+                rows.append(duration_stats["corrected_total"])
             cliutils.print_list(rows,
                                 fields=cols,
                                 formatters=formatters,
@@ -458,10 +487,22 @@ class TaskCommands(object):
                                             formatters=formatters)
                         print()
 
+            if workload.get("context_execution"):
+                self._print_context_execution(workload["context_execution"])
+
             print(_("Load duration: %s") % rutils.format_float_to_str(
                 workload["load_duration"]))
             print(_("Full duration: %s") % rutils.format_float_to_str(
                 workload["full_duration"]))
+            client_overhead = workload["statistics"].get("client_overhead")
+            if client_overhead:
+                print(_("Client CPU time: %(avg)s on average, %(max)s max "
+                        "(%(ratio).1f%% of iteration duration)") % {
+                    "avg": rutils.format_float_to_str(
+                        client_overhead["avg_cpu_duration"]),
+                    "max": rutils.format_float_to_str(
+                        client_overhead["max_cpu_duration"]),
+                    "ratio": client_overhead["avg_cpu_ratio"] * 100})
 
             print("\nHINTS:")
             print(_("* To plot HTML graphics with this data, run:"))
@@ -475,6 +516,7 @@ class TaskCommands(object):
     @cliutils.args("--uuid", type=str, dest="task_id", help="UUID of task.")
     @envutils.with_default_task_id
     @cliutils.suppress_warnings
+    @plugins.ensure_plugins_are_loaded
     def results(self, api, task_id=None):
         """Display raw task results.
 
@@ -482,7 +524,7 @@ class TaskCommands(object):
 
         :param task_id: Task uuid
         """
-        task = api.task.get(task_id=task_id, detailed=True)
+        task = api.task.get(task_id=task_id)
         finished_statuses = (consts.TaskStatus.FINISHED,
                              consts.TaskStatus.ABORTED)
         if task["status"] not in finished_statuses:
@@ -491,38 +533,10 @@ class TaskCommands(object):
             return 1
 
         # TODO(chenhb): Ensure `rally task results` puts out old format.
-        for workload in itertools.chain(
-                *[s["workloads"] for s in task["subtasks"]]):
-            for itr in workload["data"]:
-                itr["atomic_actions"] = collections.OrderedDict(
-                    tutils.WrapperForAtomicActions(
-                        itr["atomic_actions"]).items()
-                )
-
-        results = [
-            {
-                "key": {
-                    "name": w["name"],
-                    "description": w["description"],
-                    "pos": w["position"],
-                    "kw": {
-                        "args": w["args"],
-                        "runner": w["runner"],
-                        "context": w["context"],
-                        "sla": w["sla"],
-                        "hooks": [r["config"] for r in w["hooks"]],
-                    }
-                },
-                "result": w["data"],
-                "sla": w["sla_results"].get("sla", []),
-                "hooks": w["hooks"],
-                "load_duration": w["load_duration"],
-                "full_duration": w["full_duration"],
-                "created_at": w["created_at"]}
-            for w in itertools.chain(
-                *[s["workloads"] for s in task["subtasks"]])]
-
-        print(json.dumps(results, sort_keys=False, indent=4))
+        report = self._export(api, tasks_uuids=[task_id],
+                              output_type="json-results")
+        self._write_report_content(sys.stdout, report["print"])
+        print()
 
     @cliutils.args("--deployment", dest="deployment", type=str,
                    metavar="<uuid>", required=False,
@@ -537,9 +551,18 @@ class TaskCommands(object):
                    help="Tags to filter tasks by.")
     @cliutils.args("--uuids-only", action="store_true",
                    dest="uuids_only", help="List task UUIDs only.")
+    @cliutils.args("--limit", type=int, dest="limit", metavar="<number>",
+                   required=False,
+                   help="Display only the given number of the most recent "
+                        "tasks.")
+    @cliutils.args("--marker", type=str, dest="marker", metavar="<uuid>",
+                   required=False,
+                   help="Display only tasks created before the task with the "
+                        "given UUID (i.e. the last task of the previous "
+                        "page).")
     @envutils.with_default_deployment(cli_arg_name="deployment")
     def list(self, api, deployment=None, all_deployments=False, status=None,
-             tags=None, uuids_only=False):
+             tags=None, uuids_only=False, limit=None, marker=None):
         """List tasks, started and finished.
 
         Displayed tasks can be filtered by status or deployment.  By
@@ -551,6 +574,8 @@ class TaskCommands(object):
             Available task statuses are in rally.consts.TaskStatus
         :param all_deployments: display tasks from all deployments
         :param uuids_only: list task UUIDs only
+        :param limit: display only the given number of the most recent tasks
+        :param marker: display only tasks created before the given one
         """
 
         filters = {}
@@ -572,6 +597,16 @@ class TaskCommands(object):
         if tags:
             filters["tags"] = tags
 
+        if limit is not None:
+            if limit < 1:
+                print(_("Error: The limit should be a positive number."),
+                      file=sys.stderr)
+                return 1
+            filters["limit"] = limit
+
+        if marker:
+            filters["marker"] = marker
+
         task_list = api.task.list(**filters)
 
         if uuids_only:
@@ -594,6 +629,11 @@ class TaskCommands(object):
                 task_list, fields=headers, normalize_field_names=True,
                 sortby_index=headers.index("Created at"),
                 formatters=formatters)
+            if limit is not None and len(task_list) == limit:
+                print(_("To display the next page, use:\n"
+                        "\trally task list --limit %(limit)s "
+                        "--marker %(marker)s")
+                      % {"limit": limit, "marker": task_list[-1]["uuid"]})
         else:
             if status:
                 print(_("There are no tasks in '%s' status. "
@@ -904,7 +944,7 @@ class TaskCommands(object):
         :param task_id: Task uuid.
         :returns: Number of failed criteria.
         """
-        task = api.task.get(task_id=task_id, detailed=True)
+        task = api.task.get(task_id=task_id, detailed=True, load_data=False)
         failed_criteria = 0
         data = []
         STATUS_PASS = "PASS"
@@ -966,20 +1006,41 @@ class TaskCommands(object):
         :param output_dest: output format (html, html-static, junit-xml,etc)
         """
         task_id = isinstance(task_id, list) and task_id or [task_id]
-        report = api.task.export(tasks_uuids=task_id,
-                                 output_type=output_type,
-                                 output_dest=output_dest)
+        report = self._export(api, tasks_uuids=task_id,
+                              output_type=output_type,
+                              output_dest=output_dest)
         if "files" in report:
             for path in report["files"]:
                 output_file = os.path.expanduser(path)
                 with open(output_file, "w+") as f:
-                    f.write(report["files"][path])
+                    self._write_report_content(f, report["files"][path])
                 if open_it:
                     if "open" in report:
                         webbrowser.open_new_tab(report["open"])
 
         if "print" in report:
-            print(report["print"])
+            if isinstance(report["print"], six.string_types):
+                print(report["print"])
+            else:
+                self._write_report_content(sys.stdout, report["print"])
+                print()
+
+    @staticmethod
+    def _export(api, **kwargs):
+        # NOTE(agent): reports are streamed only by a local API, the remote
+        #   one returns the whole content of reports
+        if api.endpoint_url:
+            return api.task.export(**kwargs)
+        return api.task._export(**kwargs)
+
+    @staticmethod
+    def _write_report_content(stream, content):
+        """Write a report content which is a string or iterable of strings."""
+        if isinstance(content, six.string_types):
+            stream.write(content)
+        else:
+            for chunk in content:
+                stream.write(chunk)
 
     @staticmethod
     def _print_task_errors(task_id, task_errors):
@@ -989,6 +1050,37 @@ class TaskCommands(object):
             print(*err_data, sep="\n")
             print("-" * 80)
 
+    @staticmethod
+    def _print_context_execution(context_execution):
+        cols = ["Context", "Stage", "Action", "Count", "Failed", "Retries",
+                "Duration (sec)"]
+        rows = []
+        for ctx_name, stages in sorted(context_execution.items()):
+            for stage in ("setup", "cleanup"):
+                if stage not in stages:
+                    continue
+                rows.append({"Context": ctx_name, "Stage": stage,
+                             "Action": "total", "Count": "", "Failed": "",
+                             "Retries": "",
+                             "Duration (sec)": stages[stage]["duration"]})
+                actions = stages[stage].get("actions", {})
+                for name, action in actions.items():
+                    duration = None
+                    if action["started_at"] and action["finished_at"]:
+                        duration = (action["finished_at"]
+                                    - action["started_at"])
+                    rows.append({"Context": ctx_name, "Stage": stage,
+                                 "Action": name, "Count": action["count"],
+                                 "Failed": action["failed"],
+                                 "Retries": action["retries"],
+                                 "Duration (sec)": duration})
+        formatters = {"Duration (sec)": cliutils.pretty_float_formatter(
+            "Duration (sec)", 3)}
+        cliutils.print_list(rows, fields=cols, formatters=formatters,
+                            table_label="Contexts execution",
+                            sortby_index=None)
+        print()
+
     @staticmethod
     def _format_task_error(data):
         error_type = _("Unknown type")
@@ -439,6 +439,12 @@ class VerifyCommands(object):
                    help="How many processes to be used for running verifier "
                         "tests. The default value (0) auto-detects your CPU "
                         "count.")
+    @cliutils.args("--shards", dest="shards", type=int, metavar="<N>",
+                   required=False,
+                   help="Split tests into N shards balanced by durations of "
+                        "tests in previous verifications and run each shard "
+                        "by a separate verifier process. Cannot be used "
+                        "with '--concurrency'.")
     @cliutils.args("--load-list", dest="load_list", type=str, metavar="<path>",
                    required=False,
                    help="Path to a file with a list of tests to run.")
@@ -465,7 +471,7 @@ class VerifyCommands(object):
     @plugins.ensure_plugins_are_loaded
     def start(self, api, verifier_id=None, deployment=None, tags=None,
               pattern=None, concur=0, load_list=None, skip_list=None,
-              xfail_list=None, detailed=False, do_use=True):
+              xfail_list=None, detailed=False, do_use=True, shards=None):
         """Start a verification (run verifier tests)."""
         if pattern and load_list:
             print(_("Arguments '--pattern' and '--load-list' cannot be used "
@@ -499,7 +505,7 @@ class VerifyCommands(object):
         run_args = {key: value for key, value in (
             ("pattern", pattern), ("load_list", load_list),
             ("skip_list", skip_list), ("xfail_list", xfail_list),
-            ("concurrency", concur)) if value}
+            ("concurrency", concur), ("shards", shards)) if value}
 
         try:
             results = api.verification.start(
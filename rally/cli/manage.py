@@ -66,6 +66,46 @@ class DBCommands(object):
         """Print current Rally database revision UUID."""
         print(db.schema_revision())
 
+    @cliutils.args("--older-than", type=int, dest="older_than",
+                   metavar="<days>", required=False,
+                   help="Compact tasks created more than the given number "
+                        "of days ago. Defaults to 30.")
+    @cliutils.args("--sample-size", type=int, dest="sample_size",
+                   metavar="<number>", required=False,
+                   help="The number of raw iterations left per workload. "
+                        "Defaults to 1000.")
+    @cliutils.args("--archive-dir", type=str, dest="archive_dir",
+                   metavar="<path>", required=False,
+                   help="Directory to save all the raw iterations of "
+                        "compacted workloads to.")
+    def compact(self, api, older_than=30, sample_size=1000,
+                archive_dir=None):
+        """Compact results of old tasks and reclaim space of the database.
+
+        Only a random sample of raw iterations of finished tasks is left,
+        while their statistics and SLA results are kept, so trends and
+        reports still can be built for them. Then the database is vacuumed.
+        """
+        if older_than < 0 or sample_size < 0:
+            print("The age of tasks and the sample size can not be "
+                  "negative.", file=sys.stderr)
+            return 1
+        api.check_db_revision()
+
+        tasks = api.task.compact(older_than=older_than,
+                                 sample_size=sample_size,
+                                 archive_dir=archive_dir)
+        for task in tasks:
+            print("Task %(uuid)s: %(workloads)d workload(s) compacted, "
+                  "%(removed_iterations)d iteration(s) removed." % task)
+        print("%d task(s) compacted." % len(tasks))
+
+        if db.vacuum():
+            print("Database has been vacuumed.")
+        else:
+            print("Vacuuming of the database is not supported by its "
+                  "backend.")
+
 
 def main():
     categories = {"db": DBCommands}
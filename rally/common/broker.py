@@ -13,8 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
 import threading
+import time
+
+from six import moves
 
 from rally.common.i18n import _LW
 from rally.common import logging
@@ -22,36 +24,80 @@ from rally.common import logging
 
 LOG = logging.getLogger(__name__)
 
+# NOTE(agent): the default size of the queue is proportional to the
+#   number of consumers, so each of them has some jobs in advance while
+#   publisher is not able to load too many jobs into memory.
+QUEUE_SIZE_PER_CONSUMER = 10
+
+_STOP = object()
+
+
+class _Queue(moves.queue.Queue):
+    """Bounded blocking queue which counts published jobs.
+
+    append() is an alias of put(), so publishers written for
+    collections.deque keep working.
+    """
+
+    def __init__(self, maxsize=0):
+        moves.queue.Queue.__init__(self, maxsize)
+        self.published = 0
+
+    def put(self, item, block=True, timeout=None):
+        moves.queue.Queue.put(self, item, block, timeout)
+        if item is not _STOP:
+            self.published += 1
 
-def _consumer(consume, queue):
-    """Infinity worker that consumes tasks from queue.
+    append = put
+
+
+class _Stats(object):
+    """Thread-safe counters of consumed jobs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.consumed = 0
+        self.failed = 0
+        self.consume_duration = 0.0
+
+    def add(self, duration, failed=False):
+        with self._lock:
+            self.consumed += 1
+            self.consume_duration += duration
+            if failed:
+                self.failed += 1
+
+
+def _consumer(consume, queue, stats=None):
+    """Worker that consumes jobs from queue until it gets a stop sentinel.
 
     :param consume: method that consumes an object removed from the queue
-    :param queue: deque object to popleft() objects from
+    :param queue: Queue object to get objects from
+    :param stats: _Stats object to account consumed jobs
     """
     cache = {}
     while True:
-        if not queue:
+        args = queue.get()
+        if args is _STOP:
             break
-        else:
-            try:
-                args = queue.popleft()
-            except IndexError:
-                # consumed by other thread
-                continue
+        started_at = time.time()
+        failed = False
         try:
             consume(cache, args)
         except Exception as e:
+            failed = True
             LOG.warning(_LW("Failed to consume a task from the queue: %s") % e)
             if logging.is_debug():
                 LOG.exception(e)
+        if stats is not None:
+            stats.add(time.time() - started_at, failed=failed)
 
 
 def _publisher(publish, queue):
     """Calls a publish method that fills queue with jobs.
 
     :param publish: method that fills the queue
-    :param queue: deque object to be filled by the publish() method
+    :param queue: Queue object to be filled by the publish() method
     """
     try:
         publish(queue)
@@ -61,26 +107,56 @@ def _publisher(publish, queue):
             LOG.exception(e)
 
 
-def run(publish, consume, consumers_count=1):
+def run(publish, consume, consumers_count=1, queue_size=None):
     """Run broker.
 
     publish() put to queue, consume() process one element from queue.
 
-    When publish() is finished and elements from queue are processed process
-    is finished all consumers threads are cleaned.
+    Consumers are started before publish() is called, so jobs are processed
+    while they are being published. The queue is bounded: publish() blocks
+    on appending to the full queue until consumers catch up. When publish()
+    is finished, consumers process the rest of the queue and stop.
 
-    :param publish: Function that puts values to the queue
+    :param publish: Function that puts values to the queue by its append()
+        method
     :param consume: Function that processes a single value from the queue
     :param consumers_count: Number of consumers
+    :param queue_size: Max number of jobs waiting in the queue. Defaults to
+        QUEUE_SIZE_PER_CONSUMER * consumers_count
+    :returns: a dict with the numbers of published, consumed and failed
+        jobs, the duration of the whole run, the throughput (consumed jobs
+        per second) and the average duration of consuming a job
     """
-    queue = collections.deque()
-    _publisher(publish, queue)
+    consumers_count = max(consumers_count, 1)
+    queue = _Queue(queue_size or QUEUE_SIZE_PER_CONSUMER * consumers_count)
+    stats = _Stats()
+    started_at = time.time()
 
     consumers = []
     for i in range(consumers_count):
-        consumer = threading.Thread(target=_consumer, args=(consume, queue))
+        consumer = threading.Thread(target=_consumer,
+                                    args=(consume, queue, stats))
         consumer.start()
         consumers.append(consumer)
 
-    for consumer in consumers:
-        consumer.join()
+    try:
+        _publisher(publish, queue)
+    finally:
+        for consumer in consumers:
+            queue.put(_STOP)
+        for consumer in consumers:
+            consumer.join()
+
+    duration = time.time() - started_at
+    result = {"published": queue.published,
+              "consumed": stats.consumed,
+              "failed": stats.failed,
+              "duration": duration,
+              "throughput": stats.consumed / duration if duration else 0.0,
+              "avg_consume_duration": (
+                  stats.consume_duration / stats.consumed
+                  if stats.consumed else 0.0)}
+    LOG.debug("Broker has consumed %(consumed)d of %(published)d jobs "
+              "(%(failed)d failed) in %(duration).3f seconds, throughput "
+              "is %(throughput).2f jobs per second." % result)
+    return result
@@ -50,6 +50,33 @@ CONF = cfg.CONF
 
 db_options.set_defaults(CONF, connection="sqlite:////tmp/rally.sqlite")
 
+SQLITE_OPTS = [
+    cfg.BoolOpt("tuning", default=False,
+                help="Apply the options below to connections to SQLite "
+                     "file databases"),
+    cfg.StrOpt("journal_mode", default="WAL",
+               choices=["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL"],
+               help="Journal mode of the database. WAL allows reading "
+                    "while the database is written by another connection"),
+    cfg.StrOpt("synchronous", default="NORMAL",
+               choices=["OFF", "NORMAL", "FULL", "EXTRA"],
+               help="Synchronization of writes with the disk. NORMAL does "
+                    "not sync the WAL on each commit, but keeps the "
+                    "database consistent"),
+    cfg.IntOpt("cache_size", default=65536, min=0,
+               help="Size of the page cache of a connection in KiB"),
+    cfg.IntOpt("mmap_size", default=268435456, min=0,
+               help="The maximum size of the database file mapped into "
+                    "memory in bytes"),
+    cfg.FloatOpt("busy_timeout", default=60.0, min=0,
+                 help="Time in seconds to wait for a lock of the database "
+                      "held by another connection"),
+    cfg.FloatOpt("checkpoint_interval", default=300.0, min=0,
+                 help="Interval in seconds between checkpoints of WAL "
+                      "which also truncate the journal file. 0 disables "
+                      "them, WAL is checkpointed automatically anyway"),
+]
+
 
 IMPL = None
 
@@ -94,20 +121,25 @@ def schema_stamp(revision):
     return get_impl().schema_stamp(revision)
 
 
-def task_get(uuid, detailed=False):
+def vacuum():
+    """Reclaim unused space of the database and update its statistics.
+
+    :returns: False if the database backend is not supported, else True.
+    """
+    return get_impl().vacuum()
+
+
+def task_get(uuid, detailed=False, load_data=True):
     """Returns task by uuid.
 
     :param uuid: UUID of the task.
     :param detailed: whether return results of task or not (Defaults to False).
+    :param load_data: whether load raw iterations of workloads into "data"
+        key or not. Makes sense only for detailed mode (Defaults to True).
     :raises TaskNotFound: if the task does not exist.
     :returns: task dict with data on the task.
     """
-    task = get_impl().task_get(uuid, detailed=detailed)
-    if detailed:
-        for subtask in task["subtasks"]:
-            for workload in subtask["workloads"]:
-                del workload["context_execution"]
-    return task
+    return get_impl().task_get(uuid, detailed=detailed, load_data=load_data)
 
 
 def task_get_status(uuid):
@@ -154,7 +186,8 @@ def task_update_status(task_uuid, status, allowed_statuses):
                                          status)
 
 
-def task_list(status=None, deployment=None, tags=None):
+def task_list(status=None, deployment=None, tags=None, limit=None,
+              marker=None):
     """Get a list of tasks.
 
     :param status: Task status to filter the returned list on. If set to
@@ -163,11 +196,19 @@ def task_list(status=None, deployment=None, tags=None):
                       If set to None, tasks from all deployments will be
                       returned.
     :param tags: A list of tags to filter tasks by.
+    :param limit: The maximum number of tasks to return. If the limit or
+                  the marker is set, the most recent tasks are returned
+                  first.
+    :param marker: UUID of the last task of the previous page. Only tasks
+                   created before it will be returned.
+    :raises TaskNotFound: if the marker task does not exist.
     :returns: A list of dicts with data on the tasks.
     """
     return get_impl().task_list(status=status,
                                 deployment=deployment,
-                                tags=tags)
+                                tags=tags,
+                                limit=limit,
+                                marker=marker)
 
 
 def task_delete(uuid, status=None):
@@ -243,6 +284,18 @@ def workload_get(workload_uuid):
     return get_impl().workload_get(workload_uuid)
 
 
+def workload_data_iter(workload_uuid):
+    """Iterate over raw iterations of a workload.
+
+    Iterations are loaded from DB chunk by chunk in order of chunks. Each
+    chunk is sorted by timestamps of iterations.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :returns: a generator of dicts with results of iterations.
+    """
+    return get_impl().workload_data_iter(workload_uuid)
+
+
 def workload_data_create(task_uuid, workload_uuid, chunk_order, data):
     """Create a workload data.
 
@@ -256,9 +309,37 @@ def workload_data_create(task_uuid, workload_uuid, chunk_order, data):
                                            chunk_order, data)
 
 
+def workload_data_create_many(task_uuid, workload_uuid, chunks):
+    """Create several workload data records in one transaction.
+
+    :param task_uuid: string with UUID of Task instance.
+    :param workload_uuid: string with UUID of Workload instance.
+    :param chunks: list of pairs of ordinal index of workload data and dict
+        with record values on the workload data.
+    """
+    return get_impl().workload_data_create_many(task_uuid, workload_uuid,
+                                                chunks)
+
+
+def workload_data_compact(workload_uuid, data, archive=None):
+    """Replace workload data of the workload by one record in a transaction.
+
+    Statistics of the workload are kept, the compaction is recorded to them.
+
+    :param workload_uuid: string with UUID of Workload instance.
+    :param data: dict with iterations left in the database.
+    :param archive: path to the file with all the iterations of the workload
+        if they were archived.
+    :returns: the number of removed workload data records.
+    """
+    return get_impl().workload_data_compact(workload_uuid, data,
+                                            archive=archive)
+
+
 def workload_set_results(workload_uuid, subtask_uuid, task_uuid, load_duration,
                          full_duration, start_time, sla_results,
-                         hooks_results=None):
+                         hooks_results=None, context_execution=None,
+                         runner_statistics=None):
     """Set workload results.
 
     :param workload_uuid: string with UUID of Workload instance.
@@ -270,6 +351,8 @@ def workload_set_results(workload_uuid, subtask_uuid, task_uuid, load_duration,
     :param start_time: a timestamp of load start
     :param sla_results: a list with Workload's SLA results
     :param hooks_results: a list with Workload's Hooks results
+    :param context_execution: a dict with statistics of contexts execution
+    :param runner_statistics: a dict with statistics collected by the runner
     :returns: a dict with data on the workload.
     """
     return get_impl().workload_set_results(workload_uuid=workload_uuid,
@@ -279,7 +362,9 @@ def workload_set_results(workload_uuid, subtask_uuid, task_uuid, load_duration,
                                            full_duration=full_duration,
                                            start_time=start_time,
                                            sla_results=sla_results,
-                                           hooks_results=hooks_results)
+                                           hooks_results=hooks_results,
+                                           context_execution=context_execution,
+                                           runner_statistics=runner_statistics)
 
 
 def deployment_create(values):
@@ -483,6 +568,30 @@ def verification_update(uuid, **properties):
     return get_impl().verification_update(uuid, properties)
 
 
+def verification_tests_add(verification_uuid, tests):
+    """Store results of tests of a verification.
+
+    Results of already stored tests are replaced. Counters of tests of the
+    verification are updated accordingly.
+
+    :param verification_uuid: verification UUID
+    :param tests: a dict with results of tests where keys are test IDs
+    :raises ResourceNotFound: if verification does not exist
+    :returns: the updated dict with verification data
+    """
+    return get_impl().verification_tests_add(verification_uuid, tests)
+
+
+def verification_tests_get(verification_uuid, status=None):
+    """Get stored results of tests of a verification.
+
+    :param verification_uuid: verification UUID
+    :param status: a status or a list of statuses to filter tests by
+    :returns: an ordered dict with results of tests where keys are test IDs
+    """
+    return get_impl().verification_tests_get(verification_uuid, status)
+
+
 def register_worker(values):
     """Register a new worker service at the specified hostname.
 
@@ -507,6 +616,14 @@ def get_worker(hostname):
     return get_impl().get_worker(hostname)
 
 
+def list_workers():
+    """Get a list of registered worker services.
+
+    :returns: A list of workers.
+    """
+    return get_impl().list_workers()
+
+
 def unregister_worker(hostname):
     """Unregister this worker with the service registry.
 
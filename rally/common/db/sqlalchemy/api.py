@@ -16,8 +16,10 @@
 SQLAlchemy implementation for DB.API
 """
 
+import atexit
 import collections
 import datetime as dt
+import json
 import os
 import time
 
@@ -30,11 +32,14 @@ from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import session as db_session
 from oslo_utils import timeutils
 import six
+from sqlalchemy import event
+from sqlalchemy import func
 from sqlalchemy import or_
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.orm import load_only as sa_loadonly
 
 from rally.common.db.sqlalchemy import models
+from rally.common.db.sqlalchemy import types as sa_types
 from rally.common.i18n import _
 from rally import consts
 from rally import exceptions
@@ -45,9 +50,52 @@ from rally.task.processing import charts
 CONF = cfg.CONF
 
 _FACADE = None
+_SQLITE_TUNING = None
 
 INITIAL_REVISION_UUID = "ca3626f62937"
 
+# NOTE(agent): SQLite limits the number of variables of a query, so
+#   test IDs are looked up by chunks.
+_TESTS_QUERY_CHUNK = 500
+
+# statuses of tests mapped to the counters of a verification
+_TESTS_COUNTERS = {"success": "success",
+                   "fail": "failures",
+                   "skip": "skipped",
+                   "xfail": "expected_failures",
+                   "uxsuccess": "unexpected_success"}
+
+
+def _serialize_model(model):
+    # NOTE(andreykurilin): it is an instance of the Model. It support a
+    #   method `_as_dict`, which should transform an object into dict
+    #   (quite logical as from the method name), BUT it does some extra
+    #   work - tries to load properties which were marked to not be loaded
+    #   in particular request and fails since the session object is not
+    #   present. That is why the code bellow makes a custom transformation.
+    # NOTE(agent): only the model itself (and related models) is
+    #   converted. Payloads of JSON columns are already decoded into new
+    #   objects which are not shared with anything else, so they are
+    #   returned without copying. It matters for results of workloads,
+    #   which can contain millions of nested objects.
+    result = {}
+    for key, value in model.__dict__.items():
+        if key.startswith("_"):
+            continue
+        if hasattr(value, "_as_dict"):
+            value = _serialize_model(value)
+        elif isinstance(value, sa_types.MutableDict):
+            # the mutable wrapper tracks changes of the model, so only it
+            #   is replaced by a plain dict
+            value = dict(value)
+        elif isinstance(value, sa_types.MutableList):
+            value = list(value)
+        elif (isinstance(value, list) and value
+              and hasattr(value[0], "_as_dict")):
+            value = [_serialize_model(v) for v in value]
+        result[key] = value
+    return result
+
 
 def serialize_data(data):
     if data is None:
@@ -65,21 +113,19 @@ def serialize_data(data):
     if isinstance(data, (list, tuple)):
         return [serialize_data(i) for i in data]
     if hasattr(data, "_as_dict"):
-        # NOTE(andreykurilin): it is an instance of the Model. It support a
-        #   method `_as_dict`, which should transform an object into dict
-        #   (quite logical as from the method name), BUT it does some extra
-        #   work - tries to load properties which were marked to not be loaded
-        #   in particular request and fails since the session object is not
-        #   present. That is why the code bellow makes a custom transformation.
-        result = {}
-        for key in data.__dict__:
-            if not key.startswith("_"):
-                result[key] = serialize_data(getattr(data, key))
-        return result
+        return _serialize_model(data)
 
     raise ValueError(_("Can not serialize %s") % data)
 
 
+def _serialize_workload(workload):
+    result = serialize_data(workload)
+    # NOTE(agent): profiling data is stored as a json-encoded string
+    result["profiling_data"] = (json.loads(workload._profiling_data)
+                                if workload._profiling_data else {})
+    return result
+
+
 def serialize(fn):
     def wrapper(*args, **kwargs):
         result = fn(*args, **kwargs)
@@ -87,15 +133,101 @@ def serialize(fn):
     return wrapper
 
 
+class _SQLiteTuning(object):
+    """Applies the tuning profile to new connections to SQLite."""
+
+    def __init__(self):
+        self._last_checkpoint = time.time()
+        self._keeper = None
+        self._pid = os.getpid()
+
+    def keep_connection(self, engine):
+        # NOTE(agent): connections to file databases are not pooled,
+        #   so each session opens a new one. When the last connection is
+        #   closed, SQLite checkpoints WAL and removes it, which makes each
+        #   transaction even slower than without WAL. An idle connection is
+        #   kept open to avoid it.
+        self._keeper = engine.raw_connection()
+
+    def close(self):
+        if self._keeper is not None:
+            # NOTE(agent): a forked process inherits the kept connection, but
+            #   it belongs to the parent process and should not be closed here.
+            if self._pid == os.getpid():
+                self._keeper.close()
+            self._keeper = None
+
+    def on_connect(self, dbapi_con, con_record):
+        conf = CONF.sqlite
+        cursor = dbapi_con.cursor()
+        try:
+            cursor.execute("PRAGMA busy_timeout = %d"
+                           % int(conf.busy_timeout * 1000))
+            # NOTE(agent): WAL mode is persistent, so it is enough
+            #   to set it by the first (kept) connection.
+            if conf.journal_mode != "WAL" or self._keeper is None:
+                cursor.execute("PRAGMA journal_mode = %s"
+                               % conf.journal_mode)
+            cursor.execute("PRAGMA synchronous = %s" % conf.synchronous)
+            # NOTE(agent): a negative value is the size in KiB
+            cursor.execute("PRAGMA cache_size = -%d" % conf.cache_size)
+            cursor.execute("PRAGMA mmap_size = %d" % conf.mmap_size)
+            # NOTE(agent): connections are not pooled for file
+            #   databases, so a new connection is opened for each session
+            #   and it is a good place to checkpoint WAL from time to time.
+            if (conf.journal_mode == "WAL" and conf.checkpoint_interval
+                    and (time.time() - self._last_checkpoint
+                         >= conf.checkpoint_interval)):
+                self._last_checkpoint = time.time()
+                cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            cursor.close()
+
+
+def _tune_sqlite(engine):
+    """Set up the tuning profile for the SQLite file database.
+
+    :returns: _SQLiteTuning object or None if the profile is not applied
+    """
+    # NOTE(agent): the [sqlite] group is registered by rally.common.opts, the
+    #   profile is not applied if nothing registered it.
+    if ("sqlite" not in CONF or not CONF.sqlite.tuning
+            or engine.name != "sqlite"
+            or engine.url.database in (None, "", ":memory:")):
+        return None
+    tuning = _SQLiteTuning()
+    event.listen(engine, "connect", tuning.on_connect)
+    # NOTE(agent): the facade has already opened a connection to
+    #   test the database, it should not be reused without the profile.
+    engine.dispose()
+    if CONF.sqlite.journal_mode == "WAL":
+        tuning.keep_connection(engine)
+    return tuning
+
+
 def _create_facade_lazily():
-    global _FACADE
+    global _FACADE, _SQLITE_TUNING
 
     if _FACADE is None:
         _FACADE = db_session.EngineFacade.from_config(CONF)
+        _SQLITE_TUNING = _tune_sqlite(_FACADE.get_engine())
 
     return _FACADE
 
 
+@atexit.register
+def _dispose_facade():
+    """Close connections of the current engine and forget the facade."""
+    global _FACADE, _SQLITE_TUNING
+
+    if _SQLITE_TUNING is not None:
+        _SQLITE_TUNING.close()
+        _SQLITE_TUNING = None
+    if _FACADE is not None:
+        _FACADE.get_engine().dispose()
+        _FACADE = None
+
+
 def get_engine():
     facade = _create_facade_lazily()
     return facade.get_engine()
@@ -120,9 +252,7 @@ def _alembic_config():
 class Connection(object):
 
     def engine_reset(self):
-        global _FACADE
-
-        _FACADE = None
+        _dispose_facade()
 
     def schema_cleanup(self):
         models.drop_db()
@@ -226,6 +356,24 @@ class Connection(object):
 
         return list(set(t.tag for t in tags))
 
+    def _tags_get_all(self, uuids_query, tag_type, session=None):
+        """Get tags of several objects by one query.
+
+        :param uuids_query: a query which selects uuids of objects
+        :returns: dict with sorted lists of tags by uuids of objects
+        """
+        # NOTE(agent): the query can be limited and some backends
+        #   (i.e. MySQL) do not support LIMIT within IN subqueries, so
+        #   tags are joined to the derived table.
+        uuids = uuids_query.subquery()
+        tags = (self.model_query(models.Tag, session=session).
+                filter(models.Tag.type == tag_type).
+                join(uuids, models.Tag.uuid == uuids.c.uuid).all())
+        result = collections.defaultdict(set)
+        for tag in tags:
+            result[tag.uuid].add(tag.tag)
+        return dict((uuid, sorted(tags)) for uuid, tags in result.items())
+
     def _uuids_by_tags_get(self, tag_type, tags):
         tags = (self.model_query(models.Tag).
                 filter(models.Tag.type == tag_type,
@@ -255,14 +403,49 @@ class Connection(object):
                        for raw in workload_data.chunk_data["raw"]],
                       key=lambda x: x["timestamp"])
 
-    @serialize
-    def task_get(self, uuid=None, detailed=False):
+    def _task_workload_data_get_all_by_task_uuid(self, task_uuid,
+                                                 session=None):
+        """Get raw iterations of all workloads of the task by one query.
+
+        :returns: dict with lists of iterations by uuids of workloads
+        """
+        chunks = (self.model_query(models.WorkloadData, session=session).
+                  options(sa_loadonly("workload_uuid", "chunk_data")).
+                  filter_by(task_uuid=task_uuid).
+                  order_by(models.WorkloadData.chunk_order.asc()))
+        result = collections.defaultdict(list)
+        for chunk in chunks:
+            result[chunk.workload_uuid].extend(chunk.chunk_data["raw"])
+        for data in result.values():
+            data.sort(key=lambda x: x["timestamp"])
+        return result
+
+    def workload_data_iter(self, workload_uuid):
+        chunks = (self.model_query(models.WorkloadData).
+                  options(sa_loadonly("id")).
+                  filter_by(workload_uuid=workload_uuid).
+                  order_by(models.WorkloadData.chunk_order.asc()).all())
+        # NOTE(agent): each chunk is loaded by a separate query, so
+        #   only one chunk of raw data is kept in memory at a time.
+        for chunk_id in [chunk.id for chunk in chunks]:
+            chunk = (self.model_query(models.WorkloadData).
+                     options(sa_loadonly("chunk_data")).
+                     filter_by(id=chunk_id).first())
+            if chunk is None:
+                # the chunk was removed while iterating
+                continue
+            for raw in chunk.chunk_data["raw"]:
+                yield raw
+
+    def task_get(self, uuid=None, detailed=False, load_data=True):
+        # NOTE(agent): the result is serialized here, the serialize
+        #   decorator is not used to avoid copying raw data of workloads.
         session = get_session()
         task = serialize_data(self._task_get(uuid, session=session))
 
         if detailed:
             task["subtasks"] = self._subtasks_get_all_by_task_uuid(
-                uuid, session=session)
+                uuid, session=session, load_data=load_data)
 
         return task
 
@@ -332,11 +515,12 @@ class Connection(object):
         return result
 
     @serialize
-    def task_list(self, status=None, deployment=None, tags=None):
+    def task_list(self, status=None, deployment=None, tags=None, limit=None,
+                  marker=None):
         session = get_session()
         tasks = []
         with session.begin():
-            query = self.model_query(models.Task)
+            query = self.model_query(models.Task, session=session)
 
             filters = {}
             if status is not None:
@@ -352,9 +536,21 @@ class Connection(object):
                     consts.TagType.TASK, tags)
                 query = query.filter(models.Task.uuid.in_(uuids))
 
+            if limit is not None or marker is not None:
+                # NOTE(agent): pages start from the most recent
+                #   tasks, the marker is the last task of the previous page
+                query = query.order_by(models.Task.id.desc())
+                if marker is not None:
+                    marker = self._task_get(marker, load_only="id",
+                                            session=session)
+                    query = query.filter(models.Task.id < marker.id)
+                if limit is not None:
+                    query = query.limit(limit)
+
+            tags = self._tags_get_all(query.with_entities(models.Task.uuid),
+                                      consts.TagType.TASK, session=session)
             for task in query.all():
-                task.tags = sorted(
-                    self._tags_get(task.uuid, consts.TagType.TASK, session))
+                task.tags = tags.get(task.uuid, [])
                 tasks.append(task)
 
         return tasks
@@ -390,19 +586,27 @@ class Connection(object):
                                                            actual=task.status)
                 raise exceptions.TaskNotFound(uuid=uuid)
 
-    def _subtasks_get_all_by_task_uuid(self, task_uuid, session=None):
+    def _subtasks_get_all_by_task_uuid(self, task_uuid, session=None,
+                                       load_data=True):
         result = (self.model_query(models.Subtask, session=session).filter_by(
             task_uuid=task_uuid).all())
+        workloads = collections.defaultdict(list)
+        for workload in (self.model_query(models.Workload, session=session).
+                         filter_by(task_uuid=task_uuid).
+                         order_by(models.Workload.id.asc())):
+            workloads[workload.subtask_uuid].append(workload)
+        if load_data:
+            data = self._task_workload_data_get_all_by_task_uuid(
+                task_uuid, session=session)
+
         subtasks = []
         for subtask in result:
             subtask = serialize_data(subtask)
             subtask["workloads"] = []
-            workloads = (self.model_query(models.Workload, session=session).
-                         filter_by(subtask_uuid=subtask["uuid"]).all())
-            for workload in workloads:
-                workload.data = self._task_workload_data_get_all(
-                    workload.uuid)
-                subtask["workloads"].append(serialize_data(workload))
+            for workload in workloads[subtask["uuid"]]:
+                if load_data:
+                    workload.data = data.get(workload.uuid, [])
+                subtask["workloads"].append(_serialize_workload(workload))
             subtasks.append(subtask)
         return subtasks
 
@@ -425,10 +629,10 @@ class Connection(object):
         subtask.save()
         return subtask
 
-    @serialize
     def workload_get(self, workload_uuid):
-        return self.model_query(models.Workload).filter_by(
+        workload = self.model_query(models.Workload).filter_by(
             uuid=workload_uuid).first()
+        return _serialize_workload(workload) if workload else None
 
     @serialize
     def workload_create(self, task_uuid, subtask_uuid, name, description,
@@ -450,12 +654,8 @@ class Connection(object):
         workload.save()
         return workload
 
-    @serialize
-    def workload_data_create(self, task_uuid, workload_uuid, chunk_order,
-                             data):
-        workload_data = models.WorkloadData(task_uuid=task_uuid,
-                                            workload_uuid=workload_uuid)
-
+    @staticmethod
+    def _workload_data_values(task_uuid, workload_uuid, chunk_order, data):
         raw_data = data.get("raw", [])
         iter_count = len(raw_data)
 
@@ -483,7 +683,7 @@ class Connection(object):
         if finished_at == 0:
             finished_at = now
 
-        workload_data.update({
+        return {
             "task_uuid": task_uuid,
             "workload_uuid": workload_uuid,
             "chunk_order": chunk_order,
@@ -495,14 +695,89 @@ class Connection(object):
             "compressed_chunk_size": 0,
             "started_at": dt.datetime.fromtimestamp(started_at),
             "finished_at": dt.datetime.fromtimestamp(finished_at)
-        })
+        }
+
+    @serialize
+    def workload_data_create(self, task_uuid, workload_uuid, chunk_order,
+                             data):
+        workload_data = models.WorkloadData(task_uuid=task_uuid,
+                                            workload_uuid=workload_uuid)
+        workload_data.update(self._workload_data_values(
+            task_uuid, workload_uuid, chunk_order, data))
         workload_data.save()
         return workload_data
 
+    def workload_data_create_many(self, task_uuid, workload_uuid, chunks):
+        if not chunks:
+            return
+        rows = [self._workload_data_values(task_uuid, workload_uuid,
+                                           chunk_order, data)
+                for chunk_order, data in chunks]
+        session = get_session()
+        with session.begin():
+            # NOTE(agent): all chunks are inserted by one statement
+            #   within one transaction, ORM objects are not needed here.
+            session.execute(models.WorkloadData.__table__.insert(), rows)
+
+    def workload_data_compact(self, workload_uuid, data, archive=None):
+        session = get_session()
+        with session.begin():
+            workload = (self.model_query(models.Workload, session=session).
+                        options(sa_loadonly("task_uuid", "statistics",
+                                            "total_iteration_count")).
+                        filter_by(uuid=workload_uuid).first())
+            if not workload:
+                raise exceptions.ResourceNotFound(id=workload_uuid)
+            removed = (self.model_query(models.WorkloadData,
+                                        session=session).
+                       filter_by(workload_uuid=workload_uuid).
+                       delete(synchronize_session=False))
+            if data["raw"]:
+                session.execute(
+                    models.WorkloadData.__table__.insert(),
+                    [self._workload_data_values(
+                        workload.task_uuid, workload_uuid, 0, data)])
+            # NOTE(agent): the statistics are not changed, they are
+            #   calculated by all iterations while only a part of them is
+            #   left in the database.
+            statistics = dict(workload.statistics)
+            statistics["compaction"] = {
+                "stored_iterations": len(data["raw"]),
+                "archive": archive}
+            session.query(models.Workload).filter_by(
+                uuid=workload_uuid).update({"statistics": statistics})
+        return removed
+
+    def vacuum(self):
+        engine = get_engine()
+        dialect = engine.dialect.name
+        if dialect == "mysql":
+            statements = ["OPTIMIZE TABLE %s" % table
+                          for table in models.BASE.metadata.sorted_tables]
+        elif dialect == "postgresql":
+            statements = ["VACUUM ANALYZE"]
+        elif dialect == "sqlite":
+            statements = ["VACUUM", "ANALYZE"]
+            if (_SQLITE_TUNING is not None
+                    and CONF.sqlite.journal_mode == "WAL"):
+                statements.append("PRAGMA wal_checkpoint(TRUNCATE)")
+        else:
+            return False
+        with engine.connect() as connection:
+            if dialect == "postgresql":
+                # NOTE(agent): VACUUM can not be executed within a
+                #   transaction block.
+                connection = connection.execution_options(
+                    isolation_level="AUTOCOMMIT")
+            for statement in statements:
+                connection.execute(statement)
+        return True
+
     @serialize
     def workload_set_results(self, workload_uuid, subtask_uuid, task_uuid,
                              load_duration, full_duration, start_time,
-                             sla_results, hooks_results):
+                             sla_results, hooks_results,
+                             context_execution=None, runner_statistics=None):
         session = get_session()
         with session.begin():
             workload_results = self._task_workload_data_get_all(workload_uuid)
@@ -546,8 +821,35 @@ class Connection(object):
                 {"total_iteration_count": iter_count,
                  "statistics": {"atomics": atomics}})
 
+            traces = []
+            cpu_durations = []
+            cpu_ratios = []
             for itr in workload_results:
                 durations_stat.add_iteration(itr)
+                if itr.get("profiling"):
+                    traces.append(dict(itr["profiling"],
+                                       duration=itr["duration"],
+                                       error=bool(itr["error"])))
+                if itr.get("cpu_duration") is not None:
+                    cpu_durations.append(itr["cpu_duration"])
+                    if itr["duration"]:
+                        cpu_ratios.append(
+                            itr["cpu_duration"] / itr["duration"])
+            traces.sort(key=lambda t: t["iteration"])
+
+            statistics = {"durations": durations_stat.to_dict(),
+                          "atomics": atomics}
+            if cpu_durations:
+                # NOTE(agent): CPU time which the load generator
+                #   spends on iterations tells whether it is a bottleneck.
+                statistics["client_overhead"] = {
+                    "avg_cpu_duration": (sum(cpu_durations)
+                                         / len(cpu_durations)),
+                    "max_cpu_duration": max(cpu_durations),
+                    "avg_cpu_ratio": (sum(cpu_ratios) / len(cpu_ratios)
+                                      if cpu_ratios else 0.0)}
+            if runner_statistics:
+                statistics["runner"] = runner_statistics
 
             sla = sla_results or []
             # NOTE(ikhudoshyn): we call it 'pass_sla'
@@ -559,7 +861,7 @@ class Connection(object):
                 uuid=workload_uuid).update(
                 {
                     "sla_results": {"sla": sla},
-                    "context_execution": {},
+                    "context_execution": context_execution or {},
                     "hooks": hooks_results or [],
                     "load_duration": load_duration,
                     "full_duration": full_duration,
@@ -568,9 +870,10 @@ class Connection(object):
                     "total_iteration_count": iter_count,
                     "failed_iteration_count": failed_iter_count,
                     "start_time": start_time,
-                    "statistics": {"durations": durations_stat.to_dict(),
-                                   "atomics": atomics},
-                    "pass_sla": success}
+                    "statistics": statistics,
+                    "pass_sla": success,
+                    "_profiling_data": (json.dumps({"traces": traces})
+                                        if traces else "")}
             )
             task_values = {
                 "task_duration": models.Task.task_duration + load_duration}
@@ -793,6 +1096,10 @@ class Connection(object):
     def verification_delete(self, verification_uuid):
         session = get_session()
         with session.begin():
+            self.model_query(
+                models.VerificationTest, session=session).filter_by(
+                verification_uuid=verification_uuid).delete(
+                synchronize_session=False)
             count = self.model_query(
                 models.Verification, session=session).filter_by(
                 uuid=verification_uuid).delete(synchronize_session=False)
@@ -808,6 +1115,64 @@ class Connection(object):
             verification.save()
         return verification
 
+    @serialize
+    def verification_tests_add(self, verification_uuid, tests):
+        session = get_session()
+        with session.begin():
+            verification = self._verification_get(verification_uuid,
+                                                  session=session)
+            test_ids = list(tests)
+            existing = {}
+            for i in range(0, len(test_ids), _TESTS_QUERY_CHUNK):
+                query = self.model_query(
+                    models.VerificationTest, session=session).filter(
+                    models.VerificationTest.verification_uuid ==
+                    verification_uuid,
+                    models.VerificationTest.test_id.in_(
+                        test_ids[i:i + _TESTS_QUERY_CHUNK]))
+                existing.update((t.test_id, t) for t in query)
+
+            new_tests = []
+            for test_id, test in tests.items():
+                if test_id in existing:
+                    existing[test_id].update({"status": test["status"],
+                                              "data": test})
+                else:
+                    new_tests.append({"verification_uuid": verification_uuid,
+                                      "test_id": test_id,
+                                      "status": test["status"],
+                                      "data": test})
+            if new_tests:
+                session.bulk_insert_mappings(models.VerificationTest,
+                                             new_tests)
+            session.flush()
+
+            # NOTE(agent): counters of tests are recalculated from the
+            #   stored tests, so they are always up to date even while the
+            #   verification is running.
+            counts = dict(
+                session.query(models.VerificationTest.status,
+                              func.count(models.VerificationTest.id)).filter(
+                    models.VerificationTest.verification_uuid ==
+                    verification_uuid).group_by(
+                    models.VerificationTest.status))
+            totals = {"tests_count": sum(counts.values())}
+            for status, field in _TESTS_COUNTERS.items():
+                totals[field] = counts.get(status, 0)
+            verification.update(totals)
+        return verification
+
+    def verification_tests_get(self, verification_uuid, status=None):
+        query = self.model_query(models.VerificationTest).filter_by(
+            verification_uuid=verification_uuid)
+        if status:
+            if isinstance(status, six.string_types):
+                status = [status]
+            query = query.filter(models.VerificationTest.status.in_(status))
+        return collections.OrderedDict(
+            (t.test_id, t.data)
+            for t in query.order_by(models.VerificationTest.id))
+
     @serialize
     def register_worker(self, values):
         try:
@@ -828,6 +1193,11 @@ class Connection(object):
         except NoResultFound:
             raise exceptions.WorkerNotFound(worker=hostname)
 
+    @serialize
+    def list_workers(self):
+        return (self.model_query(models.Worker).
+                order_by(models.Worker.id).all())
+
     def unregister_worker(self, hostname):
         count = (self.model_query(models.Worker).
                  filter_by(hostname=hostname).delete())
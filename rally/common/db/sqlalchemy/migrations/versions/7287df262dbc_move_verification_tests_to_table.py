@@ -0,0 +1,83 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""move verification tests to a separate table
+
+Revision ID: 7287df262dbc
+Revises: c517b0011857
+Create Date: 2017-07-12 15:31:40.581346
+
+"""
+
+from alembic import op
+from oslo_utils import timeutils
+import sqlalchemy as sa
+
+from rally.common.db.sqlalchemy import types as sa_types
+from rally import exceptions
+
+# revision identifiers, used by Alembic.
+revision = "7287df262dbc"
+down_revision = "c517b0011857"
+branch_labels = None
+depends_on = None
+
+
+verification_helper = sa.Table(
+    "verifications",
+    sa.MetaData(),
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("uuid", sa.String(36), nullable=False),
+    sa.Column("tests", sa_types.MutableJSONEncodedDict, default={})
+)
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    verification_tests_table = op.create_table(
+        "verification_tests",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("verification_uuid", sa.String(36), nullable=False),
+        sa.Column("test_id", sa.Text, nullable=False),
+        sa.Column("status", sa.String(36), nullable=False),
+        sa.Column("data", sa_types.MutableJSONEncodedDict, nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+        sa.ForeignKeyConstraint(["verification_uuid"], ["verifications.uuid"])
+    )
+
+    op.create_index("verification_test_verification_uuid_status",
+                    "verification_tests", ["verification_uuid", "status"])
+
+    for verification in connection.execute(verification_helper.select()):
+        if not verification.tests:
+            continue
+        now = timeutils.utcnow()
+        connection.execute(
+            verification_tests_table.insert(),
+            [{"verification_uuid": verification.uuid,
+              "test_id": test_id,
+              "status": test["status"],
+              "data": test,
+              "created_at": now,
+              "updated_at": now}
+             for test_id, test in verification.tests.items()])
+
+    with op.batch_alter_table("verifications") as batch_op:
+        batch_op.drop_column("tests")
+
+
+def downgrade():
+    raise exceptions.DowngradeNotSupported()
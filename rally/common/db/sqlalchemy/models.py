@@ -395,7 +395,28 @@ class Verification(BASE, RallyBase):
     expected_failures = sa.Column(sa.Integer, default=0)
     tests_duration = sa.Column(sa.Float, default=0.0)
 
-    tests = sa.Column(sa_types.MutableJSONEncodedDict, default={})
+
+class VerificationTest(BASE, RallyBase):
+    """Represents a result of a single test of a verification."""
+
+    __tablename__ = "verification_tests"
+    __table_args__ = (
+        sa.Index("verification_test_verification_uuid_status",
+                 "verification_uuid", "status"),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+
+    verification_uuid = sa.Column(
+        sa.String(36),
+        sa.ForeignKey(Verification.uuid),
+        nullable=False,
+    )
+
+    test_id = sa.Column(sa.Text, nullable=False)
+    status = sa.Column(sa.String(36), nullable=False)
+    data = sa.Column(sa_types.MutableJSONEncodedDict, default={},
+                     nullable=False)
 
 
 class Worker(BASE, RallyBase):
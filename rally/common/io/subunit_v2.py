@@ -14,12 +14,20 @@
 #    under the License.
 #
 
+import collections
+import threading
+
 from oslo_utils import encodeutils
+from six.moves import queue as Queue
 from subunit import v2
 
 from rally.common import logging
 
 
+# The default number of finished tests to pass to a callback at once.
+BATCH_SIZE = 100
+
+
 def prepare_input_args(func):
     # NOTE(andreykurilin): Variables 'runnable', 'eof', 'route_code' are not
     # used in parser.
@@ -47,6 +55,15 @@ def prepare_input_args(func):
     return inner
 
 
+def _get_prefixes(test_id):
+    """Yield the test ID and IDs of all its parents (modules, classes)."""
+    pos = test_id.find(".")
+    while pos > -1:
+        yield test_id[:pos]
+        pos = test_id.find(".", pos + 1)
+    yield test_id
+
+
 def _parse_test_tags(test_id):
     tags = []
     if test_id.find("[") > -1:
@@ -56,9 +73,17 @@ def _parse_test_tags(test_id):
 
 
 class SubunitV2StreamResult(object):
+    """Collects results of tests from subunit v2 stream.
+
+    If on_tests callback is specified, results of finished tests are passed
+    to it in batches while the stream is parsed, so they can be stored
+    before the whole run is over. Results which are changed afterwards (for
+    example, a test class is skipped or failed as a whole) are passed again
+    when the stream ends.
+    """
 
     def __init__(self, expected_failures=None, skipped_tests=None, live=False,
-                 logger_name=None):
+                 logger_name=None, on_tests=None, batch_size=None):
         self._tests = {}
         self._expected_failures = expected_failures or {}
         self._skipped_tests = skipped_tests or {}
@@ -73,9 +98,22 @@ class SubunitV2StreamResult(object):
         self._last_timestamp = None
 
         # Store unknown entities and process them later.
-        self._unknown_entities = {}
+        self._unknown_entities = collections.OrderedDict()
         self._is_parsed = False
 
+        # NOTE(agent): attachments ("traceback" and "reason") of tests
+        #   and unknown entities come by chunks. They are collected as lists
+        #   of chunks and joined at once, since extending immutable bytes
+        #   with each chunk is quadratic.
+        self._attachments = collections.defaultdict(list)
+
+        self._on_tests = on_tests
+        self._batch_size = batch_size or BATCH_SIZE
+        # IDs of finished tests which are not passed to on_tests yet
+        self._pending_tests = collections.OrderedDict()
+        # IDs of tests which are passed to on_tests
+        self._passed_tests = set()
+
     @staticmethod
     def _get_test_name(test_id):
         return test_id.split("[")[0] if test_id.find("[") > -1 else test_id
@@ -92,7 +130,8 @@ class SubunitV2StreamResult(object):
                 self._tests[test_id]["status"] = "uxsuccess"
 
     def _process_skipped_tests(self):
-        for t_id in self._skipped_tests.copy():
+        skipped_tests, self._skipped_tests = self._skipped_tests, {}
+        for t_id, reason in skipped_tests.items():
             if t_id not in self._tests:
                 status = "skip"
                 name = self._get_test_name(t_id)
@@ -100,33 +139,71 @@ class SubunitV2StreamResult(object):
                                      "name": name,
                                      "duration": "%.3f" % 0,
                                      "tags": _parse_test_tags(t_id)}
-                if self._skipped_tests[t_id]:
-                    self._tests[t_id]["reason"] = self._skipped_tests[t_id]
-                    status += ": %s" % self._tests[t_id]["reason"]
+                if reason:
+                    self._tests[t_id]["reason"] = reason
+                    status += ": %s" % reason
                 if self._live:
                     self._logger.info("{-} %s ... %s", name, status)
-
-            self._skipped_tests.pop(t_id)
+                self._test_finished(t_id)
+
+    def _join_attachments(self, entity_id, entity):
+        for file_name in ["traceback", "reason"]:
+            chunks = self._attachments.pop((entity_id, file_name), None)
+            if chunks:
+                if file_name in entity:
+                    chunks.insert(0, encodeutils.safe_encode(
+                        entity[file_name]))
+                entity[file_name] = b"".join(chunks)
+
+    def _test_finished(self, test_id):
+        if self._on_tests is None:
+            return
+        self._pending_tests[test_id] = True
+        if len(self._pending_tests) >= self._batch_size:
+            self._pass_tests(list(self._pending_tests))
+            self._pending_tests.clear()
+
+    def _pass_tests(self, test_ids):
+        batch = {}
+        for test_id in test_ids:
+            self._join_attachments(test_id, self._tests[test_id])
+            test = dict(self._tests[test_id])
+            for file_name in ["traceback", "reason"]:
+                if file_name in test:
+                    test[file_name] = encodeutils.safe_decode(test[file_name])
+            batch[test_id] = test
+        self._passed_tests.update(test_ids)
+        self._on_tests(batch)
 
     def _parse(self):
+        for entity_id, file_name in list(self._attachments):
+            if entity_id in self._tests:
+                self._join_attachments(entity_id, self._tests[entity_id])
+            elif entity_id in self._unknown_entities:
+                self._join_attachments(entity_id,
+                                       self._unknown_entities[entity_id])
+
         # NOTE(andreykurilin): When whole test class is marked as skipped or
         # failed, there is only one event with reason and status. So we should
-        # modify all tests of test class manually.
-        for test_id in self._unknown_entities:
-            known_test_ids = filter(lambda t:
-                                    t == test_id or t.startswith(
-                                        "%s." % test_id), self._tests)
-            for t_id in known_test_ids:
-                if self._tests[t_id]["status"] == "init":
-                    self._tests[t_id]["status"] = (
-                        self._unknown_entities[test_id]["status"])
-
-                if self._unknown_entities[test_id].get("reason"):
-                    self._tests[t_id]["reason"] = (
-                        self._unknown_entities[test_id]["reason"])
-                elif self._unknown_entities[test_id].get("traceback"):
-                    self._tests[t_id]["traceback"] = (
-                        self._unknown_entities[test_id]["traceback"])
+        # modify all tests of test class manually. Instead of matching each
+        # unknown entity against all tests, parents of each test are looked
+        # up among unknown entities.
+        if self._unknown_entities:
+            order = dict((entity_id, i) for i, entity_id in
+                         enumerate(self._unknown_entities))
+            for t_id, test in self._tests.items():
+                parents = [p for p in _get_prefixes(t_id)
+                           if p in self._unknown_entities]
+                for parent in sorted(parents, key=order.get):
+                    entity = self._unknown_entities[parent]
+                    if test["status"] == "init":
+                        test["status"] = entity["status"]
+
+                    if entity.get("reason"):
+                        test["reason"] = entity["reason"]
+                    elif entity.get("traceback"):
+                        test["traceback"] = entity["traceback"]
+                    self._passed_tests.discard(t_id)
 
         # decode data
         for test_id in self._tests:
@@ -139,6 +216,13 @@ class SubunitV2StreamResult(object):
 
         self._is_parsed = True
 
+        if self._on_tests is not None:
+            test_ids = [t_id for t_id in self._tests
+                        if t_id not in self._passed_tests]
+            for i in range(0, len(test_ids), self._batch_size):
+                self._pass_tests(test_ids[i:i + self._batch_size])
+            self._pending_tests.clear()
+
     @property
     def tests(self):
         if not self._is_parsed:
@@ -151,22 +235,27 @@ class SubunitV2StreamResult(object):
         if self._first_timestamp:
             td = (self._last_timestamp - self._first_timestamp).total_seconds()
 
+        statuses = collections.Counter(
+            test["status"] for test in self.tests.values())
         return {"tests_count": len(self.tests),
                 "tests_duration": "%.3f" % td,
-                "failures": len(self.filter_tests("fail")),
-                "skipped": len(self.filter_tests("skip")),
-                "success": len(self.filter_tests("success")),
-                "unexpected_success": len(self.filter_tests("uxsuccess")),
-                "expected_failures": len(self.filter_tests("xfail"))}
+                "failures": statuses["fail"],
+                "skipped": statuses["skip"],
+                "success": statuses["success"],
+                "unexpected_success": statuses["uxsuccess"],
+                "expected_failures": statuses["xfail"]}
 
     @prepare_input_args
     def status(self, test_id=None, test_status=None, timestamp=None, tags=None,
                file_name=None, file_bytes=None, worker=None, mime_type=None,
                charset=None):
         if timestamp:
-            if not self._first_timestamp:
+            # NOTE(agent): events of merged streams are not ordered
+            #   by time, so the earliest and the latest ones are tracked.
+            if not self._first_timestamp or timestamp < self._first_timestamp:
                 self._first_timestamp = timestamp
-            self._last_timestamp = timestamp
+            if not self._last_timestamp or timestamp > self._last_timestamp:
+                self._last_timestamp = timestamp
 
         if test_status == "exists":
             self._tests[test_id] = {"status": "init",
@@ -184,21 +273,22 @@ class SubunitV2StreamResult(object):
                     timestamp - self._timestamps[test_id]).total_seconds()
                 self._tests[test_id]["status"] = test_status
 
+                self._join_attachments(test_id, self._tests[test_id])
                 self._check_expected_failure(test_id)
+                self._test_finished(test_id)
             else:
                 if file_name in ["traceback", "reason"]:
-                    if file_name not in self._tests[test_id]:
-                        self._tests[test_id][file_name] = file_bytes
-                    else:
-                        self._tests[test_id][file_name] += file_bytes
+                    self._attachments[(test_id, file_name)].append(file_bytes)
+                    if self._tests[test_id]["status"] != "init":
+                        # the test is finished, but its details are still
+                        # coming, so it should be passed once again
+                        self._passed_tests.discard(test_id)
+                        self._test_finished(test_id)
         else:
             self._unknown_entities.setdefault(test_id, {"name": test_id})
             self._unknown_entities[test_id]["status"] = test_status
             if file_name in ["traceback", "reason"]:
-                if file_name not in self._unknown_entities[test_id]:
-                    self._unknown_entities[test_id][file_name] = file_bytes
-                else:
-                    self._unknown_entities[test_id][file_name] += file_bytes
+                self._attachments[(test_id, file_name)].append(file_bytes)
 
         if self._skipped_tests:
             self._process_skipped_tests()
@@ -217,6 +307,8 @@ class SubunitV2StreamResult(object):
                 if test_id in self._tests:
                     reason = self._tests[test_id].get("reason")
                 else:
+                    self._join_attachments(test_id,
+                                           self._unknown_entities[test_id])
                     reason = self._unknown_entities[test_id].get("reason")
                 if reason:
                     status += ": %s" % reason
@@ -227,25 +319,82 @@ class SubunitV2StreamResult(object):
 
     def filter_tests(self, status):
         """Filter tests by given status."""
-        filtered_tests = {}
-        for test in self.tests:
-            if self.tests[test]["status"] == status:
-                filtered_tests[test] = self.tests[test]
-
-        return filtered_tests
+        return dict((test_id, test) for test_id, test in self.tests.items()
+                    if test["status"] == status)
 
 
 def parse(stream, expected_failures=None, skipped_tests=None, live=False,
-          logger_name=None):
+          logger_name=None, on_tests=None):
     results = SubunitV2StreamResult(expected_failures, skipped_tests, live,
-                                    logger_name)
+                                    logger_name, on_tests)
     v2.ByteStreamToStreamResult(stream, "non-subunit").run(results)
+    if on_tests is not None:
+        # NOTE(agent): the stream is over, so the rest of results
+        #   should be post-processed and passed to the callback.
+        results._parse()
+
+    return results
+
+
+class _StreamEvents(object):
+    """Puts events of a stream to the queue to merge them with other streams.
+
+    Tests of each stream are marked as tests of a separate worker unless
+    the stream specifies workers itself.
+    """
+
+    def __init__(self, events, worker):
+        self._events = events
+        self._worker = "worker-%s" % worker
+
+    def status(self, **kwargs):
+        if not kwargs.get("test_tags"):
+            kwargs["test_tags"] = set([self._worker])
+        self._events.put(kwargs)
+
+
+def parse_streams(streams, expected_failures=None, skipped_tests=None,
+                  live=False, logger_name=None, on_tests=None):
+    """Parse several subunit v2 streams into one result.
+
+    Streams are read concurrently (for example, outputs of several test
+    runners launched in parallel), while their events are parsed
+    sequentially in the calling thread as soon as they come.
+    """
+    results = SubunitV2StreamResult(expected_failures, skipped_tests, live,
+                                    logger_name, on_tests)
+    events = Queue.Queue()
+
+    def read(stream, worker):
+        try:
+            v2.ByteStreamToStreamResult(stream, "non-subunit").run(
+                _StreamEvents(events, worker))
+        finally:
+            # the end of the stream
+            events.put(None)
+
+    readers = []
+    for i, stream in enumerate(streams):
+        reader = threading.Thread(target=read, args=(stream, i))
+        reader.daemon = True
+        reader.start()
+        readers.append(reader)
+
+    running = len(readers)
+    while running:
+        event = events.get()
+        if event is None:
+            running -= 1
+        else:
+            results.status(**event)
+    if on_tests is not None:
+        results._parse()
 
     return results
 
 
 def parse_file(filename, expected_failures=None, skipped_tests=None,
-               live=False, logger_name=None):
+               live=False, logger_name=None, on_tests=None):
     with open(filename, "rb") as stream:
         return parse(stream, expected_failures, skipped_tests, live,
-                     logger_name)
+                     logger_name, on_tests)
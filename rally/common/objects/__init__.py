@@ -21,3 +21,4 @@ from rally.common.objects.task import Task  # noqa
 from rally.common.objects.task import Workload  # noqa
 from rally.common.objects.verification import Verification  # noqa
 from rally.common.objects.verifier import Verifier  # noqa
+from rally.common.objects.worker import Worker  # noqa
@@ -312,6 +312,20 @@ TASK_EXTENDED_RESULT_SCHEMA = {
 }
 
 
+class LazyWorkloadData(object):
+    """Iterable over raw iterations of a workload which are stored in DB.
+
+    Iterations are not kept in memory, they are loaded chunk by chunk each
+    time the object is iterated over.
+    """
+
+    def __init__(self, workload_uuid):
+        self.workload_uuid = workload_uuid
+
+    def __iter__(self):
+        return iter(db.workload_data_iter(self.workload_uuid))
+
+
 class Task(object):
     """Represents a task object.
 
@@ -375,17 +389,41 @@ class Task(object):
         return db_task
 
     @classmethod
-    def get(cls, uuid, detailed=False):
-        return cls(db.api.task_get(uuid, detailed=detailed))
+    def get(cls, uuid, detailed=False, data="full"):
+        """Get task by uuid.
+
+        :param uuid: UUID of the task
+        :param detailed: whether load subtasks and workloads or not
+        :param data: how raw iterations of workloads are loaded. Makes sense
+            only for detailed mode.
+            "full" - all of them are loaded at once;
+            "lazy" - they are replaced with LazyWorkloadData objects which
+                load them from the database by chunks while iterating;
+            None - they are not loaded, workloads contain only summaries
+                (statistics, SLA results, etc).
+        """
+        if data not in ("full", "lazy", None):
+            raise exceptions.InvalidArgumentsException(
+                "data should be one of 'full', 'lazy' or None, but got %r."
+                % data)
+        task = db.api.task_get(uuid, detailed=detailed,
+                               load_data=data == "full")
+        if detailed and data == "lazy":
+            for subtask in task["subtasks"]:
+                for workload in subtask["workloads"]:
+                    workload["data"] = LazyWorkloadData(workload["uuid"])
+        return cls(task)
 
     @staticmethod
     def get_status(uuid):
         return db.task_get_status(uuid)
 
     @staticmethod
-    def list(status=None, deployment=None, tags=None):
+    def list(status=None, deployment=None, tags=None, limit=None,
+             marker=None):
         return [Task(db_task) for db_task in db.task_list(
-            status, deployment=deployment, tags=tags)]
+            status, deployment=deployment, tags=tags, limit=limit,
+            marker=marker)]
 
     @staticmethod
     def delete_by_uuid(uuid, status=None):
@@ -484,8 +522,29 @@ class Workload(object):
                                 self.workload["uuid"], chunk_order,
                                 workload_data)
 
+    def add_workload_data_chunks(self, chunks):
+        """Save several chunks of workload data at once.
+
+        :param chunks: list of pairs of ordinal index and workload data
+        """
+        db.workload_data_create_many(self.workload["task_uuid"],
+                                     self.workload["uuid"], chunks)
+
+    @staticmethod
+    def compact_workload_data(workload_uuid, workload_data, archive=None):
+        """Replace all the workload data by the given one.
+
+        :param workload_uuid: UUID of the workload
+        :param workload_data: workload data which is left in the database
+        :param archive: path to the file with all the raw iterations
+        :returns: the number of removed chunks of workload data
+        """
+        return db.workload_data_compact(workload_uuid, workload_data,
+                                        archive=archive)
+
     def set_results(self, load_duration, full_duration, start_time,
-                    sla_results, hooks_results=None):
+                    sla_results, hooks_results=None, context_execution=None,
+                    runner_statistics=None):
         db.workload_set_results(workload_uuid=self.workload["uuid"],
                                 subtask_uuid=self.workload["subtask_uuid"],
                                 task_uuid=self.workload["task_uuid"],
@@ -493,7 +552,9 @@ class Workload(object):
                                 full_duration=full_duration,
                                 start_time=start_time,
                                 sla_results=sla_results,
-                                hooks_results=hooks_results)
+                                hooks_results=hooks_results,
+                                context_execution=context_execution,
+                                runner_statistics=runner_statistics)
 
     @classmethod
     def format_workload_config(cls, workload):
@@ -28,18 +28,33 @@ class Verification(object):
                              in the database
         """
         self._db_entry = verification
+        # IDs of tests which are stored by this object
+        self._stored_tests = set()
 
     def __getattr__(self, attr):
         return self._db_entry[attr]
 
     def __getitem__(self, item):
+        if item == "tests":
+            return self.tests
         return self._db_entry[item]
 
-    def to_dict(self, item=None):
+    @property
+    def tests(self):
+        return self.get_tests()
+
+    def get_tests(self, status=None):
+        """Get results of tests of the verification.
+
+        :param status: a status or a list of statuses to filter tests by
+        """
+        return db.verification_tests_get(self.uuid, status)
+
+    def to_dict(self, item=None, include_tests=True):
         data = {}
         formatters = ["created_at", "updated_at"]
         fields = ["deployment_uuid", "verifier_uuid", "uuid", "id",
-                  "unexpected_success", "status", "tests", "skipped",
+                  "unexpected_success", "status", "skipped",
                   "tags", "tests_duration", "run_args", "success",
                   "expected_failures", "tests_count", "failures"]
         for field in fields:
@@ -47,6 +62,8 @@ class Verification(object):
         for field in formatters:
             data[field] = self._db_entry.get(field, "").strftime(
                 self.TIME_FORMAT)
+        if include_tests:
+            data["tests"] = self.tests
         return data
 
     @classmethod
@@ -74,13 +91,30 @@ class Verification(object):
     def update_status(self, status):
         self._update(status=status)
 
-    def finish(self, totals, tests):
+    def add_tests(self, tests):
+        """Store results of a batch of tests.
+
+        It is designed to be called while tests are running, so results
+        are not lost if the verification crashes.
+
+        :param tests: a dict with results of tests where keys are test IDs
+        """
+        self._db_entry = db.verification_tests_add(self.uuid, tests)
+        self._stored_tests.update(tests)
+
+    def finish(self, totals, tests=None):
+        if tests:
+            not_stored = dict((test_id, test)
+                              for test_id, test in tests.items()
+                              if test_id not in self._stored_tests)
+            if not_stored:
+                self.add_tests(not_stored)
         if (totals.get("failures", 0) == 0 and
                 totals.get("unexpected_success", 0) == 0):
             status = consts.VerificationStatus.FINISHED
         else:
             status = consts.VerificationStatus.FAILED
-        self._update(status=status, tests=tests, **totals)
+        self._update(status=status, **totals)
 
     def set_error(self, error_message):
         # TODO(andreykurilin): Save error message in the database.
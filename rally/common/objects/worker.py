@@ -0,0 +1,53 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_utils import timeutils
+
+from rally.common import db
+
+
+class Worker(object):
+    """Represents a registered worker service (e.g. a load agent)."""
+
+    def __init__(self, worker=None, hostname=None):
+        if worker:
+            self.worker = worker
+        else:
+            self.worker = db.register_worker({"hostname": hostname})
+
+    def __getitem__(self, key):
+        return self.worker[key]
+
+    @classmethod
+    def get(cls, hostname):
+        return cls(db.get_worker(hostname))
+
+    @classmethod
+    def list(cls, alive_within=None):
+        """Get registered workers.
+
+        :param alive_within: return only workers which have been updated
+            during this number of seconds
+        """
+        workers = [cls(w) for w in db.list_workers()]
+        if alive_within is not None:
+            workers = [w for w in workers if not timeutils.is_older_than(
+                w["updated_at"], alive_within)]
+        return workers
+
+    def update(self):
+        db.update_worker(self.worker["hostname"])
+
+    def delete(self):
+        db.unregister_worker(self.worker["hostname"])
@@ -16,9 +16,11 @@ import itertools
 
 from oslo_config import cfg
 
+from rally.common.db import api as db_api
 from rally.common import logging
 from rally import osclients
 from rally.plugins.openstack.cfg import opts as openstack_opts
+from rally.task import distributed
 from rally.task import engine
 
 CONF = cfg.CONF
@@ -33,6 +35,8 @@ def list_opts():
     merged_opts["DEFAULT"] = itertools.chain(logging.DEBUG_OPTS,
                                              osclients.OSCLIENTS_OPTS,
                                              engine.TASK_ENGINE_OPTS)
+    merged_opts["distributed"] = distributed.DISTRIBUTED_OPTS
+    merged_opts["sqlite"] = db_api.SQLITE_OPTS
     return merged_opts.items()
 
 
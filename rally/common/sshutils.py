@@ -42,6 +42,20 @@ Execute local script on remote side:
     status, out, err = ssh.execute("/bin/sh -s arg1 arg2",
                                    stdin=open("~/myscript.sh", "r"))
 
+Objects of the same server and credentials share one connection, which
+is closed when all of them are closed:
+
+    ssh = sshclient.SSH("user", "example.com")
+    ssh.wait()
+    ssh.execute("uname")
+    ssh.close()
+
+Execute command on many servers concurrently:
+
+    ssh_objects = [sshclient.SSH("user", ip) for ip in ips]
+    for result in sshclient.execute_on_hosts(ssh_objects, "uptime"):
+        print(result["host"], result["status"], result["stdout"])
+
 Upload file:
 
     ssh = sshclient.SSH("user", "example.com")
@@ -60,6 +74,7 @@ Eventlet:
 import os
 import select
 import socket
+import threading
 import time
 
 import paramiko
@@ -70,6 +85,75 @@ from rally import exceptions
 
 LOG = logging.getLogger(__name__)
 
+# NOTE(agent): paramiko sends data in packets of up to 32KiB, so
+#   reading less makes the loop spin several times per packet.
+_READ_SIZE = 32768
+
+
+class _ClientPool(object):
+    """Share connected paramiko clients between SSH objects.
+
+    paramiko multiplexes sessions over a single transport, so all SSH
+    objects of the same server and credentials run their commands over
+    one connection, which is closed when the last of them is closed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._connect_locks = {}
+
+    @staticmethod
+    def _is_active(client):
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def _get(self, key):
+        entry = self._clients.get(key)
+        if entry and self._is_active(entry[0]):
+            entry[1] += 1
+            return entry[0]
+
+    def acquire(self, key, connect):
+        """Get a connected client for the key.
+
+        :param key: hashable identifier of the server and credentials
+        :param connect: a callable which returns a new connected client
+        """
+        with self._lock:
+            client = self._get(key)
+            if client:
+                return client
+            connect_lock = self._connect_locks.setdefault(key,
+                                                          threading.Lock())
+        # NOTE(agent): only one thread connects to the server while
+        #   the others wait for the connection, and clients of other servers
+        #   are not blocked
+        with connect_lock:
+            with self._lock:
+                client = self._get(key)
+                if client:
+                    return client
+            client = connect()
+            with self._lock:
+                self._clients[key] = [client, 1]
+                return client
+
+    def release(self, key, client):
+        """Release the client and close it if it is not used anymore."""
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry and entry[0] is client:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return
+                del self._clients[key]
+                self._connect_locks.pop(key, None)
+        client.close()
+
+
+_POOL = _ClientPool()
+
 
 class SSH(object):
     """Represent ssh connection."""
@@ -93,6 +177,9 @@ class SSH(object):
         self.password = password
         self.key_filename = key_filename
         self._client = False
+        # NOTE(agent): the object can be shared by threads, so the client is
+        #   acquired from the pool and released once per object
+        self._client_lock = threading.Lock()
 
     def _get_pkey(self, key):
         if isinstance(key, six.string_types):
@@ -105,31 +192,40 @@ class SSH(object):
                 errors.append(e)
         raise exceptions.SSHError("Invalid pkey: %s" % (errors))
 
-    def _get_client(self):
-        if self._client:
-            return self._client
+    def _pool_key(self):
+        return (self.user, self.host, self.port, self.pkey,
+                self.key_filename, self.password)
+
+    def _connect(self):
         try:
-            self._client = paramiko.SSHClient()
-            self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self._client.connect(self.host, username=self.user,
-                                 port=self.port, pkey=self.pkey,
-                                 key_filename=self.key_filename,
-                                 password=self.password, timeout=1)
-            return self._client
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(self.host, username=self.user,
+                           port=self.port, pkey=self.pkey,
+                           key_filename=self.key_filename,
+                           password=self.password, timeout=1)
+            return client
         except Exception as e:
             message = ("Exception %(exception_type)s was raised "
                        "during connect to %(user)s@%(host)s:%(port)s. "
                        "Exception value is: %(exception)r")
-            self._client = False
             raise exceptions.SSHError(message % {"exception": e,
                                                  "user": self.user,
                                                  "host": self.host,
                                                  "port": self.port,
                                                  "exception_type": type(e)})
 
+    def _get_client(self):
+        with self._client_lock:
+            if not self._client:
+                self._client = _POOL.acquire(self._pool_key(), self._connect)
+            return self._client
+
     def close(self):
-        self._client.close()
-        self._client = False
+        with self._client_lock:
+            if self._client:
+                _POOL.release(self._pool_key(), self._client)
+            self._client = False
 
     def run(self, cmd, stdin=None, stdout=None, stderr=None,
             raise_on_error=True, timeout=3600):
@@ -175,38 +271,53 @@ class SSH(object):
         else:
             writes = []
 
-        while True:
-            # Block until data can be read/write.
-            r, w, e = select.select([session], writes, [session], 1)
+        # NOTE(agent): formatting of debug messages for each chunk
+        #   of the output is expensive, so it is done only in debug mode
+        debug = logging.is_debug()
 
-            if session.recv_ready():
-                data = session.recv(4096)
-                LOG.debug("stdout: %r" % data)
+        def read_stdout():
+            while session.recv_ready():
+                data = session.recv(_READ_SIZE)
+                if debug:
+                    LOG.debug("stdout: %r" % data)
                 if stdout is not None:
                     stdout.write(data.decode("utf8"))
-                continue
 
-            if session.recv_stderr_ready():
-                stderr_data = session.recv_stderr(4096)
-                LOG.debug("stderr: %r" % stderr_data)
+        def read_stderr():
+            data = None
+            while session.recv_stderr_ready():
+                data = session.recv_stderr(_READ_SIZE)
+                if debug:
+                    LOG.debug("stderr: %r" % data)
                 if stderr is not None:
-                    stderr.write(stderr_data.decode("utf8"))
-                continue
+                    stderr.write(data.decode("utf8"))
+            return data
+
+        while True:
+            # Block until data can be read/write.
+            r, w, e = select.select([session], writes, [session], 1)
+
+            read_stdout()
+            stderr_data = read_stderr() or stderr_data
 
             if session.send_ready():
                 if stdin is not None and not stdin.closed:
                     if not data_to_send:
-                        data_to_send = stdin.read(4096)
+                        data_to_send = stdin.read(_READ_SIZE)
                         if not data_to_send:
                             stdin.close()
                             session.shutdown_write()
                             writes = []
                             continue
                     sent_bytes = session.send(data_to_send)
-                    LOG.debug("sent: %s" % data_to_send[:sent_bytes])
+                    if debug:
+                        LOG.debug("sent: %s" % data_to_send[:sent_bytes])
                     data_to_send = data_to_send[sent_bytes:]
 
             if session.exit_status_ready():
+                # the output can be received after the exit status
+                read_stdout()
+                stderr_data = read_stderr() or stderr_data
                 break
 
             if timeout and (time.time() - timeout) > start_time:
@@ -245,18 +356,36 @@ class SSH(object):
         stderr.seek(0)
         return (exit_status, stdout.read(), stderr.read())
 
+    def _is_port_open(self, timeout):
+        try:
+            sock = socket.create_connection((self.host, self.port),
+                                            timeout=timeout)
+        except socket.error:
+            return False
+        sock.close()
+        return True
+
     def wait(self, timeout=120, interval=1):
-        """Wait for the host will be available via ssh."""
+        """Wait for the host will be available via ssh.
+
+        The port is probed with plain TCP connections first, which is much
+        cheaper than SSH handshakes, and then the connection is established
+        and kept for further commands.
+        """
         start_time = time.time()
         while True:
             try:
-                return self.execute("uname")
+                if self._is_port_open(interval):
+                    self._get_client()
+                    return
+                LOG.debug("Port %s of %s is still closed."
+                          % (self.port, self.host))
             except (socket.error, exceptions.SSHError) as e:
                 LOG.debug("Ssh is still unavailable: %r" % e)
-                time.sleep(interval)
             if time.time() > (start_time + timeout):
                 raise exceptions.SSHTimeout("Timeout waiting for '%s'" %
                                             self.host)
+            time.sleep(interval)
 
     def _put_file_sftp(self, localpath, remotepath, mode=None):
         client = self._get_client()
@@ -288,3 +417,63 @@ class SSH(object):
             self._put_file_sftp(localpath, remotepath, mode=mode)
         except (paramiko.SSHException, socket.error):
             self._put_file_shell(localpath, remotepath, mode=mode)
+
+
+_FANOUT_STOP = object()
+
+
+def execute_on_hosts(ssh_objects, cmd, stdin=None, timeout=3600,
+                     concurrency=10):
+    """Execute the command on many servers concurrently.
+
+    Commands are executed by a bounded number of threads and results are
+    yielded as soon as the commands finish, so the output of fast servers
+    can be processed while slow ones are still working.
+
+    :param ssh_objects: iterable of SSH objects of servers
+    :param cmd: Command to be executed, can be a list.
+    :param stdin: String to pass to stdin of each command.
+    :param timeout: Timeout for execution of the command on each server.
+    :param concurrency: The maximum number of commands executed at once.
+
+    :returns: generator of dicts with "host", "port", "status", "stdout",
+        "stderr", "started_at", "duration" and "error" keys. "status" is
+        None and "error" is a message if the command could not be
+        executed on the server.
+    """
+    ssh_objects = iter(ssh_objects)
+    lock = threading.Lock()
+    results = six.moves.queue.Queue()
+
+    def execute():
+        while True:
+            with lock:
+                ssh = next(ssh_objects, None)
+            if ssh is None:
+                results.put(_FANOUT_STOP)
+                return
+            result = {"host": ssh.host, "port": ssh.port, "status": None,
+                      "stdout": "", "stderr": "", "error": None,
+                      "started_at": time.time()}
+            try:
+                result["status"], result["stdout"], result["stderr"] = (
+                    ssh.execute(cmd, stdin=stdin, timeout=timeout))
+            except Exception as e:
+                # NOTE(agent): failure of one server should not stop
+                #   the others
+                result["error"] = "%s: %s" % (type(e).__name__, e)
+            result["duration"] = time.time() - result["started_at"]
+            results.put(result)
+
+    threads = [threading.Thread(target=execute) for i in range(concurrency)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    running = len(threads)
+    while running:
+        result = results.get()
+        if result is _FANOUT_STOP:
+            running -= 1
+        else:
+            yield result
@@ -17,6 +17,7 @@ from __future__ import division
 
 import abc
 import math
+import random
 
 import six
 
@@ -239,3 +240,58 @@ class DegradationComputation(StreamingAlgorithm):
         if min_result is None or max_result is None:
             return 0.0
         return (max_result / min_result - 1) * 100.0
+
+
+class ReservoirSampling(StreamingAlgorithm):
+    """Keep a uniform random sample of a stream of values.
+
+    Each value of the stream gets into the sample with the same
+    probability, while only the sample is kept in memory (algorithm R).
+    """
+
+    def __init__(self, size, seed=None):
+        """Init streaming computation.
+
+        :param size: the maximum number of values in the sample
+        :param seed: seed of the random generator, the same sample is taken
+            from the same stream with the same seed
+        """
+        if size < 0:
+            raise ValueError("Unexpected size: %s" % size)
+        self._size = size
+        self._random = random.Random(seed)
+        self._sample = []
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if len(self._sample) < self._size:
+            self._sample.append(value)
+        else:
+            idx = self._random.randrange(self.count)
+            if idx < self._size:
+                self._sample[idx] = value
+
+    def merge(self, other):
+        mine = list(self._sample)
+        theirs = list(other._sample)
+        self._random.shuffle(mine)
+        self._random.shuffle(theirs)
+        # NOTE(agent): values are taken from the samples with
+        #   probabilities proportional to the number of values which each
+        #   of the samples represents.
+        mine_count, theirs_count = self.count, other.count
+        sample = []
+        while len(sample) < self._size and (mine or theirs):
+            if mine and (not theirs or self._random.randrange(
+                    mine_count + theirs_count) < mine_count):
+                sample.append(mine.pop())
+                mine_count -= 1
+            else:
+                sample.append(theirs.pop())
+                theirs_count -= 1
+        self._sample = sample
+        self.count += other.count
+
+    def result(self):
+        return list(self._sample)
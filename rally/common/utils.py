@@ -17,6 +17,7 @@ import bisect
 import collections
 import copy
 import ctypes
+import functools
 import heapq
 import inspect
 import multiprocessing
@@ -82,12 +83,38 @@ class StdErrCapture(object):
         sys.stderr = self.stderr
 
 
+# NOTE(agent): time.monotonic is not available in Python 2.7, the
+#   wall clock is used there instead.
+monotonic = getattr(time, "monotonic", time.time)
+perf_counter = getattr(time, "perf_counter", monotonic)
+
+# NOTE(agent): time.thread_time appeared in Python 3.7, while the
+#   same clock is available via clock_gettime on Linux since Python 3.3.
+#   CPU time is not measured if neither of them is available.
+if hasattr(time, "thread_time"):
+    thread_time = time.thread_time
+elif hasattr(time, "CLOCK_THREAD_CPUTIME_ID"):
+    thread_time = functools.partial(time.clock_gettime,
+                                    time.CLOCK_THREAD_CPUTIME_ID)
+else:
+    thread_time = None
+
+
 class Timer(object):
-    """Timer based on context manager interface."""
+    """Timer based on context manager interface.
+
+    The duration is measured by a monotonic high-resolution clock, so steps
+    of the system time do not distort it. The wall clock is used only as an
+    anchor of timestamps: the finish timestamp is the start one plus the
+    duration. CPU time spent by the current thread is measured as well,
+    if the platform allows it.
+    """
 
     def __enter__(self):
         self.error = None
         self.start = time.time()
+        self._started_at = perf_counter()
+        self._cpu_started_at = thread_time() if thread_time else None
         return self
 
     def timestamp(self):
@@ -97,12 +124,20 @@ class Timer(object):
         return self.finish
 
     def __exit__(self, type, value, tb):
-        self.finish = time.time()
+        self._duration = perf_counter() - self._started_at
+        self.finish = self.start + self._duration
+        self._cpu_duration = None
+        if self._cpu_started_at is not None:
+            self._cpu_duration = thread_time() - self._cpu_started_at
         if type:
             self.error = (type, value, tb)
 
     def duration(self):
-        return self.finish - self.start
+        return self._duration
+
+    def cpu_duration(self):
+        """CPU time spent by the current thread or None if it is unknown."""
+        return self._cpu_duration
 
 
 class Struct(object):
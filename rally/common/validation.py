@@ -14,6 +14,8 @@
 #    under the License.
 
 import abc
+import json
+import threading
 import traceback
 
 import six
@@ -173,6 +175,72 @@ class ValidationResult(object):
         return self.msg
 
 
+class LookupCache(object):
+    """Thread-safe memo of cloud lookups done by semantic validators.
+
+    The task engine creates one instance per task and passes it to
+    validators as ``credentials[<platform>]["lookup_cache"]``, so workloads
+    which refer to the same resources query the cloud only once.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @staticmethod
+    def _make_key(key):
+        # keys consist of lookup names, credentials and resource specs from
+        # a task config, i.e. objects and dicts which are not hashable.
+        def serialize(obj):
+            if hasattr(obj, "to_dict"):
+                return obj.to_dict()
+            return repr(obj)
+
+        return json.dumps(key, sort_keys=True, default=serialize)
+
+    def get(self, key, loader, cached_errors=()):
+        """Return the result of loader() memoized by key.
+
+        :param key: identifier of the lookup, i.e. a list of a lookup name,
+            a credential object and a resource spec
+        :param loader: function that performs the lookup
+        :param cached_errors: exception classes which are memoized as the
+            result of the lookup and raised again for each following call
+        :returns: the result of loader()
+        """
+        key = self._make_key(key)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._results:
+                try:
+                    self._results[key] = (loader(), None)
+                except cached_errors as e:
+                    self._results[key] = (None, e)
+        result, error = self._results[key]
+        if error is not None:
+            raise error
+        return result
+
+
+def cached_lookup(credentials, platform, key, loader, cached_errors=()):
+    """Perform a lookup via the task lookup cache if it is available.
+
+    :param credentials: credentials dict for all platforms which is passed
+        to validators
+    :param platform: name of the platform
+    :param key: identifier of the lookup (see `LookupCache.get`)
+    :param loader: function that performs the lookup
+    :param cached_errors: exception classes which are memoized as the result
+        of the lookup
+    """
+    cache = ((credentials or {}).get(platform) or {}).get("lookup_cache")
+    if not isinstance(cache, LookupCache):
+        return loader()
+    return cache.get(key, loader, cached_errors=cached_errors)
+
+
 class ValidatablePluginMixin(object):
 
     @staticmethod
@@ -218,6 +218,11 @@ class WorkerAlreadyRegistered(RallyException):
     msg_fmt = _("Worker %(worker)s already registered")
 
 
+class DistributedLoadFailure(RallyException):
+    error_code = 534
+    msg_fmt = _("Distributed load generation failed: %(message)s")
+
+
 class MultipleMatchesFound(RallyException):
     error_code = 470
     msg_fmt = _("Found multiple %(needle)s: %(haystack)s")
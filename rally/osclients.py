@@ -14,7 +14,9 @@
 #    under the License.
 
 import abc
+import json
 import os
+import threading
 
 from oslo_config import cfg
 from six.moves.urllib import parse
@@ -33,13 +35,104 @@ CONF = cfg.CONF
 
 OSCLIENTS_OPTS = [
     cfg.FloatOpt("openstack_client_http_timeout", default=180.0,
-                 help="HTTP timeout for any of OpenStack service in seconds")
+                 help="HTTP timeout for any of OpenStack service in seconds"),
+    cfg.IntOpt("openstack_client_http_pool_maxsize", default=0, min=0,
+               help="Maximum number of keep-alive HTTP connections kept by "
+                    "a keystone session per host. 0 means the default of "
+                    "the requests library. It should be close to the number "
+                    "of threads which share one credential in a runner "
+                    "process."),
+    cfg.BoolOpt("openstack_client_http_stats", default=False,
+                help="Collect the number, latency and size of HTTP requests "
+                     "made within each atomic action. They are shown in the "
+                     "main stats table and in the output of each "
+                     "iteration.")
 ]
 CONF.register_opts(OSCLIENTS_OPTS)
 
 _NAMESPACE = "openstack"
 
 
+class ClientsCache(dict):
+    """Thread-safe storage for client handles of a single credential.
+
+    Creation of a handle is guarded by a per-key lock, so concurrent threads
+    asking for the same client wait for the first one instead of
+    authenticating on their own.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ClientsCache, self).__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get_or_create(self, key, factory):
+        try:
+            return self[key]
+        except KeyError:
+            pass
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self:
+                self[key] = factory()
+            return self[key]
+
+
+def _get_or_create(cache, key, factory):
+    if isinstance(cache, ClientsCache):
+        return cache.get_or_create(key, factory)
+    if key not in cache:
+        cache[key] = factory()
+    return cache[key]
+
+
+_SHARED_CACHES = {}
+_SHARED_CACHES_LOCK = threading.Lock()
+
+
+def _make_credential_key(credential):
+    try:
+        return json.dumps(credential.to_dict(), sort_keys=True)
+    except (AttributeError, TypeError, ValueError):
+        # credentials which can not be represented as a plain dict (mocks
+        # in tests, custom objects) are not shared.
+        return None
+
+
+def get_shared_cache(credential, api_info=None):
+    """Return process-wide cache of clients for the credential and api_info.
+
+    Keystone sessions and clients stored there are reused by all
+    `Clients` objects of the same process, so contexts, scenario iterations
+    and cleanup do not authenticate again for the same user. The pid is a
+    part of the key, so forked runner processes never share HTTP
+    connections with the parent.
+    """
+    cred_key = _make_credential_key(credential)
+    if cred_key is None:
+        return ClientsCache()
+    key = (os.getpid(), json.dumps(api_info or {}, sort_keys=True))
+    with _SHARED_CACHES_LOCK:
+        caches = _SHARED_CACHES.setdefault(cred_key, {})
+        if key not in caches:
+            caches[key] = ClientsCache()
+        return caches[key]
+
+
+def invalidate_shared_cache(credential=None):
+    """Drop shared client handles of the credential or all of them.
+
+    :param credential: credential which handles should be dropped for any
+        api_info. If it is not specified, the whole cache is dropped.
+    """
+    with _SHARED_CACHES_LOCK:
+        if credential is None:
+            _SHARED_CACHES.clear()
+        else:
+            _SHARED_CACHES.pop(_make_credential_key(credential), None)
+
+
 def configure(name, default_version=None, default_service_type=None,
               supported_versions=None):
     """OpenStack client class wrapper.
@@ -207,9 +300,8 @@ class OSClient(plugin.Plugin):
         key = "{0}{1}{2}".format(self.get_name(),
                                  str(args) if args else "",
                                  str(kwargs) if kwargs else "")
-        if key not in self.cache:
-            self.cache[key] = self.create_client(*args, **kwargs)
-        return self.cache[key]
+        return _get_or_create(self.cache, key,
+                              lambda: self.create_client(*args, **kwargs))
 
     @classmethod
     def get(cls, name, platform=_NAMESPACE, namespace=_NAMESPACE, **kwargs):
@@ -232,7 +324,11 @@ class Keystone(OSClient):
     @property
     def auth_ref(self):
         try:
-            if "keystone_auth_ref" not in self.cache:
+            auth_ref = self.cache.get("keystone_auth_ref")
+            if auth_ref is None or auth_ref.will_expire_soon():
+                # identity plugin re-authenticates by itself only if its
+                # token is about to expire, otherwise it returns already
+                # obtained access info.
                 sess, plugin = self.get_session()
                 self.cache["keystone_auth_ref"] = plugin.get_access(sess)
         except Exception as e:
@@ -252,50 +348,82 @@ class Keystone(OSClient):
 
     def get_session(self, version=None):
         key = "keystone_session_and_plugin_%s" % version
-        if key not in self.cache:
-            from keystoneauth1 import discover
-            from keystoneauth1 import identity
-            from keystoneauth1 import session
-
-            version = self.choose_version(version)
-            auth_url = self.credential.auth_url
-            if version is not None:
-                auth_url = self._remove_url_version()
-
-            password_args = {
-                "auth_url": auth_url,
-                "username": self.credential.username,
-                "password": self.credential.password,
-                "tenant_name": self.credential.tenant_name
-            }
-
-            if version is None:
-                # NOTE(rvasilets): If version not specified than we discover
-                # available version with the smallest number. To be able to
-                # discover versions we need session
-                temp_session = session.Session(
-                    verify=(self.credential.https_cacert or
-                            not self.credential.https_insecure),
-                    timeout=CONF.openstack_client_http_timeout)
-                version = str(discover.Discover(
-                    temp_session,
-                    password_args["auth_url"]).version_data()[0]["version"][0])
-
-            if "v2.0" not in password_args["auth_url"] and (
-                    version != "2"):
-                password_args.update({
-                    "user_domain_name": self.credential.user_domain_name,
-                    "domain_name": self.credential.domain_name,
-                    "project_domain_name": self.credential.project_domain_name
-                })
-            identity_plugin = identity.Password(**password_args)
-            sess = session.Session(
-                auth=identity_plugin,
+        return _get_or_create(self.cache, key,
+                              lambda: self._create_session(version))
+
+    @staticmethod
+    def _create_http_session():
+        """Return requests session with configured size of connection pool.
+
+        None is returned if the pool size is not configured, so keystoneauth
+        falls back to its own default session.
+        """
+        pool_maxsize = CONF.openstack_client_http_pool_maxsize
+        if not pool_maxsize:
+            return None
+        import requests
+        from requests import adapters
+
+        http_session = requests.Session()
+        for prefix in ("http://", "https://"):
+            http_session.mount(prefix, adapters.HTTPAdapter(
+                pool_connections=pool_maxsize, pool_maxsize=pool_maxsize))
+        return http_session
+
+    def _create_session(self, version=None):
+        from keystoneauth1 import discover
+        from keystoneauth1 import identity
+        from keystoneauth1 import session
+
+        version = self.choose_version(version)
+        auth_url = self.credential.auth_url
+        if version is not None:
+            auth_url = self._remove_url_version()
+
+        password_args = {
+            "auth_url": auth_url,
+            "username": self.credential.username,
+            "password": self.credential.password,
+            "tenant_name": self.credential.tenant_name
+        }
+
+        if version is None:
+            # NOTE(rvasilets): If version not specified than we discover
+            # available version with the smallest number. To be able to
+            # discover versions we need session
+            temp_session = session.Session(
                 verify=(self.credential.https_cacert or
                         not self.credential.https_insecure),
                 timeout=CONF.openstack_client_http_timeout)
-            self.cache[key] = (sess, identity_plugin)
-        return self.cache[key]
+            version = str(discover.Discover(
+                temp_session,
+                password_args["auth_url"]).version_data()[0]["version"][0])
+
+        if "v2.0" not in password_args["auth_url"] and (
+                version != "2"):
+            password_args.update({
+                "user_domain_name": self.credential.user_domain_name,
+                "domain_name": self.credential.domain_name,
+                "project_domain_name": self.credential.project_domain_name
+            })
+        identity_plugin = identity.Password(**password_args)
+        kw = {}
+        http_session = self._create_http_session()
+        if http_session is not None:
+            kw["session"] = http_session
+        sess = session.Session(
+            auth=identity_plugin,
+            verify=(self.credential.https_cacert or
+                    not self.credential.https_insecure),
+            timeout=CONF.openstack_client_http_timeout, **kw)
+        if CONF.openstack_client_http_stats:
+            # NOTE(agent): the hook is imported only if it is used, so the
+            #   clients do not depend on the task runtime (atomic actions,
+            #   tracing, osprofiler) otherwise.
+            from rally.task import atomic
+
+            sess.session.hooks["response"].append(atomic.http_response_hook)
+        return sess, identity_plugin
 
     def _remove_url_version(self):
         """Remove any version from the auth_url.
@@ -794,7 +922,9 @@ class Clients(object):
     def __init__(self, credential, api_info=None, cache=None):
         self.credential = credential
         self.api_info = api_info or {}
-        self.cache = cache or {}
+        if cache is None:
+            cache = get_shared_cache(credential, self.api_info)
+        self.cache = cache
 
     def __getattr__(self, client_name):
         """Lazy load of clients."""
@@ -821,7 +951,11 @@ class Clients(object):
 
     def clear(self):
         """Remove all cached client handles."""
-        self.cache = {}
+        if self.cache is get_shared_cache(self.credential, self.api_info):
+            invalidate_shared_cache(self.credential)
+            self.cache = get_shared_cache(self.credential, self.api_info)
+        else:
+            self.cache = {}
 
     def verified_keystone(self):
         """Ensure keystone endpoints are valid and then authenticate
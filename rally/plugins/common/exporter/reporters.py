@@ -12,12 +12,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import itertools
+import json
 import os
 
 from rally.common.io import junit
 from rally.task import exporter
 from rally.task.processing import plot
+from rally.task import utils as tutils
 
 
 @exporter.configure("html")
@@ -63,6 +66,93 @@ class HTMLStaticExporter(HTMLExporter):
     INCLUDE_LIBS = True
 
 
+@exporter.configure("json-results")
+class JSONResultsExporter(exporter.TaskExporter):
+    """Generates task report in the format of `rally task results` command.
+
+    The report is generated by chunks while raw iterations are loaded from
+    the database, so the whole report is never kept in memory.
+    """
+
+    STREAMING = True
+
+    @classmethod
+    def validate(cls, output_destination):
+        """Validate destination of report.
+
+        :param output_destination: Destination of report
+        """
+        # nothing to check :)
+        pass
+
+    @staticmethod
+    def _iterations(data):
+        for itr in data:
+            itr["atomic_actions"] = collections.OrderedDict(
+                tutils.WrapperForAtomicActions(itr["atomic_actions"]).items())
+            yield itr
+
+    def _workloads(self):
+        for task in self.tasks_results:
+            for w in itertools.chain(
+                    *[s["workloads"] for s in task["subtasks"]]):
+                yield {
+                    "name": w["name"],
+                    "description": w["description"],
+                    "pos": w["position"],
+                    "kw": {
+                        "args": w["args"],
+                        "runner": w["runner"],
+                        "context": w["context"],
+                        "sla": w["sla"],
+                        "hooks": [r["config"] for r in w["hooks"]],
+                    }
+                }, self._iterations(w["data"]), collections.OrderedDict([
+                    ("sla", w["sla_results"].get("sla", [])),
+                    ("hooks", w["hooks"]),
+                    ("load_duration", w["load_duration"]),
+                    ("full_duration", w["full_duration"]),
+                    ("created_at", w["created_at"])])
+
+    @staticmethod
+    def _dumps(obj, level):
+        """Encode obj as a JSON value nested at the given level."""
+        return json.dumps(obj, indent=4, separators=(",", ": ")).replace(
+            "\n", "\n" + " " * 4 * level)
+
+    def _encode(self):
+        # NOTE(agent): the report is the same as json.dumps(results,
+        #   indent=4), but iterations are the largest part of a workload,
+        #   so they are encoded one by one while they are loaded.
+        yield "["
+        workloads = 0
+        for key, iterations, other in self._workloads():
+            yield ",\n    {\n" if workloads else "\n    {\n"
+            workloads += 1
+            yield "        \"key\": %s,\n" % self._dumps(key, 2)
+            yield "        \"result\": ["
+            count = 0
+            for itr in iterations:
+                yield ",\n" if count else "\n"
+                count += 1
+                yield "            %s" % self._dumps(itr, 3)
+            yield "\n        ]" if count else "]"
+            for k, v in other.items():
+                yield ",\n        %s: %s" % (json.dumps(k), self._dumps(v, 2))
+            yield "\n    }"
+        yield "\n]" if workloads else "]"
+
+    def generate(self):
+        result = self._encode()
+
+        if self.output_destination:
+            return {"files": {self.output_destination: result},
+                    "open": "file://" + os.path.abspath(
+                        self.output_destination)}
+        else:
+            return {"print": result}
+
+
 @exporter.configure("junit-xml")
 class JUnitXMLExporter(exporter.TaskExporter):
     """Generates task report in JUnit-XML format.
@@ -84,6 +174,10 @@ class JUnitXMLExporter(exporter.TaskExporter):
       </testsuite>
     """
 
+    # NOTE(agent): raw iterations are not used by JUnit report, so
+    #   there is no need to load them from the database.
+    STREAMING = True
+
     @classmethod
     def validate(cls, output_destination):
         """Validate destination of report.
@@ -0,0 +1,212 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import gc
+import os
+import time
+
+from rally.common import utils
+from rally import consts
+from rally import exceptions
+from rally.task import hook
+
+
+_PROC = "/proc"
+
+
+def _read_stat(pid):
+    """Read CPU time, RSS and the number of threads of the process.
+
+    :returns: dict with "ppid", "cpu" (in seconds), "rss" (in bytes) and
+        "threads" keys or None if the process does not exist anymore
+    """
+    try:
+        with open(os.path.join(_PROC, str(pid), "stat")) as f:
+            stat = f.read()
+    except (IOError, OSError):
+        return None
+    # NOTE(agent): the name of the process may contain spaces and
+    #   brackets, so fields are counted from the last bracket. The first
+    #   field after it is the 3rd field of stat (state).
+    fields = stat[stat.rfind(")") + 2:].split()
+    return {"ppid": int(fields[1]),
+            "cpu": ((int(fields[11]) + int(fields[12]))
+                    / float(os.sysconf("SC_CLK_TCK"))),
+            "threads": int(fields[17]),
+            "rss": int(fields[21]) * os.sysconf("SC_PAGE_SIZE")}
+
+
+def _get_children(pid):
+    """Return PIDs of child processes of the process."""
+    children = []
+    for name in os.listdir(_PROC):
+        if not name.isdigit():
+            continue
+        stat = _read_stat(name)
+        if stat and stat["ppid"] == pid:
+            children.append(int(name))
+    return children
+
+
+class _GCTimer(object):
+    """Measures pauses of the garbage collector of the current process."""
+
+    def __init__(self):
+        self.collections = 0
+        self.duration = 0.0
+        self._started_at = None
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._started_at = utils.perf_counter()
+        elif self._started_at is not None:
+            self.collections += 1
+            self.duration += utils.perf_counter() - self._started_at
+            self._started_at = None
+
+    def __enter__(self):
+        # NOTE(agent): gc.callbacks is not available in Python 2.7,
+        #   pauses of the garbage collector are not measured there.
+        if hasattr(gc, "callbacks"):
+            gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if hasattr(gc, "callbacks"):
+            gc.callbacks.remove(self._callback)
+
+
+@hook.configure(name="self_monitoring")
+class SelfMonitoringHook(hook.Hook):
+    """Samples resources used by Rally itself on the load generating host.
+
+    Usage of CPU and memory, the number of threads of the controller
+    process and runner worker processes (its children) are read from /proc
+    during the sampling window, together with pauses of the garbage
+    collector of the controller, the depth of runner queues and the
+    scheduler lag (how much later than requested the controller wakes up
+    from sleep). The hook is intended to be triggered periodically, so the
+    samples are shown as time-series charts, which help to find out whether
+    latency spikes are caused by the saturated load generator.
+
+    Only Linux is supported.
+    """
+
+    CONFIG_SCHEMA = {
+        "$schema": consts.JSON_SCHEMA,
+        "type": "object",
+        "properties": {
+            "window": {
+                "type": "number",
+                "minimum": 0.1,
+                "description": "Duration of sampling in seconds "
+                               "(0.5 by default)."
+            }
+        },
+        "additionalProperties": False
+    }
+
+    # NOTE(agent): the sampling window is split into steps of this
+    #   duration to measure the scheduler lag
+    _STEP = 0.05
+
+    def _sample(self):
+        pid = os.getpid()
+        controller = _read_stat(pid)
+        workers = [_read_stat(child) for child in _get_children(pid)]
+        workers = [w for w in workers if w]
+        return {"controller": controller,
+                "workers": workers,
+                "workers_cpu": sum(w["cpu"] for w in workers),
+                "timestamp": utils.perf_counter()}
+
+    def _sleep(self, window):
+        """Sleep for the window and return the maximum scheduler lag."""
+        lag = 0.0
+        deadline = utils.perf_counter() + window
+        while True:
+            left = deadline - utils.perf_counter()
+            if left <= 0:
+                return lag
+            step = min(self._STEP, left)
+            started_at = utils.perf_counter()
+            time.sleep(step)
+            lag = max(lag, utils.perf_counter() - started_at - step)
+
+    def run(self):
+        if not os.path.isdir(_PROC):
+            raise exceptions.RallyException(
+                "%s is not available, only Linux is supported." % _PROC)
+        window = self.config.get("window", 0.5)
+
+        with _GCTimer() as gc_timer:
+            before = self._sample()
+            lag = self._sleep(window)
+            after = self._sample()
+        elapsed = after["timestamp"] - before["timestamp"]
+
+        def cpu_percent(before_cpu, after_cpu):
+            return max(after_cpu - before_cpu, 0) * 100.0 / elapsed
+
+        # NOTE(agent): CPU usage of workers which were started or
+        #   stopped within the window is not precise
+        workers = after["workers"]
+        self.add_output(additive={
+            "title": "Load generator CPU usage",
+            "description": "CPU usage of Rally processes, in percents of "
+                           "one core.",
+            "chart_plugin": "Lines",
+            "axis_label": "Sample",
+            "label": "%",
+            "data": [["controller",
+                      cpu_percent(before["controller"]["cpu"],
+                                  after["controller"]["cpu"])],
+                     ["workers", cpu_percent(before["workers_cpu"],
+                                             after["workers_cpu"])]]})
+        self.add_output(additive={
+            "title": "Load generator memory usage",
+            "description": "Resident set size of Rally processes.",
+            "chart_plugin": "Lines",
+            "axis_label": "Sample",
+            "label": "MiB",
+            "data": [["controller",
+                      after["controller"]["rss"] / 1048576.0],
+                     ["workers",
+                      sum(w["rss"] for w in workers) / 1048576.0]]})
+        self.add_output(additive={
+            "title": "Load generator threads",
+            "description": "The number of threads of Rally processes.",
+            "chart_plugin": "Lines",
+            "axis_label": "Sample",
+            "label": "Threads",
+            "data": [["controller", after["controller"]["threads"]],
+                     ["workers", sum(w["threads"] for w in workers)],
+                     ["worker processes", len(workers)]]})
+
+        queues = [["scheduler lag, ms", lag * 1000.0],
+                  ["GC pauses, ms", gc_timer.duration * 1000.0],
+                  ["GC collections", gc_timer.collections]]
+        if self.runner is not None:
+            queues.extend([["result queue depth",
+                            len(self.runner.result_queue)],
+                           ["event queue depth",
+                            len(self.runner.event_queue)]])
+        self.add_output(additive={
+            "title": "Load generator scheduling",
+            "description": "Scheduler lag and pauses of the garbage "
+                           "collector of the controller process and the "
+                           "depth of queues of the runner.",
+            "chart_plugin": "Lines",
+            "axis_label": "Sample",
+            "data": queues})
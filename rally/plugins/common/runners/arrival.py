@@ -0,0 +1,284 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+
+from rally.common import utils
+from rally.common import validation
+from rally import consts
+from rally.plugins.common.runners import rps
+from rally.task import runner
+
+
+DISTRIBUTIONS = ("poisson", "uniform", "constant")
+
+# The number of concurrent iterations per used CPU if neither times nor
+# max_concurrency is set
+DEFAULT_CONCURRENCY_PER_CPU = 16
+
+
+def _random_arrivals(distribution, rate, seed):
+    """Generate arrival moments with random intervals between them.
+
+    :param distribution: distribution of intervals, one of DISTRIBUTIONS
+    :param rate: average number of arrivals per second
+    :param seed: seed of the random numbers generator
+    """
+    rand = random.Random(seed)
+    rate = float(rate)
+    moment = 0.0
+    while True:
+        yield moment
+        if distribution == "poisson":
+            moment += rand.expovariate(rate)
+        elif distribution == "uniform":
+            moment += rand.uniform(0, 2 / rate)
+        else:
+            moment += 1 / rate
+
+
+def _read_trace(path, speed=1.0):
+    """Read arrival moments from the trace file line by line.
+
+    Each not empty line of the file which does not start with "#" should
+    contain a timestamp of the arrival (in seconds) as the first field
+    separated by a whitespace or a comma. Timestamps should be sorted.
+
+    :param path: path to the trace file
+    :param speed: the trace is replayed this times faster
+    :returns: generator of arrival moments relative to the first one
+    """
+    first = None
+    with open(os.path.expanduser(path)) as trace:
+        for line in trace:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            timestamp = float(line.replace(",", " ").split()[0])
+            if first is None:
+                first = timestamp
+            yield (timestamp - first) / speed
+
+
+def _arrivals(arrivals_cfg, seed, processes_to_start, processes_counter):
+    """Generate arrival moments of the current worker process.
+
+    Every process produces the whole stream of arrivals (it is cheap and
+    lazy) and takes each N-th of them, where N is the number of processes,
+    so the merged load of all processes follows the configured stream
+    exactly.
+
+    :param arrivals_cfg: arrivals section from the runner config
+    :param seed: seed of the random numbers generator which should be
+                 equal for all processes
+    :param processes_to_start: int, number of started processes
+    :param processes_counter: int, index of the current process
+    """
+    if "trace" in arrivals_cfg:
+        moments = _read_trace(arrivals_cfg["trace"],
+                              arrivals_cfg.get("speed", 1.0))
+    else:
+        moments = _random_arrivals(arrivals_cfg["distribution"],
+                                   arrivals_cfg["rate"], seed)
+    return itertools.islice(moments, processes_counter, None,
+                            processes_to_start)
+
+
+@validation.configure("check_arrival")
+class CheckArrivalValidator(validation.Validator):
+    """Additional schema validation for arrival runner"""
+
+    def validate(self, credentials, config, plugin_cls, plugin_cfg):
+        trace = plugin_cfg["arrivals"].get("trace")
+        if trace is None:
+            if "times" not in plugin_cfg:
+                return self.fail("Parameter 'times' is required unless "
+                                 "arrivals are replayed from a trace.")
+        elif not os.path.isfile(os.path.expanduser(trace)):
+            return self.fail("Trace file '%s' is not found." % trace)
+
+
+@validation.add("check_arrival")
+@runner.configure(name="arrival")
+class ArrivalScenarioRunner(runner.ScenarioRunner):
+    """Scenario runner that starts iterations at generated arrival moments.
+
+    Iterations are started in an open loop at moments with random
+    inter-arrival intervals (e.g. a Poisson stream of arrivals with the
+    given average rate) or at moments replayed from a trace file with one
+    timestamp per line, which is read lazily, so long traces are not
+    loaded into memory. It allows to reproduce the shape of production
+    traffic.
+
+    Like in the rps runner, iterations are executed by threads of a pool
+    of processes and the delay of each iteration start is saved to its
+    "schedule" result key.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "times": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "Total number of iteration executions. The "
+                               "whole trace is replayed if it is not set."
+            },
+            "arrivals": {
+                "oneOf": [
+                    {
+                        "type": "object",
+                        "description": "Generate arrivals with random "
+                                       "intervals.",
+                        "properties": {
+                            "distribution": {
+                                "enum": list(DISTRIBUTIONS),
+                                "description": "Distribution of intervals "
+                                               "between arrivals."
+                            },
+                            "rate": {
+                                "type": "number",
+                                "exclusiveMinimum": True,
+                                "minimum": 0,
+                                "description": "Average number of arrivals "
+                                               "per second."
+                            }
+                        },
+                        "required": ["distribution", "rate"],
+                        "additionalProperties": False
+                    },
+                    {
+                        "type": "object",
+                        "description": "Replay arrivals from a trace file.",
+                        "properties": {
+                            "trace": {
+                                "type": "string",
+                                "description": "Path to a file with one "
+                                               "arrival timestamp per line."
+                            },
+                            "speed": {
+                                "type": "number",
+                                "exclusiveMinimum": True,
+                                "minimum": 0,
+                                "description": "Replay the trace this times "
+                                               "faster."
+                            }
+                        },
+                        "required": ["trace"],
+                        "additionalProperties": False
+                    }
+                ]
+            },
+            "seed": {
+                "type": "integer",
+                "description": "Seed of the random numbers generator to "
+                               "reproduce the same arrivals."
+            },
+            "timeout": {
+                "type": "number"
+            },
+            "max_concurrency": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "Maximum number of concurrent iterations. "
+                               "Defaults to times or, if it is not set, to "
+                               "%d per used CPU." % DEFAULT_CONCURRENCY_PER_CPU
+            },
+            "max_cpu_count": {
+                "type": "integer",
+                "minimum": 1
+            }
+        },
+        "required": ["type", "arrivals"],
+        "additionalProperties": False
+    }
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        times = self.config.get("times")
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        seed = self.config.get("seed", random.randint(0, sys.maxsize))
+        iteration_gen = utils.RAMInt()
+
+        cpu_count = multiprocessing.cpu_count()
+        max_cpu_used = min(cpu_count,
+                           self.config.get("max_cpu_count", cpu_count))
+        # NOTE(agent): the number of iterations of a trace is unknown
+        #   in advance, so the concurrency is limited by the number of used
+        #   CPUs if it is not set.
+        max_concurrency = self.config.get(
+            "max_concurrency",
+            times or max_cpu_used * DEFAULT_CONCURRENCY_PER_CPU)
+
+        processes_to_start = min(max_cpu_used, max_concurrency,
+                                 times or max_cpu_used)
+        if times:
+            times_per_worker, times_overhead = divmod(times,
+                                                      processes_to_start)
+        else:
+            # the trace is replayed until its end
+            times_per_worker, times_overhead = None, 0
+        concurrency_per_worker, concurrency_overhead = divmod(
+            max_concurrency, processes_to_start)
+
+        self._log_debug_info(times=times, timeout=timeout, seed=seed,
+                             max_cpu_used=max_cpu_used,
+                             processes_to_start=processes_to_start,
+                             times_per_worker=times_per_worker,
+                             times_overhead=times_overhead,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
+
+        result_queue = multiprocessing.Queue()
+        event_queue = multiprocessing.Queue()
+        schedule = functools.partial(_arrivals, self.config["arrivals"], seed)
+
+        def worker_args_gen(times_overhead, concurrency_overhead):
+            while True:
+                yield (
+                    result_queue, iteration_gen, timeout,
+                    times_per_worker and (times_per_worker +
+                                          (times_overhead and 1)),
+                    concurrency_per_worker + (concurrency_overhead and 1),
+                    context, cls, method_name, args, event_queue,
+                    self.aborted, schedule
+                )
+                if times_overhead:
+                    times_overhead -= 1
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        process_pool = self._create_process_pool(
+            processes_to_start, rps._worker_process,
+            worker_args_gen(times_overhead, concurrency_overhead))
+        self._join_processes(process_pool, result_queue, event_queue)
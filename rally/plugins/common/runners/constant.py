@@ -24,25 +24,30 @@ from rally.common import utils
 from rally.common import validation
 from rally import consts
 from rally.task import runner
-from rally.task import utils as butils
 
 
 def _worker_process(queue, iteration_gen, timeout, concurrency, times,
-                    context, cls, method_name, args, event_queue, aborted,
-                    info):
+                    deadline, context, cls, method_name, args, event_queue,
+                    aborted, info):
     """Start the scenario within threads.
 
-    Spawn threads to support scenario execution for a fixed number of times.
-    This generates a constant load on the cloud under test by executing each
-    scenario iteration without pausing between iterations. Each thread runs
-    the scenario method once with passed scenario arguments and context.
-    After execution the result is appended to the queue.
+    Spawn threads to support scenario execution for a fixed number of times
+    or until the deadline. This generates a constant load on the cloud under
+    test by executing each scenario iteration without pausing between
+    iterations. Each thread runs the scenario method once with passed
+    scenario arguments and context. After execution the result is appended
+    to the queue.
 
     :param queue: queue object to append results
     :param iteration_gen: next iteration number generator
     :param timeout: operation's timeout
     :param concurrency: number of concurrently running scenario iterations
-    :param times: total number of scenario iterations to be run
+    :param times: total number of scenario iterations to be run or None if
+                  the number of iterations is limited by deadline only
+    :param deadline: utils.monotonic() value after which new iterations are
+                     not started or None if the load is limited by times only.
+                     The first iteration is started even if the deadline has
+                     already come.
     :param context: scenario context object
     :param cls: scenario class
     :param method_name: scenario method name
@@ -69,8 +74,17 @@ def _worker_process(queue, iteration_gen, timeout, concurrency, times,
         )
         collector_thr_by_timeout.start()
 
+    def can_start(iteration):
+        if aborted.is_set():
+            return False
+        if times is not None and iteration >= times:
+            return False
+        if deadline is not None and iteration:
+            return utils.monotonic() < deadline
+        return True
+
     iteration = next(iteration_gen)
-    while iteration < times and not aborted.is_set():
+    while can_start(iteration):
         scenario_context = runner._get_scenario_context(iteration, context)
         worker_args = (
             queue, cls, method_name, scenario_context, args, event_queue)
@@ -221,8 +235,8 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
             while True:
                 yield (result_queue, iteration_gen, timeout,
                        concurrency_per_worker + (concurrency_overhead and 1),
-                       times, context, cls, method_name, args, event_queue,
-                       self.aborted)
+                       times, None, context, cls, method_name, args,
+                       event_queue, self.aborted)
                 if concurrency_overhead:
                     concurrency_overhead -= 1
 
@@ -232,18 +246,6 @@ class ConstantScenarioRunner(runner.ScenarioRunner):
         self._join_processes(process_pool, result_queue, event_queue)
 
 
-def _run_scenario_once_with_unpack_args(args):
-    # NOTE(andreykurilin): `pool.imap` is used in
-    #     ConstantForDurationScenarioRunner. It does not want to work with
-    #     instance-methods, class-methods and static-methods. Also, it can't
-    #     transmit positional or keyword arguments to destination function.
-    #     While original `rally.task.runner._run_scenario_once` accepts
-    #     multiple arguments instead of one big tuple with all arguments, we
-    #     need to hardcode unpacking here(all other runners are able to
-    #     transmit arguments in proper way).
-    return runner._run_scenario_once(*args)
-
-
 @runner.configure(name="constant_for_duration")
 class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
     """Creates constant load executing a scenario for an interval of time.
@@ -281,26 +283,29 @@ class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
                 "type": "number",
                 "minimum": 1,
                 "description": "Operation's timeout."
+            },
+            "max_cpu_count": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of processes to create load"
+                               " from."
             }
         },
         "required": ["type", "duration"],
         "additionalProperties": False
     }
 
-    @staticmethod
-    def _iter_scenario_args(cls, method, ctx, args, event_queue, aborted):
-        def _scenario_args(i):
-            if aborted.is_set():
-                raise StopIteration()
-            return (cls, method, runner._get_scenario_context(i, ctx), args,
-                    event_queue)
-        return _scenario_args
-
-    def _run_scenario(self, cls, method, context, args):
+    def _run_scenario(self, cls, method_name, context, args):
         """Runs the specified benchmark scenario with given arguments.
 
+        This method generates a constant load on the cloud under test by
+        executing each scenario iteration using a pool of processes without
+        pausing between iterations until the specified duration has elapsed.
+        Iterations which have been started before the end of the duration
+        are waited for (at most for the timeout).
+
         :param cls: The Scenario class where the scenario is implemented
-        :param method: Name of the method that implements the scenario
+        :param method_name: Name of the method that implements the scenario
         :param context: Benchmark context that contains users, admin & other
                         information, that was created before benchmark started.
         :param args: Arguments to call the scenario method with
@@ -311,46 +316,36 @@ class ConstantForDurationScenarioRunner(runner.ScenarioRunner):
         timeout = self.config.get("timeout", 600)
         concurrency = self.config.get("concurrency", 1)
         duration = self.config.get("duration")
+        iteration_gen = utils.RAMInt()
 
-        # FIXME(andreykurilin): unify `_worker_process`, use it here and remove
-        #     usage of `multiprocessing.Pool`(usage of separate process for
-        #     each concurrent iteration is redundant).
-        pool = multiprocessing.Pool(concurrency)
-        manager = multiprocessing.Manager()
-        event_queue = manager.Queue()
-        stop_event_listener = threading.Event()
-
-        def event_listener():
-            while not stop_event_listener.isSet():
-                while not event_queue.empty():
-                    self.send_event(**event_queue.get())
-                else:
-                    time.sleep(0.01)
-
-        event_listener_thread = threading.Thread(target=event_listener)
-        event_listener_thread.start()
-
-        run_args = butils.infinite_run_args_generator(
-            self._iter_scenario_args(
-                cls, method, context, args, event_queue, self.aborted))
-        iter_result = pool.imap(_run_scenario_once_with_unpack_args, run_args)
-
-        start = time.time()
-        while True:
-            try:
-                result = iter_result.next(timeout)
-            except multiprocessing.TimeoutError as e:
-                result = runner.format_result_on_timeout(e, timeout)
-            except StopIteration:
-                break
+        cpu_count = multiprocessing.cpu_count()
+        max_cpu_used = min(cpu_count,
+                           self.config.get("max_cpu_count", cpu_count))
 
-            self._send_result(result)
+        processes_to_start = min(max_cpu_used, concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            concurrency, processes_to_start)
 
-            if time.time() - start > duration:
-                break
+        self._log_debug_info(duration=duration, concurrency=concurrency,
+                             timeout=timeout, max_cpu_used=max_cpu_used,
+                             processes_to_start=processes_to_start,
+                             concurrency_per_worker=concurrency_per_worker,
+                             concurrency_overhead=concurrency_overhead)
+
+        result_queue = multiprocessing.Queue()
+        event_queue = multiprocessing.Queue()
+        deadline = utils.monotonic() + duration
+
+        def worker_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       None, deadline, context, cls, method_name, args,
+                       event_queue, self.aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
 
-        stop_event_listener.set()
-        event_listener_thread.join()
-        pool.terminate()
-        pool.join()
-        self._flush_results()
+        process_pool = self._create_process_pool(
+            processes_to_start, _worker_process,
+            worker_args_gen(concurrency_overhead))
+        self._join_processes(process_pool, result_queue, event_queue)
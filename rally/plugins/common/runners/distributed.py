@@ -0,0 +1,175 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+from rally.common import validation
+from rally import consts
+from rally.task import distributed
+from rally.task import runner
+
+
+SHARDABLE_RUNNERS = ("constant", "constant_for_duration", "rps", "serial")
+
+# NOTE(agent): the default values of options of shardable runners
+_DEFAULTS = {"constant": {"times": 1, "concurrency": 1},
+             "constant_for_duration": {"concurrency": 1},
+             "serial": {"times": 1}}
+
+
+def _split(value, shards):
+    """Split the integer value into the given number of almost equal parts."""
+    per_shard, overhead = divmod(value, shards)
+    return [per_shard + (1 if i < overhead else 0) for i in range(shards)]
+
+
+def shard_config(config, shards):
+    """Split the load of the runner config between the given number of agents.
+
+    The number of iterations and the concurrency are split as evenly as
+    possible, while requests per second are divided equally. The number of
+    shards is decreased if the load is too small to be split.
+
+    :param config: config of a runner, one of SHARDABLE_RUNNERS
+    :param shards: the desired number of shards
+    :returns: list of runner configs of shards
+    """
+    config = dict(_DEFAULTS.get(config["type"], {}), **config)
+    splittable = [key for key in ("times", "concurrency", "max_concurrency")
+                  if key in config]
+    shards = min([shards] + [config[key] for key in splittable])
+
+    configs = [copy.deepcopy(config) for i in range(shards)]
+    for key in splittable:
+        for cfg, value in zip(configs, _split(config[key], shards)):
+            cfg[key] = value
+    if config["type"] == "rps":
+        rps = config["rps"]
+        for cfg in configs:
+            if isinstance(rps, dict):
+                for key in ("start", "end", "step"):
+                    cfg["rps"][key] = float(rps[key]) / shards
+            else:
+                cfg["rps"] = float(rps) / shards
+    return configs
+
+
+@validation.configure("check_distributed")
+class CheckDistributedValidator(validation.Validator):
+    """Validate the runner which generates load of agents"""
+
+    def validate(self, credentials, config, plugin_cls, plugin_cfg):
+        inner = plugin_cfg["runner"]
+        if inner["type"] not in SHARDABLE_RUNNERS:
+            return self.fail(
+                "Runner '%s' can not be distributed. Supported runners: %s."
+                % (inner["type"], ", ".join(SHARDABLE_RUNNERS)))
+        errors = runner.ScenarioRunner.validate(name=inner["type"],
+                                                credentials=credentials,
+                                                config=None,
+                                                plugin_cfg=inner,
+                                                vtype="syntax")
+        if errors:
+            return self.fail("Wrong config of the distributed runner: %s" %
+                             "; ".join(str(e) for e in errors))
+
+
+@validation.add("check_distributed")
+@runner.configure(name="distributed")
+class DistributedScenarioRunner(runner.ScenarioRunner):
+    """Generates the load from several hosts.
+
+    The load of the inner runner is split between the given number of agents
+    (started with `rally task agent` on load generating hosts), which run it
+    with the inner runner and stream results back. The number of iterations
+    and the concurrency (or requests per second) are split as evenly as
+    possible. Iteration numbers are counted by each agent separately.
+
+    All hosts should share the same Rally database and the same
+    [distributed]authkey option.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "agents": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The number of agents to generate the load."
+            },
+            "runner": {
+                "type": "object",
+                "properties": {
+                    "type": {
+                        "type": "string"
+                    }
+                },
+                "required": ["type"],
+                "description": "Config of the runner which generates the "
+                               "load of each agent."
+            },
+            "agents_wait_timeout": {
+                "type": "number",
+                "minimum": 0,
+                "description": "How long to wait for alive agents (in "
+                               "seconds)."
+            }
+        },
+        "required": ["type", "agents", "runner"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, *args, **kwargs):
+        super(DistributedScenarioRunner, self).__init__(*args, **kwargs)
+        self._coordinator = None
+
+    def abort(self):
+        super(DistributedScenarioRunner, self).abort()
+        if self._coordinator:
+            self._coordinator.abort()
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        configs = shard_config(self.config["runner"], self.config["agents"])
+        self._log_debug_info(agents=len(configs),
+                             runner=self.config["runner"]["type"])
+
+        coordinator = distributed.Coordinator()
+        try:
+            coordinator.connect(len(configs),
+                                self.config.get("agents_wait_timeout"))
+            self._coordinator = coordinator
+            if self.aborted.is_set():
+                return
+            coordinator.run(self.task["uuid"], cls.get_name(), context, args,
+                            configs, on_results=self.result_queue.append,
+                            on_event=self.send_event)
+        finally:
+            self._coordinator = None
+            coordinator.close()
+            self.statistics = {"agents": coordinator.statistics}
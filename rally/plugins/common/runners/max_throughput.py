@@ -0,0 +1,326 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import math
+import multiprocessing
+
+from rally.common import logging
+from rally.common import streaming_algorithms as streaming
+from rally.common import utils
+from rally.common import validation
+from rally import consts
+from rally.plugins.common.runners import constant
+from rally.plugins.common.runners import rps
+from rally.task import runner
+from rally.task import sla
+
+
+LOG = logging.getLogger(__name__)
+
+
+class _Step(object):
+    """Load level of a single step and statistics of its iterations."""
+
+    def __init__(self, level, sla_config):
+        self.level = level
+        self.sla_checker = sla.SLAChecker({"sla": sla_config})
+        self.passed = True
+        self.iterations = 0
+        self.failures = 0
+        self.durations = []
+        self.started_at = utils.monotonic()
+        self.finished_at = None
+
+    def add_iteration(self, result):
+        """Account the iteration and check SLA criteria.
+
+        :returns: True if SLA criteria of the step are still met
+        """
+        self.iterations += 1
+        if result["error"]:
+            self.failures += 1
+        else:
+            self.durations.append(result["duration"])
+        # NOTE(agent): SLAChecker wraps atomic actions of the
+        #   iteration, so a copy is passed to keep the original result intact
+        if not self.sla_checker.add_iteration(dict(result)):
+            self.passed = False
+        return self.passed
+
+    def finish(self):
+        self.finished_at = utils.monotonic()
+
+    def to_dict(self):
+        duration = (self.finished_at or utils.monotonic()) - self.started_at
+        mean = streaming.MeanComputation()
+        p95 = streaming.PercentileComputation(0.95,
+                                              max(len(self.durations), 1))
+        for d in self.durations:
+            mean.add(d)
+            p95.add(d)
+        return {
+            "level": self.level,
+            "passed": self.passed,
+            "iterations": self.iterations,
+            "failures": self.failures,
+            "duration": duration,
+            "throughput": self.iterations / duration if duration else 0.0,
+            "avg_duration": mean.result(),
+            "95%ile_duration": p95.result(),
+            "sla": self.sla_checker.results()
+        }
+
+
+@validation.configure("check_max_throughput")
+class CheckMaxThroughputValidator(validation.Validator):
+    """Validate SLA criteria and levels of max_throughput runner"""
+
+    def validate(self, credentials, config, plugin_cls, plugin_cfg):
+        if plugin_cfg["end"] < plugin_cfg["start"]:
+            return self.fail("end value must not be less than start value.")
+        errors = []
+        for name, criterion in plugin_cfg["sla"].items():
+            errors.extend(sla.SLA.validate(name=name,
+                                           credentials=credentials,
+                                           config=None,
+                                           plugin_cfg=criterion,
+                                           vtype="syntax"))
+        if errors:
+            return self.fail("Wrong SLA criteria of the runner: %s" %
+                             "; ".join(str(e) for e in errors))
+
+
+@validation.add("check_max_throughput")
+@runner.configure(name="max_throughput")
+class MaxThroughputScenarioRunner(runner.ScenarioRunner):
+    """Ramps the load up step by step until SLA criteria break.
+
+    Each step generates a constant load of the given level (either the
+    number of concurrent iterations or the number of iterations started per
+    second) for step_duration seconds. SLA criteria of the runner config are
+    checked live against iterations of the current step only. Once they
+    break, the step is stopped and the ramp ends, or, if refinements are
+    allowed, the load backs off to the last passed level and continues with
+    a twice smaller step.
+
+    The throughput and latency of every step are saved to the workload
+    statistics as a throughput-versus-latency curve together with the
+    maximum passed level.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "$schema": consts.JSON_SCHEMA,
+        "properties": {
+            "type": {
+                "type": "string"
+            },
+            "mode": {
+                "enum": ["concurrency", "rps"],
+                "description": "What to increase: the number of concurrent "
+                               "iterations or iterations per second."
+            },
+            "start": {
+                "type": "number",
+                "minimum": 1,
+                "description": "Load level of the first step."
+            },
+            "step": {
+                "type": "number",
+                "exclusiveMinimum": True,
+                "minimum": 0,
+                "description": "Increase of the load level for each next "
+                               "step."
+            },
+            "end": {
+                "type": "number",
+                "minimum": 1,
+                "description": "Maximum load level. The ramp ends with it "
+                               "if SLA criteria never break."
+            },
+            "step_duration": {
+                "type": "number",
+                "exclusiveMinimum": True,
+                "minimum": 0,
+                "description": "The number of seconds to generate the load "
+                               "of each step."
+            },
+            "sla": {
+                "type": "object",
+                "minProperties": 1,
+                "description": "SLA criteria to check for each step."
+            },
+            "refinements": {
+                "type": "integer",
+                "minimum": 0,
+                "description": "How many times to back off to the last "
+                               "passed level and continue with a twice "
+                               "smaller step after a failed one."
+            },
+            "timeout": {
+                "type": "number",
+                "minimum": 1,
+                "description": "Operation's timeout."
+            },
+            "max_cpu_count": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "The maximum number of processes to create load"
+                               " from."
+            }
+        },
+        "required": ["type", "start", "step", "end", "sla"],
+        "additionalProperties": False
+    }
+
+    def __init__(self, *args, **kwargs):
+        super(MaxThroughputScenarioRunner, self).__init__(*args, **kwargs)
+        self._step = None
+        self._step_aborted = multiprocessing.Event()
+
+    def abort(self):
+        super(MaxThroughputScenarioRunner, self).abort()
+        self._step_aborted.set()
+
+    def _send_result(self, result):
+        accepted = super(MaxThroughputScenarioRunner, self)._send_result(
+            result)
+        if accepted and self._step and not self._step.add_iteration(result):
+            self._step_aborted.set()
+        return accepted
+
+    def _worker_args(self, level, cls, method_name, context, args,
+                     result_queue, event_queue, iteration_gen):
+        """Return the worker function and its arguments generator."""
+        timeout = self.config.get("timeout", 0)  # 0 means no timeout
+        duration = self.config.get("step_duration", 60)
+        cpu_count = multiprocessing.cpu_count()
+        max_cpu_used = min(cpu_count,
+                           self.config.get("max_cpu_count", cpu_count))
+
+        if self.config.get("mode", "concurrency") == "concurrency":
+            concurrency = int(level)
+            times = None
+            deadline = utils.monotonic() + duration
+        else:
+            times = int(math.ceil(level * duration))
+            concurrency = times
+        processes_to_start = min(max_cpu_used, concurrency)
+        concurrency_per_worker, concurrency_overhead = divmod(
+            concurrency, processes_to_start)
+        times_per_worker, times_overhead = divmod(times or 0,
+                                                  processes_to_start)
+
+        def concurrency_args_gen(concurrency_overhead):
+            while True:
+                yield (result_queue, iteration_gen, timeout,
+                       concurrency_per_worker + (concurrency_overhead and 1),
+                       None, deadline, context, cls, method_name, args,
+                       event_queue, self._step_aborted)
+                if concurrency_overhead:
+                    concurrency_overhead -= 1
+
+        def rps_args_gen(times_overhead):
+            while True:
+                per_worker = times_per_worker + (times_overhead and 1)
+                yield (result_queue, iteration_gen, timeout, per_worker,
+                       per_worker, context, cls, method_name, args,
+                       event_queue, self._step_aborted,
+                       functools.partial(rps._schedule, level))
+                if times_overhead:
+                    times_overhead -= 1
+
+        if times is None:
+            return (processes_to_start, constant._worker_process,
+                    concurrency_args_gen(concurrency_overhead))
+        return (processes_to_start, rps._worker_process,
+                rps_args_gen(times_overhead))
+
+    def _run_step(self, level, cls, method_name, context, args,
+                  iteration_gen):
+        """Generate the load of the given level and check SLA criteria.
+
+        :returns: _Step object with statistics of the step
+        """
+        self._step_aborted.clear()
+        if self.aborted.is_set():
+            self._step_aborted.set()
+        step = _Step(level, self.config["sla"])
+        self._step = step
+
+        result_queue = multiprocessing.Queue()
+        event_queue = multiprocessing.Queue()
+        processes_to_start, worker, worker_args_gen = self._worker_args(
+            level, cls, method_name, context, args, result_queue,
+            event_queue, iteration_gen)
+        process_pool = self._create_process_pool(
+            processes_to_start, worker, worker_args_gen)
+        self._join_processes(process_pool, result_queue, event_queue)
+
+        step.finish()
+        self._step = None
+        LOG.info("Task %(task)s | Load level %(level)s: %(status)s" %
+                 {"task": self.task["uuid"], "level": level,
+                  "status": "passed" if step.passed else "failed"})
+        return step
+
+    def _run_scenario(self, cls, method_name, context, args):
+        """Runs the specified benchmark scenario with given arguments.
+
+        :param cls: The Scenario class where the scenario is implemented
+        :param method_name: Name of the method that implements the scenario
+        :param context: Benchmark context that contains users, admin & other
+                        information, that was created before benchmark started.
+        :param args: Arguments to call the scenario method with
+
+        :returns: List of results fore each single scenario iteration,
+                  where each result is a dictionary
+        """
+        level = self.config["start"]
+        step = self.config["step"]
+        end = self.config["end"]
+        refinements = self.config.get("refinements", 0)
+        mode = self.config.get("mode", "concurrency")
+        iteration_gen = utils.RAMInt()
+
+        self._log_debug_info(mode=mode, start=level, step=step, end=end,
+                             refinements=refinements,
+                             step_duration=self.config.get("step_duration",
+                                                           60))
+
+        curve = []
+        max_passed = None
+        while not self.aborted.is_set() and level <= end:
+            step_stats = self._run_step(level, cls, method_name, context,
+                                        args, iteration_gen)
+            curve.append(step_stats.to_dict())
+            if self.aborted.is_set():
+                break
+            if step_stats.passed:
+                max_passed = level
+            elif refinements and max_passed is not None:
+                refinements -= 1
+                step /= 2.0
+                if mode == "concurrency":
+                    step = int(step)
+                if not step:
+                    break
+                level = max_passed
+            else:
+                break
+            level += step
+
+        self.statistics = {"throughput_curve": curve,
+                           "max_passed_level": max_passed}
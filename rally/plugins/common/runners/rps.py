@@ -14,6 +14,7 @@
 #    under the License.
 
 import collections
+import functools
 import multiprocessing
 import threading
 import time
@@ -29,19 +30,91 @@ from rally.task import runner
 LOG = logging.getLogger(__name__)
 
 
+def _runs_per_second(rps_cfg, moment):
+    """Return the desired rps at the given moment since the start of load.
+
+    :param rps_cfg: rps section from task config
+    :param moment: seconds since the start of load
+    """
+    if not isinstance(rps_cfg, dict):
+        return float(rps_cfg)
+    stage = int(moment // rps_cfg.get("duration", 1))
+    return float(min(rps_cfg["start"] + rps_cfg["step"] * stage,
+                     rps_cfg["end"]))
+
+
+def _schedule(rps_cfg, processes_to_start, processes_counter):
+    """Generate intended start times of iterations for a worker process.
+
+    The load is split between processes equally: each of them runs every
+    N-th iteration of the whole schedule, where N is the number of
+    processes. Start times are seconds since the start of load and do not
+    depend on the actual progress of iterations (open-loop schedule).
+
+    :param rps_cfg: rps section from task config
+    :param processes_to_start: int, number of started processes
+    :param processes_counter: int, index of the current process
+    """
+    moment = processes_counter / _runs_per_second(rps_cfg, 0)
+    while True:
+        yield moment
+        moment += processes_to_start / _runs_per_second(rps_cfg, moment)
+
+
+# The interval of checks whether load generation is aborted while all
+# concurrent slots are busy
+SLOT_WAIT_INTERVAL = 0.1
+
+
+def _acquire_slot(slots, aborted):
+    """Take a slot from the queue of busy slots unless aborted.
+
+    :param slots: Queue object limited by the number of slots
+    :param aborted: multiprocessing.Event that aborts load generation
+    :returns: True if a slot is taken, False if load generation is aborted
+    """
+    while not aborted.is_set():
+        try:
+            slots.put(None, timeout=SLOT_WAIT_INTERVAL)
+            return True
+        except Queue.Full:
+            pass
+    return False
+
+
+def _worker_thread(queue, cls, method_name, context_obj, scenario_kwargs,
+                   event_queue, schedule, slots):
+    try:
+        result = runner._run_scenario_once(cls, method_name, context_obj,
+                                           scenario_kwargs, event_queue)
+        result["schedule"] = schedule
+        queue.put(result)
+    finally:
+        slots.get_nowait()
+
+
 def _worker_process(queue, iteration_gen, timeout, times, max_concurrent,
                     context, cls, method_name, args, event_queue, aborted,
-                    runs_per_second, rps_cfg, processes_to_start, info):
+                    schedule, info):
     """Start scenario within threads.
 
-    Spawn N threads per second. Each thread runs the scenario once, and appends
-    result to queue. A maximum of max_concurrent threads will be ran
-    concurrently.
+    Start threads at the moments of the schedule. Each thread runs the
+    scenario once, and appends result to queue. A maximum of
+    max_concurrent threads will be ran concurrently.
+
+    Each result is extended with the "schedule" key: a dict with the
+    intended and the actual start timestamps of the iteration and the lag
+    between them. The lag appears when the process is not able to start
+    the iteration in time (e.g. all concurrent slots are busy since the
+    cloud slows down) and should be added to the duration of the
+    iteration to get the latency which is not affected by coordinated
+    omission.
 
     :param queue: queue object to append results
     :param iteration_gen: next iteration number generator
     :param timeout: operation's timeout
-    :param times: total number of scenario iterations to be run
+    :param times: total number of scenario iterations to be run or None to
+                  run iterations until the schedule is exhausted
     :param max_concurrent: maximum worker concurrency
     :param context: scenario context object
     :param cls: scenario class
@@ -49,27 +122,23 @@ def _worker_process(queue, iteration_gen, timeout, times, max_concurrent,
     :param args: scenario args
     :param aborted: multiprocessing.Event that aborts load generation if
                     the flag is set
-    :param runs_per_second: function that should return desired rps value
-    :param rps_cfg: rps section from task config
-    :param processes_to_start: int, number of started processes for scenario
-                               execution
+    :param schedule: callable which accepts the number of started processes
+                     and the index of the current process and returns an
+                     iterator over intended start moments (seconds since the
+                     start of load) of iterations of the current process
     :param info: info about all processes count and counter of runned process
     """
 
     pool = collections.deque()
-    if isinstance(rps_cfg, dict):
-        rps = rps_cfg["start"]
-    else:
-        rps = rps_cfg
-    sleep = 1.0 / rps
-
-    runner._log_worker_info(times=times, rps=rps, timeout=timeout,
-                            cls=cls, method_name=method_name, args=args)
+    slots = Queue.Queue(maxsize=max_concurrent)
 
-    time.sleep(
-        (sleep * info["processes_counter"]) / info["processes_to_start"])
+    # NOTE(agent): schedules are partials of generators over load configs
+    #   (rps, arrivals, etc), so the configs are logged instead of reprs
+    runner._log_worker_info(times=times,
+                            schedule=getattr(schedule, "args", schedule),
+                            timeout=timeout, cls=cls,
+                            method_name=method_name, args=args)
 
-    start = time.time()
     timeout_queue = Queue.Queue()
 
     if timeout:
@@ -79,14 +148,35 @@ def _worker_process(queue, iteration_gen, timeout, times, max_concurrent,
         )
         collector_thr_by_timeout.start()
 
+    moments = schedule(info["processes_to_start"], info["processes_counter"])
+    max_lag = 0.0
     i = 0
-    while i < times and not aborted.is_set():
+    start = utils.monotonic()
+    while (times is None or i < times) and not aborted.is_set():
+        try:
+            intended_start = start + next(moments)
+        except StopIteration:
+            break
+        delay = intended_start - utils.monotonic()
+        if delay > 0:
+            aborted.wait(delay)
+            if aborted.is_set():
+                break
+
+        # NOTE(agent): an iteration waits for a free slot, but the schedule is
+        #   not shifted, the delay is recorded as lag instead.
+        if not _acquire_slot(slots, aborted):
+            break
+        lag = max(utils.monotonic() - intended_start, 0.0)
+        max_lag = max(max_lag, lag)
+        now = time.time()
         scenario_context = runner._get_scenario_context(next(iteration_gen),
                                                         context)
         worker_args = (
-            queue, cls, method_name, scenario_context, args, event_queue)
-        thread = threading.Thread(target=runner._worker_thread,
-                                  args=worker_args)
+            queue, cls, method_name, scenario_context, args, event_queue,
+            {"intended_start": now - lag, "actual_start": now, "lag": lag},
+            slots)
+        thread = threading.Thread(target=_worker_thread, args=worker_args)
 
         i += 1
         thread.start()
@@ -94,24 +184,14 @@ def _worker_process(queue, iteration_gen, timeout, times, max_concurrent,
             timeout_queue.put((thread, time.time() + timeout))
         pool.append(thread)
 
-        time_gap = time.time() - start
-        real_rps = i / time_gap if time_gap else "Infinity"
-
-        LOG.debug("Worker: %s rps: %s (requested rps: %s)" %
-                  (i, real_rps, runs_per_second(
-                      rps_cfg, start, processes_to_start)))
-
-        # try to join latest thread(s) until it finished, or until time to
-        # start new thread (if we have concurrent slots available)
-        while i / (time.time() - start) > runs_per_second(
-                rps_cfg, start, processes_to_start) or (
-                    len(pool) >= max_concurrent):
-            if pool:
-                pool[0].join(0.001)
-                if not pool[0].isAlive():
-                    pool.popleft()
-            else:
-                time.sleep(0.001)
+        while pool and not pool[0].is_alive():
+            pool.popleft()
+
+    duration = utils.monotonic() - start
+    LOG.debug("Worker started %(iterations)d iterations in %(duration).3f "
+              "seconds (%(rps).2f rps), max lag is %(lag).3f seconds." %
+              {"iterations": i, "duration": duration,
+               "rps": i / duration if duration else 0.0, "lag": max_lag})
 
     while pool:
         pool.popleft().join()
@@ -234,18 +314,6 @@ class RPSScenarioRunner(runner.ScenarioRunner):
         max_cpu_used = min(cpu_count,
                            self.config.get("max_cpu_count", cpu_count))
 
-        def runs_per_second(rps_cfg, start_timer, number_of_processes):
-            """At the given second return desired rps."""
-
-            if not isinstance(rps_cfg, dict):
-                return float(rps_cfg) / number_of_processes
-            stage_order = (time.time() - start_timer) / rps_cfg.get(
-                "duration", 1) - 1
-            rps = (float(rps_cfg["start"] + rps_cfg["step"] * stage_order) /
-                   number_of_processes)
-
-            return min(rps, float(rps_cfg["end"]))
-
         processes_to_start = min(max_cpu_used, times,
                                  self.config.get("max_concurrency", times))
         times_per_worker, times_overhead = divmod(times, processes_to_start)
@@ -284,8 +352,8 @@ class RPSScenarioRunner(runner.ScenarioRunner):
                     times_per_worker + (times_overhead and 1),
                     concurrency_per_worker + (concurrency_overhead and 1),
                     context, cls, method_name, args, event_queue,
-                    self.aborted, runs_per_second, self.config["rps"],
-                    processes_to_start
+                    self.aborted,
+                    functools.partial(_schedule, self.config["rps"])
                 )
                 if times_overhead:
                     times_overhead -= 1
@@ -48,3 +48,24 @@ class IterationTime(sla.SLA):
     def details(self):
         return (_("Maximum seconds per iteration %.2fs <= %.2fs - %s") %
                 (self.max_iteration_time, self.criterion_value, self.status()))
+
+
+@sla.configure(name="max_corrected_seconds_per_iteration")
+class CorrectedIterationTime(IterationTime):
+    """Maximum time for one iteration in seconds including its start lag.
+
+    Runners which follow a schedule (e.g. rps) record how late each
+    iteration has been started. The lag is added to the duration of the
+    iteration, so the time which iterations spend waiting for the previous
+    slow ones is not hidden (so called coordinated omission).
+    """
+
+    def add_iteration(self, iteration):
+        lag = iteration.get("schedule", {}).get("lag", 0.0)
+        return super(CorrectedIterationTime, self).add_iteration(
+            dict(iteration, duration=iteration["duration"] + lag))
+
+    def details(self):
+        return (_("Maximum seconds per iteration including start lag "
+                  "%.2fs <= %.2fs - %s") %
+                (self.max_iteration_time, self.criterion_value, self.status()))
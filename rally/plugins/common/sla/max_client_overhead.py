@@ -0,0 +1,59 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+SLA (Service-level agreement) is set of details for determining compliance
+with contracted values such as maximum error rate or minimum response time.
+"""
+
+from rally.common.i18n import _
+from rally.common import streaming_algorithms
+from rally.task import sla
+
+
+@sla.configure(name="max_avg_client_overhead")
+class MaxAverageClientOverhead(sla.SLA):
+    """Maximum average share of iteration duration spent on client CPU.
+
+    The share (in percents) is CPU time spent by the load generator on the
+    iteration divided by the iteration duration. A high share means that
+    the load generator itself is a bottleneck. Iterations without measured
+    CPU time are ignored.
+    """
+    CONFIG_SCHEMA = {"type": "number", "minimum": 0.0, "maximum": 100.0}
+
+    def __init__(self, criterion_value):
+        super(MaxAverageClientOverhead, self).__init__(criterion_value)
+        self.avg = 0.0
+        self.avg_comp = streaming_algorithms.MeanComputation()
+
+    def add_iteration(self, iteration):
+        if (iteration.get("cpu_duration") is not None
+                and iteration.get("duration")):
+            self.avg_comp.add(
+                iteration["cpu_duration"] * 100.0 / iteration["duration"])
+            self.avg = self.avg_comp.result()
+        self.success = self.avg <= self.criterion_value
+        return self.success
+
+    def merge(self, other):
+        self.avg_comp.merge(other.avg_comp)
+        self.avg = self.avg_comp.result() or 0.0
+        self.success = self.avg <= self.criterion_value
+        return self.success
+
+    def details(self):
+        return (_("Average client overhead of one iteration %.2f%% <= "
+                  "%.2f%% - %s") %
+                (self.avg, self.criterion_value, self.status()))
@@ -12,15 +12,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import heapq
 import os
 import re
 import shutil
 import subprocess
 
+from six.moves import configparser
+
 from rally.common.i18n import _LE
 from rally.common.io import subunit_v2
 from rally.common import logging
+from rally.common import objects
 from rally.common import utils as common_utils
+from rally import consts
 from rally import exceptions
 from rally.verification import context
 from rally.verification import manager
@@ -31,6 +37,91 @@ LOG = logging.getLogger(__name__)
 
 TEST_NAME_RE = re.compile(r"^[a-zA-Z_.0-9]+(\[[a-zA-Z-_,=0-9]*\])?$")
 
+# The number of latest verifications to take durations of tests from.
+DURATIONS_HISTORY = 3
+
+
+def _get_test_name(test_id):
+    return test_id.split("[")[0]
+
+
+def _get_test_durations(verifier_uuid):
+    """Get durations of tests from the latest verifications of the verifier.
+
+    :returns: a dict where keys are names of tests (without tags) and values
+        are durations (in seconds)
+    """
+    verifications = [v for v in objects.Verification.list(verifier_uuid)
+                     if v.status in (consts.VerificationStatus.FINISHED,
+                                     consts.VerificationStatus.FAILED)]
+    verifications.sort(key=lambda v: v.created_at, reverse=True)
+
+    durations = {}
+    for verification in verifications[:DURATIONS_HISTORY]:
+        tests = verification.get_tests(
+            status=["success", "fail", "xfail", "uxsuccess"])
+        for test_id, test in tests.items():
+            durations.setdefault(_get_test_name(test_id),
+                                 float(test["duration"]))
+    return durations
+
+
+def shard_tests(tests, shards, durations=None):
+    """Split tests into shards with almost equal expected durations.
+
+    Tests of the same class are put into the same shard, so resources
+    which are shared by tests of a class are not created in each shard.
+    Classes are distributed from the longest one to the shortest one, each
+    to the shard with the least expected duration. The duration of tests
+    which have not run yet is assumed to be equal to the average one.
+
+    :param tests: a list of test IDs
+    :param shards: the number of shards
+    :param durations: a dict with known durations of tests by their names
+    :returns: a list of non-empty lists of test IDs
+    """
+    durations = durations or {}
+    default = (sum(durations.values()) / len(durations)
+               if durations else 1.0)
+
+    def get_class(test_id):
+        return _get_test_name(test_id).rsplit(".", 1)[0]
+
+    classes = collections.defaultdict(float)
+    for test_id in tests:
+        classes[get_class(test_id)] += durations.get(_get_test_name(test_id),
+                                                     default)
+
+    heap = [(0.0, shard) for shard in range(shards)]
+    assignment = {}
+    for cls, duration in sorted(classes.items(), key=lambda c: (-c[1], c[0])):
+        total, i = heapq.heappop(heap)
+        assignment[cls] = i
+        heapq.heappush(heap, (total + duration, i))
+
+    # NOTE(agent): tests of each shard keep their original order
+    result = [[] for _ in range(shards)]
+    for test_id in tests:
+        result[assignment[get_class(test_id)]].append(test_id)
+    return [shard for shard in result if shard]
+
+
+class _TeeStream(object):
+    """Saves everything which is read from the stream to the file."""
+
+    def __init__(self, stream, path):
+        self._stream = stream
+        self.path = path
+        self._file = open(path, "wb")
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._file.write(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
 
 @context.configure("testr", order=999)
 class TestrContext(context.VerifierContext):
@@ -40,11 +131,45 @@ class TestrContext(context.VerifierContext):
         super(TestrContext, self).__init__(ctx)
         self._tmp_files = []
 
+    def _write_load_list(self, tests):
+        load_list_file = common_utils.generate_random_path()
+        with open(load_list_file, "w") as f:
+            f.write("\n".join(tests))
+        self._tmp_files.append(load_list_file)
+        return load_list_file
+
+    def _setup_shards(self, run_args, shards):
+        """Prepare commands to run each shard of tests by a separate process.
+
+        testr is not used to run shards, since parallel testr processes
+        would share the same repository of results.
+        """
+        tests = run_args.get("load_list")
+        if not tests:
+            tests = self.verifier.manager.list_tests(
+                run_args.get("pattern", ""))
+        if run_args.get("failed"):
+            failing = set(self.verifier.manager.list_failing_tests())
+            tests = [t for t in tests if t in failing]
+        skip_list = run_args.get("skip_list")
+        if skip_list:
+            tests = [t for t in tests if t not in skip_list]
+
+        durations = _get_test_durations(self.verifier.uuid)
+        self.context["testr_cmds"] = [
+            self.verifier.manager.get_test_command(
+                self._write_load_list(shard))
+            for shard in shard_tests(tests, shards, durations)]
+
     def setup(self):
         self.context["testr_cmd"] = ["testr", "run", "--subunit"]
         run_args = self.verifier.manager.prepare_run_args(
             self.context.get("run_args", {}))
 
+        shards = run_args.get("shards", 1)
+        if shards > 1:
+            return self._setup_shards(run_args, shards)
+
         concurrency = run_args.get("concurrency", 0)
         if concurrency == 0 or concurrency > 1:
             self.context["testr_cmd"].append("--parallel")
@@ -60,11 +185,8 @@ class TestrContext(context.VerifierContext):
                 load_list = self.verifier.manager.list_tests()
             load_list = set(load_list) - set(skip_list)
         if load_list:
-            load_list_file = common_utils.generate_random_path()
-            with open(load_list_file, "w") as f:
-                f.write("\n".join(load_list))
-            self._tmp_files.append(load_list_file)
-            self.context["testr_cmd"].extend(["--load-list", load_list_file])
+            self.context["testr_cmd"].extend(
+                ["--load-list", self._write_load_list(load_list)])
 
         if run_args.get("failed"):
             self.context["testr_cmd"].append("--failing")
@@ -81,6 +203,11 @@ class TestrContext(context.VerifierContext):
 class TestrLauncher(manager.VerifierManager):
     """Testr wrapper."""
 
+    RUN_ARGS = {"shards": "Number of processes to split tests between. "
+                          "Tests are balanced by their durations in previous "
+                          "verifications and each process runs its tests "
+                          "serially. Cannot be used with 'concurrency'."}
+
     @property
     def run_environ(self):
         return self.environ
@@ -105,6 +232,19 @@ class TestrLauncher(manager.VerifierManager):
         super(TestrLauncher, self).install()
         self._init_testr()
 
+    def validate_args(self, args):
+        """Validate given arguments."""
+        super(TestrLauncher, self).validate_args(args)
+
+        if "shards" in args:
+            if not isinstance(args["shards"], int) or args["shards"] < 1:
+                raise exceptions.ValidationError(
+                    "'shards' argument should be a positive integer.")
+            if args["shards"] > 1 and args.get("concurrency"):
+                raise exceptions.ValidationError(
+                    "'shards' and 'concurrency' arguments cannot be used "
+                    "simultaneously.")
+
     def list_tests(self, pattern=""):
         """List all tests."""
         output = utils.check_output(["testr", "list-tests", pattern],
@@ -112,8 +252,44 @@ class TestrLauncher(manager.VerifierManager):
                                     debug_output=False)
         return [t for t in output.split("\n") if TEST_NAME_RE.match(t)]
 
+    def list_failing_tests(self):
+        """List tests which failed in the latest runs."""
+        process = subprocess.Popen(["testr", "failing", "--list"],
+                                   cwd=self.repo_dir, env=self.environ,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+        output = process.communicate()[0].decode("utf-8")
+        # NOTE(agent): testr exits with 1 if there are failing tests
+        if process.returncode not in (0, 1):
+            raise exceptions.RallyException(
+                "Failed to list failing tests: %s" % output)
+        return [t for t in output.split("\n") if TEST_NAME_RE.match(t)]
+
+    def get_test_command(self, load_list):
+        """Make the command which runs tests of the load list without testr.
+
+        The command is taken from .testr.conf of the repository in the same
+        way as testr does it.
+        """
+        parser = configparser.RawConfigParser()
+        parser.read(os.path.join(self.repo_dir, ".testr.conf"))
+        try:
+            command = parser.get("DEFAULT", "test_command")
+            id_option = parser.get("DEFAULT", "test_id_option")
+        except (configparser.NoSectionError, configparser.NoOptionError):
+            raise exceptions.RallyException(
+                "Tests of the verifier can not be split into shards: "
+                ".testr.conf does not define 'test_command' or "
+                "'test_id_option'.")
+        id_option = id_option.replace("$IDFILE", load_list)
+        return command.replace("$LISTOPT", "").replace("$IDOPTION",
+                                                       id_option)
+
     def run(self, context):
         """Run tests."""
+        if "testr_cmds" in context:
+            return self._run_shards(context)
+
         testr_cmd = context["testr_cmd"]
         run_args = context.get("run_args", {})
         LOG.debug("Test(s) started by the command: '%s'.", " ".join(testr_cmd))
@@ -123,14 +299,70 @@ class TestrLauncher(manager.VerifierManager):
                                   stderr=subprocess.STDOUT)
         xfail_list = run_args.get("xfail_list")
         skip_list = run_args.get("skip_list")
-        results = subunit_v2.parse(stream.stdout, live=True,
-                                   expected_failures=xfail_list,
-                                   skipped_tests=skip_list,
-                                   logger_name=self.verifier.name)
+        # NOTE(agent): results of tests are stored while the stream
+        #   is parsed, so they are not lost if the run is interrupted.
+        verification = context.get("verification")
+        results = subunit_v2.parse(
+            stream.stdout, live=True, expected_failures=xfail_list,
+            skipped_tests=skip_list, logger_name=self.verifier.name,
+            on_tests=verification.add_tests if verification else None)
         stream.wait()
 
         return results
 
+    def _run_shards(self, context):
+        """Run shards of tests in parallel and merge their results.
+
+        Outputs of shards are saved to files as well and loaded to the
+        repository of testr as one run when all the shards are finished,
+        so 'testr failing' works as after usual runs.
+        """
+        run_args = context.get("run_args", {})
+        processes = []
+        streams = []
+        for test_cmd in context["testr_cmds"]:
+            LOG.debug("Test(s) started by the command: '%s'.", test_cmd)
+            processes.append(subprocess.Popen(test_cmd, shell=True,
+                                              env=self.run_environ,
+                                              cwd=self.repo_dir,
+                                              stdout=subprocess.PIPE,
+                                              stderr=subprocess.STDOUT))
+            streams.append(_TeeStream(processes[-1].stdout,
+                                      common_utils.generate_random_path()))
+        try:
+            verification = context.get("verification")
+            results = subunit_v2.parse_streams(
+                streams, live=True,
+                expected_failures=run_args.get("xfail_list"),
+                skipped_tests=run_args.get("skip_list"),
+                logger_name=self.verifier.name,
+                on_tests=verification.add_tests if verification else None)
+            for process in processes:
+                process.wait()
+            for stream in streams:
+                stream.close()
+            if streams:
+                self._load_results([stream.path for stream in streams])
+        finally:
+            for stream in streams:
+                stream.close()
+                if os.path.exists(stream.path):
+                    os.remove(stream.path)
+
+        return results
+
+    def _load_results(self, paths):
+        """Load subunit streams to the repository of testr as one run."""
+        process = subprocess.Popen(["testr", "load", "--partial"] + paths,
+                                   cwd=self.repo_dir, env=self.environ,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+        output = process.communicate()[0]
+        # NOTE(agent): testr exits with 1 if some of the tests failed
+        if process.returncode not in (0, 1):
+            LOG.warning("Failed to load results to the repository of "
+                        "testr: %s", output)
+
     def prepare_run_args(self, run_args):
         """Prepare 'run_args' for testr context.
 
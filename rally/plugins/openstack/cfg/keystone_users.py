@@ -24,6 +24,17 @@ OPTS = {"users_context": [
     cfg.IntOpt("resource_management_workers",
                default=20,
                help=RESOURCE_MANAGEMENT_WORKERS_DESCR),
+    cfg.IntOpt("resource_management_retries",
+               default=5,
+               min=0,
+               help="How many times a request to Keystone should be retried "
+                    "if Keystone answers with 409 or 503 status code."),
+    cfg.FloatOpt("resource_management_backoff",
+                 default=0.5,
+                 min=0,
+                 help="Initial delay in seconds before retrying a request "
+                      "to Keystone which has failed with 409 or 503 status "
+                      "code. The delay is doubled on each next attempt."),
     cfg.StrOpt("project_domain",
                default="default",
                help=PROJECT_DOMAIN_DESCR),
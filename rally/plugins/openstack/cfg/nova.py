@@ -254,5 +254,15 @@ OPTS = {"benchmark": [
                  help="Nova volume detach timeout"),
     cfg.FloatOpt("nova_detach_volume_poll_interval",
                  default=float(2),
-                 help="Nova volume detach poll interval")
+                 help="Nova volume detach poll interval"),
+    # bulk polling of servers
+    cfg.BoolOpt("nova_server_bulk_polling",
+                default=False,
+                help="Refresh servers which are waited for boot or delete "
+                     "by a single list request per tenant and round instead "
+                     "of a request per server"),
+    cfg.FloatOpt("nova_server_bulk_polling_max_interval",
+                 default=float(8),
+                 help="Maximal interval between servers list requests while "
+                      "statuses of servers do not change")
 ]}
@@ -17,5 +17,18 @@ from oslo_config import cfg
 
 OPTS = {"benchmark": [
     cfg.BoolOpt("enable_profiler", default=True,
-        help="Enable or disable osprofiler to trace the scenarios")
+        help="Enable or disable osprofiler to trace the scenarios"),
+    cfg.FloatOpt("profiler_sampling_rate", default=1.0, min=0, max=1,
+                 help="The share of iterations to trace by osprofiler. "
+                      "Iterations are sampled evenly, e.g. each tenth "
+                      "iteration is traced with 0.1 value"),
+    cfg.StrOpt("profiler_trace_url",
+               help="URL of a trace in the UI of the osprofiler collector "
+                    "with {trace_id} placeholder for ID of the trace. It is "
+                    "saved with traces of iterations and HTML reports link "
+                    "the slowest traced iterations to it"),
+    cfg.StrOpt("profiler_connection_string",
+               help="Connection string of the osprofiler collector (e.g. "
+                    "redis://127.0.0.1:6379) which spans of atomic actions "
+                    "are sent to. Without it only IDs of traces are saved")
 ]}
@@ -14,9 +14,14 @@
 #    under the License.
 
 import collections
+import functools
+import random
+import threading
+import time
 import uuid
 
 from oslo_config import cfg
+from six import moves
 
 from rally.common import broker
 from rally.common.i18n import _
@@ -46,6 +51,167 @@ PROJECT_DOMAIN_DESCR = "ID of domain in which projects will be created."
 USER_DOMAIN_DESCR = "ID of domain in which users will be created."
 
 
+# NOTE(agent): Keystone answers with these codes when it is not able
+#   to handle more concurrent requests (503) or when concurrent requests
+#   conflict with each other (409).
+OVERLOAD_STATUS_CODES = (409, 503)
+
+
+def _is_overloaded(exc):
+    status = getattr(exc, "http_status", None) or getattr(exc, "code", None)
+    return status in OVERLOAD_STATUS_CODES
+
+
+class Provisioner(object):
+    """Executes identity requests by the broker.
+
+    Jobs are handed over to consumers of rally.common.broker, so the
+    publisher never gets far ahead of them. Each consumer uses its own
+    identity client during the whole run.
+
+    The number of concurrent requests is adapted to Keystone: it is halved
+    each time Keystone answers with 409 or 503 (such request is retried
+    after an exponential backoff) and is slowly restored after successful
+    requests.
+    """
+
+    def __init__(self, credential, workers, name_generator=None,
+                 retries=None, backoff=None):
+        """Init provisioner.
+
+        :param credential: admin credential to make requests with
+        :param workers: the number of consumer threads
+        :param name_generator: a function for generating random names
+        :param retries: how many times a request should be retried on 409
+            or 503. Defaults to users_context.resource_management_retries
+        :param backoff: initial delay before retry. Defaults to
+            users_context.resource_management_backoff
+        """
+        self.credential = credential
+        self.workers = workers
+        self.name_generator = name_generator
+        if retries is None:
+            retries = CONF.users_context.resource_management_retries
+        self.retries = retries
+        if backoff is None:
+            backoff = CONF.users_context.resource_management_backoff
+        self.backoff = backoff
+
+        self.stats = collections.OrderedDict()
+        self._cond = threading.Condition()
+        self._limit = float(workers)
+        self._active = 0
+
+    def _get_client(self, cache):
+        if "client" not in cache:
+            clients = osclients.Clients(self.credential)
+            cache["client"] = identity.Identity(
+                clients, name_generator=self.name_generator)
+        return cache["client"]
+
+    def _acquire(self):
+        with self._cond:
+            while self._active >= int(self._limit):
+                self._cond.wait()
+            self._active += 1
+
+    def _release(self, overloaded):
+        with self._cond:
+            self._active -= 1
+            if overloaded:
+                self._limit = max(1.0, self._limit / 2)
+            else:
+                self._limit = min(float(self.workers),
+                                  self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def _update_stats(self, action, **kwargs):
+        with self._cond:
+            stats = self.stats.setdefault(
+                action, {"count": 0, "failed": 0, "retries": 0,
+                         "started_at": None, "finished_at": None})
+            for key in ("count", "failed", "retries"):
+                stats[key] += kwargs.get(key, 0)
+            if "started_at" in kwargs:
+                stats["started_at"] = min(
+                    stats["started_at"] or kwargs["started_at"],
+                    kwargs["started_at"])
+            if "finished_at" in kwargs:
+                stats["finished_at"] = max(stats["finished_at"] or 0,
+                                           kwargs["finished_at"])
+
+    def _call(self, action, func, client):
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                result = func(client)
+            except Exception as e:
+                overloaded = _is_overloaded(e)
+                self._release(overloaded)
+                if not overloaded or attempt >= self.retries:
+                    raise
+            else:
+                self._release(False)
+                return result
+
+            delay = self.backoff * 2 ** attempt
+            attempt += 1
+            self._update_stats(action, retries=1)
+            LOG.debug("Keystone is overloaded, retrying '%(action)s' in "
+                      "%(delay).2f seconds (attempt #%(attempt)d)."
+                      % {"action": action, "delay": delay,
+                         "attempt": attempt})
+            time.sleep(random.uniform(delay / 2, delay))
+
+    def _consume(self, cache, job):
+        action, func, callback = job
+        self._update_stats(action, started_at=time.time())
+        result = None
+        try:
+            result = self._call(action, func, self._get_client(cache))
+        except Exception as e:
+            self._update_stats(action, failed=1)
+            LOG.warning(_("Failed to %(action)s: %(error)s")
+                        % {"action": action.replace("_", " "), "error": e})
+            if logging.is_debug():
+                LOG.exception(e)
+        self._update_stats(action, count=1, finished_at=time.time())
+        if callback:
+            callback(result)
+
+    def run(self, publish):
+        """Run the broker with jobs of the given publisher.
+
+        :param publish: a function which accepts a single argument - a
+            function for putting jobs to the queue. A job is a tuple of
+            action name, a function which makes the request using an
+            identity client passed to it, and a callback which receives
+            the result of the request (None if it has failed). Callbacks
+            are called from consumer threads.
+        :returns: a dict with statistics per action
+        """
+        broker.run(lambda queue: publish(queue.append), self._consume,
+                   consumers_count=self.workers,
+                   queue_size=self.workers * 2)
+        return self.stats
+
+
+def _drain(queue, block=False):
+    """Get all available items from the queue.
+
+    :param queue: a Queue object
+    :param block: whether wait for the first item or not
+    """
+    if block:
+        yield queue.get()
+    while True:
+        try:
+            yield queue.get_nowait()
+        except moves.queue.Empty:
+            break
+
+
 @validation.add("required_platform", platform="openstack", users=True)
 @context.configure(name="users", namespace="openstack", order=100)
 class UserGenerator(context.Context):
@@ -150,138 +316,176 @@ class UserGenerator(context.Context):
                 if default:
                     clients.neutron().delete_security_group(default[0]["id"])
 
-    def _create_tenants(self):
-        threads = self.config["resource_management_workers"]
-
-        tenants = collections.deque()
-
-        def publish(queue):
-            for i in range(self.config["tenants"]):
-                args = (self.config["project_domain"], self.task["uuid"], i)
-                queue.append(args)
-
-        def consume(cache, args):
-            domain, task_id, i = args
-            if "client" not in cache:
-                clients = osclients.Clients(self.credential)
-                cache["client"] = identity.Identity(
-                    clients, name_generator=self.generate_random_name)
-            tenant = cache["client"].create_project(domain_name=domain)
-            tenant_dict = {"id": tenant.id, "name": tenant.name, "users": []}
-            tenants.append(tenant_dict)
-
-        # NOTE(msdubov): consume() will fill the tenants list in the closure.
-        broker.run(publish, consume, threads)
-        tenants_dict = {}
-        for t in tenants:
-            tenants_dict[t["id"]] = t
-
-        return tenants_dict
-
-    def _create_users(self):
-        # NOTE(msdubov): This should be called after _create_tenants().
-        threads = self.config["resource_management_workers"]
-        users_per_tenant = self.config["users_per_tenant"]
-        default_role = cfg.CONF.users_context.keystone_default_role
-
-        users = collections.deque()
+    def _get_provisioner(self):
+        return Provisioner(self.credential,
+                           self.config["resource_management_workers"],
+                           name_generator=self.generate_random_name)
+
+    def _save_execution_stats(self, stage, stats, started_at):
+        context_execution = self.context.setdefault("context_execution", {})
+        ctx_stats = context_execution.setdefault(
+            "%s@%s" % (self.get_name(), self.get_platform()), {})
+        ctx_stats[stage] = {"duration": time.time() - started_at,
+                            "actions": stats}
+
+    def _create_user(self, client, tenant_id, tenant_name):
+        password = str(uuid.uuid4())
+        user = client.create_user(
+            self.generate_random_name(), password=password,
+            project_id=tenant_id, domain_name=self.config["user_domain"],
+            default_role=cfg.CONF.users_context.keystone_default_role)
+        user_credential = credential.OpenStackCredential(
+            auth_url=self.credential.auth_url,
+            username=user.name,
+            password=password,
+            tenant_name=tenant_name,
+            permission=consts.EndpointPermission.USER,
+            project_domain_name=self.config["project_domain"],
+            user_domain_name=self.config["user_domain"],
+            endpoint_type=self.credential.endpoint_type,
+            https_insecure=self.credential.https_insecure,
+            https_cacert=self.credential.https_cacert,
+            region_name=self.credential.region_name,
+            profiler_hmac_key=self.credential.profiler_hmac_key)
+        return {"id": user.id,
+                "credential": user_credential,
+                "tenant_id": tenant_id}
 
-        def publish(queue):
-            for tenant_id in self.context["tenants"]:
-                for user_id in range(users_per_tenant):
-                    username = self.generate_random_name()
-                    password = str(uuid.uuid4())
-                    args = (username, password, self.config["project_domain"],
-                            self.config["user_domain"], tenant_id)
-                    queue.append(args)
-
-        def consume(cache, args):
-            username, password, project_dom, user_dom, tenant_id = args
-            if "client" not in cache:
-                clients = osclients.Clients(self.credential)
-                cache["client"] = identity.Identity(
-                    clients, name_generator=self.generate_random_name)
-            client = cache["client"]
-            user = client.create_user(username, password=password,
-                                      project_id=tenant_id,
-                                      domain_name=user_dom,
-                                      default_role=default_role)
-            user_credential = credential.OpenStackCredential(
-                auth_url=self.credential.auth_url,
-                username=user.name,
-                password=password,
-                tenant_name=self.context["tenants"][tenant_id]["name"],
-                permission=consts.EndpointPermission.USER,
-                project_domain_name=project_dom,
-                user_domain_name=user_dom,
-                endpoint_type=self.credential.endpoint_type,
-                https_insecure=self.credential.https_insecure,
-                https_cacert=self.credential.https_cacert,
-                region_name=self.credential.region_name,
-                profiler_hmac_key=self.credential.profiler_hmac_key)
-            users.append({"id": user.id,
-                          "credential": user_credential,
-                          "tenant_id": tenant_id})
-
-        # NOTE(msdubov): consume() will fill the users list in the closure.
-        broker.run(publish, consume, threads)
-        return list(users)
-
-    def _get_consumer_for_deletion(self, func_name):
-        def consume(cache, resource_id):
-            if "client" not in cache:
-                clients = osclients.Clients(self.credential)
-                cache["client"] = identity.Identity(clients)
-            getattr(cache["client"], func_name)(resource_id)
-        return consume
-
-    def _delete_tenants(self):
-        threads = self.config["resource_management_workers"]
+    def _create_tenants_and_users(self):
+        """Create tenants and users in a pipeline.
 
-        def publish(queue):
+        Users of a tenant are scheduled as soon as the tenant is created,
+        so creation of users overlaps with creation of the rest tenants.
+        """
+        tenants_num = self.config["tenants"]
+        users_per_tenant = self.config["users_per_tenant"]
+        project_domain = self.config["project_domain"]
+
+        tenants = {}
+        users = []
+        created_tenants = moves.queue.Queue()
+
+        def create_tenant(client):
+            return client.create_project(domain_name=project_domain)
+
+        def on_user_created(user):
+            if user is not None:
+                users.append(user)
+
+        def publish_users(put, tenant):
+            if tenant is None:
+                # the tenant has not been created
+                return
+            tenants[tenant.id] = {"id": tenant.id, "name": tenant.name,
+                                  "users": []}
+            for i in range(users_per_tenant):
+                put(("create_user",
+                     functools.partial(self._create_user, tenant_id=tenant.id,
+                                       tenant_name=tenant.name),
+                     on_user_created))
+
+        def publish(put):
+            processed = 0
+            for i in range(tenants_num):
+                put(("create_project", create_tenant, created_tenants.put))
+                for tenant in _drain(created_tenants):
+                    processed += 1
+                    publish_users(put, tenant)
+            while processed < tenants_num:
+                for tenant in _drain(created_tenants, block=True):
+                    processed += 1
+                    publish_users(put, tenant)
+
+        stats = self._get_provisioner().run(publish)
+        return tenants, users, stats
+
+    def _delete_tenants_and_users(self):
+        """Delete users and tenants in a pipeline.
+
+        A tenant is deleted as soon as all its users are deleted.
+        """
+        users_left = collections.Counter(
+            u["tenant_id"] for u in self.context["users"])
+        deleted_users = moves.queue.Queue()
+
+        def delete_user(client, user_id):
+            client.delete_user(user_id)
+
+        def delete_tenant(client, tenant_id):
+            client.delete_project(tenant_id)
+
+        def publish_tenant(put, tenant_id):
+            put(("delete_project",
+                 functools.partial(delete_tenant, tenant_id=tenant_id), None))
+
+        def user_deleted(tenant_id, result):
+            deleted_users.put(tenant_id)
+
+        def on_user_deleted(put, tenant_id):
+            users_left[tenant_id] -= 1
+            if not users_left[tenant_id] and (
+                    tenant_id in self.context["tenants"]):
+                publish_tenant(put, tenant_id)
+
+        def publish(put):
             for tenant_id in self.context["tenants"]:
-                queue.append(tenant_id)
-
-        broker.run(publish, self._get_consumer_for_deletion("delete_project"),
-                   threads)
-        self.context["tenants"] = {}
+                if not users_left[tenant_id]:
+                    publish_tenant(put, tenant_id)
 
-    def _delete_users(self):
-        threads = self.config["resource_management_workers"]
-
-        def publish(queue):
+            processed = 0
             for user in self.context["users"]:
-                queue.append(user["id"])
+                put(("delete_user",
+                     functools.partial(delete_user, user_id=user["id"]),
+                     functools.partial(user_deleted, user["tenant_id"])))
+                for tenant_id in _drain(deleted_users):
+                    processed += 1
+                    on_user_deleted(put, tenant_id)
+            while processed < len(self.context["users"]):
+                for tenant_id in _drain(deleted_users, block=True):
+                    processed += 1
+                    on_user_deleted(put, tenant_id)
 
-        broker.run(publish, self._get_consumer_for_deletion("delete_user"),
-                   threads)
+        for user in self.context["users"]:
+            osclients.invalidate_shared_cache(user["credential"])
+        stats = self._get_provisioner().run(publish)
         self.context["users"] = []
+        self.context["tenants"] = {}
+        return stats
 
     def create_users(self):
-        """Create tenants and users, using the broker pattern."""
+        """Create tenants and users, using the pipeline of workers."""
         threads = self.config["resource_management_workers"]
+        users_num = self.config["users_per_tenant"] * self.config["tenants"]
 
-        LOG.debug("Creating %(tenants)d tenants using %(threads)s threads" %
-                  {"tenants": self.config["tenants"], "threads": threads})
-        self.context["tenants"] = self._create_tenants()
+        LOG.debug("Creating %(tenants)d tenants and %(users)d users using "
+                  "%(threads)s threads" % {"tenants": self.config["tenants"],
+                                           "users": users_num,
+                                           "threads": threads})
+        started_at = time.time()
+        tenants, users, stats = self._create_tenants_and_users()
+        self._save_execution_stats("setup", stats, started_at)
+
+        self.context["tenants"] = tenants
+        self.context["users"] = users
+        for user in self.context["users"]:
+            self.context["tenants"][user["tenant_id"]]["users"].append(user)
 
         if len(self.context["tenants"]) < self.config["tenants"]:
             raise exceptions.ContextSetupFailure(
                 ctx_name=self.get_name(),
                 msg=_("Failed to create the requested number of tenants."))
 
-        users_num = self.config["users_per_tenant"] * self.config["tenants"]
-        LOG.debug("Creating %(users)d users using %(threads)s threads" %
-                  {"users": users_num, "threads": threads})
-        self.context["users"] = self._create_users()
-        for user in self.context["users"]:
-            self.context["tenants"][user["tenant_id"]]["users"].append(user)
-
         if len(self.context["users"]) < users_num:
             raise exceptions.ContextSetupFailure(
                 ctx_name=self.get_name(),
                 msg=_("Failed to create the requested number of users."))
 
+    def delete_users(self):
+        """Delete tenants and users, using the pipeline of workers."""
+        started_at = time.time()
+        stats = self._delete_tenants_and_users()
+        self._save_execution_stats("cleanup", stats, started_at)
+
     def use_existing_users(self):
         LOG.debug("Using existing users")
         for user_credential in self.existing_users:
@@ -314,11 +518,10 @@ class UserGenerator(context.Context):
 
     @logging.log_task_wrapper(LOG.info, _("Exit context: `users`"))
     def cleanup(self):
-        """Delete tenants and users, using the broker pattern."""
+        """Delete tenants and users."""
         if self.existing_users:
             # nothing to do here.
             return
         else:
             self._remove_default_security_group()
-            self._delete_users()
-            self._delete_tenants()
+            self.delete_users()
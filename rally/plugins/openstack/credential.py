@@ -48,8 +48,6 @@ class OpenStackCredential(credential.Credential):
         self.https_cacert = https_cacert
         self.profiler_hmac_key = profiler_hmac_key
 
-        self._clients_cache = {}
-
     # backward compatibility
     @property
     def insecure(self):
@@ -92,8 +90,7 @@ class OpenStackCredential(credential.Credential):
                       key=lambda s: s["name"])
 
     def clients(self, api_info=None):
-        return osclients.Clients(self, api_info=api_info,
-                                 cache=self._clients_cache)
+        return osclients.Clients(self, api_info=api_info)
 
 
 @credential.configure_builder("openstack")
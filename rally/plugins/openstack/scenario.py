@@ -17,9 +17,9 @@ import functools
 import random
 
 from oslo_config import cfg
-from osprofiler import profiler
 from rally import osclients
 from rally.task import scenario
+from rally.task import tracing
 
 configure = functools.partial(scenario.configure, namespace="openstack")
 
@@ -112,7 +112,11 @@ class OpenStackScenario(scenario.Scenario):
         return client(version) if version is not None else client()
 
     def _init_profiler(self, context):
-        """Inits the profiler."""
+        """Inits the profiler.
+
+        The iteration is traced only if it is sampled by
+        [benchmark]profiler_sampling_rate option.
+        """
         if not CONF.benchmark.enable_profiler:
             return
         if context is not None:
@@ -128,8 +132,14 @@ class OpenStackScenario(scenario.Scenario):
                     profiler_hmac_key = cred.profiler_hmac_key
             if profiler_hmac_key is None:
                 return
-            profiler.init(profiler_hmac_key)
-            trace_id = profiler.get().get_base_id()
+            iteration = context.get("iteration", 1)
+            if not tracing.is_sampled(iteration,
+                                      CONF.benchmark.profiler_sampling_rate):
+                return
+            trace_id = tracing.start(
+                profiler_hmac_key, iteration,
+                trace_url=CONF.benchmark.profiler_trace_url,
+                connection_string=CONF.benchmark.profiler_connection_string)
             self.add_output(complete={
                 "title": "OSProfiler Trace-ID",
                 "chart_plugin": "TextArea",
@@ -48,6 +48,29 @@ class NovaScenario(scenario.OpenStackScenario):
             net_idx = self.context["iteration"] % len(nets)
             return [{"net-id": nets[net_idx]}]
 
+    def _get_server_updater(self, check_interval, timeout):
+        """Return the function to refresh servers while waiting for them.
+
+        If bulk polling is enabled, servers of the tenant are refreshed by
+        a status watcher shared by iterations of the process which use the
+        same nova client and check interval.
+
+        :param check_interval: the interval between refreshes of servers
+        :param timeout: the timeout of the whole wait
+        """
+        tenant_id = self.context.get("tenant", {}).get("id")
+        if not (CONF.benchmark.nova_server_bulk_polling and tenant_id):
+            return utils.get_from_manager()
+        nova = self.clients("nova")
+        watcher = utils.get_status_watcher(
+            ("nova_servers", tenant_id, nova, check_interval),
+            # NOTE(agent): Nova does not filter servers by a list of IDs, so
+            #   all servers of the tenant are listed.
+            lambda ids: nova.servers.list(),
+            min_interval=check_interval,
+            max_interval=CONF.benchmark.nova_server_bulk_polling_max_interval)
+        return utils.get_from_watcher(watcher, timeout=timeout)
+
     @atomic.action_timer("nova.boot_server")
     def _boot_server(self, image, flavor,
                      auto_assign_nic=False, **kwargs):
@@ -84,7 +107,9 @@ class NovaScenario(scenario.OpenStackScenario):
         server = utils.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
-            update_resource=utils.get_from_manager(),
+            update_resource=self._get_server_updater(
+                CONF.benchmark.nova_server_boot_poll_interval,
+                CONF.benchmark.nova_server_boot_timeout),
             timeout=CONF.benchmark.nova_server_boot_timeout,
             check_interval=CONF.benchmark.nova_server_boot_poll_interval
         )
@@ -384,7 +409,9 @@ class NovaScenario(scenario.OpenStackScenario):
                 server,
                 ready_statuses=["deleted"],
                 check_deletion=True,
-                update_resource=utils.get_from_manager(),
+                update_resource=self._get_server_updater(
+                    CONF.benchmark.nova_server_delete_poll_interval,
+                    CONF.benchmark.nova_server_delete_timeout),
                 timeout=CONF.benchmark.nova_server_delete_timeout,
                 check_interval=CONF.benchmark.nova_server_delete_poll_interval
             )
@@ -408,7 +435,9 @@ class NovaScenario(scenario.OpenStackScenario):
                     server,
                     ready_statuses=["deleted"],
                     check_deletion=True,
-                    update_resource=utils.get_from_manager(),
+                    update_resource=self._get_server_updater(
+                        CONF.benchmark.nova_server_delete_poll_interval,
+                        CONF.benchmark.nova_server_delete_timeout),
                     timeout=CONF.benchmark.nova_server_delete_timeout,
                     check_interval=CONF.
                     benchmark.nova_server_delete_poll_interval
@@ -585,8 +614,9 @@ class NovaScenario(scenario.OpenStackScenario):
         servers = [utils.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
-            update_resource=utils.
-            get_from_manager(),
+            update_resource=self._get_server_updater(
+                CONF.benchmark.nova_server_boot_poll_interval,
+                CONF.benchmark.nova_server_boot_timeout),
             timeout=CONF.benchmark.nova_server_boot_timeout,
             check_interval=CONF.benchmark.nova_server_boot_poll_interval
         ) for server in servers]
@@ -188,6 +188,57 @@ class VMScenario(nova_utils.NovaScenario):
             self._delete_floating_ip(server, fip)
         return self._delete_server(server, force=force_delete)
 
+    @atomic.action_timer("vm.run_command_on_servers")
+    def _run_command_on_servers(self, ssh_objects, cmd, stdin=None,
+                                timeout=3600, concurrency=10):
+        """Run the command on several servers concurrently.
+
+        Durations of the command on servers and the number of failed
+        commands are added to the iteration output as additive charts.
+
+        :param ssh_objects: list of SSH objects of servers
+        :param cmd: command to execute, can be a list
+        :param stdin: string to pass to stdin of each command
+        :param timeout: timeout of the command on each server
+        :param concurrency: the maximum number of commands executed at once
+
+        :returns: list of results (see sshutils.execute_on_hosts) in the
+            order the commands finished
+        """
+        results = []
+        for result in sshutils.execute_on_hosts(ssh_objects, cmd,
+                                                stdin=stdin, timeout=timeout,
+                                                concurrency=concurrency):
+            if result["error"]:
+                LOG.warning("Failed to run command on %s: %s"
+                            % (result["host"], result["error"]))
+            elif result["status"]:
+                LOG.debug("Command on %s exited with status %s"
+                          % (result["host"], result["status"]))
+            results.append(result)
+        if not results:
+            return results
+
+        durations = [r["duration"] for r in results]
+        durations_data = [["min", min(durations)],
+                          ["avg", sum(durations) / len(durations)],
+                          ["max", max(durations)]]
+        self.add_output(additive={
+            "title": "Command duration on servers",
+            "description": "The fastest, average and the slowest command "
+                           "among %d servers" % len(results),
+            "chart_plugin": "Lines",
+            "data": durations_data,
+            "label": "Seconds",
+            "axis_label": "Iteration"})
+        failed = len([r for r in results if r["status"] != 0])
+        self.add_output(additive={
+            "title": "Command status on servers",
+            "chart_plugin": "Pie",
+            "data": [["succeeded", len(results) - failed],
+                     ["failed", failed]]})
+        return results
+
     @atomic.action_timer("vm.wait_for_ssh")
     def _wait_for_ssh(self, ssh, timeout=120, interval=1):
         ssh.wait(timeout, interval)
@@ -228,5 +279,8 @@ class VMScenario(nova_utils.NovaScenario):
         pkey = pkey if pkey else self.context["user"]["keypair"]["private"]
         ssh = sshutils.SSH(username, server_ip, port=port,
                            pkey=pkey, password=password)
-        self._wait_for_ssh(ssh, timeout, interval)
-        return self._run_command_over_ssh(ssh, command)
+        try:
+            self._wait_for_ssh(ssh, timeout, interval)
+            return self._run_command_over_ssh(ssh, command)
+        finally:
+            ssh.close()
@@ -227,6 +227,12 @@ class RuncommandHeat(vm_utils.VMScenario):
          should print `key` `value` pairs separated by colon. These pairs will
          be presented in results.
 
+         The template can output a list of IPs of several gate nodes as
+         `gate_nodes` instead of a single `gate_node`. In that case the
+         workload is started on all of them at once, e.g. to generate load
+         by several siege clients, and results of each gate node are
+         presented separately.
+
          Gate node should be accessible via ssh with keypair `key_name`, so
          heat template should accept parameter `key_name`.
 
@@ -243,40 +249,69 @@ class RuncommandHeat(vm_utils.VMScenario):
                                      template, files=files,
                                      parameters=parameters)
         self.stack.create()
+        gate_nodes = []
         for output in self.stack.stack.outputs:
             if output["output_key"] == "gate_node":
-                ip = output["output_value"]
-                break
-        ssh = sshutils.SSH(workload["username"], ip, pkey=keypair["private"])
-        ssh.wait()
-        script = workload.get("resource")
-        if script:
-            script = pkgutil.get_data(*script)
-        else:
-            script = open(workload["file"]).read()
-        ssh.execute("cat > /tmp/.rally-workload", stdin=script)
-        ssh.execute("chmod +x /tmp/.rally-workload")
-        with atomic.ActionTimer(self, "runcommand_heat.workload"):
-            status, out, err = ssh.execute(
-                "/tmp/.rally-workload",
-                stdin=json.dumps(self.stack.stack.outputs))
-        rows = []
-        for line in out.splitlines():
-            row = line.split(":")
-            if len(row) != 2:
-                raise exceptions.ScriptError("Invalid data '%s'" % line)
-            rows.append(row)
-        if not rows:
-            raise exceptions.ScriptError("No data returned. Original error "
-                                         "message is %s" % err)
-        self.add_output(
-            complete={"title": "Workload summary",
-                      "description": "Data generated by workload",
-                      "chart_plugin": "Table",
-                      "data": {
-                          "cols": ["key", "value"],
-                          "rows": rows}}
-        )
+                gate_nodes.append(output["output_value"])
+            elif output["output_key"] == "gate_nodes":
+                gate_nodes.extend(output["output_value"])
+        if not gate_nodes:
+            raise exceptions.ScriptError("The stack has neither gate_node "
+                                         "nor gate_nodes output.")
+        ssh_objects = [sshutils.SSH(workload["username"], ip,
+                                    pkey=keypair["private"])
+                       for ip in gate_nodes]
+        try:
+            for ssh in ssh_objects:
+                ssh.wait()
+            script = workload.get("resource")
+            if script:
+                script = pkgutil.get_data(*script)
+            else:
+                script = open(workload["file"]).read()
+            for result in sshutils.execute_on_hosts(
+                    ssh_objects,
+                    "cat > /tmp/.rally-workload && "
+                    "chmod +x /tmp/.rally-workload",
+                    stdin=script):
+                if result["error"]:
+                    raise exceptions.ScriptError(
+                        "Failed to upload the workload to %s: %s"
+                        % (result["host"], result["error"]))
+            with atomic.ActionTimer(self, "runcommand_heat.workload"):
+                results = self._run_command_on_servers(
+                    ssh_objects, "/tmp/.rally-workload",
+                    stdin=json.dumps(self.stack.stack.outputs))
+        finally:
+            for ssh in ssh_objects:
+                ssh.close()
+        results.sort(key=lambda r: gate_nodes.index(r["host"]))
+        for result in results:
+            if result["error"]:
+                raise exceptions.ScriptError(
+                    "Failed to run the workload on %s: %s"
+                    % (result["host"], result["error"]))
+            rows = []
+            for line in result["stdout"].splitlines():
+                row = line.split(":")
+                if len(row) != 2:
+                    raise exceptions.ScriptError("Invalid data '%s'" % line)
+                rows.append(row)
+            if not rows:
+                raise exceptions.ScriptError(
+                    "No data returned. Original error message is %s"
+                    % result["stderr"])
+            title = "Workload summary"
+            if len(gate_nodes) > 1:
+                title = "Workload summary of %s" % result["host"]
+            self.add_output(
+                complete={"title": title,
+                          "description": "Data generated by workload",
+                          "chart_plugin": "Table",
+                          "data": {
+                              "cols": ["key", "value"],
+                              "rows": rows}}
+            )
 
 BASH_DD_LOAD_TEST = """
 #!/bin/sh
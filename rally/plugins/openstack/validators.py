@@ -32,6 +32,58 @@ LOG = logging.getLogger(__name__)
 ValidationResult = validation.ValidationResult
 
 
+def get_image(credentials, clients, image_args):
+    """Find an image and return its dict with normalized size fields.
+
+    The lookup is memoized within semantic validation of a task, so it is
+    performed once per user for all workloads with the same image.
+
+    :param credentials: credentials dict passed to validators
+    :param clients: osclients.Clients of the user to search image with
+    :param image_args: image spec with `id`, `name` or `regex`
+    """
+    def load():
+        image_id = openstack_types.GlanceImage.transform(
+            clients=clients, resource_config=image_args)
+        image = clients.glance().images.get(image_id)
+        if hasattr(image, "to_dict"):
+            # NOTE(stpierre): Glance v1 images are objects that can be
+            # converted to dicts; Glance v2 images are already
+            # dict-like
+            image = image.to_dict()
+        if not image.get("size"):
+            image["size"] = 0
+        if not image.get("min_ram"):
+            image["min_ram"] = 0
+        if not image.get("min_disk"):
+            image["min_disk"] = 0
+        return image
+
+    key = ["glance_image", getattr(clients, "credential", None), image_args]
+    return validation.cached_lookup(
+        credentials, "openstack", key, load,
+        cached_errors=(glance_exc.HTTPNotFound,
+                       exceptions.InvalidScenarioArgument))
+
+
+def get_flavor(credentials, clients, flavor_args):
+    """Find a flavor, memoized within semantic validation of a task.
+
+    :param credentials: credentials dict passed to validators
+    :param clients: osclients.Clients of the user to search flavor with
+    :param flavor_args: flavor spec with `id`, `name` or `regex`
+    """
+    def load():
+        flavor_id = openstack_types.Flavor.transform(
+            clients=clients, resource_config=flavor_args)
+        return clients.nova().flavors.get(flavor=flavor_id)
+
+    key = ["nova_flavor", getattr(clients, "credential", None), flavor_args]
+    return validation.cached_lookup(
+        credentials, "openstack", key, load,
+        cached_errors=(nova_exc.NotFound, exceptions.InvalidScenarioArgument))
+
+
 @validation.add("required_platform", platform="openstack", users=True)
 @validation.configure(name="image_exists", namespace="openstack")
 class ImageExistsValidator(validation.Validator):
@@ -72,9 +124,7 @@ class ImageExistsValidator(validation.Validator):
         try:
             for user in credentials["openstack"]["users"]:
                 clients = user.get("credential", {}).clients()
-                image_id = openstack_types.GlanceImage.transform(
-                    clients=clients, resource_config=image_args)
-                clients.glance().images.get(image_id)
+                get_image(credentials, clients, image_args)
         except (glance_exc.HTTPNotFound, exceptions.InvalidScenarioArgument):
             message = ("Image '%s' not found") % image_args
             return self.fail(message)
@@ -103,7 +153,10 @@ class ExternalNetworkExistsValidator(validation.Validator):
         for user in users:
             creds = user["credential"]
 
-            networks = creds.clients().neutron().list_networks()["networks"]
+            networks = validation.cached_lookup(
+                credentials, "openstack",
+                ["neutron_networks", creds],
+                lambda: creds.clients().neutron().list_networks()["networks"])
             external_networks = [net["name"] for net in networks if
                                  net.get("router:external", False)]
             if ext_network not in external_networks:
@@ -142,8 +195,10 @@ class RequiredNeutronExtensionsValidator(validation.Validator):
             self.req_ext.extend(args)
 
     def validate(self, config, credentials, plugin_cls, plugin_cfg):
-        clients = credentials["openstack"]["users"][0]["credential"].clients()
-        extensions = clients.neutron().list_extensions()["extensions"]
+        creds = credentials["openstack"]["users"][0]["credential"]
+        extensions = validation.cached_lookup(
+            credentials, "openstack", ["neutron_extensions", creds],
+            lambda: creds.clients().neutron().list_extensions()["extensions"])
         aliases = [x["alias"] for x in extensions]
         for extension in self.req_ext:
             if extension not in aliases:
@@ -177,7 +232,8 @@ class ImageValidOnFlavorValidator(validation.Validator):
         self.fail_on_404_image = fail_on_404_image
         self.validate_disk = validate_disk
 
-    def _get_validated_image(self, config, clients, param_name):
+    def _get_validated_image(self, config, clients, param_name,
+                             credentials=None):
         image_context = config.get("context", {}).get("images", {})
         image_args = config.get("args", {}).get(param_name)
         image_ctx_name = image_context.get("image_name")
@@ -201,20 +257,7 @@ class ImageValidOnFlavorValidator(validation.Validator):
                 }
                 return (ValidationResult(True), image)
         try:
-            image_id = openstack_types.GlanceImage.transform(
-                clients=clients, resource_config=image_args)
-            image = clients.glance().images.get(image_id)
-            if hasattr(image, "to_dict"):
-                # NOTE(stpierre): Glance v1 images are objects that can be
-                # converted to dicts; Glance v2 images are already
-                # dict-like
-                image = image.to_dict()
-            if not image.get("size"):
-                image["size"] = 0
-            if not image.get("min_ram"):
-                image["min_ram"] = 0
-            if not image.get("min_disk"):
-                image["min_disk"] = 0
+            image = get_image(credentials, clients, image_args)
             return (ValidationResult(True), image)
         except (glance_exc.HTTPNotFound, exceptions.InvalidScenarioArgument):
             message = ("Image '%s' not found") % image_args
@@ -232,15 +275,14 @@ class ImageValidOnFlavorValidator(validation.Validator):
         flavor.id = "<context flavor: %s>" % flavor.name
         return (ValidationResult(True), flavor)
 
-    def _get_validated_flavor(self, config, clients, param_name):
+    def _get_validated_flavor(self, config, clients, param_name,
+                              credentials=None):
         flavor_value = config.get("args", {}).get(param_name)
         if not flavor_value:
             msg = "Parameter %s is not specified." % param_name
             return (ValidationResult(False, msg), None)
         try:
-            flavor_id = openstack_types.Flavor.transform(
-                clients=clients, resource_config=flavor_value)
-            flavor = clients.nova().flavors.get(flavor=flavor_id)
+            flavor = get_flavor(credentials, clients, flavor_value)
             return (ValidationResult(True), flavor)
         except (nova_exc.NotFound, exceptions.InvalidScenarioArgument):
             try:
@@ -258,12 +300,12 @@ class ImageValidOnFlavorValidator(validation.Validator):
 
             if not flavor:
                 valid_result, flavor = self._get_validated_flavor(
-                    config, clients, self.flavor_name)
+                    config, clients, self.flavor_name, credentials)
                 if not valid_result.is_valid:
                     return valid_result
 
             valid_result, image = self._get_validated_image(
-                config, clients, self.image_name)
+                config, clients, self.image_name, credentials)
 
             if not image and not self.fail_on_404_image:
                 return
@@ -15,12 +15,21 @@
 
 import collections
 import functools
+import threading
 
 from rally.common import logging
 from rally.common import utils
+from rally.task import tracing
 
 LOG = logging.getLogger(__name__)
 
+# NOTE(agent): atomic actions which are in progress in the current
+#   thread, so HTTP requests can be assigned to the innermost of them.
+_local = threading.local()
+
+# HTTP statuses which make clients repeat requests
+_RETRIABLE_STATUSES = (429, 500, 502, 503, 504)
+
 
 class ActionTimerMixin(object):
 
@@ -57,6 +66,8 @@ class ActionTimer(utils.Timer):
                               "children": [],
                               "started_at": None}
         self._root.append(self.atomic_action)
+        self._traced = False
+        self._last_request = None
 
     def _find_parent(self, atomic_actions):
         if atomic_actions and "finished_at" not in atomic_actions[-1]:
@@ -65,12 +76,65 @@ class ActionTimer(utils.Timer):
             return atomic_actions
 
     def __enter__(self):
+        self._traced = tracing.start_atomic_action(self.name)
+        _get_actions_stack().append(self)
         super(ActionTimer, self).__enter__()
         self.atomic_action["started_at"] = self.start
 
     def __exit__(self, type_, value, tb):
         super(ActionTimer, self).__exit__(type_, value, tb)
         self.atomic_action["finished_at"] = self.finish
+        stack = _get_actions_stack()
+        if self in stack:
+            stack.remove(self)
+        if self._traced:
+            tracing.stop_atomic_action()
+
+    def add_http_request(self, method, url, status, duration, size):
+        """Account HTTP request made within the atomic action.
+
+        A request is counted as a retry if it repeats the previous request
+        of the atomic action which failed with a retriable status.
+        """
+        stats = self.atomic_action.setdefault(
+            "http", {"requests": 0, "bytes": 0, "retries": 0,
+                     "methods": {}})
+        stats["requests"] += 1
+        stats["bytes"] += size
+        if (self._last_request and self._last_request[:2] == (method, url)
+                and self._last_request[2] in _RETRIABLE_STATUSES):
+            stats["retries"] += 1
+        self._last_request = (method, url, status)
+        method_stats = stats["methods"].setdefault(
+            method, {"count": 0, "duration": 0.0})
+        method_stats["count"] += 1
+        method_stats["duration"] += duration
+
+
+def _get_actions_stack():
+    if not hasattr(_local, "actions"):
+        _local.actions = []
+    return _local.actions
+
+
+def http_response_hook(response, *args, **kwargs):
+    """Assign HTTP response to the atomic action in progress.
+
+    It is a response hook for requests sessions. The size of the response
+    is taken from Content-Length header, since the body is not read yet.
+    """
+    stack = _get_actions_stack()
+    if not stack:
+        return
+    try:
+        size = int(response.headers.get("Content-Length") or 0)
+    except ValueError:
+        size = 0
+    stack[-1].add_http_request(method=response.request.method,
+                               url=response.request.url,
+                               status=response.status_code,
+                               duration=response.elapsed.total_seconds(),
+                               size=size)
 
 
 def action_timer(name):
@@ -137,3 +201,43 @@ def merge_atomic(atomic_actions):
             merged_atomic[name]["duration"] += duration
             merged_atomic[name]["count"] += 1
     return merged_atomic
+
+
+def merge_http_stats(atomic_actions):
+    """Sum HTTP statistics of atomic actions and all their children."""
+    merged = {"requests": 0, "bytes": 0, "retries": 0, "methods": {}}
+    actions = list(atomic_actions)
+    while actions:
+        action = actions.pop()
+        actions.extend(action.get("children", []))
+        stats = action.get("http")
+        if not stats:
+            continue
+        for key in ("requests", "bytes", "retries"):
+            merged[key] += stats[key]
+        for method, value in stats["methods"].items():
+            method_stats = merged["methods"].setdefault(
+                method, {"count": 0, "duration": 0.0})
+            method_stats["count"] += value["count"]
+            method_stats["duration"] += value["duration"]
+    return merged
+
+
+def http_output(atomic_actions):
+    """Return additive output with HTTP statistics of the iteration."""
+    stats = merge_http_stats(atomic_actions)
+    if not stats["requests"]:
+        return []
+    methods = sorted(stats["methods"].items())
+    return [{"title": "HTTP requests",
+             "description": "The number of HTTP requests made within atomic "
+                            "actions by method.",
+             "chart_plugin": "StatsTable",
+             "data": [[method, value["count"]] for method, value in methods]
+             + [["retries", stats["retries"]]]},
+            {"title": "HTTP latency",
+             "description": "Average time to receive a response to HTTP "
+                            "requests by method (in seconds).",
+             "chart_plugin": "StatsTable",
+             "data": [[method, value["duration"] / value["count"]]
+                      for method, value in methods]}]
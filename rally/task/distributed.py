@@ -0,0 +1,355 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Distributed load generation.
+
+Agents are started on load generating hosts (`rally task agent`). Each of
+them listens for a coordinator and registers its address as a Worker in the
+database, so all hosts should share the same Rally database. A coordinator
+(the "distributed" runner) picks alive agents from the database, sends each
+of them a shard of the workload and feeds the streamed results into its own
+result queue, so the task engine consumes them as results of local workers.
+
+Workloads are sent to agents as pickled messages over plain TCP connections.
+They include contexts of workloads with credentials of users, while the
+shared authkey only authenticates peers and does not encrypt anything. That
+is why agents listen and coordinators connect only on loopback addresses
+unless [distributed]trusted_network option is set, i.e. the network between
+hosts is trusted (a private network, a VPN, etc).
+"""
+
+import collections
+import multiprocessing.connection as mp_connection
+import socket
+import threading
+import time
+
+import netaddr
+from oslo_config import cfg
+
+from rally.common import logging
+from rally.common import objects
+from rally.common import utils
+from rally import exceptions
+from rally.task import runner
+from rally.task import scenario
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+DISTRIBUTED_OPTS = [
+    cfg.StrOpt("authkey", secret=True,
+               help="The shared secret to authenticate agents and "
+                    "coordinators of distributed load. Distributed load "
+                    "generation is disabled until it is set."),
+    cfg.StrOpt("agent_host", default="127.0.0.1",
+               help="The address which agents listen on. Coordinators "
+                    "connect to it, so it should be reachable from them. "
+                    "Only loopback addresses are allowed unless "
+                    "trusted_network option is set."),
+    cfg.BoolOpt("trusted_network", default=False,
+                help="Allow agents and coordinators to communicate over "
+                     "non-loopback addresses. Workloads, including "
+                     "credentials of users, are sent unencrypted, so enable "
+                     "it only if the network between hosts is trusted."),
+    cfg.PortOpt("agent_port", default=0,
+                help="The port which agents listen on. 0 means a random "
+                     "free port."),
+    cfg.FloatOpt("heartbeat_interval", default=10.0, min=0.1,
+                 help="How often agents mark themselves alive in the "
+                      "database (in seconds)."),
+    cfg.FloatOpt("agents_wait_timeout", default=300.0, min=0,
+                 help="How long coordinators wait for the required number "
+                      "of alive agents (in seconds).")
+]
+CONF.register_opts(DISTRIBUTED_OPTS, group="distributed")
+
+# NOTE(agent): results and events of agents are sent to the
+#   coordinator in batches not more often than once per this period.
+_FLUSH_INTERVAL = 0.1
+
+
+def _get_authkey(authkey=None):
+    authkey = authkey or CONF.distributed.authkey
+    if not authkey:
+        raise exceptions.DistributedLoadFailure(
+            "[distributed]authkey option is not set.")
+    return authkey.encode("utf-8")
+
+
+def _parse_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def _is_allowed_host(host):
+    """Check that credentials are allowed to be sent via the host."""
+    if CONF.distributed.trusted_network:
+        return True
+    try:
+        return netaddr.IPAddress(socket.gethostbyname(host)).is_loopback()
+    except (socket.error, netaddr.AddrFormatError):
+        return False
+
+
+class Coordinator(object):
+    """Spreads the load of a workload over agents."""
+
+    def __init__(self, authkey=None):
+        self._authkey = _get_authkey(authkey)
+        self.agents = collections.OrderedDict()
+        self.statistics = {}
+        self.errors = {}
+        self._send_lock = threading.Lock()
+
+    def connect(self, count, timeout=None):
+        """Connect to the given number of alive agents.
+
+        :param count: the number of agents to connect to
+        :param timeout: how long to wait for alive agents (in seconds)
+        :returns: the list of names of connected agents
+        """
+        if timeout is None:
+            timeout = CONF.distributed.agents_wait_timeout
+        deadline = utils.monotonic() + timeout
+        alive_within = CONF.distributed.heartbeat_interval * 3
+        while True:
+            for worker in objects.Worker.list(alive_within=alive_within):
+                name = worker["hostname"]
+                if name in self.agents:
+                    continue
+                if not _is_allowed_host(_parse_address(name)[0]):
+                    LOG.warning("Agent %s is skipped, since it does not "
+                                "listen on a loopback address and "
+                                "[distributed]trusted_network option is not "
+                                "set." % name)
+                    continue
+                try:
+                    self.agents[name] = mp_connection.Client(
+                        _parse_address(name), authkey=self._authkey)
+                except (IOError, OSError, EOFError,
+                        mp_connection.AuthenticationError) as e:
+                    LOG.warning("Failed to connect to agent %s: %s"
+                                % (name, e))
+                    continue
+                LOG.info("Agent %s is connected." % name)
+                if len(self.agents) == count:
+                    return list(self.agents)
+            if utils.monotonic() >= deadline:
+                raise exceptions.DistributedLoadFailure(
+                    "only %(connected)d of %(count)d agents are available."
+                    % {"connected": len(self.agents), "count": count})
+            time.sleep(1)
+
+    def _send(self, conn, message):
+        with self._send_lock:
+            conn.send(message)
+
+    def run(self, task_uuid, name, context, args, configs, on_results,
+            on_event):
+        """Run shards of the workload on connected agents.
+
+        :param task_uuid: UUID of the task
+        :param name: name of the scenario
+        :param context: context of the workload
+        :param args: scenario arguments
+        :param configs: runner configs of shards (one per connected agent)
+        :param on_results: a callable to pass a batch of results to
+        :param on_event: a callable to pass runner events to
+        """
+        # NOTE(agent): agents do not have access to the task object
+        context = dict(context, task={"uuid": task_uuid})
+        consumers = []
+        for (agent, conn), config in zip(self.agents.items(), configs):
+            self._send(conn, ("run", {"task_uuid": task_uuid,
+                                      "name": name,
+                                      "context": context,
+                                      "args": args,
+                                      "runner": config}))
+            consumer = threading.Thread(
+                target=self._consume, args=(agent, conn, on_results,
+                                            on_event))
+            consumer.start()
+            consumers.append(consumer)
+        for consumer in consumers:
+            consumer.join()
+
+        if self.errors:
+            raise exceptions.DistributedLoadFailure(
+                "; ".join("%s: %s" % (agent, error)
+                          for agent, error in self.errors.items()))
+
+    def _consume(self, agent, conn, on_results, on_event):
+        while True:
+            try:
+                kind, data = conn.recv()
+            except (IOError, OSError, EOFError):
+                self.errors[agent] = "the connection is lost."
+                return
+            if kind == "results":
+                on_results(data)
+            elif kind == "events":
+                for event in data:
+                    on_event(**event)
+            elif kind == "done":
+                self.statistics[agent] = data
+                return
+            elif kind == "error":
+                self.errors[agent] = data
+                return
+
+    def abort(self):
+        for conn in self.agents.values():
+            try:
+                self._send(conn, ("abort", None))
+            except (IOError, OSError):
+                pass
+
+    def close(self):
+        for conn in self.agents.values():
+            conn.close()
+
+
+class Agent(object):
+    """Runs shards of workloads sent by coordinators."""
+
+    def __init__(self, host=None, port=None, authkey=None):
+        if host is None:
+            host = CONF.distributed.agent_host
+        if port is None:
+            port = CONF.distributed.agent_port
+        if not _is_allowed_host(host):
+            raise exceptions.DistributedLoadFailure(
+                "agent is not allowed to listen on %s, since workloads are "
+                "sent unencrypted. Set [distributed]trusted_network option "
+                "if the network is trusted." % host)
+        self._listener = mp_connection.Listener(
+            (host, port), authkey=_get_authkey(authkey))
+        self.name = "%s:%s" % self._listener.address
+        self._worker = None
+        self._stopped = threading.Event()
+
+    def serve(self, once=False):
+        """Register the agent and run workloads of coordinators.
+
+        :param once: stop after the first workload
+        """
+        self._worker = objects.Worker(hostname=self.name)
+        heartbeat = threading.Thread(target=self._heartbeat)
+        heartbeat.daemon = True
+        heartbeat.start()
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except mp_connection.AuthenticationError as e:
+                    LOG.warning("Coordinator is not authenticated: %s" % e)
+                    continue
+                try:
+                    self._serve_connection(conn)
+                finally:
+                    conn.close()
+                if once:
+                    break
+        finally:
+            self._stopped.set()
+            self._worker.delete()
+            self._listener.close()
+
+    def _heartbeat(self):
+        while not self._stopped.wait(CONF.distributed.heartbeat_interval):
+            self._worker.update()
+
+    def _serve_connection(self, conn):
+        try:
+            kind, workload = conn.recv()
+        except (IOError, OSError, EOFError):
+            return
+        if kind != "run":
+            return
+        LOG.info("Agent %(agent)s | Task %(task)s | Starting a workload."
+                 % {"agent": self.name, "task": workload["task_uuid"]})
+
+        send_lock = threading.Lock()
+
+        def send(message):
+            with send_lock:
+                conn.send(message)
+
+        try:
+            runner_cfg = workload["runner"]
+            runner_obj = runner.ScenarioRunner.get(runner_cfg["type"])(
+                {"uuid": workload["task_uuid"]}, runner_cfg)
+            scenario_cls = scenario.Scenario.get(workload["name"])
+        except Exception as e:
+            send(("error", "%s: %s" % (type(e).__name__, e)))
+            return
+
+        def listen_for_abort():
+            try:
+                while conn.recv()[0] != "abort":
+                    pass
+            except (IOError, OSError, EOFError):
+                return
+            runner_obj.abort()
+
+        abort_listener = threading.Thread(target=listen_for_abort)
+        abort_listener.daemon = True
+        abort_listener.start()
+
+        errors = []
+
+        def generate_load():
+            try:
+                # NOTE(agent): arguments are preprocessed by the
+                #   coordinator, so _run_scenario is used instead of run
+                runner_obj._run_scenario(scenario_cls, "run",
+                                         workload["context"],
+                                         workload["args"])
+            except Exception as e:
+                LOG.exception(e)
+                errors.append("%s: %s" % (type(e).__name__, e))
+
+        load = threading.Thread(target=generate_load)
+        load.start()
+        while True:
+            load.join(_FLUSH_INTERVAL)
+            finished = not load.is_alive()
+            if finished:
+                runner_obj._flush_results()
+            self._flush(runner_obj, send)
+            if finished:
+                break
+
+        if errors:
+            send(("error", errors[0]))
+        else:
+            send(("done", runner_obj.statistics))
+
+    @staticmethod
+    def _flush(runner_obj, send):
+        """Send accumulated results and events to the coordinator."""
+        events = []
+        while runner_obj.event_queue:
+            events.append(runner_obj.event_queue.popleft())
+        if events:
+            send(("events", events))
+        results = []
+        while runner_obj.result_queue:
+            results.extend(runner_obj.result_queue.popleft())
+        if results:
+            send(("results", results))
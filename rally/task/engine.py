@@ -16,17 +16,22 @@
 import collections
 import copy
 import json
+import sys
 import threading
 import time
 import traceback
 
 import jsonschema
 from oslo_config import cfg
+import six
+from six import moves
 
+from rally.common import broker
 from rally.common.i18n import _
 from rally.common import logging
 from rally.common import objects
 from rally.common import utils
+from rally.common import validation
 from rally import consts
 from rally import exceptions
 # TODO(andreykurilin): remove openstack specific import after Rally 0.10.0
@@ -46,10 +51,158 @@ CONF = cfg.CONF
 TASK_ENGINE_OPTS = [
     cfg.IntOpt("raw_result_chunk_size", default=1000, min=1,
                help="Size of raw result chunk in iterations"),
+    cfg.FloatOpt("raw_result_flush_interval", default=0, min=0,
+                 help="Save incomplete raw result chunks if nothing was "
+                      "saved for the given number of seconds. 0 means that "
+                      "only complete chunks are saved before the end of a "
+                      "workload"),
+    cfg.IntOpt("raw_result_queue_size", default=1000, min=1,
+               help="The maximum number of batches of raw results waiting "
+                    "for saving to the database. Consuming of results is "
+                    "blocked if the queue is full"),
+    cfg.IntOpt("semantic_validation_workers", default=10, min=1,
+               help="Number of threads which validate workloads of a task "
+                    "against the cloud in parallel"),
 ]
 CONF.register_opts(TASK_ENGINE_OPTS)
 
 
+class WorkloadDataWriter(object):
+    """Saves raw results of a workload by chunks in a separate thread.
+
+    Results are passed to the thread via a bounded queue, so the consumer of
+    results is not blocked by the database unless the queue is full.
+    Complete chunks which are ready at the same time are saved in one
+    transaction.
+    """
+
+    _STOP = object()
+
+    def __init__(self, workload, chunk_size, flush_interval=0,
+                 queue_size=1000):
+        """WorkloadDataWriter constructor.
+
+        :param workload: Instance of Workload
+        :param chunk_size: the number of iterations in a chunk
+        :param flush_interval: save an incomplete chunk if nothing was saved
+            for the given number of seconds. 0 disables it
+        :param queue_size: the maximum number of batches of results in the
+            queue
+        """
+        self.workload = workload
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.chunks_count = 0
+        self.stats = {"chunks": 0,
+                      "transactions": 0,
+                      "write_duration": 0.0,
+                      "blocked_duration": 0.0,
+                      "max_queue_size": 0}
+        self._queue = moves.queue.Queue(maxsize=queue_size)
+        self._chunk = []
+        # chunks which were not saved because of a failure of the database
+        self._unsaved = []
+        self._failed = False
+        self._thread = threading.Thread(target=self._write)
+
+    def start(self):
+        self._thread.start()
+
+    def add(self, results):
+        """Add a batch of results. Blocks if the queue is full."""
+        try:
+            self._queue.put_nowait(results)
+        except moves.queue.Full:
+            started_at = utils.perf_counter()
+            self._queue.put(results)
+            self.stats["blocked_duration"] += (utils.perf_counter()
+                                               - started_at)
+        self.stats["max_queue_size"] = max(self.stats["max_queue_size"],
+                                           self._queue.qsize())
+
+    def _cut_chunk(self, ready):
+        if self._chunk:
+            # NOTE(boris-42): Sort in order of starting
+            #                 instead of order of ending
+            self._chunk.sort(key=lambda x: x["timestamp"])
+            ready.append((self.chunks_count, {"raw": self._chunk}))
+            self.chunks_count += 1
+            self._chunk = []
+
+    def _save(self, chunks):
+        started_at = utils.perf_counter()
+        self.workload.add_workload_data_chunks(chunks)
+        self.stats["write_duration"] += utils.perf_counter() - started_at
+        self.stats["chunks"] += len(chunks)
+        self.stats["transactions"] += 1
+
+    def _write(self):
+        ready = []
+        last_flush = utils.perf_counter()
+        while True:
+            timeout = None
+            if self.flush_interval:
+                timeout = max(
+                    last_flush + self.flush_interval - utils.perf_counter(),
+                    0)
+            try:
+                results = self._queue.get(timeout=timeout)
+            except moves.queue.Empty:
+                results = None
+            stop = results is self._STOP
+            if results is not None and not stop:
+                for result in results:
+                    self._chunk.append(result)
+                    if len(self._chunk) >= self.chunk_size:
+                        self._cut_chunk(ready)
+            timed_out = (self.flush_interval and utils.perf_counter()
+                         >= last_flush + self.flush_interval)
+            if stop or timed_out:
+                self._cut_chunk(ready)
+            # NOTE(agent): chunks are saved when the queue is drained,
+            #   so while the database is slow, chunks are accumulated and
+            #   then saved in one transaction.
+            if ready and (stop or timed_out or self._queue.empty()):
+                if not self._failed:
+                    try:
+                        self._save(ready)
+                    except Exception as e:
+                        LOG.exception("Failed to save raw results, they "
+                                      "will be saved at the end of the "
+                                      "workload: %s" % e)
+                        self._failed = True
+                if self._failed:
+                    self._unsaved.extend(ready)
+                ready = []
+            if stop or timed_out:
+                last_flush = utils.perf_counter()
+            if stop:
+                break
+
+    def close(self):
+        """Save the rest of results and stop the thread.
+
+        Chunks which were not saved because of a failure are saved again
+        here, so all results are stored when the method returns.
+        """
+        self._queue.put(self._STOP)
+        self._thread.join()
+        if self._unsaved:
+            self._save(self._unsaved)
+            self._unsaved = []
+        LOG.info("Saved %(chunks)s chunks of raw results in "
+                 "%(transactions)s transactions for %(write)s seconds. "
+                 "Consuming of results was blocked for %(blocked)s seconds, "
+                 "the maximum size of the queue was %(queue)s." % {
+                     "chunks": self.stats["chunks"],
+                     "transactions": self.stats["transactions"],
+                     "write": utils.format_float_to_str(
+                         self.stats["write_duration"]),
+                     "blocked": utils.format_float_to_str(
+                         self.stats["blocked_duration"]),
+                     "queue": self.stats["max_queue_size"]})
+
+
 class ResultConsumer(object):
     """ResultConsumer class stores results from ScenarioRunner, checks SLA.
 
@@ -58,7 +211,7 @@ class ResultConsumer(object):
     """
 
     def __init__(self, key, task, subtask, workload, runner,
-                 abort_on_sla_failure):
+                 abort_on_sla_failure, context_obj=None):
         """ResultConsumer constructor.
 
         :param key: Scenario identifier
@@ -69,6 +222,9 @@ class ResultConsumer(object):
                        consumed
         :param abort_on_sla_failure: True if the execution should be stopped
                                      when some SLA check fails
+        :param context_obj: context of the workload. Statistics of contexts
+                            execution are taken from its "context_execution"
+                            key
         """
 
         self.key = key
@@ -78,20 +234,25 @@ class ResultConsumer(object):
         self.runner = runner
         self.load_started_at = float("inf")
         self.load_finished_at = 0
-        self.workload_data_count = 0
 
         self.sla_checker = sla.SLAChecker(key["kw"])
-        self.hook_executor = hook.HookExecutor(key["kw"], self.task)
+        self.hook_executor = hook.HookExecutor(key["kw"], self.task,
+                                               runner=self.runner)
         self.abort_on_sla_failure = abort_on_sla_failure
+        self.context_obj = context_obj
         self.is_done = threading.Event()
         self.unexpected_failure = {}
-        self.results = []
+        self.writer = WorkloadDataWriter(
+            workload, chunk_size=CONF.raw_result_chunk_size,
+            flush_interval=CONF.raw_result_flush_interval,
+            queue_size=CONF.raw_result_queue_size)
         self.thread = threading.Thread(target=self._consume_results)
         self.aborting_checker = threading.Thread(target=self.wait_and_abort)
         if "hooks" in self.key["kw"]:
             self.event_thread = threading.Thread(target=self._consume_events)
 
     def __enter__(self):
+        self.writer.start()
         self.thread.start()
         self.aborting_checker.start()
         if "hooks" in self.key["kw"]:
@@ -104,7 +265,6 @@ class ResultConsumer(object):
         while True:
             if self.runner.result_queue:
                 results = self.runner.result_queue.popleft()
-                self.results.extend(results)
                 for r in results:
                     self.load_started_at = min(r["timestamp"],
                                                self.load_started_at)
@@ -120,15 +280,7 @@ class ResultConsumer(object):
                             consts.TaskStatus.SOFT_ABORTING)
                         task_aborted = True
 
-                # save results chunks
-                chunk_size = CONF.raw_result_chunk_size
-                while len(self.results) >= chunk_size:
-                    results_chunk = self.results[:chunk_size]
-                    self.results = self.results[chunk_size:]
-                    results_chunk.sort(key=lambda x: x["timestamp"])
-                    self.workload.add_workload_data(self.workload_data_count,
-                                                    {"raw": results_chunk})
-                    self.workload_data_count += 1
+                self.writer.add(results)
 
             elif self.is_done.isSet():
                 break
@@ -149,6 +301,10 @@ class ResultConsumer(object):
         self.is_done.set()
         self.aborting_checker.join()
         self.thread.join()
+        # NOTE(agent): all results should be saved before setting
+        #   results of the workload, since statistics are calculated from
+        #   the saved ones.
+        self.writer.close()
 
         if exc_type:
             self.sla_checker.set_unexpected_failure(exc_value)
@@ -171,12 +327,13 @@ class ResultConsumer(object):
             self.event_thread.join()
             results["hooks_results"] = self.hook_executor.results()
 
-        if self.results:
-            # NOTE(boris-42): Sort in order of starting
-            #                 instead of order of ending
-            self.results.sort(key=lambda x: x["timestamp"])
-            self.workload.add_workload_data(self.workload_data_count,
-                                            {"raw": self.results})
+        if self.context_obj and self.context_obj.get("context_execution"):
+            results["context_execution"] = self.context_obj[
+                "context_execution"]
+
+        if self.runner.statistics:
+            results["runner_statistics"] = self.runner.statistics
+
         start_time = (self.load_started_at
                       if self.load_started_at != float("inf") else None)
         self.workload.set_results(load_duration=load_duration,
@@ -354,11 +511,30 @@ class TaskEngine(object):
                                          workloads, platform):
         with user_context as ctx:
             ctx.setup()
-            users = ctx.context["users"]
-            for workload in workloads:
-                credentials = {platform: {"admin": admin, "users": users}}
-                self._validate_workload(workload, credentials=credentials,
-                                        vtype="semantic")
+            # the lookup cache lets workloads which refer to the same
+            # resources share results of cloud API calls made by validators
+            credentials = {platform: {
+                "admin": admin, "users": ctx.context["users"],
+                "lookup_cache": validation.LookupCache()}}
+            errors = {}
+
+            def publish(queue):
+                for i, workload in enumerate(workloads):
+                    queue.append((i, workload))
+
+            def consume(cache, args):
+                i, workload = args
+                try:
+                    self._validate_workload(workload, credentials=credentials,
+                                            vtype="semantic")
+                except Exception:
+                    errors[i] = sys.exc_info()
+
+            broker.run(publish, consume,
+                       min(CONF.semantic_validation_workers, len(workloads)))
+            if errors:
+                # report the first invalid workload as serial validation did
+                six.reraise(*errors[min(errors)])
 
     @logging.log_task_wrapper(LOG.info, _("Task validation of semantic."))
     def _validate_config_semantic(self, config):
@@ -520,7 +696,8 @@ class TaskEngine(object):
             workload.context, workload.name, workload_obj["uuid"])
         try:
             with ResultConsumer(key, self.task, subtask_obj, workload_obj,
-                                runner_obj, self.abort_on_sla_failure):
+                                runner_obj, self.abort_on_sla_failure,
+                                context_obj=context_obj):
                 with context.ContextManager(context_obj):
                     runner_obj.run(workload.name, context_obj,
                                    workload.args)
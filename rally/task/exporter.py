@@ -53,6 +53,27 @@ REPORT_RESPONSE_SCHEMA = {
     "additionalProperties": False
 }
 
+# NOTE(agent): streaming exporters are allowed to return iterables
+#   of strings instead of strings for "files" and "print" keys, so the report
+#   can be written by chunks without keeping it in memory.
+STREAMING_REPORT_RESPONSE_SCHEMA = {
+    "type": "object",
+    "$schema": consts.JSON_SCHEMA,
+    "properties": {
+        "files": {
+            "type": "object",
+            "patternProperties": {
+                ".{1,}": {}
+            }
+        },
+        "open": {
+            "type": "string",
+        },
+        "print": {}
+    },
+    "additionalProperties": False
+}
+
 
 @plugin.base()
 @six.add_metaclass(abc.ABCMeta)
@@ -78,7 +99,14 @@ class Exporter(plugin.Plugin):
 @plugin.base()
 @six.add_metaclass(abc.ABCMeta)
 class TaskExporter(plugin.Plugin):
-    """Base class for all exporters for Tasks."""
+    """Base class for all exporters for Tasks.
+
+    Exporters with STREAMING=True receive workloads which "data" key is an
+    iterable that loads raw iterations from the database on demand, and may
+    return iterables of strings as contents of files and printed output.
+    """
+
+    STREAMING = False
 
     def __init__(self, tasks_results, output_destination, api=None):
         """Init reporter
@@ -128,6 +156,9 @@ class TaskExporter(plugin.Plugin):
         report = exporter_cls(task_results, output_destination,
                               api).generate()
 
-        jsonschema.validate(report, REPORT_RESPONSE_SCHEMA)
+        if exporter_cls.STREAMING:
+            jsonschema.validate(report, STREAMING_REPORT_RESPONSE_SCHEMA)
+        else:
+            jsonschema.validate(report, REPORT_RESPONSE_SCHEMA)
 
         return report
@@ -40,7 +40,7 @@ configure = plugin.configure
 class HookExecutor(object):
     """Runs hooks and collects results from them."""
 
-    def __init__(self, config, task):
+    def __init__(self, config, task, runner=None):
         self.config = config
         self.task = task
 
@@ -49,6 +49,7 @@ class HookExecutor(object):
             hook_cls = Hook.get(hook["name"])
             trigger_obj = trigger.Trigger.get(
                 hook["trigger"]["name"])(hook, self.task, hook_cls)
+            trigger_obj.runner = runner
             event_type = trigger_obj.get_listening_event()
             self.triggers[event_type].append(trigger_obj)
 
@@ -116,6 +117,10 @@ class Hook(plugin.Plugin, validation.ValidatablePluginMixin):
 
     CONFIG_SCHEMA = {"type": "null"}
 
+    # NOTE(agent): the runner of the workload is set by triggers
+    #   before the hook is started. It is None if it is unknown.
+    runner = None
+
     def __init__(self, task, config, triggered_by):
         self.task = task
         self.config = config
@@ -21,6 +21,7 @@ import six
 
 from rally.common.plugin import plugin
 from rally.common import streaming_algorithms as streaming
+from rally.task import atomic
 from rally.task.processing import utils
 
 
@@ -377,30 +378,67 @@ class MainStatsTable(Table):
     columns = ["Action", "Min (sec)", "Median (sec)", "90%ile (sec)",
                "95%ile (sec)", "Max (sec)", "Avg (sec)", "Success", "Count"]
 
+    # NOTE(agent): these columns are shown only if HTTP requests of
+    #   atomic actions are collected (average values per iteration).
+    http_columns = ["HTTP requests", "HTTP latency (sec)", "HTTP KB",
+                    "HTTP retries"]
+
+    # NOTE(agent): this row is shown only if iterations are started by a
+    #   schedule (rps runner, etc). It is the total duration plus the lag
+    #   between the intended and the actual start of an iteration, i.e. the
+    #   latency which would be seen by a client sending requests by the
+    #   schedule, without coordinated omission.
+    corrected_total = "total (lag-corrected)"
+
     def __init__(self, *args, **kwargs):
         super(MainStatsTable, self).__init__(*args, **kwargs)
-        iters_num = self._workload["total_iteration_count"]
+        self._http_data = {}
+        self._has_http = False
         for name in (self._get_atomic_names() + ["total"]):
-            self._data[name] = [
-                [streaming.MinComputation(), None],
-                [streaming.PercentileComputation(0.5, iters_num), None],
-                [streaming.PercentileComputation(0.9, iters_num), None],
-                [streaming.PercentileComputation(0.95, iters_num), None],
-                [streaming.MaxComputation(), None],
-                [streaming.MeanComputation(), None],
-                [streaming.MeanComputation(),
-                 lambda st, has_result: ("%.1f%%" % (st.result() * 100)
-                                         if has_result else "n/a")],
-                [streaming.IncrementComputation(),
-                 lambda st, has_result: st.result()]]
+            self._data[name] = self._init_row()
+
+    def _init_row(self):
+        iters_num = self._workload["total_iteration_count"]
+        return [
+            [streaming.MinComputation(), None],
+            [streaming.PercentileComputation(0.5, iters_num), None],
+            [streaming.PercentileComputation(0.9, iters_num), None],
+            [streaming.PercentileComputation(0.95, iters_num), None],
+            [streaming.MaxComputation(), None],
+            [streaming.MeanComputation(), None],
+            [streaming.MeanComputation(),
+             lambda st, has_result: ("%.1f%%" % (st.result() * 100)
+                                     if has_result else "n/a")],
+            [streaming.IncrementComputation(),
+             lambda st, has_result: st.result()]]
 
     def _map_iteration_values(self, iteration):
         atomic_actions = self._merge_atomic_actions(
             iteration["atomic_actions"])
-        return dict(atomic_actions, total=iteration["duration"])
+        values = dict(atomic_actions, total=iteration["duration"])
+        if "schedule" in iteration:
+            values[self.corrected_total] = (iteration["duration"]
+                                            + iteration["schedule"]["lag"])
+        return values
+
+    def _map_http_values(self, iteration):
+        """Get HTTP statistics of merged atomic actions of the iteration."""
+        atomic_merger = utils.AtomicMerger(
+            self._workload["statistics"]["atomics"])
+        values = {}
+        for name, value in self._workload["statistics"]["atomics"].items():
+            actions = [a for a in iteration["atomic_actions"]
+                       if a["name"] == name]
+            if len(actions) == value.get("count", 1):
+                values[atomic_merger.get_merged_name(name)] = (
+                    atomic.merge_http_stats(actions))
+        values["total"] = atomic.merge_http_stats(iteration["atomic_actions"])
+        return values
 
     def add_iteration(self, iteration):
         for name, value in self._map_iteration_values(iteration).items():
+            if name == self.corrected_total and name not in self._data:
+                self._data[name] = self._init_row()
             self._data[name][-1][0].add()
             if iteration["error"]:
                 self._data[name][-2][0].add(0)
@@ -409,23 +447,58 @@ class MainStatsTable(Table):
                 for idx, dummy in enumerate(self._data[name][:-2]):
                     self._data[name][idx][0].add(value)
 
+        for name, stats in self._map_http_values(iteration).items():
+            if not stats["requests"]:
+                continue
+            self._has_http = True
+            requests, latency, kbytes, retries = self._http_data.setdefault(
+                name, [streaming.MeanComputation() for i in range(4)])
+            requests.add(stats["requests"])
+            latency.add(sum(m["duration"] for m in stats["methods"].values())
+                        / stats["requests"])
+            kbytes.add(stats["bytes"] / 1024.0)
+            retries.add(stats["retries"])
+
+    def get_rows(self):
+        rows = super(MainStatsTable, self).get_rows()
+        if self._has_http:
+            for row in rows:
+                values = self._http_data.get(row[0])
+                row.extend([self._round(ins, True) for ins in values]
+                           if values else ["n/a"] * len(self.http_columns))
+        return rows
+
+    def render(self):
+        columns = self.columns
+        if self._has_http:
+            columns = columns + self.http_columns
+        return {"cols": columns, "rows": self.get_rows()}
+
     def to_dict(self):
         stats = {"total": None, "atomics": []}
 
         def row_to_dict(data):
-            return {"name": data[0],
-                    "min": data[1],
-                    "median": data[2],
-                    "90%ile": data[3],
-                    "95%ile": data[4],
-                    "max": data[5],
-                    "avg": data[6],
-                    "success": data[7],
-                    "count": data[8]}
+            result = {"name": data[0],
+                      "min": data[1],
+                      "median": data[2],
+                      "90%ile": data[3],
+                      "95%ile": data[4],
+                      "max": data[5],
+                      "avg": data[6],
+                      "success": data[7],
+                      "count": data[8]}
+            if self._has_http:
+                result.update({"http_requests": data[9],
+                               "http_latency": data[10],
+                               "http_kb": data[11],
+                               "http_retries": data[12]})
+            return result
 
         for row in self.get_rows():
             if row[0] == "total":
                 stats["total"] = row_to_dict(row)
+            elif row[0] == self.corrected_total:
+                stats["corrected_total"] = row_to_dict(row)
             else:
                 stats["atomics"].append(row_to_dict(row))
         return stats
@@ -28,6 +28,10 @@ from rally.task.processing import charts
 from rally.ui import utils as ui_utils
 
 
+# The number of the slowest traced iterations to show in reports
+SLOWEST_TRACES_COUNT = 10
+
+
 def _process_hooks(hooks):
     """Prepare hooks data for report."""
     hooks_ctx = []
@@ -83,14 +87,50 @@ def _process_hooks(hooks):
     return hooks_ctx
 
 
+def _process_traces(workload):
+    """Prepare the slowest traced iterations for report."""
+    traces = workload.get("profiling_data", {}).get("traces", [])
+    traces = sorted(traces, key=lambda t: t["duration"], reverse=True)
+    return [{"iteration": trace["iteration"],
+             "duration": round(trace["duration"], 3),
+             "error": trace["error"],
+             "trace_id": trace["trace_id"],
+             "url": trace.get("url", ""),
+             "atomic_actions": trace["atomic_actions"]}
+            for trace in traces[:SLOWEST_TRACES_COUNT]]
+
+
+def _render_durations(durations):
+    """Render stored statistics of durations as the main stats table."""
+    columns = charts.MainStatsTable.columns
+    keys = ["name", "min", "median", "90%ile", "95%ile", "max", "avg",
+            "success", "count"]
+    if "http_requests" in durations["total"]:
+        columns = columns + charts.MainStatsTable.http_columns
+        keys += ["http_requests", "http_latency", "http_kb", "http_retries"]
+    rows = durations["atomics"] + [durations["total"]]
+    if "corrected_total" in durations:
+        rows.append(durations["corrected_total"])
+    return {"cols": columns,
+            "rows": [[row[key] for key in keys] for row in rows]}
+
+
 def _process_workload(workload, workload_cfg, pos):
-    main_area = charts.MainStackedAreaChart(workload)
-    main_hist = charts.MainHistogramChart(workload)
-    main_stat = charts.MainStatsTable(workload)
-    load_profile = charts.LoadProfileChart(workload)
-    atomic_pie = charts.AtomicAvgChart(workload)
-    atomic_area = charts.AtomicStackedAreaChart(workload)
-    atomic_hist = charts.AtomicHistogramChart(workload)
+    compaction = workload.get("statistics", {}).get("compaction")
+    if compaction:
+        # NOTE(agent): only a sample of iterations of compacted
+        #   workloads is stored, charts are built by it.
+        chart_workload = dict(
+            workload, total_iteration_count=compaction["stored_iterations"])
+    else:
+        chart_workload = workload
+    main_area = charts.MainStackedAreaChart(chart_workload)
+    main_hist = charts.MainHistogramChart(chart_workload)
+    main_stat = charts.MainStatsTable(chart_workload)
+    load_profile = charts.LoadProfileChart(chart_workload)
+    atomic_pie = charts.AtomicAvgChart(chart_workload)
+    atomic_area = charts.AtomicStackedAreaChart(chart_workload)
+    atomic_hist = charts.AtomicHistogramChart(chart_workload)
 
     errors = []
     output_errors = []
@@ -108,7 +148,7 @@ def _process_workload(workload, workload_cfg, pos):
             except IndexError:
                 chart_cls = plugin.Plugin.get(additive["chart_plugin"])
                 chart = chart_cls(
-                    workload, title=additive["title"],
+                    chart_workload, title=additive["title"],
                     description=additive.get("description", ""),
                     label=additive.get("label", ""),
                     axis_label=additive.get("axis_label",
@@ -130,6 +170,12 @@ def _process_workload(workload, workload_cfg, pos):
 
     cls, method = workload["name"].split(".")
     additive_output = [chart.render() for chart in additive_output_charts]
+    if compaction:
+        failed_count = workload["failed_iteration_count"]
+        table = _render_durations(workload["statistics"]["durations"])
+    else:
+        failed_count = len(errors)
+        table = main_stat.render()
 
     return {
         "cls": cls,
@@ -143,21 +189,24 @@ def _process_workload(workload, workload_cfg, pos):
         "iterations": {
             "iter": main_area.render(),
             "pie": [("success", (workload["total_iteration_count"]
-                                 - len(errors))),
-                    ("errors", len(errors))],
+                                 - failed_count)),
+                    ("errors", failed_count)],
             "histogram": main_hist.render()},
         "load_profile": load_profile.render(),
         "atomic": {"histogram": atomic_hist.render(),
                    "iter": atomic_area.render(),
                    "pie": atomic_pie.render()},
-        "table": main_stat.render(),
+        "table": table,
         "additive_output": additive_output,
         "complete_output": complete_output,
         "has_output": any(additive_output) or any(complete_output),
         "output_errors": output_errors,
         "errors": errors,
+        "traces": _process_traces(workload),
         "load_duration": workload["load_duration"],
         "full_duration": workload["full_duration"],
+        "client_overhead": workload.get("statistics", {}).get(
+            "client_overhead"),
         "created_at": workload["created_at"],
         "sla": workload["sla"],
         "sla_success": workload["pass_sla"],
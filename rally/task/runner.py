@@ -25,8 +25,10 @@ from rally.common import logging
 from rally.common.plugin import plugin
 from rally.common import utils as rutils
 from rally.common import validation
+from rally.task import atomic
 from rally.task.processing import charts
 from rally.task import scenario
+from rally.task import tracing
 from rally.task import types
 from rally.task import utils
 
@@ -80,12 +82,21 @@ def _run_scenario_once(cls, method_name, context_obj, scenario_kwargs,
                  {"task": context_obj["task"]["uuid"], "iteration": iteration,
                   "status": status})
 
-        return {"duration": timer.duration() - scenario_inst.idle_duration(),
-                "timestamp": timer.timestamp(),
-                "idle_duration": scenario_inst.idle_duration(),
-                "error": error,
-                "output": scenario_inst._output,
-                "atomic_actions": scenario_inst.atomic_actions()}
+        for output in atomic.http_output(scenario_inst.atomic_actions()):
+            scenario_inst.add_output(additive=output)
+
+        result = {"duration": timer.duration() - scenario_inst.idle_duration(),
+                  "timestamp": timer.timestamp(),
+                  "idle_duration": scenario_inst.idle_duration(),
+                  "error": error,
+                  "output": scenario_inst._output,
+                  "atomic_actions": scenario_inst.atomic_actions()}
+        if timer.cpu_duration() is not None:
+            result["cpu_duration"] = timer.cpu_duration()
+        trace = tracing.stop()
+        if trace:
+            result["profiling"] = trace
+        return result
 
 
 def _worker_thread(queue, cls, method_name, context_obj, scenario_kwargs,
@@ -143,6 +154,9 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin):
         self.run_duration = 0
         self.batch_size = batch_size
         self.result_batch = []
+        # NOTE(agent): runners can put here statistics of the load
+        #   which are saved to the workload statistics (under "runner" key).
+        self.statistics = {}
 
     @abc.abstractmethod
     def _run_scenario(self, cls, method_name, context, args):
@@ -313,8 +327,8 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin):
         """Store partial result to send it to consumer later.
 
         :param result: Result dict to be sent. It should match the
-                       ScenarioRunnerResult schema, otherwise
-                       ValidationError is raised.
+                       ScenarioRunnerResult schema, otherwise it is skipped.
+        :returns: True if the result is accepted
         """
 
         if not self._result_has_valid_schema(result):
@@ -322,7 +336,7 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin):
                 "Task %(task)s | Runner `%(runner)s` is trying to send "
                 "results in wrong format"
                 % {"task": self.task["uuid"], "runner": self.get_name()})
-            return
+            return False
 
         self.result_batch.append(result)
 
@@ -331,6 +345,7 @@ class ScenarioRunner(plugin.Plugin, validation.ValidatablePluginMixin):
                                   key=lambda r: result["timestamp"])
             self.result_queue.append(sorted_batch)
             del self.result_batch[:]
+        return True
 
     def send_event(self, type, value=None):
         """Store event to send it to consumer later.
@@ -0,0 +1,121 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Tracing of iterations by OSProfiler.
+
+A trace is started in the thread which runs an iteration. While it is
+active, keystoneauth sessions pass the trace in headers of requests, so
+spans of the cloud services are collected under the trace.
+
+If the connection string of the osprofiler collector is given, each atomic
+action of the iteration is a span of the trace as well, so requests made
+within an atomic action are children of its span. Spans of atomic actions
+are sent to the collector, otherwise services would refer to parent spans
+which are not stored anywhere, so atomic actions are not traced without it.
+
+The record of the trace (its ID and IDs of spans of atomic actions) is
+saved to the iteration result and then to the profiling data of the
+workload.
+"""
+
+import socket
+import threading
+
+from osprofiler import notifier
+from osprofiler import profiler
+
+
+_local = threading.local()
+
+
+def is_sampled(iteration, rate):
+    """Check whether the iteration should be traced.
+
+    Iterations are sampled evenly, e.g. each tenth one with rate 0.1.
+
+    :param iteration: the number of the iteration (starting from 1)
+    :param rate: the share of iterations to trace, from 0 to 1
+    """
+    return int(iteration * rate) > int((iteration - 1) * rate)
+
+
+def start(hmac_key, iteration, trace_url=None, connection_string=None):
+    """Start the trace of the iteration in the current thread.
+
+    :param hmac_key: the key to sign the trace with
+    :param iteration: the number of the iteration
+    :param trace_url: URL of the trace in the UI of the collector with
+        {trace_id} placeholder. It is saved to the record of the trace.
+    :param connection_string: connection string of the osprofiler collector
+        to send spans of atomic actions to. Atomic actions are not traced
+        without it.
+    :returns: ID of the trace
+    """
+    if connection_string:
+        # NOTE(agent): drivers are cached by osprofiler, so the collector
+        #   is connected only once per process.
+        notifier.set(notifier.create(connection_string, project="rally",
+                                     service="rally",
+                                     host=socket.gethostname()))
+    trace_id = profiler.init(hmac_key).get_base_id()
+    _local.trace = {"iteration": iteration,
+                    "trace_id": trace_id,
+                    "url": (trace_url.format(trace_id=trace_id)
+                            if trace_url else ""),
+                    "atomic_actions": []}
+    _local.collected = bool(connection_string)
+    return trace_id
+
+
+def stop():
+    """Stop the trace of the current thread.
+
+    :returns: the record of the trace or None if nothing is traced
+    """
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is not None:
+        # NOTE(agent): the profiler of the thread is cleaned, so requests of
+        #   the next iterations executed by the same thread do not carry the
+        #   trace. Releases of osprofiler without clean() have no call to
+        #   stop tracing, but their init() always replaces the profiler, so
+        #   a profiler without a key replaces the traced one.
+        if hasattr(profiler, "clean"):
+            profiler.clean()
+        else:
+            profiler.init(None)
+    return trace
+
+
+def start_atomic_action(name):
+    """Start a span of the atomic action if the iteration is traced.
+
+    Spans are started only if the collector is given to start().
+
+    :returns: True if the span is started
+    """
+    trace = getattr(_local, "trace", None)
+    prof = profiler.get()
+    if trace is None or prof is None or not _local.collected:
+        return False
+    prof.start("rally-atomic-action", info={"atomic_action": name})
+    trace["atomic_actions"].append({"name": name, "span_id": prof.get_id()})
+    return True
+
+
+def stop_atomic_action():
+    prof = profiler.get()
+    if prof is not None:
+        prof.stop()
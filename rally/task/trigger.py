@@ -35,6 +35,9 @@ class Trigger(plugin.Plugin, validation.ValidatablePluginMixin):
 
     CONFIG_SCHEMA = {"type": "null"}
 
+    # NOTE(agent): the runner of the workload is set by HookExecutor
+    runner = None
+
     def __init__(self, context, task, hook_cls):
         self.context = context
         self.config = self.context["trigger"]["args"]
@@ -53,6 +56,7 @@ class Trigger(plugin.Plugin, validation.ValidatablePluginMixin):
                     event_type, value))
         hook = self.hook_cls(self.task, self.context.get("args", {}),
                              {"event_type": event_type, "value": value})
+        hook.runner = self.runner
         hook.run_async()
         self._runs.append(hook)
 
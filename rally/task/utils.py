@@ -15,6 +15,8 @@
 
 import collections
 import itertools
+import os
+import threading
 import time
 import traceback
 
@@ -24,6 +26,7 @@ import six
 
 from rally.common.i18n import _
 from rally.common import logging
+from rally.common import utils
 from rally import consts
 from rally import exceptions
 
@@ -80,19 +83,219 @@ def get_from_manager(error_statuses=None):
                 raise exceptions.GetResourceNotFound(resource=resource)
             raise exceptions.GetResourceFailure(resource=resource, err=e)
 
-        # catch abnormal status, such as "no valid host" for servers
-        status = get_status(res)
+        return _check_resource_status(res, error_statuses)
 
-        if status in ("DELETED", "DELETE_COMPLETE"):
-            raise exceptions.GetResourceNotFound(resource=res)
-        if status in error_statuses:
-            raise exceptions.GetResourceErrorStatus(
-                resource=res, status=status,
-                fault=getattr(res, "fault", "n/a"))
+    return _get_from_manager
 
-        return res
 
-    return _get_from_manager
+def _check_resource_status(resource, error_statuses):
+    # catch abnormal status, such as "no valid host" for servers
+    status = get_status(resource)
+
+    if status in ("DELETED", "DELETE_COMPLETE"):
+        raise exceptions.GetResourceNotFound(resource=resource)
+    if status in error_statuses:
+        raise exceptions.GetResourceErrorStatus(
+            resource=resource, status=status,
+            fault=getattr(resource, "fault", "n/a"))
+
+    return resource
+
+
+class StatusWatcher(object):
+    """Refreshes resources of one type by bulk list requests.
+
+    Waiters get the latest states of resources from the watcher instead of
+    requesting each resource separately. The watcher refreshes all watched
+    resources by a single list request per round, so the number of requests
+    does not depend on the number of concurrent waiters. Rounds are started
+    by a poller thread which exits when there is nothing to watch. The
+    interval between rounds starts from min_interval and grows up to
+    max_interval while statuses of resources do not change.
+
+    :param list_resources: a callable which takes a list of IDs of watched
+        resources and returns resources with these IDs (it may return other
+        resources as well). Watched resources which are not returned are
+        considered deleted.
+    :param id_attr: the name of the attribute with the resource ID
+    :param min_interval: the minimal interval between rounds (in seconds)
+    :param max_interval: the maximal interval between rounds (in seconds).
+        Defaults to four minimal intervals.
+    :param expire: stop watching resources which are not requested for
+        this number of seconds. Defaults to three maximal intervals.
+    """
+
+    def __init__(self, list_resources, id_attr="id", min_interval=1.0,
+                 max_interval=None, expire=None):
+        self._list_resources = list_resources
+        self._id_attr = id_attr
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval or min_interval * 4,
+                                min_interval)
+        self.expire = expire or self.max_interval * 3
+        self.rounds = 0
+        self._interval = min_interval
+        self._watched = {}
+        self._cond = threading.Condition()
+        self._poller = None
+
+    def get(self, resource_id, timeout=None):
+        """Return the latest state of the resource.
+
+        The state is taken from a round which is started after the previous
+        request of the resource, so the call blocks until the next round if
+        there is nothing new.
+
+        :param resource_id: ID of the resource
+        :param timeout: the maximal time to wait for the next round (in
+            seconds). None means no limit.
+        :raises GetResourceNotFound: if the resource is not listed
+        :raises GetResourceFailure: if the list request failed or the poller
+            thread is dead
+        :raises TimeoutException: if no round is finished within timeout
+        """
+        deadline = None if timeout is None else utils.monotonic() + timeout
+        with self._cond:
+            watched = self._watched.get(resource_id)
+            if watched is None:
+                watched = {"resource": None, "error": None, "round": None,
+                           "seen": None}
+                self._watched[resource_id] = watched
+                # NOTE(agent): new resources are refreshed at the minimal
+                #   interval, so the poller should be woken up.
+                self._interval = self.min_interval
+                self._cond.notify_all()
+
+            while True:
+                watched["accessed"] = utils.monotonic()
+                # NOTE(agent): the resource could expire while the poller was
+                #   busy with a slow list request.
+                self._watched.setdefault(resource_id, watched)
+                if self._poller is None:
+                    self._poller = threading.Thread(target=self._poll)
+                    self._poller.daemon = True
+                    self._poller.start()
+                elif not self._poller.is_alive():
+                    self._poller = None
+                    raise exceptions.GetResourceFailure(
+                        resource=resource_id,
+                        err="the poller thread of the status watcher has "
+                            "died")
+                if watched["round"] is not None and (
+                        watched["round"] != watched["seen"]):
+                    break
+                wait = self.max_interval
+                if deadline is not None:
+                    wait = min(wait, deadline - utils.monotonic())
+                    if wait <= 0:
+                        raise exceptions.TimeoutException(
+                            desired_status="refreshed",
+                            resource_name=resource_id,
+                            resource_type="resource",
+                            resource_id=resource_id,
+                            resource_status=get_status(watched["resource"]))
+                self._cond.wait(wait)
+            watched["seen"] = watched["round"]
+
+            if watched["error"] is not None:
+                raise exceptions.GetResourceFailure(resource=resource_id,
+                                                    err=watched["error"])
+            if watched["resource"] is None:
+                raise exceptions.GetResourceNotFound(resource=resource_id)
+            return watched["resource"]
+
+    def _poll(self):
+        while True:
+            with self._cond:
+                started_at = utils.monotonic()
+                for resource_id, watched in list(self._watched.items()):
+                    if started_at - watched["accessed"] > self.expire:
+                        del self._watched[resource_id]
+                if not self._watched:
+                    self._poller = None
+                    return
+                ids = list(self._watched)
+
+            resources = {}
+            error = None
+            try:
+                for resource in self._list_resources(ids):
+                    resources[getattr(resource, self._id_attr)] = resource
+            except Exception as e:
+                LOG.debug("Failed to list resources: %s" % e)
+                error = e
+
+            with self._cond:
+                self.rounds += 1
+                changed = False
+                for resource_id in ids:
+                    watched = self._watched.get(resource_id)
+                    if watched is None:
+                        continue
+                    resource = resources.get(resource_id)
+                    if error is None and (
+                            get_status(resource) != get_status(
+                                watched["resource"])):
+                        changed = True
+                    watched.update(resource=resource, error=error,
+                                   round=self.rounds)
+                if changed or any(w["round"] is None
+                                  for w in self._watched.values()):
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * 2,
+                                         self.max_interval)
+                self._cond.notify_all()
+
+                while True:
+                    remaining = started_at + self._interval - (
+                        utils.monotonic())
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+
+_status_watchers = {}
+_status_watchers_lock = threading.Lock()
+
+
+def get_status_watcher(key, list_resources, **kwargs):
+    """Return the status watcher shared by waiters of the current process.
+
+    :param key: a hashable key of resources type and scope (e.g. servers of
+        a tenant). Waiters with the same key share the watcher, so their
+        resources should be listed by the same request.
+    :param list_resources: see StatusWatcher. It is used only if the watcher
+        is not created yet.
+    :param kwargs: other arguments of StatusWatcher
+    """
+    # NOTE(agent): the poller thread does not survive fork, so
+    #   each process of a runner has own watchers.
+    key = (os.getpid(), key)
+    with _status_watchers_lock:
+        if key not in _status_watchers:
+            _status_watchers[key] = StatusWatcher(list_resources, **kwargs)
+        return _status_watchers[key]
+
+
+def get_from_watcher(watcher, error_statuses=None, timeout=None):
+    """Return a function to get resources from the status watcher.
+
+    It can be used as update_resource of wait_for_status instead of
+    get_from_manager to refresh resources by bulk requests.
+
+    :param watcher: StatusWatcher object
+    :param error_statuses: statuses which mean that the resource is failed
+    :param timeout: the maximal time to wait for a refresh of the resource
+        (in seconds), usually the timeout of the whole wait
+    """
+    error_statuses = [s.upper() for s in error_statuses or ["ERROR"]]
+
+    def _get_from_watcher(resource, id_attr="id"):
+        res = watcher.get(getattr(resource, id_attr), timeout=timeout)
+        return _check_resource_status(res, error_statuses)
+
+    return _get_from_watcher
 
 
 def manager_list_size(sizes):
@@ -28,7 +28,7 @@ from rally.common import validation
 from rally.common import yamlutils as yaml
 from rally import exceptions
 from rally.plugins.openstack.context.nova import flavors as flavors_ctx
-from rally.plugins.openstack import types as openstack_types
+from rally.plugins.openstack import validators as os_validators
 from rally.task import types
 
 LOG = logging.getLogger(__name__)
@@ -188,7 +188,18 @@ def valid_command(config, clients, deployment, param_name, required=True):
     return ValidationResult(True)
 
 
-def _get_validated_image(config, clients, param_name):
+def _get_credentials(deployment):
+    """Return credentials of OpenStack for lookups of legacy validators.
+
+    Credentials given by OldValidator carry the lookup cache of the task,
+    so lookups are shared with other validators of the task.
+    """
+    if deployment is None:
+        return None
+    return {"openstack": deployment.get_credentials_for("openstack")}
+
+
+def _get_validated_image(config, clients, param_name, credentials=None):
     image_context = config.get("context", {}).get("images", {})
     image_args = config.get("args", {}).get(param_name)
     image_ctx_name = image_context.get("image_name")
@@ -211,20 +222,7 @@ def _get_validated_image(config, clients, param_name):
             }
             return (ValidationResult(True), image)
     try:
-        image_id = openstack_types.GlanceImage.transform(
-            clients=clients, resource_config=image_args)
-        image = clients.glance().images.get(image_id)
-        if hasattr(image, "to_dict"):
-            # NOTE(stpierre): Glance v1 images are objects that can be
-            # converted to dicts; Glance v2 images are already
-            # dict-like
-            image = image.to_dict()
-        if not image.get("size"):
-            image["size"] = 0
-        if not image.get("min_ram"):
-            image["min_ram"] = 0
-        if not image.get("min_disk"):
-            image["min_disk"] = 0
+        image = os_validators.get_image(credentials, clients, image_args)
         return (ValidationResult(True), image)
     except (glance_exc.HTTPNotFound, exceptions.InvalidScenarioArgument):
         message = _("Image '%s' not found") % image_args
@@ -244,15 +242,13 @@ def _get_flavor_from_context(config, flavor_value):
     return (ValidationResult(True), flavor)
 
 
-def _get_validated_flavor(config, clients, param_name):
+def _get_validated_flavor(config, clients, param_name, credentials=None):
     flavor_value = config.get("args", {}).get(param_name)
     if not flavor_value:
         msg = "Parameter %s is not specified." % param_name
         return (ValidationResult(False, msg), None)
     try:
-        flavor_id = openstack_types.Flavor.transform(
-            clients=clients, resource_config=flavor_value)
-        flavor = clients.nova().flavors.get(flavor=flavor_id)
+        flavor = os_validators.get_flavor(credentials, clients, flavor_value)
         return (ValidationResult(True), flavor)
     except (nova_exc.NotFound, exceptions.InvalidScenarioArgument):
         try:
@@ -282,7 +278,9 @@ def flavor_exists(config, clients, deployment, param_name):
     :param param_name: defines which variable should be used
                        to get flavor id value.
     """
-    return _get_validated_flavor(config, clients, param_name)[0]
+    return _get_validated_flavor(
+        config, clients, param_name,
+        credentials=_get_credentials(deployment))[0]
 
 
 @validator
@@ -330,6 +330,19 @@ class TaskCommandsTestCase(test.TestCase):
         self.assertRaises(exceptions.InvalidArgumentsException,
                           self.task.abort, self.fake_api, None)
 
+    @mock.patch("rally.cli.commands.task.distributed.Agent")
+    def test_agent(self, mock_agent):
+        self.task.agent(self.fake_api, host="127.0.0.1", port=1234,
+                        once=True)
+        mock_agent.assert_called_once_with(host="127.0.0.1", port=1234)
+        mock_agent.return_value.serve.assert_called_once_with(once=True)
+
+    @mock.patch("rally.cli.commands.task.distributed.Agent")
+    def test_agent_interrupted(self, mock_agent):
+        mock_agent.return_value.serve.side_effect = KeyboardInterrupt
+        self.task.agent(self.fake_api)
+        mock_agent.assert_called_once_with(host=None, port=None)
+
     def test_status(self):
         test_uuid = "a3e7cefb-bec2-4802-89f6-410cc31f71af"
         value = {"task_id": "task", "status": "status"}
@@ -344,9 +357,30 @@ class TaskCommandsTestCase(test.TestCase):
                           self.task.status, None)
 
     @ddt.data({"iterations_data": False, "has_output": True},
-              {"iterations_data": True, "has_output": False})
+              {"iterations_data": True, "has_output": False},
+              {"iterations_data": False, "has_output": False,
+               "client_overhead": {"avg_cpu_duration": 0.1,
+                                   "max_cpu_duration": 0.2,
+                                   "avg_cpu_ratio": 0.05}},
+              {"iterations_data": False, "has_output": False,
+               "context_execution": {"users@openstack": {
+                   "setup": {"duration": 2.5, "actions": {
+                       "create_project": {"count": 2, "failed": 0,
+                                          "retries": 1, "started_at": 1.0,
+                                          "finished_at": 2.0}}},
+                   "cleanup": {"duration": 1.5, "actions": {
+                       "delete_project": {"count": 0, "failed": 2,
+                                          "retries": 0, "started_at": 5.0,
+                                          "finished_at": None}}}}}},
+              {"iterations_data": False, "has_output": False,
+               "corrected_total": {"name": "total (lag-corrected)", "min": 1,
+                                   "median": 2.5, "90%ile": 2.9,
+                                   "95%ile": 2.95, "max": 4, "avg": 1.95,
+                                   "success": 6, "count": 6}})
     @ddt.unpack
-    def test_detailed(self, iterations_data, has_output):
+    def test_detailed(self, iterations_data, has_output,
+                      client_overhead=None, context_execution=None,
+                      corrected_total=None):
         test_uuid = "c0d874d4-7195-4fd5-8688-abe82bfad36f"
         detailed_value = {
             "id": "task", "uuid": test_uuid, "status": "finished",
@@ -418,12 +452,44 @@ class TaskCommandsTestCase(test.TestCase):
         if has_output:
             detailed_value["subtasks"][0]["workloads"][0]["output"] = {
                 "additive": [], "complete": []}
+        if client_overhead:
+            detailed_value["subtasks"][0]["workloads"][0]["statistics"][
+                "client_overhead"] = client_overhead
+        if context_execution:
+            detailed_value["subtasks"][0]["workloads"][0][
+                "context_execution"] = context_execution
+        if corrected_total:
+            detailed_value["subtasks"][0]["workloads"][0]["statistics"][
+                "durations"]["corrected_total"] = corrected_total
         self.fake_api.task.get.return_value = detailed_value
         self.task.detailed(self.fake_api, test_uuid,
                            iterations_data=iterations_data)
         self.fake_api.task.get.assert_called_once_with(
             task_id=test_uuid, detailed=True)
 
+    @mock.patch("rally.cli.commands.task.cliutils.print_list")
+    def test__print_context_execution(self, mock_print_list):
+        self.task._print_context_execution({"users@openstack": {
+            "setup": {"duration": 2.5, "actions": {
+                "create_user": {"count": 2, "failed": 1, "retries": 3,
+                                "started_at": 1.0, "finished_at": 2.0}}},
+            "cleanup": {"duration": 1.5, "actions": {}}}})
+
+        fields = ["Context", "Stage", "Action", "Count", "Failed", "Retries",
+                  "Duration (sec)"]
+        mock_print_list.assert_called_once_with(
+            [{"Context": "users@openstack", "Stage": "setup",
+              "Action": "total", "Count": "", "Failed": "", "Retries": "",
+              "Duration (sec)": 2.5},
+             {"Context": "users@openstack", "Stage": "setup",
+              "Action": "create_user", "Count": 2, "Failed": 1,
+              "Retries": 3, "Duration (sec)": 1.0},
+             {"Context": "users@openstack", "Stage": "cleanup",
+              "Action": "total", "Count": "", "Failed": "", "Retries": "",
+              "Duration (sec)": 1.5}],
+            fields=fields, formatters={"Duration (sec)": mock.ANY},
+            table_label="Contexts execution", sortby_index=None)
+
     @mock.patch("rally.cli.commands.task.sys.stdout")
     @mock.patch("rally.cli.commands.task.logging")
     @ddt.data({"debug": True},
@@ -504,37 +570,21 @@ class TaskCommandsTestCase(test.TestCase):
                 "context": {"users": {}},
                 "data": data or []}]}]}
 
-    @mock.patch("rally.cli.commands.task.json.dumps")
-    def test_results(self, mock_json_dumps):
+    @mock.patch("rally.cli.commands.task.sys.stdout")
+    def test_results(self, mock_stdout):
         task_id = "foo_task_id"
 
-        task_obj = self._make_task(data=[{"atomic_actions": {"foo": 1.1}}])
-        result = map(lambda x: {"key": {"kw": {"sla": x["sla"],
-                                               "args": x["args"],
-                                               "context": x["context"],
-                                               "runner": x["runner"],
-                                               "hooks": x["hooks"]},
-                                        "pos": x["position"],
-                                        "name": x["name"],
-                                        "description": x["description"]},
-                                "result": x["data"],
-                                "load_duration": x["load_duration"],
-                                "full_duration": x["full_duration"],
-                                "created_at": x["created_at"],
-                                "hooks": x["hooks"],
-                                "sla": x["sla_results"]["sla"]},
-                     task_obj["subtasks"][0]["workloads"])
-
-        self.fake_api.task.get.return_value = task_obj
+        self.fake_api.task.get.return_value = self._make_task()
+        self.fake_api.task._export.return_value = {
+            "print": iter(["[", "{}", "]"])}
 
         self.assertIsNone(self.task.results(self.fake_api, task_id))
-        self.assertEqual(1, mock_json_dumps.call_count)
-        self.assertEqual(1, len(mock_json_dumps.call_args[0]))
-        self.assertSequenceEqual(result, mock_json_dumps.call_args[0][0])
-        self.assertEqual({"sort_keys": False, "indent": 4},
-                         mock_json_dumps.call_args[1])
-        self.fake_api.task.get.assert_called_once_with(
-            task_id=task_id, detailed=True)
+
+        self.fake_api.task.get.assert_called_once_with(task_id=task_id)
+        self.fake_api.task._export.assert_called_once_with(
+            tasks_uuids=[task_id], output_type="json-results")
+        mock_stdout.write.assert_has_calls(
+            [mock.call("["), mock.call("{}"), mock.call("]")])
 
     @mock.patch("rally.cli.commands.task.sys.stdout")
     def test_results_no_data(self, mock_stdout):
@@ -544,8 +594,8 @@ class TaskCommandsTestCase(test.TestCase):
 
         self.assertEqual(1, self.task.results(self.fake_api, task_id))
 
-        self.fake_api.task.get.assert_called_once_with(
-            task_id=task_id, detailed=True)
+        self.fake_api.task.get.assert_called_once_with(task_id=task_id)
+        self.assertFalse(self.fake_api.task._export.called)
 
         expected_out = ("Task status is %s. Results "
                         "available when it is one of %s.") % (
@@ -813,6 +863,24 @@ class TaskCommandsTestCase(test.TestCase):
             deployment=mock_get_global.return_value,
             status=consts.TaskStatus.RUNNING)
 
+    @mock.patch("rally.cli.commands.task.cliutils.print_list")
+    def test_list_with_limit(self, mock_print_list):
+        self.fake_api.task.list.return_value = [
+            {"uuid": "b", "created_at": "2007-01-01T00:00:02"},
+            {"uuid": "a", "created_at": "2007-01-01T00:00:01"}]
+        out = six.StringIO()
+        with mock.patch.object(sys, "stdout", new=out):
+            self.task.list(self.fake_api, deployment="d",
+                           all_deployments=True, limit=2, marker="c")
+        self.fake_api.task.list.assert_called_once_with(limit=2, marker="c")
+        self.assertTrue(mock_print_list.called)
+        self.assertIn("rally task list --limit 2 --marker a", out.getvalue())
+
+        self.fake_api.task.list.reset_mock()
+        self.assertEqual(1, self.task.list(self.fake_api, deployment="d",
+                                           limit=0))
+        self.assertFalse(self.fake_api.task.list.called)
+
     def test_list_wrong_status(self):
         self.assertEqual(1, self.task.list(self.fake_api, deployment="fake",
                                            status="wrong non existing status"))
@@ -909,7 +977,7 @@ class TaskCommandsTestCase(test.TestCase):
         result = self.task.sla_check(self.fake_api, task_id="fake_task_id")
         self.assertEqual(1, result)
         self.fake_api.task.get.assert_called_with(
-            task_id="fake_task_id", detailed=True)
+            task_id="fake_task_id", detailed=True, load_data=False)
 
         task_obj["subtasks"][0]["workloads"][0]["sla_results"]["sla"][0][
             "success"] = True
@@ -980,7 +1048,7 @@ class TaskCommandsTestCase(test.TestCase):
                     mock_path):
 
         # file
-        self.fake_api.task.export.return_value = {
+        self.fake_api.task._export.return_value = {
             "files": {"output_dest": "content"}, "open": "output_dest"}
         mock_path.expanduser.return_value = "output_file"
         mock_path.realpath.return_value = "real_path"
@@ -991,7 +1059,7 @@ class TaskCommandsTestCase(test.TestCase):
                          output_type="json", output_dest="output_dest",
                          open_it=True)
 
-        self.fake_api.task.export.assert_called_once_with(
+        self.fake_api.task._export.assert_called_once_with(
             tasks_uuids=["uuid"], output_type="json",
             output_dest="output_dest"
         )
@@ -999,14 +1067,55 @@ class TaskCommandsTestCase(test.TestCase):
         mock_fd.return_value.write.assert_called_once_with("content")
 
         # print
-        self.fake_api.task.export.reset_mock()
-        self.fake_api.task.export.return_value = {"print": "content"}
+        self.fake_api.task._export.reset_mock()
+        self.fake_api.task._export.return_value = {"print": "content"}
         self.task.export(self.fake_api, task_id="uuid", output_type="json")
-        self.fake_api.task.export.assert_called_once_with(
+        self.fake_api.task._export.assert_called_once_with(
             tasks_uuids=["uuid"], output_type="json", output_dest=None
         )
         mock_print.assert_called_once_with("content")
 
+    @mock.patch("rally.cli.commands.task.os.path")
+    @mock.patch("rally.cli.commands.task.open", create=True)
+    @mock.patch("rally.cli.commands.task.sys.stdout")
+    def test_export_streaming(self, mock_stdout, mock_open, mock_path):
+        # file
+        self.fake_api.task._export.return_value = {
+            "files": {"output_dest": iter(["con", "tent"])}}
+        mock_path.expanduser.return_value = "output_file"
+        mock_fd = mock.mock_open()
+        mock_open.side_effect = mock_fd
+
+        self.task.export(self.fake_api, task_id="uuid",
+                         output_type="json-results",
+                         output_dest="output_dest")
+
+        mock_open.assert_called_once_with("output_file", "w+")
+        self.assertEqual([mock.call("con"), mock.call("tent")],
+                         mock_fd.return_value.write.call_args_list)
+
+        # print
+        self.fake_api.task._export.return_value = {
+            "print": iter(["con", "tent"])}
+        self.task.export(self.fake_api, task_id="uuid",
+                         output_type="json-results")
+        mock_stdout.write.assert_has_calls(
+            [mock.call("con"), mock.call("tent")])
+
+    @mock.patch("rally.cli.commands.task.print")
+    def test_export_by_remote_api(self, mock_print):
+        self.fake_api.endpoint_url = "http://example.com"
+        self.fake_api.task.export.return_value = {"print": "content"}
+
+        self.task.export(self.fake_api, task_id="uuid",
+                         output_type="json-results")
+
+        self.fake_api.task.export.assert_called_once_with(
+            tasks_uuids=["uuid"], output_type="json-results",
+            output_dest=None)
+        self.assertFalse(self.fake_api.task._export.called)
+        mock_print.assert_called_once_with("content")
+
     @mock.patch("rally.cli.commands.task.plot.charts")
     @mock.patch("rally.cli.commands.task.sys.stdout")
     @ddt.data({"error_type": "test_no_trace_type",
@@ -449,6 +449,13 @@ class VerifyCommandsTestCase(test.TestCase):
             deployment_id=self.deployment_uuid, tags=None,
             xfail_list={"test_1": None, "test_2": "Reason"})
 
+        self.fake_api.verification.start.reset_mock()
+        self.verify.start(self.fake_api, self.verifier_uuid,
+                          self.deployment_uuid, shards=4)
+        self.fake_api.verification.start.assert_called_once_with(
+            verifier_id=self.verifier_uuid,
+            deployment_id=self.deployment_uuid, tags=None, shards=4)
+
         self.fake_api.verification.get.assert_called_with(
             verification_uuid=self.verification_uuid)
         mock_update_globals_file.assert_called_with(
@@ -65,3 +65,24 @@ class DBCommandsTestCase(test.TestCase):
         self.db_commands.revision(self.fake_api)
         calls = [mock.call.schema_revision()]
         mock_db.assert_has_calls(calls)
+
+    @mock.patch("rally.cli.manage.db")
+    def test_compact(self, mock_db):
+        self.fake_api.check_db_revision = mock.Mock()
+        self.fake_api.task.compact.return_value = [
+            {"uuid": "t1", "workloads": 2, "removed_iterations": 10}]
+        self.db_commands.compact(self.fake_api, older_than=7,
+                                 sample_size=100, archive_dir="/foo")
+        self.fake_api.check_db_revision.assert_called_once_with()
+        self.fake_api.task.compact.assert_called_once_with(
+            older_than=7, sample_size=100, archive_dir="/foo")
+        mock_db.vacuum.assert_called_once_with()
+
+    @mock.patch("rally.cli.manage.db")
+    def test_compact_invalid_args(self, mock_db):
+        self.assertEqual(1, self.db_commands.compact(self.fake_api,
+                                                     older_than=-1))
+        self.assertEqual(1, self.db_commands.compact(self.fake_api,
+                                                     sample_size=-1))
+        self.assertFalse(self.fake_api.task.compact.called)
+        self.assertFalse(mock_db.vacuum.called)
@@ -36,6 +36,9 @@ class ConnectionTestCase(test.DBTestCase):
         self.assertEqual(drev["revision"], rev)
         self.assertEqual(drev["revision"], drev["current_head"])
 
+    def test_vacuum(self):
+        self.assertTrue(db.vacuum())
+
 
 class TasksTestCase(test.DBTestCase):
     def setUp(self):
@@ -148,6 +151,38 @@ class TasksTestCase(test.DBTestCase):
         self.assertEqual(task_init, get_uuids(INIT))
         self.assertEqual(sorted(task_finished), get_uuids(FINISHED))
 
+    def test_task_list_with_tags(self):
+        task1 = self._create_task({"tags": ["b", "a"]})["uuid"]
+        task2 = self._create_task({"tags": ["c"]})["uuid"]
+        task3 = self._create_task()["uuid"]
+        db.verification_create(
+            db.verifier_create("v", "t", "n", "s", "v", False)["uuid"],
+            self.deploy["uuid"], tags=["d"], run_args={})
+
+        self.assertEqual({task1: ["a", "b"], task2: ["c"], task3: []},
+                         dict((t["uuid"], t["tags"]) for t in db.task_list()))
+        self.assertEqual([task2],
+                         [t["uuid"] for t in db.task_list(tags=["c"])])
+
+    def test_task_list_with_limit_and_marker(self):
+        tasks = [self._create_task({"tags": ["t%d" % i]})["uuid"]
+                 for i in moves.range(5)]
+
+        def get(**kwargs):
+            return [(t["uuid"], t["tags"]) for t in db.task_list(**kwargs)]
+
+        self.assertEqual([(tasks[4], ["t4"]), (tasks[3], ["t3"])],
+                         get(limit=2))
+        self.assertEqual([(tasks[2], ["t2"]), (tasks[1], ["t1"])],
+                         get(limit=2, marker=tasks[3]))
+        self.assertEqual([(tasks[0], ["t0"])], get(limit=2, marker=tasks[1]))
+        self.assertEqual([], get(marker=tasks[0]))
+        self.assertEqual([tasks[1]],
+                         [t["uuid"] for t in db.task_list(
+                             tags=["t1", "t3"], limit=2, marker=tasks[3])])
+        self.assertRaises(exceptions.TaskNotFound, db.task_list,
+                          marker="unknown")
+
     def test_task_delete(self):
         task1, task2 = self._create_task()["uuid"], self._create_task()["uuid"]
         db.task_delete(task1)
@@ -247,6 +282,7 @@ class TasksTestCase(test.DBTestCase):
              "max_duration": 0.0, "min_duration": 0.0,
              "failed_iteration_count": 0, "total_iteration_count": 0,
              "pass_sla": True, "sla": w_sla, "statistics": mock.ANY,
+             "profiling_data": {}, "context_execution": {},
              "sla_results": {"sla": sla_results}}, workloads[0])
 
     def test_task_multiple_raw_result_create(self):
@@ -495,6 +531,105 @@ class WorkloadTestCase(test.DBTestCase):
         self.assertEqual(self.task_uuid, workload["task_uuid"])
         self.assertEqual(self.subtask_uuid, workload["subtask_uuid"])
 
+    def test_workload_set_results_with_context_execution(self):
+        workload = db.workload_create(self.task_uuid, self.subtask_uuid,
+                                      name="foo", description="descr",
+                                      position=0, args={}, context={}, sla={},
+                                      hooks=[], runner={}, runner_type="foo")
+        context_execution = {"users@openstack": {"setup": {"duration": 1}}}
+
+        db.workload_set_results(workload_uuid=workload["uuid"],
+                                subtask_uuid=self.subtask_uuid,
+                                task_uuid=self.task_uuid,
+                                load_duration=1, full_duration=2,
+                                start_time=3, sla_results=[],
+                                context_execution=context_execution)
+
+        workload = db.workload_get(workload["uuid"])
+        self.assertEqual(context_execution, workload["context_execution"])
+
+    def test_workload_set_results_with_runner_statistics(self):
+        workload = db.workload_create(self.task_uuid, self.subtask_uuid,
+                                      name="foo", description="descr",
+                                      position=0, args={}, context={}, sla={},
+                                      hooks=[], runner={}, runner_type="foo")
+        runner_statistics = {"throughput_curve": [{"level": 1}]}
+
+        db.workload_set_results(workload_uuid=workload["uuid"],
+                                subtask_uuid=self.subtask_uuid,
+                                task_uuid=self.task_uuid,
+                                load_duration=1, full_duration=2,
+                                start_time=3, sla_results=[],
+                                runner_statistics=runner_statistics)
+
+        workload = db.workload_get(workload["uuid"])
+        self.assertEqual(runner_statistics, workload["statistics"]["runner"])
+        self.assertIn("durations", workload["statistics"])
+
+    def test_workload_set_results_with_cpu_durations(self):
+        workload = db.workload_create(self.task_uuid, self.subtask_uuid,
+                                      name="foo", description="descr",
+                                      position=0, args={}, context={}, sla={},
+                                      hooks=[], runner={}, runner_type="foo")
+        raw_data = {
+            "raw": [
+                {"error": [], "duration": 2, "timestamp": 1,
+                 "cpu_duration": 0.5, "atomic_actions": []},
+                {"error": [], "duration": 4, "timestamp": 2,
+                 "cpu_duration": 0.5, "atomic_actions": []},
+                {"error": [], "duration": 4, "timestamp": 3,
+                 "atomic_actions": []}
+            ],
+        }
+        db.workload_data_create(self.task_uuid, workload["uuid"], 0, raw_data)
+        db.workload_set_results(workload_uuid=workload["uuid"],
+                                subtask_uuid=self.subtask_uuid,
+                                task_uuid=self.task_uuid,
+                                load_duration=1, full_duration=2,
+                                start_time=3, sla_results=[])
+
+        workload = db.workload_get(workload["uuid"])
+        self.assertEqual({"avg_cpu_duration": 0.5, "max_cpu_duration": 0.5,
+                          "avg_cpu_ratio": 0.1875},
+                         workload["statistics"]["client_overhead"])
+
+    def test_workload_set_results_with_profiling(self):
+        workload = db.workload_create(self.task_uuid, self.subtask_uuid,
+                                      name="foo", description="descr",
+                                      position=0, args={}, context={}, sla={},
+                                      hooks=[], runner={}, runner_type="foo")
+        actions = [{"name": "foo", "span_id": "span"}]
+        raw_data = {
+            "raw": [
+                {"error": [], "duration": 1, "timestamp": 1,
+                 "atomic_actions": []},
+                {"error": ["Error"], "duration": 2, "timestamp": 2,
+                 "atomic_actions": [],
+                 "profiling": {"iteration": 3, "trace_id": "trace-3",
+                               "atomic_actions": actions}},
+                {"error": [], "duration": 3, "timestamp": 3,
+                 "atomic_actions": [],
+                 "profiling": {"iteration": 2, "trace_id": "trace-2",
+                               "atomic_actions": []}}
+            ],
+        }
+        db.workload_data_create(self.task_uuid, workload["uuid"], 0, raw_data)
+        db.workload_set_results(workload_uuid=workload["uuid"],
+                                subtask_uuid=self.subtask_uuid,
+                                task_uuid=self.task_uuid,
+                                load_duration=1, full_duration=2,
+                                start_time=3, sla_results=[])
+
+        workload = db.workload_get(workload["uuid"])
+        self.assertEqual(
+            {"traces": [{"iteration": 2, "trace_id": "trace-2",
+                         "atomic_actions": [], "duration": 3,
+                         "error": False},
+                        {"iteration": 3, "trace_id": "trace-3",
+                         "atomic_actions": actions, "duration": 2,
+                         "error": True}]},
+            workload["profiling_data"])
+
 
 class WorkloadDataTestCase(test.DBTestCase):
     def setUp(self):
@@ -546,6 +681,102 @@ class WorkloadDataTestCase(test.DBTestCase):
         self.assertEqual(self.task_uuid, workload_data["task_uuid"])
         self.assertEqual(self.workload_uuid, workload_data["workload_uuid"])
 
+    def test_workload_data_create_many(self):
+        db.workload_data_create_many(
+            self.task_uuid, self.workload_uuid,
+            [(1, {"raw": [{"duration": 3, "timestamp": 3}]}),
+             (0, {"raw": [{"error": "e", "duration": 1, "timestamp": 1},
+                          {"duration": 2, "timestamp": 2}]})])
+        db.workload_data_create_many(self.task_uuid, self.workload_uuid, [])
+
+        self.assertEqual([1, 2, 3],
+                         [itr["timestamp"] for itr in
+                          db.workload_data_iter(self.workload_uuid)])
+
+    def test_workload_data_compact(self):
+        db.workload_data_create_many(
+            self.task_uuid, self.workload_uuid,
+            [(0, {"raw": [{"duration": 1, "timestamp": 1},
+                          {"error": "e", "duration": 2, "timestamp": 2}]}),
+             (1, {"raw": [{"duration": 3, "timestamp": 3}]})])
+
+        removed = db.workload_data_compact(
+            self.workload_uuid,
+            {"raw": [{"error": "e", "duration": 2, "timestamp": 2}]},
+            archive="/foo.jsonl.gz")
+
+        self.assertEqual(2, removed)
+        self.assertEqual([2], [itr["timestamp"] for itr in
+                               db.workload_data_iter(self.workload_uuid)])
+        workload = db.workload_get(self.workload_uuid)
+        self.assertEqual({"compaction": {"stored_iterations": 1,
+                                         "archive": "/foo.jsonl.gz"}},
+                         workload["statistics"])
+
+        self.assertEqual(1, db.workload_data_compact(self.workload_uuid,
+                                                     {"raw": []}))
+        self.assertEqual([], list(db.workload_data_iter(self.workload_uuid)))
+        workload = db.workload_get(self.workload_uuid)
+        self.assertEqual({"stored_iterations": 0, "archive": None},
+                         workload["statistics"]["compaction"])
+
+    def test_workload_data_compact_not_found(self):
+        self.assertRaises(exceptions.ResourceNotFound,
+                          db.workload_data_compact, "unknown", {"raw": []})
+
+    def test_workload_data_iter(self):
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 1,
+                                {"raw": [{"duration": 3, "timestamp": 3}]})
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 0,
+                                {"raw": [{"duration": 1, "timestamp": 1},
+                                         {"duration": 2, "timestamp": 2}]})
+
+        data = db.workload_data_iter(self.workload_uuid)
+
+        self.assertFalse(isinstance(data, list))
+        self.assertEqual([1, 2, 3], [itr["timestamp"] for itr in data])
+        self.assertEqual([], list(db.workload_data_iter("unknown")))
+
+    def test_task_get_detailed_without_data(self):
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 0,
+                                {"raw": [{"duration": 1, "timestamp": 1}]})
+
+        task = db.task_get(self.task_uuid, detailed=True)
+        workload = task["subtasks"][0]["workloads"][0]
+        self.assertEqual([{"duration": 1, "timestamp": 1}], workload["data"])
+
+        task = db.task_get(self.task_uuid, detailed=True, load_data=False)
+        workload = task["subtasks"][0]["workloads"][0]
+        self.assertEqual(self.workload_uuid, workload["uuid"])
+        self.assertNotIn("data", workload)
+
+    def test_task_get_detailed_several_workloads(self):
+        subtask2 = db.subtask_create(self.task_uuid, title="bar")
+        workload2 = db.workload_create(
+            self.task_uuid, subtask2["uuid"], name="atata2",
+            description="foo", position=1, args={}, context={}, sla={},
+            runner={}, runner_type="r", hooks={})
+        workload3 = db.workload_create(
+            self.task_uuid, subtask2["uuid"], name="atata3",
+            description="foo", position=2, args={}, context={}, sla={},
+            runner={}, runner_type="r", hooks={})
+        db.workload_data_create(self.task_uuid, workload2["uuid"], 1,
+                                {"raw": [{"duration": 3, "timestamp": 3}]})
+        db.workload_data_create(self.task_uuid, workload2["uuid"], 0,
+                                {"raw": [{"duration": 2, "timestamp": 2}]})
+        db.workload_data_create(self.task_uuid, self.workload_uuid, 0,
+                                {"raw": [{"duration": 1, "timestamp": 1}]})
+
+        task = db.task_get(self.task_uuid, detailed=True)
+
+        self.assertEqual(
+            {self.subtask_uuid: [(self.workload_uuid, [1])],
+             subtask2["uuid"]: [(workload2["uuid"], [2, 3]),
+                                (workload3["uuid"], [])]},
+            dict((s["uuid"], [(w["uuid"], [i["duration"] for i in w["data"]])
+                              for w in s["workloads"]])
+                 for s in task["subtasks"]))
+
 
 class DeploymentTestCase(test.DBTestCase):
     def test_deployment_create(self):
@@ -859,12 +1090,78 @@ class VerificationTestCase(test.DBTestCase):
         self.assertRaises(exceptions.ResourceNotFound, db.verification_delete,
                           v["uuid"])
 
+    def test_verification_delete_with_tests(self):
+        v = self._create_verification()
+        db.verification_tests_add(
+            v["uuid"], {"test_1": {"name": "test_1", "status": "success"}})
+        db.verification_delete(v["uuid"])
+        self.assertRaises(exceptions.ResourceNotFound, db.verification_get,
+                          v["uuid"])
+        self.assertEqual({}, db.verification_tests_get(v["uuid"]))
+
     def test_verification_update(self):
         v = self._create_verification()
         v = db.verification_update(v["uuid"], status="foo", tests_count=10)
         self.assertEqual("foo", v["status"])
         self.assertEqual(10, v["tests_count"])
 
+    def test_verification_tests_add(self):
+        v = self._create_verification()
+        tests = {
+            "test_1": {"name": "test_1", "status": "success",
+                       "duration": "1.000"},
+            "test_2": {"name": "test_2", "status": "fail",
+                       "duration": "2.000", "traceback": "Oops"},
+            "test_3": {"name": "test_3", "status": "init",
+                       "duration": "0.000"}}
+        v = db.verification_tests_add(v["uuid"], tests)
+        self.assertEqual(3, v["tests_count"])
+        self.assertEqual(1, v["success"])
+        self.assertEqual(1, v["failures"])
+        self.assertEqual(0, v["skipped"])
+
+        # results of tests are replaced
+        v = db.verification_tests_add(
+            v["uuid"],
+            {"test_3": {"name": "test_3", "status": "skip",
+                        "duration": "0.000", "reason": "No way"},
+             "test_4": {"name": "test_4", "status": "xfail",
+                        "duration": "0.100"}})
+        self.assertEqual(4, v["tests_count"])
+        self.assertEqual(1, v["success"])
+        self.assertEqual(1, v["failures"])
+        self.assertEqual(1, v["skipped"])
+        self.assertEqual(1, v["expected_failures"])
+        self.assertEqual(0, v["unexpected_success"])
+
+        stored = db.verification_tests_get(v["uuid"])
+        self.assertEqual(["test_1", "test_2", "test_3", "test_4"],
+                         sorted(stored))
+        self.assertEqual(tests["test_2"], stored["test_2"])
+        self.assertEqual("No way", stored["test_3"]["reason"])
+
+    def test_verification_tests_add_raise_exc(self):
+        self.assertRaises(exceptions.ResourceNotFound,
+                          db.verification_tests_add, "1234", {})
+
+    def test_verification_tests_get(self):
+        v1 = self._create_verification()
+        v2 = self._create_verification()
+        db.verification_tests_add(
+            v1["uuid"], {"test_1": {"name": "test_1", "status": "success"},
+                         "test_2": {"name": "test_2", "status": "fail"},
+                         "test_3": {"name": "test_3", "status": "skip"}})
+        db.verification_tests_add(
+            v2["uuid"], {"test_1": {"name": "test_1", "status": "fail"}})
+
+        self.assertEqual(["test_2"],
+                         list(db.verification_tests_get(v1["uuid"], "fail")))
+        self.assertEqual(
+            ["test_2", "test_3"],
+            sorted(db.verification_tests_get(v1["uuid"], ["fail", "skip"])))
+        self.assertEqual({"test_1": {"name": "test_1", "status": "fail"}},
+                         db.verification_tests_get(v2["uuid"]))
+
 
 class WorkerTestCase(test.DBTestCase):
     def setUp(self):
@@ -883,6 +1180,11 @@ class WorkerTestCase(test.DBTestCase):
     def test_get_worker_not_found(self):
         self.assertRaises(exceptions.WorkerNotFound, db.get_worker, "notfound")
 
+    def test_list_workers(self):
+        worker = db.register_worker({"hostname": "test2"})
+        self.assertEqual([self.worker["id"], worker["id"]],
+                         [w["id"] for w in db.list_workers()])
+
     def test_unregister_worker(self):
         db.unregister_worker("test")
         self.assertRaises(exceptions.WorkerNotFound, db.get_worker, "test")
@@ -1736,3 +1736,90 @@ class MigrationWalkTestCase(rtest.DBTestCase,
             conn.execute(
                 deployment_table.delete().where(
                     deployment_table.c.uuid == deployment_uuid))
+
+    def _pre_upgrade_7287df262dbc(self, engine):
+        deployment_table = db_utils.get_table(engine, "deployments")
+        verifiers_table = db_utils.get_table(engine, "verifiers")
+        verifications_table = db_utils.get_table(engine, "verifications")
+
+        self._7287df262dbc_deployment_uuid = str(uuid.uuid4())
+        self._7287df262dbc_verifier_uuid = str(uuid.uuid4())
+        self._7287df262dbc_verifications = {
+            str(uuid.uuid4()): {
+                "test_1": {"name": "test_1", "status": "success",
+                           "duration": "1.000", "tags": []},
+                "test_2[id-1,smoke]": {"name": "test_2", "status": "fail",
+                                       "duration": "2.000",
+                                       "tags": ["id-1", "smoke"],
+                                       "traceback": "Oops"}},
+            str(uuid.uuid4()): {}
+        }
+
+        with engine.connect() as conn:
+            conn.execute(
+                deployment_table.insert(),
+                [{
+                    "uuid": self._7287df262dbc_deployment_uuid,
+                    "name": str(uuid.uuid4()),
+                    "config": "{}",
+                    "enum_deployments_status": consts.DeployStatus.DEPLOY_INIT,
+                    "credentials": six.b(json.dumps([])),
+                    "users": six.b(json.dumps([]))
+                }]
+            )
+
+            conn.execute(
+                verifiers_table.insert(),
+                [{"uuid": self._7287df262dbc_verifier_uuid,
+                  "name": str(uuid.uuid4()),
+                  "type": "some-type",
+                  "status": consts.VerifierStatus.INSTALLED
+                  }])
+
+            for v_uuid, tests in self._7287df262dbc_verifications.items():
+                conn.execute(
+                    verifications_table.insert(),
+                    [{"uuid": v_uuid,
+                      "deployment_uuid": self._7287df262dbc_deployment_uuid,
+                      "verifier_uuid": self._7287df262dbc_verifier_uuid,
+                      "status": consts.VerificationStatus.FAILED,
+                      "tests": six.b(json.dumps(tests))
+                      }])
+
+    def _check_7287df262dbc(self, engine, data):
+        deployment_table = db_utils.get_table(engine, "deployments")
+        verifiers_table = db_utils.get_table(engine, "verifiers")
+        verifications_table = db_utils.get_table(engine, "verifications")
+        verification_tests_table = db_utils.get_table(engine,
+                                                      "verification_tests")
+
+        self.assertNotIn("tests", verifications_table.c)
+
+        with engine.connect() as conn:
+            for v_uuid, tests in self._7287df262dbc_verifications.items():
+                stored = conn.execute(
+                    verification_tests_table.select().where(
+                        verification_tests_table.c.verification_uuid ==
+                        v_uuid)).fetchall()
+                self.assertEqual(
+                    tests,
+                    dict((t.test_id, json.loads(t.data)) for t in stored))
+                for t in stored:
+                    self.assertEqual(tests[t.test_id]["status"], t.status)
+
+                conn.execute(
+                    verification_tests_table.delete().where(
+                        verification_tests_table.c.verification_uuid ==
+                        v_uuid))
+                conn.execute(
+                    verifications_table.delete().where(
+                        verifications_table.c.uuid == v_uuid))
+
+            conn.execute(
+                verifiers_table.delete().where(
+                    verifiers_table.c.uuid ==
+                    self._7287df262dbc_verifier_uuid))
+            conn.execute(
+                deployment_table.delete().where(
+                    deployment_table.c.uuid ==
+                    self._7287df262dbc_deployment_uuid))
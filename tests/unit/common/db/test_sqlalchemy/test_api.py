@@ -16,10 +16,18 @@
 #   tests. Hope, it will be fixed someday.
 
 import datetime as dt
+import os
+import shutil
+import tempfile
 
 import ddt
+import mock
+from oslo_config import cfg
+from oslo_db.sqlalchemy import engines
 
 from rally.common.db.sqlalchemy import api as db_api
+from rally.common.db.sqlalchemy import models
+from rally.common import opts
 from tests.unit import test
 
 
@@ -71,3 +79,110 @@ class SerializeTestCase(test.DBTestCase):
             return Fake()
 
         self.assertRaises(ValueError, fake_method)
+
+    def test_serialize_model(self):
+        workload = models.Workload(uuid="w", args={"a": {"b": 1}},
+                                   statistics={"atomics": []})
+        workload.data = [{"duration": 1, "atomic_actions": []}]
+
+        result = db_api.serialize_data(workload)
+
+        self.assertEqual({"a": {"b": 1}}, result["args"])
+        self.assertIs(dict, type(result["args"]))
+        self.assertIs(dict, type(result["statistics"]))
+        # payloads are not copied
+        self.assertIs(workload.args["a"], result["args"]["a"])
+        self.assertIs(workload.statistics["atomics"],
+                      result["statistics"]["atomics"])
+        self.assertIs(workload.data, result["data"])
+
+
+class SQLiteTuningTestCase(test.TestCase):
+
+    def setUp(self):
+        super(SQLiteTuningTestCase, self).setUp()
+        opts.register()
+        cfg.CONF.set_override("tuning", True, "sqlite")
+        self.addCleanup(cfg.CONF.clear_override, "tuning", "sqlite")
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.engine = engines.create_engine(
+            "sqlite:///%s" % os.path.join(tmp_dir, "rally.sqlite"))
+        self.addCleanup(self.engine.dispose)
+
+    def _pragma(self, name):
+        return self.engine.execute("PRAGMA %s" % name).scalar()
+
+    def test__tune_sqlite(self):
+        tuning = db_api._tune_sqlite(self.engine)
+        self.addCleanup(tuning.close)
+
+        self.assertIsNotNone(tuning._keeper)
+        self.assertEqual("wal", self._pragma("journal_mode"))
+        # NORMAL
+        self.assertEqual(1, self._pragma("synchronous"))
+        self.assertEqual(-65536, self._pragma("cache_size"))
+        self.assertEqual(60000, self._pragma("busy_timeout"))
+
+    def test__tune_sqlite_disabled(self):
+        cfg.CONF.clear_override("tuning", "sqlite")
+
+        self.assertIsNone(db_api._tune_sqlite(self.engine))
+        self.assertEqual("delete", self._pragma("journal_mode"))
+
+    def test__tune_sqlite_in_memory(self):
+        engine = engines.create_engine("sqlite://")
+        self.assertIsNone(db_api._tune_sqlite(engine))
+
+    @mock.patch("rally.common.db.sqlalchemy.api.time.time")
+    def test__tune_sqlite_checkpoint(self, mock_time):
+        mock_time.side_effect = [0, 100, 400, 400, 500]
+        cursor = mock.Mock()
+        dbapi_con = mock.Mock(cursor=mock.Mock(return_value=cursor))
+        tuning = db_api._SQLiteTuning()
+
+        for i in range(3):
+            tuning.on_connect(dbapi_con, None)
+
+        self.assertEqual(
+            1, cursor.execute.call_args_list.count(
+                mock.call("PRAGMA wal_checkpoint(TRUNCATE)")))
+        self.assertEqual(3, cursor.close.call_count)
+
+    def test_close_in_forked_process(self):
+        tuning = db_api._SQLiteTuning()
+        keeper = mock.Mock()
+        tuning._keeper = keeper
+        tuning._pid = -1
+
+        tuning.close()
+
+        self.assertIsNone(tuning._keeper)
+        self.assertFalse(keeper.close.called)
+
+    @mock.patch("rally.common.db.sqlalchemy.api._tune_sqlite")
+    @mock.patch("rally.common.db.sqlalchemy.api.db_session.EngineFacade")
+    def test_engine_reset(self, mock_engine_facade, mock__tune_sqlite):
+        facade = mock_engine_facade.from_config.return_value
+        tuning = mock__tune_sqlite.return_value
+        db_api.Connection().engine_reset()
+
+        self.assertEqual(facade, db_api._create_facade_lazily())
+        mock__tune_sqlite.assert_called_once_with(facade.get_engine())
+
+        db_api.Connection().engine_reset()
+
+        tuning.close.assert_called_once_with()
+        facade.get_engine.return_value.dispose.assert_called_once_with()
+        self.assertIsNone(db_api._FACADE)
+        self.assertIsNone(db_api._SQLITE_TUNING)
+
+    def test__tune_sqlite_without_wal(self):
+        cfg.CONF.set_override("journal_mode", "DELETE", "sqlite")
+        self.addCleanup(cfg.CONF.clear_override, "journal_mode", "sqlite")
+
+        tuning = db_api._tune_sqlite(self.engine)
+
+        self.assertIsNone(tuning._keeper)
+        self.assertEqual("delete", self._pragma("journal_mode"))
+        self.assertEqual(1, self._pragma("synchronous"))
@@ -11,9 +11,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import datetime as dt
+import io
 import os
 
 import mock
+from subunit import iso8601
+from subunit import v2
 
 from rally.common.io import subunit_v2
 from tests.unit import test
@@ -61,6 +66,108 @@ RuntimeError: broken setUp method
                           "timestamp": "2015-06-03T08:46:22+0000"},
                          failed_tests[failed_test])
 
+    def test_parse_file_with_on_tests(self):
+        batches = []
+        results = subunit_v2.SubunitV2StreamResult(on_tests=batches.append,
+                                                   batch_size=2)
+        with open(self.fake_stream, "rb") as stream:
+            v2.ByteStreamToStreamResult(stream, "non-subunit").run(results)
+
+        # results are passed by batches while the stream is parsed
+        self.assertGreater(len(batches), 1)
+        for batch in batches:
+            self.assertEqual(2, len(batch))
+
+        batches = []
+        result = subunit_v2.parse_file(self.fake_stream,
+                                       on_tests=batches.append)
+
+        # the rest of results is passed when the stream ends
+        passed = {}
+        for batch in batches:
+            passed.update(batch)
+        self.assertEqual(result.tests, passed)
+        for t in passed.values():
+            self.assertNotIsInstance(t.get("traceback", ""), bytes)
+
+    @staticmethod
+    def _make_stream(tests, start):
+        stream = io.BytesIO()
+        output = v2.StreamResultToBytes(stream)
+        moment = dt.datetime(2017, 1, 1, tzinfo=iso8601.UTC) + dt.timedelta(
+            seconds=start)
+        for test_id, status in tests:
+            output.status(test_id=test_id, test_status="exists",
+                          timestamp=moment)
+            output.status(test_id=test_id, test_status="inprogress",
+                          timestamp=moment)
+            moment += dt.timedelta(seconds=1)
+            output.status(test_id=test_id, test_status=status,
+                          timestamp=moment)
+        stream.seek(0)
+        return stream
+
+    def test_parse_streams(self):
+        streams = [
+            self._make_stream([("t.A.test_1", "success"),
+                               ("t.A.test_2", "fail")], start=0),
+            self._make_stream([("t.B.test_1", "success"),
+                               ("t.B.test_2", "skip"),
+                               ("t.B.test_3", "success")], start=1),
+            io.BytesIO()]
+        batches = []
+
+        result = subunit_v2.parse_streams(
+            streams, expected_failures={"t.A.test_2": "bug"},
+            on_tests=batches.append)
+
+        self.assertEqual({"tests_count": 5, "tests_duration": "4.000",
+                          "failures": 0, "skipped": 1, "success": 3,
+                          "unexpected_success": 0, "expected_failures": 1},
+                         result.totals)
+        self.assertEqual(["t.A.test_1", "t.A.test_2", "t.B.test_1",
+                          "t.B.test_2", "t.B.test_3"], sorted(result.tests))
+        self.assertEqual("xfail", result.tests["t.A.test_2"]["status"])
+        passed = {}
+        for batch in batches:
+            passed.update(batch)
+        self.assertEqual(result.tests, passed)
+
+    def test__stream_events(self):
+        events = mock.Mock()
+        stream_events = subunit_v2._StreamEvents(events, 2)
+
+        stream_events.status(test_id="t", test_status="exists")
+        stream_events.status(test_id="t", test_tags=set(["worker-0"]))
+
+        self.assertEqual(
+            [mock.call({"test_id": "t", "test_status": "exists",
+                        "test_tags": set(["worker-2"])}),
+             mock.call({"test_id": "t", "test_tags": set(["worker-0"])})],
+            events.put.call_args_list)
+
+    def test_on_tests_passes_changed_tests_again(self):
+        batches = []
+        results = subunit_v2.SubunitV2StreamResult(on_tests=batches.append,
+                                                   batch_size=1)
+        results._tests = {"SkippedTestCase.test_1": {"status": "success"},
+                          "SkippedTestCase.test_2": {"status": "init"}}
+        results._test_finished("SkippedTestCase.test_1")
+        self.assertEqual(
+            [{"SkippedTestCase.test_1": {"status": "success"}}], batches)
+
+        results._unknown_entities = {"SkippedTestCase": {"status": "skip",
+                                                         "reason": ":("}}
+        results._parse()
+        self.assertEqual(3, len(batches))
+        passed = {}
+        for batch in batches[1:]:
+            passed.update(batch)
+        self.assertEqual(
+            {"SkippedTestCase.test_1": {"status": "success", "reason": ":("},
+             "SkippedTestCase.test_2": {"status": "skip", "reason": ":("}},
+            passed)
+
     def test_filter_results(self):
         results = subunit_v2.SubunitV2StreamResult()
         results._tests = {
@@ -94,6 +201,63 @@ RuntimeError: broken setUp method
 
         self.assertTrue(results._is_parsed)
 
+    def test__is_parsed_with_nested_entities(self):
+        results = subunit_v2.SubunitV2StreamResult()
+        results._tests = {
+            "tests.module.TestCase.test_1": {"status": "init"},
+            "tests.module.TestCase.test_2": {"status": "success"},
+            "tests.module.TestCaseFoo.test_1": {"status": "init"},
+            "tests.module_2.TestCase.test_1": {"status": "init"}}
+        results._unknown_entities = collections.OrderedDict([
+            ("tests.module", {"status": "fail", "traceback": "Oops"}),
+            ("tests.module.TestCase", {"status": "skip", "reason": ":("})])
+
+        self.assertEqual(
+            {"tests.module.TestCase.test_1": {"status": "fail",
+                                              "traceback": "Oops",
+                                              "reason": ":("},
+             "tests.module.TestCase.test_2": {"status": "success",
+                                              "traceback": "Oops",
+                                              "reason": ":("},
+             "tests.module.TestCaseFoo.test_1": {"status": "fail",
+                                                 "traceback": "Oops"},
+             "tests.module_2.TestCase.test_1": {"status": "init"}},
+            results.tests)
+
+    def test__get_prefixes(self):
+        self.assertEqual(["a", "a.b", "a.b.c[x,y]"],
+                         list(subunit_v2._get_prefixes("a.b.c[x,y]")))
+        self.assertEqual(["a"], list(subunit_v2._get_prefixes("a")))
+
+    def test_attachments_are_joined(self):
+        results = subunit_v2.SubunitV2StreamResult()
+        results.status(test_id="test_1", test_status="exists")
+        results.status(test_id="test_1", test_status="inprogress",
+                       timestamp=dt.datetime(2017, 1, 1))
+        for chunk in (b"Trace", b"back"):
+            results.status(test_id="test_1", file_name="traceback",
+                           file_bytes=chunk)
+            results.status(test_id="class_1", file_name="reason",
+                           file_bytes=chunk)
+        results.status(test_id="test_1", test_status="fail",
+                       timestamp=dt.datetime(2017, 1, 1))
+
+        self.assertEqual("Traceback", results.tests["test_1"]["traceback"])
+        self.assertEqual(b"Traceback",
+                         results._unknown_entities["class_1"]["reason"])
+        self.assertEqual({}, results._attachments)
+
+    def test_skipped_tests_are_not_changed(self):
+        skipped_tests = {"test_1": "No way", "test_2": None}
+        results = subunit_v2.SubunitV2StreamResult(
+            skipped_tests=skipped_tests)
+        results.status(test_id="test_3", test_status="exists")
+
+        self.assertEqual({"test_1": "No way", "test_2": None}, skipped_tests)
+        self.assertEqual(["test_1", "test_2", "test_3"],
+                         sorted(results.tests))
+        self.assertEqual("No way", results.tests["test_1"]["reason"])
+
     def test_prepare_input_args(self):
         some_mock = mock.MagicMock()
 
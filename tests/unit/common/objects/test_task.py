@@ -64,7 +64,7 @@ class TaskTestCase(test.TestCase):
         mock_task_get.return_value = self.task
         task = objects.Task.get(self.task["uuid"])
         mock_task_get.assert_called_once_with(self.task["uuid"],
-                                              detailed=False)
+                                              detailed=False, load_data=True)
         self.assertEqual(task["uuid"], self.task["uuid"])
 
     @mock.patch("rally.common.objects.task.db.task_get_status")
@@ -196,9 +196,47 @@ class TaskTestCase(test.TestCase):
             "created_at": dt.datetime.now(),
             "updated_at": dt.datetime.now()}]}
         task_detailed = objects.Task.get("task_id", detailed=True)
-        mock_task_get.assert_called_once_with("task_id", detailed=True)
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=True)
         self.assertEqual(mock_task_get.return_value, task_detailed.task)
 
+    @mock.patch("rally.common.objects.task.db.workload_data_iter")
+    @mock.patch("rally.common.db.api.task_get")
+    def test_get_detailed_lazy_data(self, mock_task_get,
+                                    mock_workload_data_iter):
+        mock_task_get.return_value = {
+            "subtasks": [{"workloads": [{"uuid": "w1"}, {"uuid": "w2"}]}]}
+        mock_workload_data_iter.side_effect = lambda uuid: iter([uuid] * 2)
+
+        task = objects.Task.get("task_id", detailed=True, data="lazy")
+
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=False)
+        self.assertFalse(mock_workload_data_iter.called)
+        w1, w2 = task["subtasks"][0]["workloads"]
+        self.assertEqual(["w1", "w1"], list(w1["data"]))
+        # data can be iterated over several times
+        self.assertEqual(["w1", "w1"], list(w1["data"]))
+        self.assertEqual(["w2", "w2"], list(w2["data"]))
+
+    @mock.patch("rally.common.db.api.task_get")
+    def test_get_detailed_without_data(self, mock_task_get):
+        mock_task_get.return_value = {
+            "subtasks": [{"workloads": [{"uuid": "w1"}]}]}
+
+        task = objects.Task.get("task_id", detailed=True, data=None)
+
+        mock_task_get.assert_called_once_with("task_id", detailed=True,
+                                              load_data=False)
+        self.assertNotIn("data", task["subtasks"][0]["workloads"][0])
+
+    @mock.patch("rally.common.db.api.task_get")
+    def test_get_with_wrong_data(self, mock_task_get):
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          objects.Task.get, "task_id", detailed=True,
+                          data="partial")
+        self.assertFalse(mock_task_get.called)
+
     @mock.patch("rally.common.objects.task.db.task_update")
     def test_set_failed(self, mock_task_update):
         mock_task_update.return_value = self.task
@@ -374,6 +412,30 @@ class WorkloadTestCase(test.TestCase):
             self.workload["task_uuid"], self.workload["uuid"],
             0, {"data": "foo"})
 
+    @mock.patch("rally.common.objects.task.db.workload_data_create_many")
+    @mock.patch("rally.common.objects.task.db.workload_create")
+    def test_add_workload_data_chunks(self, mock_workload_create,
+                                      mock_workload_data_create_many):
+        mock_workload_create.return_value = self.workload
+        workload = objects.Workload("uuid1", "uuid2", name="w",
+                                    description="descr", position=0,
+                                    runner={"type": "foo"}, context=None,
+                                    sla=None, args=None, hooks=[])
+
+        workload.add_workload_data_chunks([(0, {"raw": []})])
+        mock_workload_data_create_many.assert_called_once_with(
+            self.workload["task_uuid"], self.workload["uuid"],
+            [(0, {"raw": []})])
+
+    @mock.patch("rally.common.objects.task.db.workload_data_compact")
+    def test_compact_workload_data(self, mock_workload_data_compact):
+        self.assertEqual(
+            mock_workload_data_compact.return_value,
+            objects.Workload.compact_workload_data("uuid", {"raw": []},
+                                                   archive="/foo"))
+        mock_workload_data_compact.assert_called_once_with(
+            "uuid", {"raw": []}, archive="/foo")
+
     @mock.patch("rally.common.objects.task.db.workload_set_results")
     @mock.patch("rally.common.objects.task.db.workload_create")
     def test_set_results(self, mock_workload_create,
@@ -405,7 +467,8 @@ class WorkloadTestCase(test.TestCase):
             task_uuid=self.workload["task_uuid"],
             load_duration=load_duration, full_duration=full_duration,
             start_time=start_time, sla_results=sla_results,
-            hooks_results=None)
+            hooks_results=None, context_execution=None,
+            runner_statistics=None)
 
     def test_format_workload_config(self):
         workload = {
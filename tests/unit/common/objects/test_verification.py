@@ -36,7 +36,10 @@ class VerificationTestCase(test.TestCase):
         self.assertEqual(self.db_obj["uuid"], v.uuid)
         self.assertEqual(self.db_obj["uuid"], v["uuid"])
 
-    def test_to_dict(self):
+    @mock.patch("rally.common.objects.verification.db.verification_tests_get")
+    def test_to_dict(self, mock_verification_tests_get):
+        mock_verification_tests_get.return_value = {"test1": "tdata1",
+                                                    "test2": "tdata2"}
         TIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
         data = {"created_at": dt.date(2017, 2, 3),
                 "updated_at": dt.date(2017, 3, 3),
@@ -46,8 +49,6 @@ class VerificationTestCase(test.TestCase):
                 "verifier_uuid": "v_uuid",
                 "unexpected_success": "2",
                 "status": "False",
-                "tests": {"test1": "tdata1",
-                          "test2": "tdata2"},
                 "skipped": 2,
                 "tests_duration": "",
                 "tags": None,
@@ -58,10 +59,42 @@ class VerificationTestCase(test.TestCase):
                 "failures": 2}
         verification = objects.Verification("verification_id")
         verification._db_entry = data
+        result = objects.Verification.to_dict(verification,
+                                              include_tests=False)
+        expected = dict(data)
+        expected["created_at"] = data["created_at"].strftime(TIME_FORMAT)
+        expected["updated_at"] = data["updated_at"].strftime(TIME_FORMAT)
+        self.assertEqual(expected, result)
+        self.assertFalse(mock_verification_tests_get.called)
+
         result = objects.Verification.to_dict(verification)
-        data["created_at"] = data["created_at"].strftime(TIME_FORMAT)
-        data["updated_at"] = data["updated_at"].strftime(TIME_FORMAT)
-        self.assertEqual(data, result)
+        expected["tests"] = mock_verification_tests_get.return_value
+        self.assertEqual(expected, result)
+        mock_verification_tests_get.assert_called_once_with("v_uuid", None)
+
+    @mock.patch("rally.common.objects.verification.db.verification_tests_get")
+    def test_get_tests(self, mock_verification_tests_get):
+        v = objects.Verification(self.db_obj)
+        self.assertEqual(mock_verification_tests_get.return_value, v.tests)
+        self.assertEqual(mock_verification_tests_get.return_value,
+                         v["tests"])
+        self.assertEqual(mock_verification_tests_get.return_value,
+                         v.get_tests(status="fail"))
+        self.assertEqual(
+            [mock.call(self.db_obj["uuid"], None),
+             mock.call(self.db_obj["uuid"], None),
+             mock.call(self.db_obj["uuid"], "fail")],
+            mock_verification_tests_get.call_args_list)
+
+    @mock.patch("rally.common.objects.verification.db.verification_tests_add")
+    def test_add_tests(self, mock_verification_tests_add):
+        v = objects.Verification(self.db_obj)
+        tests = {"foo_test": {"name": "foo_test", "status": "success"}}
+        v.add_tests(tests)
+        mock_verification_tests_add.assert_called_once_with(
+            self.db_obj["uuid"], tests)
+        self.assertEqual(mock_verification_tests_add.return_value,
+                         v._db_entry)
 
     @mock.patch("rally.common.objects.verification.db.verification_create")
     def test_create(self, mock_verification_create):
@@ -95,8 +128,11 @@ class VerificationTestCase(test.TestCase):
         mock_verification_update.assert_called_once_with(self.db_obj["uuid"],
                                                          status="some-status")
 
+    @mock.patch("rally.common.objects.verification.db.verification_tests_add")
     @mock.patch("rally.common.objects.verification.db.verification_update")
-    def test_finish(self, mock_verification_update):
+    def test_finish(self, mock_verification_update,
+                    mock_verification_tests_add):
+        mock_verification_tests_add.return_value = self.db_obj
         v = objects.Verification(self.db_obj)
         totals = {
             "tests_count": 2,
@@ -122,25 +158,46 @@ class VerificationTestCase(test.TestCase):
             }
         }
         v.finish(totals, tests)
+        mock_verification_tests_add.assert_called_once_with(
+            self.db_obj["uuid"], tests)
         mock_verification_update.assert_called_once_with(
             self.db_obj["uuid"], status=consts.VerificationStatus.FINISHED,
-            tests=tests, **totals)
+            **totals)
 
         v = objects.Verification(self.db_obj)
         totals.update(failures=1)
         mock_verification_update.reset_mock()
-        v.finish(totals, tests)
+        v.finish(totals)
         mock_verification_update.assert_called_once_with(
             self.db_obj["uuid"], status=consts.VerificationStatus.FAILED,
-            tests=tests, **totals)
+            **totals)
 
         v = objects.Verification(self.db_obj)
         totals.update(failures=0, unexpected_success=1)
         mock_verification_update.reset_mock()
-        v.finish(totals, tests)
+        v.finish(totals)
         mock_verification_update.assert_called_once_with(
             self.db_obj["uuid"], status=consts.VerificationStatus.FAILED,
-            tests=tests, **totals)
+            **totals)
+
+    @mock.patch("rally.common.objects.verification.db.verification_tests_add")
+    @mock.patch("rally.common.objects.verification.db.verification_update")
+    def test_finish_with_stored_tests(self, mock_verification_update,
+                                      mock_verification_tests_add):
+        mock_verification_tests_add.return_value = self.db_obj
+        v = objects.Verification(self.db_obj)
+        tests = {"foo_test": {"name": "foo_test", "status": "success"},
+                 "bar_test": {"name": "bar_test", "status": "success"}}
+        v.add_tests({"foo_test": tests["foo_test"]})
+        mock_verification_tests_add.reset_mock()
+
+        v.finish({"tests_count": 2, "success": 2}, tests)
+        mock_verification_tests_add.assert_called_once_with(
+            self.db_obj["uuid"], {"bar_test": tests["bar_test"]})
+
+        mock_verification_tests_add.reset_mock()
+        v.finish({"tests_count": 2, "success": 2}, tests)
+        self.assertFalse(mock_verification_tests_add.called)
 
     @mock.patch("rally.common.objects.verification.db.verification_update")
     def test_set_error(self, mock_verification_update):
@@ -0,0 +1,66 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime as dt
+
+import mock
+
+from rally.common import objects
+from tests.unit import test
+
+
+class WorkerTestCase(test.TestCase):
+
+    @mock.patch("rally.common.objects.worker.db.register_worker")
+    def test_init(self, mock_register_worker):
+        worker = objects.Worker({"hostname": "host:1"})
+        self.assertFalse(mock_register_worker.called)
+        self.assertEqual("host:1", worker["hostname"])
+
+        worker = objects.Worker(hostname="host:2")
+        mock_register_worker.assert_called_once_with({"hostname": "host:2"})
+        self.assertEqual(mock_register_worker.return_value, worker.worker)
+
+    @mock.patch("rally.common.objects.worker.db.get_worker")
+    def test_get(self, mock_get_worker):
+        mock_get_worker.return_value = {"hostname": "host:1"}
+        self.assertEqual("host:1", objects.Worker.get("host:1")["hostname"])
+        mock_get_worker.assert_called_once_with("host:1")
+
+    @mock.patch("rally.common.objects.worker.timeutils.utcnow")
+    @mock.patch("rally.common.objects.worker.db.list_workers")
+    def test_list(self, mock_list_workers, mock_utcnow):
+        now = dt.datetime(2017, 1, 1, 12, 0, 0)
+        mock_utcnow.return_value = now
+        mock_list_workers.return_value = [
+            {"hostname": "alive", "updated_at": now - dt.timedelta(
+                seconds=10)},
+            {"hostname": "dead", "updated_at": now - dt.timedelta(
+                seconds=60)}]
+
+        self.assertEqual(["alive", "dead"],
+                         [w["hostname"] for w in objects.Worker.list()])
+        self.assertEqual(
+            ["alive"],
+            [w["hostname"] for w in objects.Worker.list(alive_within=30)])
+
+    @mock.patch("rally.common.objects.worker.db.update_worker")
+    def test_update(self, mock_update_worker):
+        objects.Worker({"hostname": "host:1"}).update()
+        mock_update_worker.assert_called_once_with("host:1")
+
+    @mock.patch("rally.common.objects.worker.db.unregister_worker")
+    def test_delete(self, mock_unregister_worker):
+        objects.Worker({"hostname": "host:1"}).delete()
+        mock_unregister_worker.assert_called_once_with("host:1")
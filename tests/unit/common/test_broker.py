@@ -13,7 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import collections
+import threading
 
 import mock
 
@@ -23,23 +23,46 @@ from tests.unit import test
 
 class BrokerTestCase(test.TestCase):
 
+    def _make_queue(self, items=(), stop=1):
+        queue = broker._Queue()
+        for item in items:
+            queue.append(item)
+        for i in range(stop):
+            queue.put(broker._STOP)
+        return queue
+
+    def test__queue(self):
+        queue = broker._Queue(2)
+        queue.append(1)
+        queue.put(2)
+        self.assertTrue(queue.full())
+        self.assertEqual(2, queue.published)
+        self.assertRaises(broker.moves.queue.Full, queue.put, 3, block=False)
+
+        self.assertEqual(1, queue.get())
+        queue.put(broker._STOP)
+        self.assertEqual(2, queue.published)
+
     def test__publisher(self):
         mock_publish = mock.MagicMock()
-        queue = collections.deque()
+        queue = broker._Queue()
         broker._publisher(mock_publish, queue)
         mock_publish.assert_called_once_with(queue)
 
     def test__publisher_fails(self):
         mock_publish = mock.MagicMock(side_effect=Exception())
-        queue = collections.deque()
+        queue = broker._Queue()
         broker._publisher(mock_publish, queue)
 
     def test__consumer(self):
-        queue = collections.deque([1, 2, 3])
+        queue = self._make_queue([1, 2, 3])
         mock_consume = mock.MagicMock()
-        broker._consumer(mock_consume, queue)
+        stats = broker._Stats()
+        broker._consumer(mock_consume, queue, stats)
         self.assertEqual(3, mock_consume.call_count)
-        self.assertEqual(0, len(queue))
+        self.assertTrue(queue.empty())
+        self.assertEqual(3, stats.consumed)
+        self.assertEqual(0, stats.failed)
 
     def test__consumer_cache(self):
         cache_keys_history = []
@@ -48,27 +71,45 @@ class BrokerTestCase(test.TestCase):
             cache[item] = True
             cache_keys_history.append(list(cache))
 
-        queue = collections.deque([1, 2, 3])
+        queue = self._make_queue([1, 2, 3])
         broker._consumer(consume, queue)
         self.assertEqual([[1], [1, 2], [1, 2, 3]], cache_keys_history)
 
     def test__consumer_fails(self):
-        queue = collections.deque([1, 2, 3])
+        queue = self._make_queue([1, 2, 3])
         mock_consume = mock.MagicMock(side_effect=Exception())
-        broker._consumer(mock_consume, queue)
-        self.assertEqual(0, len(queue))
+        stats = broker._Stats()
+        broker._consumer(mock_consume, queue, stats)
+        self.assertTrue(queue.empty())
+        self.assertEqual(3, stats.consumed)
+        self.assertEqual(3, stats.failed)
 
     @mock.patch("rally.common.broker.LOG")
     def test__consumer_indexerror(self, mock_log):
         consume = mock.Mock()
         consume.side_effect = IndexError()
-        queue = collections.deque([1, 2, 3])
+        queue = self._make_queue([1, 2, 3])
         broker._consumer(consume, queue)
         self.assertTrue(mock_log.warning.called)
-        self.assertFalse(queue)
+        self.assertTrue(queue.empty())
         expected = [mock.call({}, 1), mock.call({}, 2), mock.call({}, 3)]
         self.assertEqual(expected, consume.mock_calls)
 
+    def test__consumer_stops_on_sentinel_only(self):
+        queue = broker._Queue()
+        consumed = []
+        consumer = threading.Thread(
+            target=broker._consumer,
+            args=(lambda cache, item: consumed.append(item), queue))
+        consumer.start()
+
+        # the consumer waits for new jobs while the queue is empty
+        queue.append(1)
+        queue.append(2)
+        queue.put(broker._STOP)
+        consumer.join()
+        self.assertEqual([1, 2], consumed)
+
     def test_run(self):
 
         def publish(queue):
@@ -82,5 +123,61 @@ class BrokerTestCase(test.TestCase):
             consumed.add(item)
 
         consumer_count = 2
-        broker.run(publish, consume, consumer_count)
+        stats = broker.run(publish, consume, consumer_count)
         self.assertEqual(set([1, 2, 3]), consumed)
+        self.assertEqual(3, stats["published"])
+        self.assertEqual(3, stats["consumed"])
+        self.assertEqual(0, stats["failed"])
+        self.assertIn("duration", stats)
+        self.assertIn("throughput", stats)
+        self.assertIn("avg_consume_duration", stats)
+
+    def test_run_consumers_start_before_publishing_finishes(self):
+        consumed = threading.Event()
+
+        def publish(queue):
+            queue.append(1)
+            # the job should be consumed while the publisher still works
+            self.assertTrue(consumed.wait(5))
+
+        def consume(cache, item):
+            consumed.set()
+
+        stats = broker.run(publish, consume)
+        self.assertEqual(1, stats["consumed"])
+        self.assertEqual(0, stats["failed"])
+
+    def test_run_with_bounded_queue(self):
+        max_size = []
+
+        def publish(queue):
+            for i in range(50):
+                queue.append(i)
+                max_size.append(queue.qsize())
+
+        consumed = []
+
+        def consume(cache, item):
+            consumed.append(item)
+
+        stats = broker.run(publish, consume, consumers_count=2, queue_size=3)
+        self.assertEqual(list(range(50)), sorted(consumed))
+        self.assertLessEqual(max(max_size), 3)
+        self.assertEqual(50, stats["published"])
+        self.assertEqual(50, stats["consumed"])
+
+    def test_run_with_failures(self):
+
+        def publish(queue):
+            for i in range(4):
+                queue.append(i)
+            raise Exception("Oops")
+
+        def consume(cache, item):
+            if item % 2:
+                raise Exception("Oops")
+
+        stats = broker.run(publish, consume, consumers_count=3)
+        self.assertEqual(4, stats["published"])
+        self.assertEqual(4, stats["consumed"])
+        self.assertEqual(2, stats["failed"])
@@ -15,9 +15,11 @@
 
 import os
 import socket
+import threading
 
 import ddt
 import mock
+import paramiko
 
 from rally.common import sshutils
 from rally import exceptions
@@ -135,23 +137,128 @@ class SSHTestCase(test.TestCase):
         self.assertEqual("stdout fake data", stdout)
         self.assertEqual("stderr fake data", stderr)
 
+    @mock.patch("rally.common.sshutils.socket.create_connection")
+    def test__is_port_open(self, mock_create_connection):
+        self.assertTrue(self.ssh._is_port_open(3))
+        mock_create_connection.assert_called_once_with(("example.net", 22),
+                                                       timeout=3)
+        mock_create_connection.return_value.close.assert_called_once_with()
+
+        mock_create_connection.side_effect = socket.error
+        self.assertFalse(self.ssh._is_port_open(3))
+
     @mock.patch("rally.common.sshutils.time")
     def test_wait_timeout(self, mock_time):
         mock_time.time.side_effect = [1, 50, 150]
-        self.ssh.execute = mock.Mock(side_effect=[exceptions.SSHError,
-                                                  exceptions.SSHError,
-                                                  0])
+        self.ssh._is_port_open = mock.Mock(side_effect=[False, True])
+        self.ssh._get_client = mock.Mock(side_effect=exceptions.SSHError)
         self.assertRaises(exceptions.SSHTimeout, self.ssh.wait)
-        self.assertEqual([mock.call("uname")] * 2, self.ssh.execute.mock_calls)
+        self.assertEqual([mock.call(1)] * 2,
+                         self.ssh._is_port_open.mock_calls)
+        self.ssh._get_client.assert_called_once_with()
+        mock_time.sleep.assert_called_once_with(1)
 
     @mock.patch("rally.common.sshutils.time")
     def test_wait(self, mock_time):
         mock_time.time.side_effect = [1, 50, 100]
-        self.ssh.execute = mock.Mock(side_effect=[exceptions.SSHError,
-                                                  exceptions.SSHError,
-                                                  0])
-        self.ssh.wait()
-        self.assertEqual([mock.call("uname")] * 3, self.ssh.execute.mock_calls)
+        self.ssh._is_port_open = mock.Mock(side_effect=[False, True, True])
+        self.ssh._get_client = mock.Mock(side_effect=[exceptions.SSHError,
+                                                      "client"])
+        self.assertIsNone(self.ssh.wait(interval=2))
+        self.assertEqual([mock.call(2)] * 3,
+                         self.ssh._is_port_open.mock_calls)
+        self.assertEqual(2, self.ssh._get_client.call_count)
+        self.assertEqual([mock.call(2)] * 2, mock_time.sleep.mock_calls)
+
+
+class ClientPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ClientPoolTestCase, self).setUp()
+        self.pool = sshutils._ClientPool()
+
+    def test_acquire_and_release(self):
+        client = mock.Mock()
+        connect = mock.Mock(return_value=client)
+
+        self.assertEqual(client, self.pool.acquire("key", connect))
+        self.assertEqual(client, self.pool.acquire("key", connect))
+        connect.assert_called_once_with()
+
+        self.pool.release("key", client)
+        self.assertFalse(client.close.called)
+        self.pool.release("key", client)
+        client.close.assert_called_once_with()
+
+        self.assertEqual(client, self.pool.acquire("key", connect))
+        self.assertEqual(2, connect.call_count)
+
+    def test_acquire_reconnects_inactive(self):
+        clients = [mock.Mock(), mock.Mock()]
+        clients[0].get_transport.return_value.is_active.return_value = False
+        connect = mock.Mock(side_effect=clients)
+
+        self.assertEqual(clients[0], self.pool.acquire("key", connect))
+        self.assertEqual(clients[1], self.pool.acquire("key", connect))
+        self.assertEqual(clients[1], self.pool.acquire("key", connect))
+        self.assertEqual(2, connect.call_count)
+
+    def test_acquire_different_keys(self):
+        clients = [mock.Mock(), mock.Mock()]
+        connect = mock.Mock(side_effect=clients)
+        self.assertEqual(clients[0], self.pool.acquire("key1", connect))
+        self.assertEqual(clients[1], self.pool.acquire("key2", connect))
+
+    def test_release_unknown(self):
+        client = mock.Mock()
+        self.pool.release("key", client)
+        client.close.assert_called_once_with()
+
+    @mock.patch("rally.common.sshutils._POOL",
+                new_callable=sshutils._ClientPool)
+    @mock.patch("rally.common.sshutils.paramiko")
+    def test_ssh_objects_share_client(self, mock_paramiko, mock__pool):
+        ssh1 = sshutils.SSH("admin", "example.net", password="secret")
+        ssh2 = sshutils.SSH("admin", "example.net", password="secret")
+        ssh3 = sshutils.SSH("admin", "example.net", password="other")
+
+        self.assertIs(ssh1._get_client(), ssh2._get_client())
+        ssh3._get_client()
+        self.assertEqual(2, mock_paramiko.SSHClient.call_count)
+
+        client = ssh1._client
+        ssh1.close()
+        self.assertFalse(client.close.called)
+        ssh2.close()
+        client.close.assert_called_once_with()
+
+    @mock.patch("rally.common.sshutils._POOL",
+                new_callable=sshutils._ClientPool)
+    @mock.patch("rally.common.sshutils.paramiko")
+    def test_ssh_object_shared_by_threads(self, mock_paramiko, mock__pool):
+        connecting = threading.Event()
+        connected = threading.Event()
+
+        def connect(*args, **kwargs):
+            connecting.set()
+            self.assertTrue(connected.wait(5))
+
+        client = mock_paramiko.SSHClient.return_value
+        client.connect.side_effect = connect
+        ssh = sshutils.SSH("admin", "example.net", password="secret")
+
+        threads = [threading.Thread(target=ssh._get_client)
+                   for i in range(2)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(connecting.wait(5))
+        connected.set()
+        for thread in threads:
+            thread.join(5)
+        ssh.close()
+
+        client.close.assert_called_once_with()
+        self.assertEqual({}, mock__pool._clients)
 
 
 @ddt.ddt
@@ -184,7 +291,7 @@ class SSHRunTestCase(test.TestCase):
     def test_execute(self, mock_select):
         mock_select.select.return_value = ([], [], [])
         self.fake_session.recv_ready.side_effect = [1, 0, 0]
-        self.fake_session.recv_stderr_ready.side_effect = [1, 0]
+        self.fake_session.recv_stderr_ready.side_effect = [1, 0, 0]
         self.fake_session.recv.return_value = b"ok"
         self.fake_session.recv_stderr.return_value = b"error"
         self.fake_session.exit_status_ready.return_value = 1
@@ -192,11 +299,18 @@ class SSHRunTestCase(test.TestCase):
         self.assertEqual((127, "ok", "error"), self.ssh.execute("cmd"))
         self.fake_session.exec_command.assert_called_once_with("cmd")
 
+    @mock.patch("rally.common.sshutils.select")
+    def test_execute_output_after_exit_status(self, mock_select):
+        mock_select.select.return_value = ([], [], [])
+        self.fake_session.recv_ready.side_effect = [0, 1, 0]
+        self.fake_session.recv.return_value = b"late"
+        self.assertEqual((0, "late", ""), self.ssh.execute("cmd"))
+
     @mock.patch("rally.common.sshutils.select")
     def test_execute_args(self, mock_select):
         mock_select.select.return_value = ([], [], [])
         self.fake_session.recv_ready.side_effect = [1, 0, 0]
-        self.fake_session.recv_stderr_ready.side_effect = [1, 0]
+        self.fake_session.recv_stderr_ready.side_effect = [1, 0, 0]
         self.fake_session.recv.return_value = b"ok"
         self.fake_session.recv_stderr.return_value = b"error"
         self.fake_session.exit_status_ready.return_value = 1
@@ -222,7 +336,7 @@ class SSHRunTestCase(test.TestCase):
     @mock.patch("rally.common.sshutils.select")
     def test_run_stdout(self, mock_select):
         mock_select.select.return_value = ([], [], [])
-        self.fake_session.recv_ready.side_effect = [True, True, False]
+        self.fake_session.recv_ready.side_effect = [True, True, False, False]
         self.fake_session.recv.side_effect = [b"ok1", b"ok2"]
         stdout = mock.Mock()
         self.ssh.run("cmd", stdout=stdout)
@@ -232,7 +346,7 @@ class SSHRunTestCase(test.TestCase):
     @mock.patch("rally.common.sshutils.select")
     def test_run_stderr(self, mock_select):
         mock_select.select.return_value = ([], [], [])
-        self.fake_session.recv_stderr_ready.side_effect = [True, False]
+        self.fake_session.recv_stderr_ready.side_effect = [True, False, False]
         self.fake_session.recv_stderr.return_value = b"error"
         stderr = mock.Mock()
         self.ssh.run("cmd", stderr=stderr)
@@ -316,3 +430,202 @@ class SSHRunTestCase(test.TestCase):
         self.ssh.put_file("foo", "bar", 42)
         self.ssh._put_file_sftp.assert_called_once_with("foo", "bar", mode=42)
         self.ssh._put_file_shell.assert_called_once_with("foo", "bar", mode=42)
+
+
+class ExecuteOnHostsTestCase(test.TestCase):
+
+    def _ssh(self, host, result=None, exc=None):
+        ssh = mock.Mock(host=host, port=22)
+        ssh.execute.return_value = result
+        ssh.execute.side_effect = exc
+        return ssh
+
+    @mock.patch("rally.common.sshutils.time.time")
+    def test_execute_on_hosts(self, mock_time):
+        mock_time.side_effect = [1, 3, 1, 3, 1, 3]
+        ssh_objects = [self._ssh("h1", (0, "out1", "")),
+                       self._ssh("h2", (1, "", "err2")),
+                       self._ssh("h3", exc=exceptions.SSHTimeout("slow"))]
+
+        results = sshutils.execute_on_hosts(ssh_objects, "cmd", stdin="in",
+                                            timeout=5, concurrency=1)
+
+        self.assertEqual(
+            [{"host": "h1", "port": 22, "status": 0, "stdout": "out1",
+              "stderr": "", "error": None, "started_at": 1, "duration": 2},
+             {"host": "h2", "port": 22, "status": 1, "stdout": "",
+              "stderr": "err2", "error": None, "started_at": 1,
+              "duration": 2},
+             {"host": "h3", "port": 22, "status": None, "stdout": "",
+              "stderr": "", "error": "SSHTimeout: slow", "started_at": 1,
+              "duration": 2}],
+            list(results))
+        for ssh in ssh_objects:
+            ssh.execute.assert_called_once_with("cmd", stdin="in",
+                                                timeout=5)
+
+    def test_execute_on_hosts_is_concurrent(self):
+        started = threading.Semaphore(0)
+        finish = threading.Event()
+
+        def execute(*args, **kwargs):
+            started.release()
+            finish.wait()
+            return 0, "", ""
+
+        ssh_objects = [self._ssh("h%d" % i) for i in range(6)]
+        for ssh in ssh_objects:
+            ssh.execute.side_effect = execute
+
+        collected = []
+        consumer = threading.Thread(target=lambda: collected.extend(
+            sshutils.execute_on_hosts(ssh_objects, "cmd", concurrency=3)))
+        consumer.start()
+        for i in range(3):
+            self.assertTrue(started.acquire(timeout=5))
+        # no more than 3 commands are executed at once
+        self.assertFalse(started.acquire(timeout=0.1))
+        finish.set()
+        consumer.join()
+        self.assertEqual(6, len(collected))
+
+    def test_execute_on_no_hosts(self):
+        self.assertEqual([], list(sshutils.execute_on_hosts([], "cmd")))
+
+
+class _LocalSSHServer(paramiko.ServerInterface):
+    """SSH server stand-in printing the command multiplied 10000 times."""
+
+    def __init__(self, key):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(10)
+        self.port = self.sock.getsockname()[1]
+        self.key = key
+        self.transports = []
+        self.thread = threading.Thread(target=self._accept)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except socket.error:
+                return
+            threading.Thread(target=self._start_transport,
+                             args=(conn,)).start()
+
+    def _start_transport(self, conn):
+        transport = paramiko.Transport(conn)
+        transport.add_server_key(self.key)
+        try:
+            transport.start_server(server=self)
+        except (paramiko.SSHException, EOFError):
+            # TCP probes close connections without SSH handshakes
+            return
+        self.transports.append(transport)
+
+    def stop(self):
+        self.sock.close()
+        for transport in self.transports:
+            transport.close()
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if password == "secret":
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        def execute():
+            channel.sendall(command * 10000)
+            channel.send_exit_status(0)
+            channel.close()
+
+        # NOTE(agent): the output should be sent after the reply
+        #   to the exec request
+        threading.Timer(0.1, execute).start()
+        return True
+
+
+class SSHLocalServerTestCase(test.TestCase):
+    """Run commands over real connections to a local SSH server."""
+
+    def setUp(self):
+        super(SSHLocalServerTestCase, self).setUp()
+        key = paramiko.RSAKey.generate(1024)
+        try:
+            key.sign_ssh_data(b"data")
+        except AttributeError:
+            self.skipTest("The installed paramiko can not sign data with "
+                          "the installed cryptography library.")
+        self.server = _LocalSSHServer(key)
+        self.addCleanup(self.server.stop)
+        self.pool = sshutils._ClientPool()
+        patcher = mock.patch("rally.common.sshutils._POOL", new=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _ssh(self):
+        return sshutils.SSH("user", "127.0.0.1", port=self.server.port,
+                            password="secret")
+
+    def test_concurrent_commands_share_connection(self):
+        ssh_objects = [self._ssh() for i in range(5)]
+        ssh_objects[0].wait(timeout=10)
+        results = {}
+
+        def execute(i):
+            results[i] = ssh_objects[i].execute("cmd%d" % i)
+
+        threads = [threading.Thread(target=execute, args=(i,))
+                   for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for ssh in ssh_objects:
+            ssh.close()
+
+        self.assertEqual(
+            {i: (0, "cmd%d" % i * 10000, "") for i in range(5)}, results)
+        self.assertEqual(1, len(self.server.transports))
+        self.assertEqual({}, self.pool._clients)
+
+    def test_execute_on_hosts(self):
+        key = self.server.key
+        servers = [self.server] + [_LocalSSHServer(key) for i in range(2)]
+        for server in servers[1:]:
+            self.addCleanup(server.stop)
+        ssh_objects = [sshutils.SSH("user", "127.0.0.1", port=server.port,
+                                    password="secret")
+                       for server in servers] * 2
+
+        results = list(sshutils.execute_on_hosts(ssh_objects, "cmd",
+                                                 concurrency=4))
+        for ssh in ssh_objects:
+            ssh.close()
+
+        self.assertEqual(sorted([s.port for s in servers] * 2),
+                         sorted([r["port"] for r in results]))
+        for result in results:
+            self.assertEqual((0, "cmd" * 10000, "", None),
+                             (result["status"], result["stdout"],
+                              result["stderr"], result["error"]))
+        self.assertEqual([1, 1, 1], [len(s.transports) for s in servers])
+        self.assertEqual({}, self.pool._clients)
+
+    def test_wait_closed_port(self):
+        port = self.server.port
+        self.server.stop()
+        ssh = sshutils.SSH("user", "127.0.0.1", port=port,
+                           password="secret")
+        self.assertRaises(exceptions.SSHTimeout, ssh.wait, timeout=0,
+                          interval=0.1)
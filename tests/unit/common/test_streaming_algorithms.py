@@ -318,3 +318,76 @@ class DegradationComputationTestCase(test.TestCase):
         self.assertEqual(min_value, comp1.min_value.result())
         self.assertEqual(max_value, comp1.max_value.result())
         self.assertEqual(result, comp1.result())
+
+
+class ReservoirSamplingTestCase(test.TestCase):
+
+    def test_add_and_result(self):
+        comp = algo.ReservoirSampling(10, seed=42)
+        for val in six.moves.range(5):
+            comp.add(val)
+        self.assertEqual([0, 1, 2, 3, 4], comp.result())
+
+        for val in six.moves.range(5, 1000):
+            comp.add(val)
+        sample = comp.result()
+        self.assertEqual(10, len(sample))
+        self.assertEqual(10, len(set(sample)))
+        self.assertTrue(all(0 <= val < 1000 for val in sample))
+        self.assertEqual(1000, comp.count)
+
+        same = algo.ReservoirSampling(10, seed=42)
+        for val in six.moves.range(1000):
+            same.add(val)
+        self.assertEqual(sample, same.result())
+
+    def test_add_uniform(self):
+        hits = [0] * 10
+        for seed in six.moves.range(1000):
+            comp = algo.ReservoirSampling(1, seed=seed)
+            for val in six.moves.range(10):
+                comp.add(val)
+            hits[comp.result()[0]] += 1
+        # each value is sampled ~100 times out of 1000
+        self.assertTrue(all(50 < hit < 150 for hit in hits), hits)
+
+    def test_init_raises(self):
+        self.assertRaises(ValueError, algo.ReservoirSampling, -1)
+
+    def test_result_empty(self):
+        self.assertEqual([], algo.ReservoirSampling(10).result())
+        comp = algo.ReservoirSampling(0)
+        comp.add(1)
+        self.assertEqual([], comp.result())
+        self.assertEqual(1, comp.count)
+
+    def test_merge(self):
+        comps = [algo.ReservoirSampling(10, seed=idx)
+                 for idx in six.moves.range(3)]
+        for idx, comp in enumerate(comps):
+            for val in six.moves.range(idx * 100, idx * 100 + 5 + idx * 50):
+                comp.add(val)
+
+        sampled = set()
+        for comp in comps:
+            sampled.update(comp.result())
+
+        merged = comps[0]
+        for comp in comps[1:]:
+            merged.merge(comp)
+
+        self.assertEqual(5 + 55 + 105, merged.count)
+        sample = merged.result()
+        self.assertEqual(10, len(sample))
+        self.assertEqual(10, len(set(sample)))
+        self.assertTrue(set(sample).issubset(sampled))
+
+    def test_merge_small(self):
+        comp = algo.ReservoirSampling(10)
+        other = algo.ReservoirSampling(10)
+        comp.add(1)
+        other.add(2)
+        other.add(3)
+        comp.merge(other)
+        self.assertEqual([1, 2, 3], sorted(comp.result()))
+        self.assertEqual(3, comp.count)
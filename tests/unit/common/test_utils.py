@@ -95,19 +95,35 @@ class StdIOCaptureTestCase(test.TestCase):
 
 class TimerTestCase(test.TestCase):
 
-    def test_timer_duration(self):
-        start_time = time.time()
-        end_time = time.time()
-
-        with mock.patch("rally.common.utils.time") as mock_time:
-            mock_time.time = mock.MagicMock(return_value=start_time)
-            with utils.Timer() as timer:
-                mock_time.time = mock.MagicMock(return_value=end_time)
+    @mock.patch("rally.common.utils.thread_time", side_effect=[5.0, 5.5])
+    @mock.patch("rally.common.utils.perf_counter", side_effect=[10.0, 12.5])
+    @mock.patch("rally.common.utils.time.time", return_value=100.0)
+    def test_timer_duration(self, mock_time, mock_perf_counter,
+                            mock_thread_time):
+        with utils.Timer() as timer:
+            # NOTE(agent): a step of the system time does not
+            #   affect the duration
+            mock_time.return_value = 50.0
 
         self.assertIsNone(timer.error)
-        self.assertEqual(start_time, timer.timestamp())
-        self.assertEqual(end_time, timer.finish_timestamp())
-        self.assertEqual(end_time - start_time, timer.duration())
+        self.assertEqual(100.0, timer.timestamp())
+        self.assertEqual(102.5, timer.finish_timestamp())
+        self.assertEqual(2.5, timer.duration())
+        self.assertEqual(0.5, timer.cpu_duration())
+
+    def test_timer_without_cpu_time(self):
+        with mock.patch("rally.common.utils.thread_time", None):
+            with utils.Timer() as timer:
+                pass
+        self.assertIsNone(timer.cpu_duration())
+
+    def test_timer_cpu_duration(self):
+        if utils.thread_time is None:
+            self.skipTest("CPU time of threads is not available.")
+        with utils.Timer() as timer:
+            sum(range(100000))
+        self.assertGreater(timer.cpu_duration(), 0)
+        self.assertLessEqual(timer.cpu_duration(), timer.duration() * 1.1)
 
     def test_timer_exception(self):
         try:
@@ -14,6 +14,7 @@
 #    under the License.
 
 import ddt
+import mock
 
 from rally.common.plugin import plugin
 from rally.common import validation
@@ -108,6 +109,55 @@ class ValidatorTestCase(test.TestCase):
                       "with name: 'dummy_plugin'", result[0].msg)
 
 
+class LookupCacheTestCase(test.TestCase):
+
+    def test_get(self):
+        cache = validation.LookupCache()
+        loader = mock.Mock(return_value="image")
+        credential = mock.Mock()
+        credential.to_dict.return_value = {"username": "foo"}
+
+        self.assertEqual(
+            "image", cache.get(["image", credential, {"name": "a"}], loader))
+        self.assertEqual(
+            "image", cache.get(["image", credential, {"name": "a"}], loader))
+        loader.assert_called_once_with()
+
+        cache.get(["image", credential, {"name": "b"}], loader)
+        credential.to_dict.return_value = {"username": "bar"}
+        cache.get(["image", credential, {"name": "a"}], loader)
+        self.assertEqual(3, loader.call_count)
+
+    def test_get_cached_errors(self):
+        cache = validation.LookupCache()
+        loader = mock.Mock(side_effect=KeyError("foo"))
+
+        for i in range(2):
+            self.assertRaises(KeyError, cache.get, ["foo"], loader,
+                              cached_errors=(KeyError,))
+        loader.assert_called_once_with()
+
+        loader.side_effect = ValueError
+        for i in range(2):
+            self.assertRaises(ValueError, cache.get, ["bar"], loader)
+        self.assertEqual(3, loader.call_count)
+
+    def test_cached_lookup(self):
+        loader = mock.Mock()
+        cache = validation.LookupCache()
+        credentials = {"foo": {"lookup_cache": cache}}
+
+        for i in range(2):
+            self.assertEqual(
+                loader.return_value,
+                validation.cached_lookup(credentials, "foo", ["a"], loader))
+        loader.assert_called_once_with()
+
+        validation.cached_lookup(credentials, "bar", ["a"], loader)
+        validation.cached_lookup(None, "foo", ["a"], loader)
+        self.assertEqual(3, loader.call_count)
+
+
 @ddt.ddt
 class RequiredPlatformValidatorTestCase(test.TestCase):
 
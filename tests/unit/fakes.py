@@ -1775,6 +1775,9 @@ class FakeTimer(rally_utils.Timer):
     def finish_timestamp(self):
         return 3
 
+    def cpu_duration(self):
+        return 2
+
 
 @context.configure(name="fake", order=1)
 class FakeContext(context.Context):
@@ -1877,6 +1880,7 @@ class FakeTask(dict, object):
 class FakeAPI(object):
 
     def __init__(self):
+        self.endpoint_url = None
         self._deployment = mock.create_autospec(api._Deployment)
         self._task = mock.create_autospec(api._Task)
         self._verifier = mock.create_autospec(api._Verifier)
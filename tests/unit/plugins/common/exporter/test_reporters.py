@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import json
 import os
 
 import mock
@@ -100,6 +102,91 @@ class HTMLExporterTestCase(test.TestCase):
                          reporter.generate())
 
 
+class JSONResultsExporterTestCase(test.TestCase):
+
+    def test_validate(self):
+        # nothing should fail
+        reporters.JSONResultsExporter.validate(mock.Mock())
+        reporters.JSONResultsExporter.validate("")
+        reporters.JSONResultsExporter.validate(None)
+
+    def _make_tasks_results(self, data):
+        tasks_results = get_tasks_results()
+        workload = tasks_results[0]["subtasks"][0]["workloads"][0]
+        workload.update({"args": {"foo": "bar"}, "runner": {"type": "r"},
+                         "context": {"users": {}},
+                         "hooks": [{"config": {"name": "h"}}],
+                         "sla_results": {"sla": [{"success": True}]},
+                         # the data can be iterated over just once
+                         "data": iter(data)})
+        return tasks_results
+
+    def test_generate(self):
+        data = [{"timestamp": 1,
+                 "atomic_actions": [{"name": "foo", "started_at": 1,
+                                     "finished_at": 3}]},
+                {"timestamp": 2, "atomic_actions": []}]
+        reporter = reporters.JSONResultsExporter(
+            self._make_tasks_results(data), None)
+
+        report = reporter.generate()
+
+        self.assertEqual(["print"], list(report))
+        self.assertFalse(isinstance(report["print"], str))
+        self.assertEqual(
+            [{
+                "key": {"name": "CinderVolumes.list_volumes",
+                        "description": "List all volumes.",
+                        "pos": 0,
+                        "kw": {"args": {"foo": "bar"},
+                               "runner": {"type": "r"},
+                               "context": {"users": {}},
+                               "sla": {},
+                               "hooks": [{"name": "h"}]}},
+                "result": [{"timestamp": 1, "atomic_actions": {"foo": 2}},
+                           {"timestamp": 2, "atomic_actions": {}}],
+                "sla": [{"success": True}],
+                "hooks": [{"config": {"name": "h"}}],
+                "load_duration": 2.03029203414917,
+                "full_duration": 29.969523191452026,
+                "created_at": "2017-06-04T05:14:44"}],
+            json.loads("".join(report["print"])))
+
+    def test_generate_several_workloads(self):
+        tasks_results = (self._make_tasks_results([{"timestamp": 1,
+                                                    "atomic_actions": []}])
+                         + self._make_tasks_results([]))
+        reporter = reporters.JSONResultsExporter(tasks_results, None)
+
+        report = "".join(reporter.generate()["print"])
+        result = json.loads(report, object_pairs_hook=collections.OrderedDict)
+        # the same format as `rally task results` printed before streaming
+        self.assertEqual(json.dumps(result, indent=4, separators=(",", ": ")),
+                         report)
+
+        self.assertEqual(2, len(result))
+        self.assertEqual([{"timestamp": 1, "atomic_actions": {}}],
+                         result[0]["result"])
+        self.assertEqual([], result[1]["result"])
+        self.assertEqual(["key", "result", "sla", "hooks", "load_duration",
+                          "full_duration", "created_at"], list(result[1]))
+
+    def test_generate_empty_data(self):
+        reporter = reporters.JSONResultsExporter(
+            self._make_tasks_results([]), "path")
+
+        report = reporter.generate()
+
+        self.assertEqual({"files", "open"}, set(report))
+        self.assertEqual("file://" + os.path.abspath("path"), report["open"])
+        result = json.loads("".join(report["files"]["path"]))
+        self.assertEqual(1, len(result))
+        self.assertEqual([], result[0]["result"])
+
+        reporter = reporters.JSONResultsExporter([], None)
+        self.assertEqual("[]", "".join(reporter.generate()["print"]))
+
+
 class JUnitXMLExporterTestCase(test.TestCase):
 
     def test_validate(self):
@@ -0,0 +1,140 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import gc
+import os
+import shutil
+import tempfile
+
+import ddt
+import mock
+
+from rally import consts
+from rally.plugins.common.hook import self_monitoring
+from rally.task import hook
+from tests.unit import test
+
+
+MODULE = "rally.plugins.common.hook.self_monitoring."
+
+
+@ddt.ddt
+class SelfMonitoringHookTestCase(test.TestCase):
+
+    def _make_proc(self, processes):
+        proc = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, proc)
+        for pid, (ppid, ticks, threads, pages) in processes.items():
+            os.mkdir(os.path.join(proc, str(pid)))
+            with open(os.path.join(proc, str(pid), "stat"), "w") as f:
+                f.write("%d (rally (x) y) S %d 1 1 0 -1 0 0 0 0 0 %d %d 0 0 "
+                        "20 0 %d 0 100 1000 %d 18446744073709551615"
+                        % (pid, ppid, ticks, ticks, threads, pages))
+        os.mkdir(os.path.join(proc, "self"))
+        return proc
+
+    @ddt.data(({}, True), ({"window": 1}, True), ({"window": 0}, False),
+              ({"foo": 1}, False))
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = hook.Hook.validate("self_monitoring", None, None, config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertEqual(1, len(results))
+
+    @mock.patch(MODULE + "os.sysconf")
+    def test__read_stat(self, mock_sysconf):
+        mock_sysconf.side_effect = {"SC_CLK_TCK": 100,
+                                    "SC_PAGE_SIZE": 4096}.get
+        proc = self._make_proc({42: (1, 150, 7, 10)})
+
+        with mock.patch(MODULE + "_PROC", proc):
+            self.assertEqual({"ppid": 1, "cpu": 3.0, "threads": 7,
+                              "rss": 40960},
+                             self_monitoring._read_stat(42))
+            self.assertIsNone(self_monitoring._read_stat(43))
+
+    def test__get_children(self):
+        proc = self._make_proc({10: (1, 0, 1, 1), 11: (10, 0, 1, 1),
+                                12: (11, 0, 1, 1), 13: (10, 0, 1, 1)})
+        with mock.patch(MODULE + "_PROC", proc):
+            self.assertEqual([11, 13],
+                             sorted(self_monitoring._get_children(10)))
+
+    def test__gc_timer(self):
+        with self_monitoring._GCTimer() as gc_timer:
+            gc.collect()
+        if hasattr(gc, "callbacks"):
+            self.assertNotIn(gc_timer._callback, gc.callbacks)
+            self.assertEqual(1, gc_timer.collections)
+            self.assertGreater(gc_timer.duration, 0)
+
+    @mock.patch(MODULE + "os.path.isdir", return_value=False)
+    def test_run_without_proc(self, mock_isdir):
+        hook_obj = self_monitoring.SelfMonitoringHook(
+            mock.Mock(), {}, {"event_type": "time", "value": 1})
+        hook_obj.run_sync()
+        result = hook_obj.result()
+        self.assertEqual(consts.HookStatus.FAILED, result["status"])
+        self.assertEqual("RallyException", result["error"]["etype"])
+
+    @mock.patch(MODULE + "_get_children", return_value=[])
+    @mock.patch(MODULE + "_read_stat")
+    @mock.patch(MODULE + "utils.perf_counter")
+    @mock.patch(MODULE + "time.sleep")
+    def test_run(self, mock_sleep, mock_perf_counter, mock__read_stat,
+                 mock__get_children):
+        if not os.path.isdir("/proc"):
+            self.skipTest("/proc is not available.")
+        # NOTE(agent): collections of the garbage collector would
+        #   take values of the mocked clock
+        gc.disable()
+        self.addCleanup(gc.enable)
+        # sampling, deadline, two steps of the window and sampling again
+        mock_perf_counter.side_effect = [0.0, 0.0,
+                                         0.0, 0.0, 0.06,
+                                         0.06, 0.06, 0.1,
+                                         0.1, 0.1]
+        mock__read_stat.side_effect = [
+            {"cpu": 1.0, "rss": 1048576, "threads": 4, "ppid": 1},
+            {"cpu": 1.05, "rss": 2097152, "threads": 5, "ppid": 1}]
+        hook_obj = self_monitoring.SelfMonitoringHook(
+            mock.Mock(), {"window": 0.1}, {"event_type": "time", "value": 1})
+        hook_obj.runner = mock.Mock(result_queue=collections.deque([1, 2]),
+                                    event_queue=collections.deque([1]))
+
+        hook_obj.run()
+
+        self.assertEqual(2, mock_sleep.call_count)
+        self.assertAlmostEqual(0.05, mock_sleep.call_args_list[0][0][0])
+        self.assertAlmostEqual(0.04, mock_sleep.call_args_list[1][0][0])
+        additive = hook_obj.result()["output"]["additive"]
+        self.assertEqual(["Load generator CPU usage",
+                          "Load generator memory usage",
+                          "Load generator threads",
+                          "Load generator scheduling"],
+                         [chart["title"] for chart in additive])
+        cpu = dict(additive[0]["data"])
+        self.assertAlmostEqual(50.0, cpu["controller"])
+        self.assertEqual(0, cpu["workers"])
+        self.assertEqual([["controller", 2.0], ["workers", 0.0]],
+                         additive[1]["data"])
+        self.assertEqual([["controller", 5], ["workers", 0],
+                          ["worker processes", 0]], additive[2]["data"])
+        scheduling = dict(additive[3]["data"])
+        self.assertAlmostEqual(10.0, scheduling["scheduler lag, ms"])
+        self.assertEqual(2, scheduling["result queue depth"])
+        self.assertEqual(1, scheduling["event queue depth"])
@@ -0,0 +1,189 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+import os
+import tempfile
+
+import ddt
+import mock
+
+from rally.plugins.common.runners import arrival
+from rally.plugins.common.runners import rps
+from rally.task import runner
+from tests.unit import fakes
+from tests.unit import test
+
+
+RUNNERS = "rally.plugins.common.runners."
+
+
+@ddt.ddt
+class ArrivalScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ArrivalScenarioRunnerTestCase, self).setUp()
+        self.task = mock.MagicMock()
+        self.trace = self._make_trace("# time,request\n"
+                                      "100.0,GET\n"
+                                      "\n"
+                                      "100.5,POST\n"
+                                      "101.0,GET\n"
+                                      "103.0,GET\n")
+
+    def _make_trace(self, content):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        return path
+
+    @ddt.data(
+        ({"type": "arrival", "times": 10,
+          "arrivals": {"distribution": "poisson", "rate": 2}}, True),
+        ({"type": "arrival", "times": 10, "seed": 42, "max_concurrency": 3,
+          "arrivals": {"distribution": "uniform", "rate": 0.5}}, True),
+        ({"type": "arrival",
+          "arrivals": {"distribution": "poisson", "rate": 2}}, False),
+        ({"type": "arrival", "times": 10,
+          "arrivals": {"distribution": "zipf", "rate": 2}}, False),
+        ({"type": "arrival", "times": 10,
+          "arrivals": {"distribution": "poisson", "rate": 0}}, False),
+        ({"type": "arrival", "times": 10,
+          "arrivals": {"distribution": "poisson", "rate": 1,
+                       "trace": "/foo"}}, False),
+        ({"type": "arrival",
+          "arrivals": {"trace": "/path/to/nowhere"}}, False),
+        ({"type": "arrival", "arrivals": {}}, False),
+        ({"type": "arrival", "times": 10, "foo": "bar",
+          "arrivals": {"distribution": "poisson", "rate": 2}}, False)
+    )
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = runner.ScenarioRunner.validate("arrival", None, None, config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertGreater(len(results), 0)
+
+    def test_validate_trace(self):
+        config = {"type": "arrival", "arrivals": {"trace": self.trace,
+                                                  "speed": 2}}
+        self.assertEqual(
+            [], runner.ScenarioRunner.validate("arrival", None, None, config))
+
+    @ddt.data("poisson", "uniform", "constant")
+    def test__random_arrivals(self, distribution):
+        moments = list(itertools.islice(
+            arrival._random_arrivals(distribution, 100, 42), 10001))
+
+        self.assertEqual(0.0, moments[0])
+        self.assertEqual(sorted(moments), moments)
+        # the average rate of 10000 arrivals is close to the requested one
+        self.assertAlmostEqual(100, 10000 / moments[-1], delta=5)
+        self.assertEqual(moments, list(itertools.islice(
+            arrival._random_arrivals(distribution, 100, 42), 10001)))
+
+    def test__random_arrivals_constant(self):
+        moments = arrival._random_arrivals("constant", 4, None)
+        self.assertEqual([0.0, 0.25, 0.5, 0.75],
+                         list(itertools.islice(moments, 4)))
+
+    def test__read_trace(self):
+        self.assertEqual([0.0, 0.5, 1.0, 3.0],
+                         list(arrival._read_trace(self.trace)))
+        self.assertEqual([0.0, 0.25, 0.5, 1.5],
+                         list(arrival._read_trace(self.trace, speed=2)))
+
+    def test__arrivals_are_split_between_processes(self):
+        cfg = {"distribution": "poisson", "rate": 10}
+        expected = list(itertools.islice(
+            arrival._random_arrivals("poisson", 10, 13), 30))
+
+        moments = []
+        for i in range(3):
+            moments.extend(
+                itertools.islice(arrival._arrivals(cfg, 13, 3, i), 10))
+        self.assertEqual(expected, sorted(moments))
+
+        trace = {"trace": self.trace}
+        self.assertEqual([0.0, 1.0], list(arrival._arrivals(trace, 0, 2, 0)))
+        self.assertEqual([0.5], list(arrival._arrivals(trace, 0, 3, 1)))
+
+    @mock.patch(RUNNERS + "arrival.multiprocessing.Queue")
+    @mock.patch(RUNNERS + "arrival.multiprocessing.cpu_count",
+                return_value=4)
+    @mock.patch(RUNNERS + "arrival.ArrivalScenarioRunner"
+                "._create_process_pool")
+    @mock.patch(RUNNERS + "arrival.ArrivalScenarioRunner._join_processes")
+    def test__run_scenario_args(self, mock__join_processes,
+                                mock__create_process_pool, mock_cpu_count,
+                                mock_queue):
+        cfgs = [
+            {"type": "arrival", "times": 10, "max_concurrency": 5,
+             "seed": 3, "arrivals": {"distribution": "poisson", "rate": 2}},
+            {"type": "arrival", "max_cpu_count": 2,
+             "arrivals": {"trace": self.trace}}
+        ]
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, cfgs[0])
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        processes_to_start, worker, args_gen = (
+            mock__create_process_pool.call_args[0])
+        self.assertEqual(4, processes_to_start)
+        self.assertEqual(rps._worker_process, worker)
+        args = [next(args_gen) for i in range(4)]
+        # times and concurrency are split between processes
+        self.assertEqual([(3, 2), (3, 1), (2, 1), (2, 1)],
+                         [a[3:5] for a in args])
+        self.assertEqual(cfgs[0]["arrivals"], args[0][-1].args[0])
+        self.assertEqual(3, args[0][-1].args[1])
+
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, cfgs[1])
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        processes_to_start, worker, args_gen = (
+            mock__create_process_pool.call_args[0])
+        self.assertEqual(2, processes_to_start)
+        # the trace is replayed until its end, while the concurrency is
+        # limited by the number of used CPUs
+        self.assertEqual(
+            [(None, arrival.DEFAULT_CONCURRENCY_PER_CPU)] * 2,
+            [next(args_gen)[3:5] for i in range(2)])
+
+    def test__run_scenario(self):
+        config = {"type": "arrival", "times": 12, "seed": 1,
+                  "arrivals": {"distribution": "poisson", "rate": 100}}
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        self.assertEqual(12, len(runner_obj.result_queue))
+
+    def test__run_scenario_trace(self):
+        trace = self._make_trace("\n".join(str(i * 0.01)
+                                           for i in range(7)))
+        config = {"type": "arrival", "arrivals": {"trace": trace}}
+        runner_obj = arrival.ArrivalScenarioRunner(self.task, config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        self.assertEqual(7, len(runner_obj.result_queue))
+        for result_batch in runner_obj.result_queue:
+            for result in result_batch:
+                self.assertIn("schedule", result)
@@ -54,15 +54,6 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
         else:
             self.assertGreater(len(results), 0)
 
-    @mock.patch(RUNNERS + "constant.runner")
-    def test__run_scenario_once_with_unpack_args(self, mock_runner):
-        result = constant._run_scenario_once_with_unpack_args(
-            ("FOO", ("BAR", "QUUZ")))
-
-        self.assertEqual(mock_runner._run_scenario_once.return_value, result)
-        mock_runner._run_scenario_once.assert_called_once_with(
-            "FOO", ("BAR", "QUUZ"))
-
     @mock.patch(RUNNERS + "constant.time")
     @mock.patch(RUNNERS + "constant.threading.Thread")
     @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
@@ -88,7 +79,7 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
         info = {"processes_to_start": 1, "processes_counter": 1}
 
         constant._worker_process(mock_queue, fake_ram_int, 1, 2, times,
-                                 context, "Dummy", "dummy", (),
+                                 None, context, "Dummy", "dummy", (),
                                  mock_event_queue, mock_event, info)
 
         self.assertEqual(times + 1, mock_thread.call_count)
@@ -108,6 +99,29 @@ class ConstantScenarioRunnerTestCase(test.TestCase):
             )
             self.assertIn(call, mock_thread.mock_calls)
 
+    @mock.patch(RUNNERS + "constant.utils.monotonic")
+    @mock.patch(RUNNERS + "constant.threading.Thread")
+    @mock.patch(RUNNERS + "constant.runner")
+    def test__worker_process_with_deadline(self, mock_runner, mock_thread,
+                                           mock_monotonic):
+        mock_thread.return_value = mock.MagicMock(
+            isAlive=mock.MagicMock(return_value=False))
+        mock_monotonic.side_effect = [1.0, 2.0, 3.0]
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        info = {"processes_to_start": 1, "processes_counter": 1}
+
+        constant._worker_process(mock.MagicMock(), iter(range(10)), 0, 2,
+                                 None, 3.0, {}, "Dummy", "dummy", (),
+                                 mock.MagicMock(), mock_event, info)
+
+        # the first iteration is started without checking the deadline
+        self.assertEqual(3, mock_thread.call_count)
+        self.assertEqual(3, mock_monotonic.call_count)
+        self.assertEqual(
+            [mock.call(i, {}) for i in range(3)],
+            mock_runner._get_scenario_context.call_args_list)
+
     @mock.patch(RUNNERS_BASE + "_run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
         mock_queue = mock.MagicMock()
@@ -266,6 +280,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.context = fakes.FakeContext({"task": {"uuid": "uuid"}}).context
         self.context["iteration"] = 14
         self.args = {"a": 1}
+        self.task = mock.MagicMock()
 
     @ddt.data(({"duration": 0, "concurrency": 2,
                 "timeout": 2, "type": "constant_for_duration"}, True),
@@ -281,7 +296,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "do_it",
                                  self.context, self.args)
@@ -294,7 +309,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_exception(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "something_went_wrong",
                                  self.context, self.args)
@@ -308,7 +323,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
 
     def test_run_scenario_constantly_for_duration_timeout(self):
         runner_obj = constant.ConstantForDurationScenarioRunner(
-            None, self.config)
+            self.task, self.config)
 
         runner_obj._run_scenario(fakes.FakeScenario, "raise_timeout",
                                  self.context, self.args)
@@ -320,8 +335,39 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
                 self.assertIsNotNone(result)
         self.assertIn("error", runner_obj.result_queue[0][0])
 
+    @mock.patch(RUNNERS + "constant.utils.monotonic", return_value=10)
+    @mock.patch(RUNNERS + "constant.multiprocessing.Queue")
+    @mock.patch(RUNNERS + "constant.multiprocessing.cpu_count",
+                return_value=4)
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._create_process_pool")
+    @mock.patch(RUNNERS + "constant.ConstantForDurationScenarioRunner"
+                "._join_processes")
+    def test__run_scenario_uses_process_per_cpu(
+            self, mock__join_processes, mock__create_process_pool,
+            mock_cpu_count, mock_queue, mock_monotonic):
+        config = {"duration": 5, "concurrency": 10, "timeout": 2,
+                  "type": "constant_for_duration"}
+        runner_obj = constant.ConstantForDurationScenarioRunner(self.task,
+                                                                config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 self.context, self.args)
+
+        processes_to_start, worker, args_gen = (
+            mock__create_process_pool.call_args[0])
+        self.assertEqual(4, processes_to_start)
+        self.assertEqual(constant._worker_process, worker)
+        # concurrency is split between processes, times is not limited
+        self.assertEqual(
+            [(3, None, 15), (3, None, 15), (2, None, 15), (2, None, 15)],
+            [next(args_gen)[3:6] for i in range(4)])
+        mock__join_processes.assert_called_once_with(
+            mock__create_process_pool.return_value,
+            mock_queue.return_value, mock_queue.return_value)
+
     def test__run_scenario_constantly_aborted(self):
-        runner_obj = constant.ConstantForDurationScenarioRunner(None,
+        runner_obj = constant.ConstantForDurationScenarioRunner(self.task,
                                                                 self.config)
 
         runner_obj.abort()
@@ -330,7 +376,7 @@ class ConstantForDurationScenarioRunnerTestCase(test.TestCase):
         self.assertEqual(len(runner_obj.result_queue), 0)
 
     def test_abort(self):
-        runner_obj = constant.ConstantForDurationScenarioRunner(None,
+        runner_obj = constant.ConstantForDurationScenarioRunner(self.task,
                                                                 self.config)
         self.assertFalse(runner_obj.aborted.is_set())
         runner_obj.abort()
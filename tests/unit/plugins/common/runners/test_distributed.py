@@ -0,0 +1,147 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+import mock
+
+from rally.plugins.common.runners import distributed
+from rally.plugins.common.scenarios.dummy import dummy
+from rally.task import runner
+from tests.unit import test
+
+
+RUNNERS = "rally.plugins.common.runners."
+
+
+@ddt.ddt
+class ShardConfigTestCase(test.TestCase):
+
+    @ddt.data(
+        {"config": {"type": "constant", "times": 10, "concurrency": 4},
+         "shards": 3,
+         "expected": [{"type": "constant", "times": 4, "concurrency": 2},
+                      {"type": "constant", "times": 3, "concurrency": 1},
+                      {"type": "constant", "times": 3, "concurrency": 1}]},
+        {"config": {"type": "constant", "times": 10, "concurrency": 2},
+         "shards": 3,
+         "expected": [{"type": "constant", "times": 5, "concurrency": 1},
+                      {"type": "constant", "times": 5, "concurrency": 1}]},
+        {"config": {"type": "constant"},
+         "shards": 2,
+         "expected": [{"type": "constant", "times": 1, "concurrency": 1}]},
+        {"config": {"type": "constant_for_duration", "duration": 10,
+                    "concurrency": 5},
+         "shards": 2,
+         "expected": [{"type": "constant_for_duration", "duration": 10,
+                       "concurrency": 3},
+                      {"type": "constant_for_duration", "duration": 10,
+                       "concurrency": 2}]},
+        {"config": {"type": "serial", "times": 3},
+         "shards": 2,
+         "expected": [{"type": "serial", "times": 2},
+                      {"type": "serial", "times": 1}]},
+        {"config": {"type": "rps", "times": 9, "rps": 3},
+         "shards": 2,
+         "expected": [{"type": "rps", "times": 5, "rps": 1.5},
+                      {"type": "rps", "times": 4, "rps": 1.5}]},
+        {"config": {"type": "rps", "times": 4, "max_concurrency": 2,
+                    "rps": {"start": 2, "end": 10, "step": 4,
+                            "duration": 3}},
+         "shards": 2,
+         "expected": [{"type": "rps", "times": 2, "max_concurrency": 1,
+                       "rps": {"start": 1, "end": 5, "step": 2,
+                               "duration": 3}}] * 2}
+    )
+    @ddt.unpack
+    def test_shard_config(self, config, shards, expected):
+        self.assertEqual(expected, distributed.shard_config(config, shards))
+
+
+@ddt.ddt
+class DistributedScenarioRunnerTestCase(test.TestCase):
+
+    @ddt.data(
+        ({"type": "distributed", "agents": 2,
+          "runner": {"type": "constant", "times": 4}}, True),
+        ({"type": "distributed", "agents": 2,
+          "runner": {"type": "rps", "times": 4, "rps": 2}}, True),
+        ({"type": "distributed", "agents": 0,
+          "runner": {"type": "constant"}}, False),
+        ({"type": "distributed", "agents": 2}, False),
+        ({"type": "distributed", "agents": 2,
+          "runner": {"type": "distributed", "agents": 1,
+                     "runner": {"type": "serial"}}}, False),
+        ({"type": "distributed", "agents": 2,
+          "runner": {"type": "constant", "times": 1, "concurrency": 2}},
+         False),
+        ({"type": "distributed", "agents": 2,
+          "runner": {"type": "rps", "times": 4}}, False)
+    )
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = runner.ScenarioRunner.validate(
+            name="distributed", credentials=None, config=None,
+            plugin_cfg=config, vtype="syntax")
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertGreater(len(results), 0)
+
+    @mock.patch(RUNNERS + "distributed.distributed.Coordinator")
+    def test__run_scenario(self, mock_coordinator):
+        coordinator = mock_coordinator.return_value
+        coordinator.statistics = {"host:1": {}, "host:2": {}}
+        config = {"type": "distributed", "agents": 2,
+                  "agents_wait_timeout": 5,
+                  "runner": {"type": "serial", "times": 3}}
+        runner_obj = distributed.DistributedScenarioRunner(
+            {"uuid": "task-uuid"}, config)
+
+        def run(task_uuid, name, context, args, configs, on_results,
+                on_event):
+            on_results([{"duration": 1}])
+            on_event(type="foo", value="bar")
+
+        coordinator.run.side_effect = run
+        runner_obj._run_scenario(dummy.Dummy, "run", {"users": []},
+                                 {"a": 1})
+
+        coordinator.connect.assert_called_once_with(2, 5)
+        coordinator.run.assert_called_once_with(
+            "task-uuid", "Dummy.dummy", {"users": []}, {"a": 1},
+            [{"type": "serial", "times": 2}, {"type": "serial", "times": 1}],
+            on_results=mock.ANY, on_event=mock.ANY)
+        coordinator.close.assert_called_once_with()
+        self.assertEqual([[{"duration": 1}]], list(runner_obj.result_queue))
+        self.assertEqual([{"type": "foo", "value": "bar"}],
+                         list(runner_obj.event_queue))
+        self.assertEqual({"agents": coordinator.statistics},
+                         runner_obj.statistics)
+
+    @mock.patch(RUNNERS + "distributed.distributed.Coordinator")
+    def test_abort(self, mock_coordinator):
+        runner_obj = distributed.DistributedScenarioRunner(
+            {"uuid": "task-uuid"},
+            {"type": "distributed", "agents": 1,
+             "runner": {"type": "serial"}})
+        runner_obj.abort()
+        self.assertTrue(runner_obj.aborted.is_set())
+
+        def run(*args, **kwargs):
+            runner_obj.abort()
+
+        runner_obj.aborted.clear()
+        mock_coordinator.return_value.run.side_effect = run
+        runner_obj._run_scenario(dummy.Dummy, "run", {}, {})
+        mock_coordinator.return_value.abort.assert_called_once_with()
@@ -0,0 +1,232 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+import mock
+
+from rally.plugins.common.runners import constant
+from rally.plugins.common.runners import max_throughput
+from rally.plugins.common.runners import rps
+from rally.task import runner
+from tests.unit import fakes
+from tests.unit import test
+
+
+RUNNERS = "rally.plugins.common.runners."
+
+
+def _result(duration=1.0, error=None):
+    return {"duration": duration, "timestamp": 1.0, "idle_duration": 0.0,
+            "output": {"additive": [], "complete": []},
+            "atomic_actions": [], "error": error or []}
+
+
+class StepTestCase(test.TestCase):
+
+    @mock.patch(RUNNERS + "max_throughput.utils.monotonic")
+    def test_add_iteration(self, mock_monotonic):
+        mock_monotonic.side_effect = [10, 14]
+        step = max_throughput._Step(3, {"failure_rate": {"max": 20}})
+
+        self.assertTrue(step.add_iteration(_result(1.0)))
+        self.assertTrue(step.add_iteration(_result(3.0)))
+        self.assertFalse(step.add_iteration(_result(error=["E", "m", "t"])))
+        self.assertFalse(step.add_iteration(_result(5.0)))
+        step.finish()
+
+        stats = step.to_dict()
+        self.assertEqual(3, stats["level"])
+        self.assertFalse(stats["passed"])
+        self.assertEqual(4, stats["iterations"])
+        self.assertEqual(1, stats["failures"])
+        self.assertEqual(4, stats["duration"])
+        self.assertEqual(1.0, stats["throughput"])
+        self.assertEqual(3.0, stats["avg_duration"])
+        self.assertAlmostEqual(4.8, stats["95%ile_duration"])
+        self.assertEqual(["failure_rate"],
+                         [s["criterion"] for s in stats["sla"]])
+
+    def test_add_iteration_keeps_result(self):
+        step = max_throughput._Step(1, {"max_seconds_per_iteration": 1})
+        result = _result()
+        step.add_iteration(result)
+        self.assertEqual([], result["atomic_actions"])
+
+    def test_to_dict_without_iterations(self):
+        stats = max_throughput._Step(1, {"failure_rate": {"max": 0}}).to_dict()
+        self.assertEqual(0, stats["iterations"])
+        self.assertIsNone(stats["avg_duration"])
+        self.assertIsNone(stats["95%ile_duration"])
+
+
+@ddt.ddt
+class MaxThroughputScenarioRunnerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(MaxThroughputScenarioRunnerTestCase, self).setUp()
+        self.task = mock.MagicMock()
+        self.config = {"type": "max_throughput", "start": 1, "step": 2,
+                       "end": 100, "sla": {"max_avg_duration": 2.0}}
+
+    @ddt.data(
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10,
+          "mode": "rps", "step_duration": 30, "refinements": 2,
+          "sla": {"failure_rate": {"max": 1}}}, True),
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10,
+          "sla": {"max_avg_duration": 2}}, True),
+        ({"type": "max_throughput", "start": 1, "step": 2,
+          "sla": {"max_avg_duration": 2}}, False),
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10},
+         False),
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10,
+          "sla": {}}, False),
+        ({"type": "max_throughput", "start": 10, "step": 2, "end": 5,
+          "sla": {"max_avg_duration": 2}}, False),
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10,
+          "sla": {"no_such_sla": 2}}, False),
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10,
+          "sla": {"failure_rate": {"foo": 2}}}, False),
+        ({"type": "max_throughput", "start": 1, "step": 2, "end": 10,
+          "mode": "foo", "sla": {"max_avg_duration": 2}}, False)
+    )
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = runner.ScenarioRunner.validate("max_throughput", None, None,
+                                                 config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertGreater(len(results), 0)
+
+    def _mock_steps(self, runner_obj, passed):
+        steps = []
+
+        def run_step(level, *args):
+            step = mock.Mock(passed=passed[len(steps)], level=level)
+            step.to_dict.return_value = {"level": level}
+            steps.append(step)
+            return step
+
+        runner_obj._run_step = mock.Mock(side_effect=run_step)
+        return steps
+
+    @ddt.data(
+        {"config": {}, "passed": [True, True, False], "levels": [1, 3, 5],
+         "max_passed": 3},
+        {"config": {"end": 6}, "passed": [True, True, True],
+         "levels": [1, 3, 5], "max_passed": 5},
+        {"config": {}, "passed": [False], "levels": [1], "max_passed": None},
+        {"config": {"refinements": 1, "step": 4},
+         "passed": [True, True, False, True, False],
+         "levels": [1, 5, 9, 7, 9], "max_passed": 7},
+        {"config": {"refinements": 1}, "passed": [True, False, False],
+         "levels": [1, 3, 2], "max_passed": 1},
+        {"config": {"refinements": 1, "step": 1}, "passed": [True, False],
+         "levels": [1, 2], "max_passed": 1},
+        {"config": {"refinements": 1, "step": 0.5, "mode": "rps"},
+         "passed": [True, False, True, False],
+         "levels": [1, 1.5, 1.25, 1.5], "max_passed": 1.25}
+    )
+    @ddt.unpack
+    def test__run_scenario(self, config, passed, levels, max_passed):
+        self.config.update(config)
+        runner_obj = max_throughput.MaxThroughputScenarioRunner(self.task,
+                                                                self.config)
+        self._mock_steps(runner_obj, passed)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", {}, {})
+
+        self.assertEqual(levels, [c[0][0] for c in
+                                  runner_obj._run_step.call_args_list])
+        self.assertEqual(
+            {"throughput_curve": [{"level": level} for level in levels],
+             "max_passed_level": max_passed},
+            runner_obj.statistics)
+
+    def test__run_scenario_sla_never_breaks(self):
+        self.config["end"] = 8
+        runner_obj = max_throughput.MaxThroughputScenarioRunner(self.task,
+                                                                self.config)
+        self._mock_steps(runner_obj, [True] * 10)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", {}, {})
+
+        # the ramp stops at the end level
+        self.assertEqual([1, 3, 5, 7], [c[0][0] for c in
+                                        runner_obj._run_step.call_args_list])
+        self.assertEqual(7, runner_obj.statistics["max_passed_level"])
+
+    def test__run_scenario_aborted(self):
+        runner_obj = max_throughput.MaxThroughputScenarioRunner(self.task,
+                                                                self.config)
+        steps = self._mock_steps(runner_obj, [True, True])
+        runner_obj._run_step.side_effect = lambda *a: (runner_obj.abort() or
+                                                       steps.append(1) or
+                                                       mock.Mock(passed=True))
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it", {}, {})
+
+        self.assertEqual(1, runner_obj._run_step.call_count)
+        self.assertTrue(runner_obj._step_aborted.is_set())
+
+    def test__send_result(self):
+        runner_obj = max_throughput.MaxThroughputScenarioRunner(self.task,
+                                                                self.config)
+        self.assertTrue(runner_obj._send_result(_result(1.0)))
+
+        runner_obj._step = max_throughput._Step(1, self.config["sla"])
+        self.assertTrue(runner_obj._send_result(_result(1.0)))
+        self.assertFalse(runner_obj._step_aborted.is_set())
+        self.assertTrue(runner_obj._send_result(_result(5.0)))
+        self.assertTrue(runner_obj._step_aborted.is_set())
+        self.assertEqual(2, runner_obj._step.iterations)
+
+        self.assertFalse(runner_obj._send_result({"duration": 1}))
+        self.assertEqual(2, runner_obj._step.iterations)
+
+    @mock.patch(RUNNERS + "max_throughput.multiprocessing.cpu_count",
+                return_value=2)
+    def test__worker_args(self, mock_cpu_count):
+        self.config.update({"step_duration": 5, "timeout": 3})
+        runner_obj = max_throughput.MaxThroughputScenarioRunner(self.task,
+                                                                self.config)
+        processes, worker, args_gen = runner_obj._worker_args(
+            3, "cls", "method", {}, {}, "results", "events", "iterations")
+        self.assertEqual(2, processes)
+        self.assertEqual(constant._worker_process, worker)
+        args = next(args_gen)
+        self.assertEqual(("results", "iterations", 3, 2, None), args[:5])
+        self.assertEqual(1, next(args_gen)[3])
+
+        self.config["mode"] = "rps"
+        processes, worker, args_gen = runner_obj._worker_args(
+            1.5, "cls", "method", {}, {}, "results", "events", "iterations")
+        self.assertEqual(2, processes)
+        self.assertEqual(rps._worker_process, worker)
+        # 8 iterations are split between processes
+        self.assertEqual([4, 4], [next(args_gen)[3] for i in range(2)])
+
+    def test_run_steps(self):
+        self.config.update({"step_duration": 0.1, "end": 3})
+        runner_obj = max_throughput.MaxThroughputScenarioRunner(self.task,
+                                                                self.config)
+
+        runner_obj._run_scenario(fakes.FakeScenario, "do_it",
+                                 fakes.FakeContext({}).context, {})
+
+        curve = runner_obj.statistics["throughput_curve"]
+        self.assertEqual([1, 3], [s["level"] for s in curve])
+        self.assertEqual(3, runner_obj.statistics["max_passed_level"])
+        self.assertEqual(sum(s["iterations"] for s in curve),
+                         sum(len(b) for b in runner_obj.result_queue))
@@ -13,8 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+import threading
+
 import ddt
 import mock
+import six
 
 from rally.plugins.common.runners import rps
 from rally.task import runner
@@ -146,25 +150,78 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         else:
             self.assertGreater(len(results), 0)
 
-    @mock.patch(RUNNERS + "rps.LOG")
-    @mock.patch(RUNNERS + "rps.time")
-    @mock.patch(RUNNERS + "rps.threading.Thread")
-    @mock.patch(RUNNERS + "rps.multiprocessing.Queue")
-    @mock.patch(RUNNERS + "rps.runner")
-    def test__worker_process(self, mock_runner, mock_queue, mock_thread,
-                             mock_time, mock_log):
+    @ddt.data(
+        {"rps_cfg": 10, "moment": 0, "expected": 10.0},
+        {"rps_cfg": 10, "moment": 100, "expected": 10.0},
+        {"rps_cfg": {"start": 1, "end": 10, "step": 2}, "moment": 0,
+         "expected": 1.0},
+        {"rps_cfg": {"start": 1, "end": 10, "step": 2}, "moment": 1.5,
+         "expected": 3.0},
+        {"rps_cfg": {"start": 1, "end": 10, "step": 2}, "moment": 100,
+         "expected": 10.0},
+        {"rps_cfg": {"start": 1, "end": 10, "step": 2, "duration": 5},
+         "moment": 9.9, "expected": 3.0}
+    )
+    @ddt.unpack
+    def test__runs_per_second(self, rps_cfg, moment, expected):
+        self.assertEqual(expected, rps._runs_per_second(rps_cfg, moment))
+
+    def test__schedule(self):
+        schedule = rps._schedule(2000, 1, 0)
+        moments = [next(schedule) for i in range(20000)]
 
-        def time_side():
-            time_side.last += 0.03
-            time_side.count += 1
-            return time_side.last
-        time_side.last = 0
-        time_side.count = 0
+        # NOTE(agent): the schedule does not drift, so the achieved
+        #   rate is exactly the requested one.
+        self.assertEqual(0.0, moments[0])
+        self.assertAlmostEqual(10.0, moments[-1] + 1.0 / 2000, places=6)
 
-        mock_time.time = time_side
+    def test__schedule_is_split_between_processes(self):
+        schedules = [rps._schedule(10, 3, i) for i in range(3)]
+        moments = sorted(next(s) for s in schedules for i in range(10))
 
+        for i, moment in enumerate(moments):
+            self.assertAlmostEqual(i / 10.0, moment)
+
+    def test__schedule_with_steps(self):
+        schedule = rps._schedule(
+            {"start": 2, "end": 4, "step": 2, "duration": 2}, 1, 0)
+        moments = [next(schedule) for i in range(12)]
+
+        # 2 rps for the first 2 seconds, then 4 rps
+        self.assertEqual([0.0, 0.5, 1.0, 1.5, 2.0, 2.25, 2.5], moments[:7])
+        self.assertEqual(3.75, moments[-1])
+
+    def test__acquire_slot(self):
+        slots = six.moves.queue.Queue(maxsize=1)
+        aborted = threading.Event()
+
+        self.assertTrue(rps._acquire_slot(slots, aborted))
+        self.assertTrue(slots.full())
+
+    def test__acquire_slot_aborted(self):
+        slots = six.moves.queue.Queue(maxsize=1)
+        slots.put(None)
+        aborted = threading.Event()
+        timer = threading.Timer(0.05, aborted.set)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertFalse(rps._acquire_slot(slots, aborted))
+
+    @mock.patch(RUNNERS + "rps.LOG")
+    @mock.patch(RUNNERS + "rps._acquire_slot", return_value=True)
+    @mock.patch(RUNNERS + "rps.utils.monotonic")
+    @mock.patch(RUNNERS + "rps.threading")
+    @mock.patch(RUNNERS + "rps.multiprocessing.Queue")
+    @mock.patch(RUNNERS + "rps.runner")
+    def test__worker_process(self, mock_runner, mock_queue, mock_threading,
+                             mock_monotonic, mock__acquire_slot, mock_log):
+        # the process is late for 0.5 seconds starting from 2nd iteration
+        mock_monotonic.side_effect = [0.0, 0.0, 0.0, 0.0, 0.6, 0.6, 0.7,
+                                      0.7, 0.8, 0.8]
+        mock_thread = mock_threading.Thread
         mock_thread_instance = mock.MagicMock(
-            isAlive=mock.MagicMock(return_value=False))
+            is_alive=mock.MagicMock(return_value=True))
         mock_thread.return_value = mock_thread_instance
 
         mock_event = mock.MagicMock(
@@ -179,16 +236,22 @@ class RPSScenarioRunnerTestCase(test.TestCase):
 
         context = {"users": [{"tenant_id": "t1", "credential": "c1",
                               "id": "uuid1"}]}
-        info = {"processes_to_start": 1, "processes_counter": 1}
-        mock_runs_per_second = mock.MagicMock(return_value=10)
+        info = {"processes_to_start": 1, "processes_counter": 0}
 
         rps._worker_process(mock_queue, fake_ram_int, 1, times,
                             max_concurrent, context, "Dummy", "dummy",
                             (), mock_event_queue, mock_event,
-                            mock_runs_per_second, 10, 1,
-                            info)
-
-        self.assertEqual(times, mock_log.debug.call_count)
+                            functools.partial(rps._schedule, 10), info)
+
+        mock_runner._log_worker_info.assert_called_once_with(
+            times=times, schedule=(10,), timeout=1, cls="Dummy",
+            method_name="dummy", args=())
+        self.assertEqual(times, mock__acquire_slot.call_count)
+        slots = mock__acquire_slot.call_args[0][0]
+        self.assertEqual(max_concurrent, slots.maxsize)
+        mock__acquire_slot.assert_called_with(slots, mock_event)
+        mock_event.wait.assert_called_once_with(0.1)
+        self.assertEqual(1, mock_log.debug.call_count)
         self.assertEqual(times + 1, mock_thread.call_count)
         self.assertEqual(times + 1, mock_thread_instance.start.call_count)
         self.assertEqual(times + 1, mock_thread_instance.join.call_count)
@@ -196,34 +259,80 @@ class RPSScenarioRunnerTestCase(test.TestCase):
         # scenario repetition and one more need on "initialization" stage
         # of the thread stuff.
 
-        self.assertEqual(1, mock_time.sleep.call_count)
-        self.assertEqual(2, mock_thread_instance.isAlive.call_count)
-        self.assertEqual(times * 4 - 1, mock_time.time.count)
-
         self.assertEqual(times, mock_runner._get_scenario_context.call_count)
 
-        for i in range(times):
-            scenario_context = mock_runner._get_scenario_context(i, context)
-            call = mock.call(
-                args=(mock_queue, "Dummy", "dummy", scenario_context, (),
-                      mock_event_queue),
-                target=mock_runner._worker_thread,
-            )
-            self.assertIn(call, mock_thread.mock_calls)
+        lags = []
+        for call in mock_thread.mock_calls:
+            if call[2].get("target") is rps._worker_thread:
+                args = call[2]["args"]
+                self.assertEqual(
+                    (mock_queue, "Dummy", "dummy",
+                     mock_runner._get_scenario_context.return_value, (),
+                     mock_event_queue), args[:6])
+                self.assertEqual(slots, args[7])
+                lags.append(round(args[6]["lag"], 6))
+        self.assertEqual([0.0, 0.5, 0.5, 0.5], lags)
+
+    @mock.patch(RUNNERS + "rps.threading")
+    @mock.patch(RUNNERS + "rps.runner")
+    def test__worker_process_until_schedule_is_exhausted(
+            self, mock_runner, mock_threading):
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(return_value=False))
+        schedule = mock.MagicMock(return_value=iter([0, 0, 0]))
+        info = {"processes_to_start": 2, "processes_counter": 1}
+
+        rps._worker_process(mock.MagicMock(), iter(range(10)), 0, None, 3,
+                            {}, "Dummy", "dummy", (), mock.MagicMock(),
+                            mock_event, schedule, info)
+
+        schedule.assert_called_once_with(2, 1)
+        self.assertEqual(3, mock_threading.Thread.call_count)
+
+    @mock.patch(RUNNERS + "rps.threading")
+    @mock.patch(RUNNERS + "rps.runner")
+    def test__worker_process_aborted_while_slots_are_busy(
+            self, mock_runner, mock_threading):
+        mock_event = mock.MagicMock(
+            is_set=mock.MagicMock(side_effect=[False] * 5 + [True] * 5))
+        schedule = mock.MagicMock(return_value=iter([0, 0, 0]))
+        info = {"processes_to_start": 1, "processes_counter": 0}
+
+        rps._worker_process(mock.MagicMock(), iter(range(10)), 0, None, 1,
+                            {}, "Dummy", "dummy", (), mock.MagicMock(),
+                            mock_event, schedule, info)
+
+        # only the first iteration takes the single slot, which is never
+        # freed by the mocked thread
+        self.assertEqual(1, mock_threading.Thread.call_count)
 
     @mock.patch(RUNNERS + "rps.runner._run_scenario_once")
     def test__worker_thread(self, mock__run_scenario_once):
+        mock__run_scenario_once.return_value = {"duration": 1}
         mock_queue = mock.MagicMock()
         mock_event_queue = mock.MagicMock()
+        mock_slots = mock.MagicMock()
         args = ("fake_cls", "fake_method_name", "fake_context_obj", {},
                 mock_event_queue)
 
-        runner._worker_thread(mock_queue, *args)
+        rps._worker_thread(mock_queue, *(args + ({"lag": 0.1}, mock_slots)))
 
-        self.assertEqual(1, mock_queue.put.call_count)
+        mock_queue.put.assert_called_once_with(
+            {"duration": 1, "schedule": {"lag": 0.1}})
+        mock__run_scenario_once.assert_called_once_with(*args)
+        mock_slots.get_nowait.assert_called_once_with()
 
-        expected_calls = [mock.call(*args)]
-        self.assertEqual(expected_calls, mock__run_scenario_once.mock_calls)
+    @mock.patch(RUNNERS + "rps.runner._run_scenario_once")
+    def test__worker_thread_releases_slot_on_failure(
+            self, mock__run_scenario_once):
+        mock__run_scenario_once.side_effect = KeyboardInterrupt
+        mock_slots = mock.MagicMock()
+
+        self.assertRaises(KeyboardInterrupt, rps._worker_thread,
+                          mock.MagicMock(), "fake_cls", "fake_method_name",
+                          "fake_context_obj", {}, mock.MagicMock(), {},
+                          mock_slots)
+        mock_slots.get_nowait.assert_called_once_with()
 
     @ddt.data(
         {
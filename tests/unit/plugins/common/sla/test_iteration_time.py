@@ -81,3 +81,22 @@ class IterationTimeTestCase(test.TestCase):
         self.assertEqual(single_sla.success, merged_sla.success)
         self.assertEqual(single_sla.max_iteration_time,
                          merged_sla.max_iteration_time)
+
+
+class CorrectedIterationTimeTestCase(test.TestCase):
+
+    def test_add_iteration(self):
+        sla_inst = iteration_time.CorrectedIterationTime(4.0)
+        self.assertTrue(sla_inst.add_iteration({"duration": 3.14}))
+        self.assertTrue(sla_inst.add_iteration(
+            {"duration": 2.0, "schedule": {"lag": 1.5}}))
+        self.assertFalse(sla_inst.add_iteration(
+            {"duration": 3.0, "schedule": {"lag": 1.5}}))
+        self.assertEqual(4.5, sla_inst.max_iteration_time)
+        self.assertEqual("Failed", sla_inst.status())
+
+    def test_details(self):
+        sla_inst = iteration_time.CorrectedIterationTime(4.0)
+        sla_inst.add_iteration({"duration": 1.0, "schedule": {"lag": 0.5}})
+        self.assertEqual("Maximum seconds per iteration including start lag "
+                         "1.50s <= 4.00s - Passed", sla_inst.details())
@@ -0,0 +1,71 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import ddt
+
+from rally.plugins.common.sla import max_client_overhead
+from rally.task import sla
+from tests.unit import test
+
+
+@ddt.ddt
+class MaxAverageClientOverheadTestCase(test.TestCase):
+
+    @ddt.data((0, True), (50, True), (100, True), (-1, False), (101, False))
+    @ddt.unpack
+    def test_validate(self, config, valid):
+        results = sla.SLA.validate("max_avg_client_overhead", None, None,
+                                   config)
+        if valid:
+            self.assertEqual([], results)
+        else:
+            self.assertEqual(1, len(results))
+
+    def test_result_no_iterations(self):
+        sla_inst = max_client_overhead.MaxAverageClientOverhead(10)
+        self.assertTrue(sla_inst.result()["success"])
+
+    def test_add_iteration(self):
+        sla_inst = max_client_overhead.MaxAverageClientOverhead(20.0)
+        self.assertTrue(
+            sla_inst.add_iteration({"duration": 2.0, "cpu_duration": 0.2}))
+        self.assertTrue(sla_inst.add_iteration({"duration": 2.0}))
+        self.assertTrue(
+            sla_inst.add_iteration({"duration": 0, "cpu_duration": 0.2}))
+        self.assertFalse(
+            sla_inst.add_iteration({"duration": 1.0, "cpu_duration": 0.4}))
+        self.assertEqual(25.0, sla_inst.avg)
+        self.assertEqual("Failed", sla_inst.status())
+        self.assertEqual(
+            "Average client overhead of one iteration 25.00% <= 20.00% - "
+            "Failed", sla_inst.details())
+
+    def test_merge(self):
+        iterations = [{"duration": 1.0, "cpu_duration": 0.1},
+                      {"duration": 1.0, "cpu_duration": 0.5},
+                      {"duration": 2.0, "cpu_duration": 0.2}]
+        single_sla = max_client_overhead.MaxAverageClientOverhead(20.0)
+        for itr in iterations:
+            single_sla.add_iteration(itr)
+
+        sla1 = max_client_overhead.MaxAverageClientOverhead(20.0)
+        sla2 = max_client_overhead.MaxAverageClientOverhead(20.0)
+        sla1.add_iteration(iterations[0])
+        for itr in iterations[1:]:
+            sla2.add_iteration(itr)
+        sla1.merge(sla2)
+
+        self.assertEqual(single_sla.success, sla1.success)
+        self.assertAlmostEqual(single_sla.avg, sla1.avg)
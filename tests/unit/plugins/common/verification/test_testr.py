@@ -11,11 +11,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime as dt
+import io
 import os
+import shutil
 import subprocess
+import tempfile
 
 import mock
 
+from rally import consts
 from rally import exceptions
 from rally.plugins.common.verification import testr
 from tests.unit import test
@@ -24,6 +29,61 @@ from tests.unit import test
 PATH = "rally.plugins.common.verification.testr"
 
 
+class ShardTestsTestCase(test.TestCase):
+
+    def test_shard_tests(self):
+        tests = ["a.A.test_1", "a.A.test_2[id-1,smoke]", "a.B.test_1",
+                 "a.C.test_1", "a.C.test_2", "a.D.test_1"]
+        durations = {"a.A.test_1": 5.0, "a.A.test_2": 4.0,
+                     "a.B.test_1": 8.0, "a.C.test_1": 1.0}
+        # a.C.test_2 and a.D.test_1 take the average duration (4.5)
+        self.assertEqual(
+            [["a.A.test_1", "a.A.test_2[id-1,smoke]"],
+             ["a.B.test_1"],
+             ["a.C.test_1", "a.C.test_2", "a.D.test_1"]],
+            testr.shard_tests(tests, 3, durations))
+
+    def test_shard_tests_without_durations(self):
+        tests = ["a.A.test_1", "a.A.test_2", "a.B.test_1", "a.C.test_1"]
+        self.assertEqual([["a.A.test_1", "a.A.test_2"],
+                          ["a.B.test_1", "a.C.test_1"]],
+                         testr.shard_tests(tests, 2))
+
+    def test_shard_tests_skips_empty_shards(self):
+        self.assertEqual([["a.A.test_1", "a.A.test_2"]],
+                         testr.shard_tests(["a.A.test_1", "a.A.test_2"], 4))
+
+    @mock.patch("%s.objects.Verification.list" % PATH)
+    def test__get_test_durations(self, mock_verification_list):
+        def fake_verification(status, day, tests):
+            v = mock.Mock(status=status,
+                          created_at=dt.datetime(2017, 1, day))
+            v.get_tests.return_value = dict(
+                (test_id, {"duration": duration})
+                for test_id, duration in tests.items())
+            return v
+
+        statuses = consts.VerificationStatus
+        verifications = [
+            fake_verification(statuses.FINISHED, 1, {"t.A.a": "9.0",
+                                                     "t.A.c": "3.0"}),
+            fake_verification(statuses.FAILED, 3, {"t.A.a[id-1]": "1.5"}),
+            fake_verification(statuses.RUNNING, 5, {"t.A.b": "7.0"}),
+            fake_verification(statuses.FINISHED, 2, {"t.A.a": "2.0",
+                                                     "t.A.b": "0.5"}),
+            fake_verification(statuses.FINISHED, 4, {})]
+        mock_verification_list.return_value = verifications
+
+        self.assertEqual({"t.A.a": 1.5, "t.A.b": 0.5},
+                         testr._get_test_durations("uuid"))
+
+        mock_verification_list.assert_called_once_with("uuid")
+        self.assertFalse(verifications[0].get_tests.called)
+        self.assertFalse(verifications[2].get_tests.called)
+        verifications[1].get_tests.assert_called_once_with(
+            status=["success", "fail", "xfail", "uxsuccess"])
+
+
 class TestrContextTestCase(test.TestCase):
 
     def setUp(self):
@@ -132,6 +192,63 @@ class TestrContextTestCase(test.TestCase):
         ctx.setup()
         self.assertEqualCmd(["--parallel", "foo"], cfg["testr_cmd"])
 
+    @mock.patch("%s._get_test_durations" % PATH)
+    @mock.patch("%s.common_utils.generate_random_path" % PATH)
+    def test_setup_with_shards(self, mock_generate_random_path,
+                               mock__get_test_durations):
+        mock_generate_random_path.side_effect = ["/path/1", "/path/2"]
+        mock__get_test_durations.return_value = {"t.A.a": 5.0, "t.B.a": 1.0}
+        self.verifier.manager.list_tests.return_value = [
+            "t.A.a", "t.A.b", "t.B.a", "t.C.a"]
+        cfg = {"verifier": self.verifier,
+               "run_args": {"shards": 2, "pattern": "t",
+                            "skip_list": {"t.A.b": "reason"}}}
+        ctx = testr.TestrContext(cfg)
+        mock_open = mock.mock_open()
+        with mock.patch("%s.open" % PATH, mock_open):
+            ctx.setup()
+
+        self.verifier.manager.list_tests.assert_called_once_with("t")
+        self.assertFalse(self.verifier.manager.list_failing_tests.called)
+        mock__get_test_durations.assert_called_once_with(self.verifier.uuid)
+        handle = mock_open.return_value
+        self.assertEqual([mock.call("t.A.a"), mock.call("t.B.a\nt.C.a")],
+                         handle.write.call_args_list)
+        get_test_command = self.verifier.manager.get_test_command
+        self.assertEqual([mock.call("/path/1"), mock.call("/path/2")],
+                         get_test_command.call_args_list)
+        self.assertEqual([get_test_command.return_value] * 2,
+                         cfg["testr_cmds"])
+        self.assertEqual(["/path/1", "/path/2"], ctx._tmp_files)
+
+    @mock.patch("%s._get_test_durations" % PATH, return_value={})
+    @mock.patch("%s.common_utils.generate_random_path" % PATH)
+    def test_setup_with_shards_and_failing(self, mock_generate_random_path,
+                                           mock__get_test_durations):
+        self.verifier.manager.list_failing_tests.return_value = [
+            "t.A.b", "t.B.a"]
+        cfg = {"verifier": self.verifier,
+               "run_args": {"shards": 2, "failed": True,
+                            "load_list": ["t.A.a", "t.A.b", "t.B.a"]}}
+        ctx = testr.TestrContext(cfg)
+        mock_open = mock.mock_open()
+        with mock.patch("%s.open" % PATH, mock_open):
+            ctx.setup()
+
+        self.assertFalse(self.verifier.manager.list_tests.called)
+        handle = mock_open.return_value
+        self.assertEqual([mock.call("t.A.b"), mock.call("t.B.a")],
+                         handle.write.call_args_list)
+        self.assertEqual(2, len(cfg["testr_cmds"]))
+
+        # nothing has failed
+        self.verifier.manager.list_failing_tests.return_value = []
+        cfg = {"verifier": self.verifier,
+               "run_args": {"shards": 2, "failed": True,
+                            "load_list": ["t.A.a"]}}
+        testr.TestrContext(cfg).setup()
+        self.assertEqual([], cfg["testr_cmds"])
+
     @mock.patch("%s.os.remove" % PATH)
     @mock.patch("%s.os.path.exists" % PATH)
     def test_cleanup(self, mock_exists, mock_remove):
@@ -236,7 +353,8 @@ class TestrLauncherTestCase(test.TestCase):
         launcher = testr.TestrLauncher(mock.Mock())
         ctx = {"testr_cmd": ["ls", "-la"],
                "run_args": {"xfail_list": mock.Mock(),
-                            "skip_list": mock.Mock()}}
+                            "skip_list": mock.Mock()},
+               "verification": mock.Mock()}
 
         self.assertEqual(mock_parse.return_value, launcher.run(ctx))
 
@@ -250,7 +368,154 @@ class TestrLauncherTestCase(test.TestCase):
             mock_popen.return_value.stdout, live=True,
             expected_failures=ctx["run_args"]["xfail_list"],
             skipped_tests=ctx["run_args"]["skip_list"],
-            logger_name=launcher.verifier.name)
+            logger_name=launcher.verifier.name,
+            on_tests=ctx["verification"].add_tests)
+
+        mock_parse.reset_mock()
+        ctx.pop("verification")
+        launcher.run(ctx)
+        self.assertIsNone(mock_parse.call_args[1]["on_tests"])
+
+    @mock.patch("%s.os.remove" % PATH)
+    @mock.patch("%s.os.path.exists" % PATH, return_value=True)
+    @mock.patch("%s._TeeStream" % PATH)
+    @mock.patch("%s.common_utils.generate_random_path" % PATH)
+    @mock.patch("%s.subunit_v2.parse_streams" % PATH)
+    @mock.patch("%s.subprocess.Popen" % PATH)
+    def test_run_shards(self, mock_popen, mock_parse_streams,
+                        mock_generate_random_path, mock___tee_stream,
+                        mock_exists, mock_remove):
+        launcher = testr.TestrLauncher(mock.Mock())
+        launcher._load_results = mock.Mock()
+        processes = [mock.Mock(), mock.Mock()]
+        mock_popen.side_effect = processes
+        mock_generate_random_path.side_effect = ["/out/1", "/out/2"]
+        streams = [mock.Mock(path="/out/1"), mock.Mock(path="/out/2")]
+        mock___tee_stream.side_effect = streams
+        ctx = {"testr_cmd": ["ls", "-la"],
+               "testr_cmds": ["run 1", "run 2"],
+               "run_args": {"xfail_list": mock.Mock(),
+                            "skip_list": mock.Mock()},
+               "verification": mock.Mock()}
+
+        self.assertEqual(mock_parse_streams.return_value, launcher.run(ctx))
+
+        self.assertEqual([mock.call(cmd, shell=True,
+                                    env=launcher.run_environ,
+                                    cwd=launcher.repo_dir,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT)
+                          for cmd in ctx["testr_cmds"]],
+                         mock_popen.call_args_list)
+        self.assertEqual([mock.call(processes[0].stdout, "/out/1"),
+                          mock.call(processes[1].stdout, "/out/2")],
+                         mock___tee_stream.call_args_list)
+        mock_parse_streams.assert_called_once_with(
+            streams, live=True,
+            expected_failures=ctx["run_args"]["xfail_list"],
+            skipped_tests=ctx["run_args"]["skip_list"],
+            logger_name=launcher.verifier.name,
+            on_tests=ctx["verification"].add_tests)
+        for p in processes:
+            p.wait.assert_called_once_with()
+        launcher._load_results.assert_called_once_with(["/out/1", "/out/2"])
+        self.assertEqual([mock.call("/out/1"), mock.call("/out/2")],
+                         mock_remove.call_args_list)
+
+    @mock.patch("%s.subunit_v2.parse_streams" % PATH)
+    @mock.patch("%s.subprocess.Popen" % PATH)
+    def test_run_shards_without_tests(self, mock_popen, mock_parse_streams):
+        launcher = testr.TestrLauncher(mock.Mock())
+        launcher._load_results = mock.Mock()
+
+        self.assertEqual(mock_parse_streams.return_value,
+                         launcher.run({"testr_cmd": ["ls"],
+                                       "testr_cmds": []}))
+
+        self.assertFalse(mock_popen.called)
+        self.assertEqual([], mock_parse_streams.call_args[0][0])
+        self.assertFalse(launcher._load_results.called)
+
+    @mock.patch("%s.subprocess.Popen" % PATH)
+    def test__load_results(self, mock_popen):
+        launcher = testr.TestrLauncher(mock.Mock())
+        process = mock_popen.return_value
+        process.communicate.return_value = (b"output", None)
+        for returncode in (0, 1, 2):
+            process.returncode = returncode
+            launcher._load_results(["/out/1", "/out/2"])
+        mock_popen.assert_called_with(
+            ["testr", "load", "--partial", "/out/1", "/out/2"],
+            cwd=launcher.repo_dir, env=launcher.environ,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    @mock.patch("%s.subprocess.Popen" % PATH)
+    def test_list_failing_tests(self, mock_popen):
+        launcher = testr.TestrLauncher(mock.Mock())
+        process = mock_popen.return_value
+        process.communicate.return_value = (
+            b"t.A.a\nt.B.b[id-1,smoke]\nsome garbage\n", None)
+        process.returncode = 1
+
+        self.assertEqual(["t.A.a", "t.B.b[id-1,smoke]"],
+                         launcher.list_failing_tests())
+        mock_popen.assert_called_once_with(
+            ["testr", "failing", "--list"], cwd=launcher.repo_dir,
+            env=launcher.environ, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+
+        process.returncode = 3
+        self.assertRaises(exceptions.RallyException,
+                          launcher.list_failing_tests)
+
+    def test_get_test_command(self):
+        repo_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo_dir)
+        launcher = testr.TestrLauncher(mock.Mock())
+
+        with mock.patch.object(testr.TestrLauncher, "repo_dir", repo_dir):
+            self.assertRaises(exceptions.RallyException,
+                              launcher.get_test_command, "/tests")
+
+            with open(os.path.join(repo_dir, ".testr.conf"), "w") as f:
+                f.write("[DEFAULT]\n"
+                        "test_command=OS_TEST_TIMEOUT=${OS_TEST_TIMEOUT:-500}"
+                        " python -m subunit.run discover -t ./ ./tests "
+                        "$LISTOPT $IDOPTION\n"
+                        "test_id_option=--load-list $IDFILE\n"
+                        "test_list_option=--list\n")
+            self.assertEqual(
+                "OS_TEST_TIMEOUT=${OS_TEST_TIMEOUT:-500} python -m "
+                "subunit.run discover -t ./ ./tests  --load-list /tests",
+                launcher.get_test_command("/tests"))
+
+    def test__tee_stream(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, "stream")
+        stream = testr._TeeStream(io.BytesIO(b"abc"), path)
+
+        self.assertEqual(b"a", stream.read(1))
+        self.assertEqual(b"bc", stream.read())
+        self.assertEqual(b"", stream.read(1))
+        stream.close()
+
+        with open(path, "rb") as f:
+            self.assertEqual(b"abc", f.read())
+
+    @mock.patch("%s.manager.VerifierManager.validate_args" % PATH)
+    def test_validate_args(self, mock_verifier_manager_validate_args):
+        launcher = testr.TestrLauncher(mock.Mock())
+
+        launcher.validate_args({"shards": 3})
+        launcher.validate_args({"shards": 1, "concurrency": 2})
+        mock_verifier_manager_validate_args.assert_called_with(
+            {"shards": 1, "concurrency": 2})
+
+        for args in ({"shards": 0}, {"shards": "2"},
+                     {"shards": 2, "concurrency": 2}):
+            self.assertRaises(exceptions.ValidationError,
+                              launcher.validate_args, args)
 
     @mock.patch("%s.manager.VerifierManager.install" % PATH)
     def test_install(self, mock_verifier_manager_install):
@@ -13,6 +13,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
+import fixtures
 import mock
 
 from rally import consts
@@ -137,8 +140,7 @@ class UserGeneratorBaseTestCase(test.ScenarioTestCase):
     def test_cleanup(self):
         user_generator = users.UserGenerator(self.context)
         user_generator._remove_default_security_group = mock.Mock()
-        user_generator._delete_users = mock.Mock()
-        user_generator._delete_tenants = mock.Mock()
+        user_generator.delete_users = mock.Mock()
 
         # In case if existing users nothing should be done
         user_generator.existing_users = [mock.Mock]
@@ -146,8 +148,7 @@ class UserGeneratorBaseTestCase(test.ScenarioTestCase):
         user_generator.cleanup()
 
         self.assertFalse(user_generator._remove_default_security_group.called)
-        self.assertFalse(user_generator._delete_users.called)
-        self.assertFalse(user_generator._delete_tenants.called)
+        self.assertFalse(user_generator.delete_users.called)
 
         # In case when new users were created, the proper cleanup should be
         #   performed
@@ -156,8 +157,7 @@ class UserGeneratorBaseTestCase(test.ScenarioTestCase):
         user_generator.cleanup()
 
         user_generator._remove_default_security_group.assert_called_once_with()
-        user_generator._delete_users.assert_called_once_with()
-        user_generator._delete_tenants.assert_called_once_with()
+        user_generator.delete_users.assert_called_once_with()
 
 
 class UserGeneratorForExistingUsersTestCase(test.ScenarioTestCase):
@@ -350,63 +350,98 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
             admin_neutron.delete_security_group.call_args_list)
 
     @mock.patch("%s.identity" % CTX)
-    def test__create_tenants(self, mock_identity):
-        self.context["config"]["users"]["tenants"] = 1
+    def test__create_tenants_and_users(self, mock_identity):
+        identity_service = mock_identity.Identity.return_value
+        identity_service.create_project.side_effect = [
+            mock.Mock(id="t%d" % i) for i in range(3)]
+        identity_service.create_user.side_effect = [
+            mock.Mock(id="u%d" % i) for i in range(6)]
+        self.context["config"]["users"]["tenants"] = 3
+        self.context["config"]["users"]["users_per_tenant"] = 2
         user_generator = users.UserGenerator(self.context)
-        tenants = user_generator._create_tenants()
-        self.assertEqual(1, len(tenants))
-        id, tenant = tenants.popitem()
-        self.assertIn("name", tenant)
+
+        tenants, users_, stats = user_generator._create_tenants_and_users()
+
+        self.assertEqual({"t0", "t1", "t2"}, set(tenants))
+        for tenant_id, tenant in tenants.items():
+            self.assertEqual(tenant_id, tenant["id"])
+            self.assertIn("name", tenant)
+            self.assertEqual([], tenant["users"])
+        self.assertEqual({"u%d" % i for i in range(6)},
+                         set(u["id"] for u in users_))
+        self.assertEqual({"t0": 2, "t1": 2, "t2": 2},
+                         collections.Counter(u["tenant_id"] for u in users_))
+        for user in users_:
+            self.assertIn("credential", user)
+        self.assertEqual(3, stats["create_project"]["count"])
+        self.assertEqual(6, stats["create_user"]["count"])
 
     @mock.patch("%s.identity" % CTX)
-    def test__create_users(self, mock_identity):
+    def test__create_tenants_and_users_failure(self, mock_identity):
+        identity_service = mock_identity.Identity.return_value
+        identity_service.create_project.side_effect = [
+            mock.Mock(id="t0"), Exception()]
+        self.context["config"]["users"]["tenants"] = 2
         self.context["config"]["users"]["users_per_tenant"] = 2
         user_generator = users.UserGenerator(self.context)
-        user_generator.context["tenants"] = {"t1": {"id": "t1", "name": "t1"},
-                                             "t2": {"id": "t2", "name": "t2"}}
-        users_ = user_generator._create_users()
-        self.assertEqual(4, len(users_))
-        for user in users_:
-            self.assertIn("id", user)
-            self.assertIn("credential", user)
+
+        tenants, users_, stats = user_generator._create_tenants_and_users()
+
+        self.assertEqual(["t0"], list(tenants))
+        self.assertEqual(2, len(users_))
+        self.assertEqual(1, stats["create_project"]["failed"])
 
     @mock.patch("%s.identity" % CTX)
-    def test__delete_tenants(self, mock_identity):
+    def test__delete_tenants_and_users(self, mock_identity):
+        identity_service = mock_identity.Identity.return_value
         user_generator = users.UserGenerator(self.context)
         user_generator.context["tenants"] = {"t1": {"id": "t1", "name": "t1"},
-                                             "t2": {"id": "t2", "name": "t2"}}
-        user_generator._delete_tenants()
-        self.assertEqual(len(user_generator.context["tenants"]), 0)
+                                             "t2": {"id": "t2", "name": "t2"},
+                                             "t3": {"id": "t3", "name": "t3"}}
+        user_generator.context["users"] = [
+            {"id": "u1", "tenant_id": "t1", "credential": mock.Mock()},
+            {"id": "u2", "tenant_id": "t1", "credential": mock.Mock()},
+            {"id": "u3", "tenant_id": "t2", "credential": mock.Mock()}]
+        users_ = list(user_generator.context["users"])
+        deleted = []
+        identity_service.delete_user.side_effect = deleted.append
+        identity_service.delete_project.side_effect = deleted.append
+
+        stats = user_generator._delete_tenants_and_users()
+
+        self.assertEqual(0, len(user_generator.context["tenants"]))
+        self.assertEqual(0, len(user_generator.context["users"]))
+        self.assertEqual({"u1", "u2", "u3", "t1", "t2", "t3"}, set(deleted))
+        # a tenant is deleted only after all its users are deleted
+        self.assertLess(deleted.index("u1"), deleted.index("t1"))
+        self.assertLess(deleted.index("u2"), deleted.index("t1"))
+        self.assertLess(deleted.index("u3"), deleted.index("t2"))
+        self.assertEqual(3, stats["delete_user"]["count"])
+        self.assertEqual(3, stats["delete_project"]["count"])
+        self.assertEqual(
+            [mock.call(u["credential"]) for u in users_],
+            self.osclients.invalidate_shared_cache.call_args_list)
 
     @mock.patch("%s.identity" % CTX)
-    def test__delete_tenants_failure(self, mock_identity):
+    def test__delete_tenants_and_users_failure(self, mock_identity):
         identity_service = mock_identity.Identity.return_value
+        identity_service.delete_user.side_effect = Exception()
         identity_service.delete_project.side_effect = Exception()
         user_generator = users.UserGenerator(self.context)
         user_generator.context["tenants"] = {"t1": {"id": "t1", "name": "t1"},
                                              "t2": {"id": "t2", "name": "t2"}}
-        user_generator._delete_tenants()
-        self.assertEqual(len(user_generator.context["tenants"]), 0)
+        user_generator.context["users"] = [
+            {"id": "u1", "tenant_id": "t1", "credential": mock.Mock()},
+            {"id": "u2", "tenant_id": "t2", "credential": mock.Mock()}]
 
-    @mock.patch("%s.identity" % CTX)
-    def test__delete_users(self, mock_identity):
-        user_generator = users.UserGenerator(self.context)
-        user1 = mock.MagicMock()
-        user2 = mock.MagicMock()
-        user_generator.context["users"] = [user1, user2]
-        user_generator._delete_users()
-        self.assertEqual(len(user_generator.context["users"]), 0)
+        stats = user_generator._delete_tenants_and_users()
 
-    @mock.patch("%s.identity" % CTX)
-    def test__delete_users_failure(self, mock_identity):
-        identity_service = mock_identity.Identity.return_value
-        identity_service.delete_user.side_effect = Exception()
-        user_generator = users.UserGenerator(self.context)
-        user1 = mock.MagicMock()
-        user2 = mock.MagicMock()
-        user_generator.context["users"] = [user1, user2]
-        user_generator._delete_users()
-        self.assertEqual(len(user_generator.context["users"]), 0)
+        self.assertEqual(0, len(user_generator.context["tenants"]))
+        self.assertEqual(0, len(user_generator.context["users"]))
+        # tenants are deleted even if their users are not
+        self.assertEqual(2, identity_service.delete_project.call_count)
+        self.assertEqual(2, stats["delete_user"]["failed"])
+        self.assertEqual(2, stats["delete_project"]["failed"])
 
     @mock.patch("%s.identity" % CTX)
     def test_setup_and_cleanup(self, mock_identity):
@@ -425,7 +460,7 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         self.assertEqual(len(ctx.context["users"]), 0)
         self.assertEqual(len(ctx.context["tenants"]), 0)
 
-    @mock.patch("rally.common.broker.LOG.warning")
+    @mock.patch("%s.LOG.warning" % CTX)
     @mock.patch("%s.identity" % CTX)
     def test_setup_and_cleanup_with_error_during_create_user(
             self, mock_identity, mock_log_warning):
@@ -434,7 +469,7 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         with users.UserGenerator(self.context) as ctx:
                 self.assertRaises(exceptions.ContextSetupFailure, ctx.setup)
                 mock_log_warning.assert_called_with(
-                    "Failed to consume a task from the queue: ")
+                    "Failed to create user: ")
 
         # Ensure that tenants get deleted anyway
         self.assertEqual(0, len(ctx.context["tenants"]))
@@ -509,8 +544,10 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         }
 
         user_generator = users.UserGenerator(config)
-        users_ = user_generator._create_users()
+        user_generator.create_users()
+        users_ = user_generator.context["users"]
 
+        self.assertEqual(2, len(users_))
         for user in users_:
             self.assertEqual("internal", user["credential"].endpoint_type)
 
@@ -531,7 +568,170 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         }
 
         user_generator = users.UserGenerator(config)
-        users_ = user_generator._create_users()
+        user_generator.create_users()
+        users_ = user_generator.context["users"]
 
+        self.assertEqual(2, len(users_))
         for user in users_:
-            self.assertEqual("public", user["credential"].endpoint_type)
+            # the default endpoint type is chosen by clients
+            self.assertIsNone(user["credential"].endpoint_type)
+
+    @mock.patch("%s.identity" % CTX)
+    def test_setup_and_cleanup_saves_execution_stats(self, mock_identity):
+        with users.UserGenerator(self.context) as ctx:
+            ctx.setup()
+
+            stats = ctx.context["context_execution"]["users@openstack"]
+            self.assertEqual(["setup"], list(stats))
+            self.assertEqual(
+                {"create_project", "create_user"},
+                set(stats["setup"]["actions"]))
+            self.assertEqual(self.users_num,
+                             stats["setup"]["actions"]["create_user"]["count"])
+            self.assertIn("duration", stats["setup"])
+
+        stats = ctx.context["context_execution"]["users@openstack"]
+        self.assertEqual({"setup", "cleanup"}, set(stats))
+        self.assertEqual(
+            self.users_num,
+            stats["cleanup"]["actions"]["delete_user"]["count"])
+
+
+class ProvisionerTestCase(test.TestCase):
+
+    class HttpError(Exception):
+        def __init__(self, http_status):
+            super(ProvisionerTestCase.HttpError, self).__init__()
+            self.http_status = http_status
+
+    def setUp(self):
+        super(ProvisionerTestCase, self).setUp()
+        self.osclients = self.useFixture(
+            fixtures.MockPatch("%s.osclients" % CTX)).mock
+        self.identity = self.useFixture(
+            fixtures.MockPatch("%s.identity" % CTX)).mock
+        # NOTE(agent): mocks create return values lazily and it is not
+        #   thread-safe, so the client is created before consumers are started.
+        self.client = mock.Mock()
+        self.identity.Identity.return_value = self.client
+        self.mock_sleep = self.useFixture(
+            fixtures.MockPatch("%s.time.sleep" % CTX)).mock
+
+    def _run(self, provisioner, jobs):
+        results = []
+
+        def publish(put):
+            for func in jobs:
+                put(("foo_action", func, results.append))
+
+        stats = provisioner.run(publish)
+        return results, stats
+
+    def test_run(self):
+        credential = mock.Mock()
+        provisioner = users.Provisioner(credential, 3, retries=0, backoff=0)
+
+        results, stats = self._run(
+            provisioner, [lambda client, i=i: (client, i) for i in range(10)])
+
+        self.assertEqual(list(range(10)), sorted(r[1] for r in results))
+        self.assertEqual({self.client}, set(r[0] for r in results))
+        # identity client is created once per consumer
+        self.assertLessEqual(self.identity.Identity.call_count, 3)
+        self.osclients.Clients.assert_called_with(credential)
+        self.assertEqual(["foo_action"], list(stats))
+        self.assertEqual(10, stats["foo_action"]["count"])
+        self.assertEqual(0, stats["foo_action"]["failed"])
+        self.assertEqual(0, stats["foo_action"]["retries"])
+        self.assertLessEqual(stats["foo_action"]["started_at"],
+                             stats["foo_action"]["finished_at"])
+
+    def test_run_with_failures(self):
+        provisioner = users.Provisioner(mock.Mock(), 2, retries=3, backoff=1)
+
+        def fail(client):
+            raise Exception("Oops")
+
+        results, stats = self._run(provisioner, [fail, lambda client: "ok"])
+
+        self.assertEqual({"ok", None}, set(results))
+        self.assertEqual(2, stats["foo_action"]["count"])
+        self.assertEqual(1, stats["foo_action"]["failed"])
+        # only overloading errors are retried
+        self.assertEqual(0, stats["foo_action"]["retries"])
+        self.assertFalse(self.mock_sleep.called)
+
+    @mock.patch("%s.random.uniform" % CTX)
+    def test_run_retries_on_overload(self, mock_uniform):
+        mock_uniform.side_effect = lambda a, b: b
+        provisioner = users.Provisioner(mock.Mock(), 4, retries=3, backoff=1)
+        func = mock.Mock(side_effect=[self.HttpError(409),
+                                      self.HttpError(503), "ok"])
+
+        results, stats = self._run(provisioner, [func])
+
+        self.assertEqual(["ok"], results)
+        self.assertEqual(3, func.call_count)
+        self.assertEqual([mock.call(1), mock.call(2)],
+                         self.mock_sleep.call_args_list)
+        self.assertEqual(2, stats["foo_action"]["retries"])
+        self.assertEqual(0, stats["foo_action"]["failed"])
+
+    def test_run_retries_exceeded(self):
+        provisioner = users.Provisioner(mock.Mock(), 1, retries=2, backoff=0)
+        func = mock.Mock(side_effect=self.HttpError(503))
+
+        results, stats = self._run(provisioner, [func])
+
+        self.assertEqual([None], results)
+        self.assertEqual(3, func.call_count)
+        self.assertEqual(2, stats["foo_action"]["retries"])
+        self.assertEqual(1, stats["foo_action"]["failed"])
+
+    def test__update_stats(self):
+        provisioner = users.Provisioner(mock.Mock(), 2)
+
+        provisioner._update_stats("foo_action", started_at=2, count=1,
+                                  finished_at=5)
+        provisioner._update_stats("foo_action", started_at=1, count=1,
+                                  failed=1, finished_at=3)
+
+        self.assertEqual({"foo_action": {"count": 2, "failed": 1,
+                                         "retries": 0, "started_at": 1,
+                                         "finished_at": 5}},
+                         provisioner.stats)
+
+    def test_concurrency_limit(self):
+        provisioner = users.Provisioner(mock.Mock(), 8)
+        self.assertEqual(8, provisioner._limit)
+
+        provisioner._acquire()
+        provisioner._release(overloaded=True)
+        self.assertEqual(4, provisioner._limit)
+        provisioner._acquire()
+        provisioner._release(overloaded=True)
+        self.assertEqual(2, provisioner._limit)
+
+        provisioner._acquire()
+        provisioner._release(overloaded=False)
+        self.assertEqual(2.5, provisioner._limit)
+
+        for i in range(100):
+            provisioner._acquire()
+            provisioner._release(overloaded=False)
+        self.assertEqual(8, provisioner._limit)
+
+        for i in range(10):
+            provisioner._acquire()
+            provisioner._release(overloaded=True)
+        self.assertEqual(1, provisioner._limit)
+
+    def test_publish_failure(self):
+        provisioner = users.Provisioner(mock.Mock(), 2)
+
+        def publish(put):
+            put(("foo_action", lambda client: "ok", None))
+            raise Exception("Oops")
+
+        stats = provisioner.run(publish)
+        self.assertEqual(1, stats["foo_action"]["count"])
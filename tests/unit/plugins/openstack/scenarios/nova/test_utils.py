@@ -80,6 +80,42 @@ class NovaScenarioTestCase(test.ScenarioTestCase):
         # balance again, get net 1
         self.assertEqual(nic3, [{"net-id": "net_id_1"}])
 
+    @mock.patch("rally.task.utils.get_from_watcher")
+    @mock.patch("rally.task.utils.get_status_watcher")
+    def test__get_server_updater(self, mock_get_status_watcher,
+                                 mock_get_from_watcher):
+        context = {"tenant": {"id": "tenant_id"}}
+        context.update(self.context)
+        nova_scenario = utils.NovaScenario(context=context)
+
+        # bulk polling is disabled by default
+        self.assertEqual(self.mock_get_from_manager.mock.return_value,
+                         nova_scenario._get_server_updater(2, 300))
+        self.assertFalse(mock_get_status_watcher.called)
+
+        CONF.set_override("nova_server_bulk_polling", True, "benchmark")
+        self.addCleanup(CONF.clear_override, "nova_server_bulk_polling",
+                        "benchmark")
+        self.assertEqual(mock_get_from_watcher.return_value,
+                         nova_scenario._get_server_updater(2, 300))
+        nova = self.clients("nova")
+        mock_get_status_watcher.assert_called_once_with(
+            ("nova_servers", "tenant_id", nova, 2), mock.ANY,
+            min_interval=2,
+            max_interval=(
+                CONF.benchmark.nova_server_bulk_polling_max_interval))
+        mock_get_from_watcher.assert_called_once_with(
+            mock_get_status_watcher.return_value, timeout=300)
+
+        list_resources = mock_get_status_watcher.call_args[0][1]
+        self.assertEqual(nova.servers.list.return_value,
+                         list_resources(["id"]))
+
+        # there is no tenant of servers
+        nova_scenario = utils.NovaScenario(context=self.context)
+        self.assertEqual(self.mock_get_from_manager.mock.return_value,
+                         nova_scenario._get_server_updater(2, 300))
+
     @ddt.data(
         {},
         {"kwargs": {"auto_assign_nic": True}},
@@ -113,6 +113,37 @@ class VMScenarioTestCase(test.ScenarioTestCase):
             timeout=CONF.benchmark.vm_ping_timeout,
             check_interval=CONF.benchmark.vm_ping_poll_interval)
 
+    @mock.patch("%s.sshutils.execute_on_hosts" % VMTASKS_UTILS)
+    def test__run_command_on_servers(self, mock_execute_on_hosts):
+        mock_execute_on_hosts.return_value = iter([
+            {"host": "h1", "status": 0, "error": None, "duration": 1.0},
+            {"host": "h2", "status": 2, "error": None, "duration": 2.0},
+            {"host": "h3", "status": None, "error": "SSHError: e",
+             "duration": 6.0}])
+        vm_scenario = utils.VMScenario(self.context)
+
+        results = vm_scenario._run_command_on_servers(
+            ["ssh1", "ssh2", "ssh3"], "cmd", stdin="in", concurrency=2)
+
+        self.assertEqual(["h1", "h2", "h3"], [r["host"] for r in results])
+        mock_execute_on_hosts.assert_called_once_with(
+            ["ssh1", "ssh2", "ssh3"], "cmd", stdin="in", timeout=3600,
+            concurrency=2)
+        additive = vm_scenario._output["additive"]
+        self.assertEqual([["min", 1.0], ["avg", 3.0], ["max", 6.0]],
+                         additive[0]["data"])
+        self.assertEqual([["succeeded", 1], ["failed", 2]],
+                         additive[1]["data"])
+        self._test_atomic_action_timer(vm_scenario.atomic_actions(),
+                                       "vm.run_command_on_servers")
+
+    @mock.patch("%s.sshutils.execute_on_hosts" % VMTASKS_UTILS)
+    def test__run_command_on_no_servers(self, mock_execute_on_hosts):
+        mock_execute_on_hosts.return_value = iter([])
+        vm_scenario = utils.VMScenario(self.context)
+        self.assertEqual([], vm_scenario._run_command_on_servers([], "cmd"))
+        self.assertEqual([], vm_scenario._output["additive"])
+
     @mock.patch(VMTASKS_UTILS + ".VMScenario._run_command_over_ssh")
     @mock.patch("rally.common.sshutils.SSH")
     def test__run_command(self, mock_sshutils_ssh,
@@ -130,6 +161,7 @@ class VMScenarioTestCase(test.ScenarioTestCase):
         mock_vm_scenario__run_command_over_ssh.assert_called_once_with(
             mock_sshutils_ssh.return_value,
             {"script_file": "foo", "interpreter": "bar"})
+        mock_sshutils_ssh.return_value.close.assert_called_once_with()
 
     def get_scenario(self):
         server = mock.Mock(
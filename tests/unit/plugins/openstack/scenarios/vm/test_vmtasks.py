@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 import ddt
 import mock
 
@@ -255,15 +257,9 @@ class VMTasksTestCase(test.ScenarioTestCase):
                           "StdOut:", "{\"foo\": 42}"],
                       "title": "Script Output"})
 
-    @mock.patch("%s.heat" % BASE)
-    @mock.patch("%s.sshutils" % BASE)
-    def test_runcommand_heat(self, mock_sshutils, mock_heat):
-        fake_ssh = mock.Mock()
-        fake_ssh.execute.return_value = [0, "key:val", ""]
-        mock_sshutils.SSH.return_value = fake_ssh
+    def _get_runcommand_heat_scenario(self, mock_heat, outputs):
         fake_stack = mock.Mock()
-        fake_stack.stack.outputs = [{"output_key": "gate_node",
-                                     "output_value": "ok"}]
+        fake_stack.stack.outputs = outputs
         mock_heat.main.Stack.return_value = fake_stack
         context = {
             "user": {"keypair": {"name": "name", "private": "pk"},
@@ -273,14 +269,95 @@ class VMTasksTestCase(test.ScenarioTestCase):
         scenario = vmtasks.RuncommandHeat(context)
         scenario.generate_random_name = mock.Mock(return_value="name")
         scenario.add_output = mock.Mock()
+        scenario._run_command_on_servers = mock.Mock()
+        return scenario
+
+    @mock.patch("%s.heat" % BASE)
+    @mock.patch("%s.sshutils" % BASE)
+    def test_runcommand_heat(self, mock_sshutils, mock_heat):
+        outputs = [{"output_key": "gate_node", "output_value": "ok"}]
+        scenario = self._get_runcommand_heat_scenario(mock_heat, outputs)
+        mock_sshutils.execute_on_hosts.return_value = [
+            {"host": "ok", "error": None}]
+        scenario._run_command_on_servers.return_value = [
+            {"host": "ok", "error": None, "stdout": "key:val",
+             "stderr": ""}]
         workload = {"username": "admin",
                     "resource": ["foo", "bar"]}
         scenario.run(workload, "template",
                      {"file_key": "file_value"},
                      {"param_key": "param_value"})
+
+        mock_sshutils.SSH.assert_called_once_with("admin", "ok", pkey="pk")
+        fake_ssh = mock_sshutils.SSH.return_value
+        fake_ssh.wait.assert_called_once_with()
+        mock_sshutils.execute_on_hosts.assert_called_once_with(
+            [fake_ssh],
+            "cat > /tmp/.rally-workload && chmod +x /tmp/.rally-workload",
+            stdin=None)
+        scenario._run_command_on_servers.assert_called_once_with(
+            [fake_ssh], "/tmp/.rally-workload",
+            stdin=json.dumps(outputs))
+        fake_ssh.close.assert_called_once_with()
         expected = {"chart_plugin": "Table",
                     "data": {"rows": [["key", "val"]],
                              "cols": ["key", "value"]},
                     "description": "Data generated by workload",
                     "title": "Workload summary"}
         scenario.add_output.assert_called_once_with(complete=expected)
+
+    @mock.patch("%s.heat" % BASE)
+    @mock.patch("%s.sshutils" % BASE)
+    def test_runcommand_heat_on_several_gate_nodes(self, mock_sshutils,
+                                                   mock_heat):
+        outputs = [{"output_key": "gate_nodes",
+                    "output_value": ["1.1.1.1", "2.2.2.2"]}]
+        scenario = self._get_runcommand_heat_scenario(mock_heat, outputs)
+        ssh_objects = [mock.Mock(), mock.Mock()]
+        mock_sshutils.SSH.side_effect = ssh_objects
+        mock_sshutils.execute_on_hosts.return_value = []
+        # results are ordered by the time commands finish
+        scenario._run_command_on_servers.return_value = [
+            {"host": "2.2.2.2", "error": None, "stdout": "rate:2",
+             "stderr": ""},
+            {"host": "1.1.1.1", "error": None, "stdout": "rate:1",
+             "stderr": ""}]
+        scenario.run({"username": "admin", "resource": ["foo", "bar"]},
+                     "template", {}, {})
+
+        self.assertEqual([mock.call("admin", "1.1.1.1", pkey="pk"),
+                          mock.call("admin", "2.2.2.2", pkey="pk")],
+                         mock_sshutils.SSH.call_args_list)
+        for ssh in ssh_objects:
+            ssh.close.assert_called_once_with()
+        self.assertEqual(
+            [("Workload summary of 1.1.1.1", [["rate", "1"]]),
+             ("Workload summary of 2.2.2.2", [["rate", "2"]])],
+            [(c[1]["complete"]["title"], c[1]["complete"]["data"]["rows"])
+             for c in scenario.add_output.call_args_list])
+
+    @ddt.data({"outputs": [], "upload_error": None, "run_error": None},
+              {"outputs": [{"output_key": "gate_node",
+                            "output_value": "ok"}],
+               "upload_error": "SSHError: foo", "run_error": None},
+              {"outputs": [{"output_key": "gate_node",
+                            "output_value": "ok"}],
+               "upload_error": None, "run_error": "SSHError: foo"})
+    @ddt.unpack
+    @mock.patch("%s.heat" % BASE)
+    @mock.patch("%s.sshutils" % BASE)
+    def test_runcommand_heat_fails(self, mock_sshutils, mock_heat, outputs,
+                                   upload_error, run_error):
+        scenario = self._get_runcommand_heat_scenario(mock_heat, outputs)
+        mock_sshutils.execute_on_hosts.return_value = [
+            {"host": "ok", "error": upload_error}]
+        scenario._run_command_on_servers.return_value = [
+            {"host": "ok", "error": run_error, "stdout": "",
+             "stderr": ""}]
+
+        self.assertRaises(exceptions.ScriptError, scenario.run,
+                          {"username": "admin", "resource": ["foo", "bar"]},
+                          "template", {}, {})
+        self.assertFalse(scenario.add_output.called)
+        self.assertEqual(len(outputs),
+                         mock_sshutils.SSH.return_value.close.call_count)
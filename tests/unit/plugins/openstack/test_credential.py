@@ -52,7 +52,7 @@ class OpenStackCredentialTestCase(test.TestCase):
     def test_verify_connection_admin(self, mock_clients):
         self.credential.verify_connection()
         mock_clients.assert_called_once_with(
-            self.credential, api_info=None, cache={})
+            self.credential, api_info=None)
         mock_clients.return_value.verified_keystone.assert_called_once_with()
 
     @mock.patch("rally.osclients.Clients")
@@ -60,7 +60,7 @@ class OpenStackCredentialTestCase(test.TestCase):
         self.credential.permission = consts.EndpointPermission.USER
         self.credential.verify_connection()
         mock_clients.assert_called_once_with(
-            self.credential, api_info=None, cache={})
+            self.credential, api_info=None)
         mock_clients.return_value.keystone.assert_called_once_with()
 
     @mock.patch("rally.osclients.Clients")
@@ -69,7 +69,7 @@ class OpenStackCredentialTestCase(test.TestCase):
                                                            "volume": "cinder"}
         result = self.credential.list_services()
         mock_clients.assert_called_once_with(
-            self.credential, api_info=None, cache={})
+            self.credential, api_info=None)
         mock_clients.return_value.services.assert_called_once_with()
         self.assertEqual([{"name": "cinder", "type": "volume"},
                           {"name": "nova", "type": "compute"}], result)
@@ -78,7 +78,7 @@ class OpenStackCredentialTestCase(test.TestCase):
     def test_clients(self, mock_clients):
         clients = self.credential.clients(api_info="fake_info")
         mock_clients.assert_called_once_with(
-            self.credential, api_info="fake_info", cache={})
+            self.credential, api_info="fake_info")
         self.assertIs(mock_clients.return_value, clients)
 
 
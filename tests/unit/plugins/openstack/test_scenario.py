@@ -15,6 +15,7 @@
 import ddt
 import fixtures
 import mock
+from oslo_config import cfg
 
 from rally.plugins.openstack.credential import OpenStackCredential
 from rally.plugins.openstack import scenario as base_scenario
@@ -105,19 +106,48 @@ class OpenStackScenarioTestCase(test.TestCase):
               ([("admin", CREDENTIAL_WITHOUT_HMAC),
                 ("user", CREDENTIAL_WITHOUT_HMAC)], 0))
     @ddt.unpack
-    @mock.patch("rally.plugins.openstack.scenario.profiler.init")
-    @mock.patch("rally.plugins.openstack.scenario.profiler.get")
+    @mock.patch("rally.plugins.openstack.scenario.tracing.start")
     def test_profiler_init(self, users_credentials,
                            expected_call_count,
-                           mock_profiler_get,
-                           mock_profiler_init):
+                           mock_start):
+        mock_start.return_value = "trace_id"
         for user, credential in users_credentials:
             self.context.update({user: {"credential": credential}})
-        base_scenario.OpenStackScenario(self.context)
-        self.assertEqual(expected_call_count,
-                         mock_profiler_init.call_count)
-        self.assertEqual([mock.call()] * expected_call_count,
-                         mock_profiler_get.call_args_list)
+        scenario = base_scenario.OpenStackScenario(self.context)
+        self.assertEqual(
+            [mock.call("test_profiler_hmac_key", 1, trace_url=None,
+                       connection_string=None)]
+            * expected_call_count,
+            mock_start.call_args_list)
+        if expected_call_count:
+            self.assertEqual(["trace_id"],
+                             scenario._output["complete"][0]["data"])
+
+    @mock.patch("rally.plugins.openstack.scenario.tracing.start")
+    def test_profiler_init_with_sampling(self, mock_start):
+        cfg.CONF.set_override("profiler_sampling_rate", 0.25, "benchmark")
+        self.addCleanup(cfg.CONF.clear_override, "profiler_sampling_rate",
+                        "benchmark")
+        cfg.CONF.set_override("profiler_trace_url", "http://t/{trace_id}",
+                              "benchmark")
+        self.addCleanup(cfg.CONF.clear_override, "profiler_trace_url",
+                        "benchmark")
+        cfg.CONF.set_override("profiler_connection_string", "redis://",
+                              "benchmark")
+        self.addCleanup(cfg.CONF.clear_override,
+                        "profiler_connection_string", "benchmark")
+        mock_start.return_value = "trace_id"
+        self.context["user"] = {"credential": CREDENTIAL_WITH_HMAC}
+        for iteration in range(1, 10):
+            self.context["iteration"] = iteration
+            base_scenario.OpenStackScenario(self.context)
+        self.assertEqual([mock.call("test_profiler_hmac_key", 4,
+                                    trace_url="http://t/{trace_id}",
+                                    connection_string="redis://"),
+                          mock.call("test_profiler_hmac_key", 8,
+                                    trace_url="http://t/{trace_id}",
+                                    connection_string="redis://")],
+                         mock_start.call_args_list)
 
     def test__choose_user_random(self):
         users = [{"credential": mock.Mock(), "tenant_id": "foo"}
@@ -602,6 +602,74 @@ class MainStatsTableTestCase(test.TestCase):
                        "name": "total",
                        "success": "50.0%"}}, table.to_dict())
 
+    def test_add_iteration_and_render_with_http(self):
+        table = charts.MainStatsTable(
+            {"total_iteration_count": 2, "statistics": {
+                "atomics": collections.OrderedDict([("foo", {}),
+                                                    ("bar", {})])}})
+
+        def http(requests, duration, size, retries):
+            return {"requests": requests, "bytes": size, "retries": retries,
+                    "methods": {"GET": {"count": requests,
+                                        "duration": duration}}}
+
+        data = [generate_iteration(10.0, False, ("foo", 1.0), ("bar", 2.0)),
+                generate_iteration(20.0, True, ("foo", 2.0), ("bar", 2.0))]
+        data[0]["atomic_actions"][0]["http"] = http(2, 1.0, 2048, 0)
+        data[1]["atomic_actions"][0]["http"] = http(4, 4.0, 1024, 2)
+        for el in data:
+            table.add_iteration(el)
+
+        self.assertEqual(
+            {"cols": ["Action", "Min (sec)", "Median (sec)", "90%ile (sec)",
+                      "95%ile (sec)", "Max (sec)", "Avg (sec)", "Success",
+                      "Count", "HTTP requests", "HTTP latency (sec)",
+                      "HTTP KB", "HTTP retries"],
+             "rows": [
+                 ["foo", 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, "50.0%", 2,
+                  3.0, 0.75, 1.5, 1.0],
+                 ["bar", 2.0, 2.0, 2.0, 2.0, 2.0, 2.0, "50.0%", 2,
+                  "n/a", "n/a", "n/a", "n/a"],
+                 ["total", 10.0, 10.0, 10.0, 10.0, 10.0, 10.0, "50.0%", 2,
+                  3.0, 0.75, 1.5, 1.0]]},
+            table.render())
+        self.assertEqual(
+            {"http_requests": 3.0, "http_latency": 0.75, "http_kb": 1.5,
+             "http_retries": 1.0},
+            dict((k, v) for k, v in table.to_dict()["total"].items()
+                 if k.startswith("http")))
+
+    def test_add_iteration_and_render_with_schedule(self):
+        table = charts.MainStatsTable(
+            {"total_iteration_count": 3, "statistics": {
+                "atomics": collections.OrderedDict([("foo", {})])}})
+        data = [generate_iteration(2.0, False, ("foo", 1.0)),
+                generate_iteration(4.0, False, ("foo", 3.0)),
+                generate_iteration(6.0, True, ("foo", 5.0))]
+        for itr, lag in zip(data, (0.0, 1.0, 2.0)):
+            itr["schedule"] = {"intended_start": 0.0, "actual_start": lag,
+                               "lag": lag}
+            table.add_iteration(itr)
+
+        self.assertEqual(
+            [["foo", 1.0, 2.0, 2.8, 2.9, 3.0, 2.0, "66.7%", 3],
+             ["total", 2.0, 3.0, 3.8, 3.9, 4.0, 3.0, "66.7%", 3],
+             ["total (lag-corrected)", 2.0, 3.5, 4.7, 4.85, 5.0, 3.5,
+              "66.7%", 3]],
+            table.render()["rows"])
+        stats = table.to_dict()
+        self.assertEqual(["foo"], [a["name"] for a in stats["atomics"]])
+        self.assertEqual({"name": "total (lag-corrected)", "min": 2.0,
+                          "median": 3.5, "90%ile": 4.7, "95%ile": 4.85,
+                          "max": 5.0, "avg": 3.5, "success": "66.7%",
+                          "count": 3}, stats["corrected_total"])
+
+    def test_to_dict_without_schedule(self):
+        table = charts.MainStatsTable(
+            {"total_iteration_count": 1, "statistics": {"atomics": {}}})
+        table.add_iteration(generate_iteration(1.0, False))
+        self.assertNotIn("corrected_total", table.to_dict())
+
 
 class OutputChartTestCase(test.TestCase):
 
@@ -80,9 +80,103 @@ class PlotTestCase(test.TestCase):
              "complete_output": [[], [], [], [], [], [], [], [], [], []],
              "has_output": False,
              "output_errors": [],
+             "traces": [],
+             "client_overhead": None,
              "sla": {}, "sla_success": True, "table": "main_stats"},
             result)
 
+    @mock.patch(PLOT + "charts.MainStackedAreaChart")
+    def test__process_workload_compacted(self, mock_main_stacked_area_chart):
+        durations = {
+            "atomics": [{"name": "foo_action", "min": 1.0, "median": 1.5,
+                         "90%ile": 1.9, "95%ile": 1.95, "max": 2.0,
+                         "avg": 1.5, "success": "70.0%", "count": 10}],
+            "total": {"name": "total", "min": 2.0, "median": 2.5,
+                      "90%ile": 2.9, "95%ile": 2.95, "max": 3.0,
+                      "avg": 2.5, "success": "70.0%", "count": 10}}
+        iterations = [
+            {"timestamp": i + 2, "error": [], "duration": i + 2,
+             "idle_duration": 0, "output": {"additive": [], "complete": []},
+             "atomic_actions": [{"name": "foo_action", "children": [],
+                                 "started_at": i + 2,
+                                 "finished_at": i + 3}]} for i in range(2)]
+        workload = {
+            "data": iterations, "sla": {}, "pass_sla": True,
+            "name": "Foo.bar", "runner": {"type": "constant"},
+            "statistics": {
+                "durations": durations,
+                "atomics": {"foo_action": {"max_duration": 2,
+                                           "min_duration": 1,
+                                           "count": 1}},
+                "compaction": {"stored_iterations": 2, "archive": None}},
+            "full_duration": 40, "load_duration": 32,
+            "total_iteration_count": 10, "failed_iteration_count": 3,
+            "max_duration": 3, "min_duration": 2, "start_time": 2,
+            "created_at": "xxx_time", "hooks": []}
+
+        result = plot._process_workload(
+            workload, {"runner": {"type": "constant"}}, 0)
+
+        self.assertEqual(
+            2, mock_main_stacked_area_chart.call_args[0][0][
+                "total_iteration_count"])
+        self.assertEqual(10, result["iterations_count"])
+        self.assertEqual([("success", 7), ("errors", 3)],
+                         result["iterations"]["pie"])
+        self.assertEqual(
+            {"cols": plot.charts.MainStatsTable.columns,
+             "rows": [["foo_action", 1.0, 1.5, 1.9, 1.95, 2.0, 1.5,
+                       "70.0%", 10],
+                      ["total", 2.0, 2.5, 2.9, 2.95, 3.0, 2.5,
+                       "70.0%", 10]]},
+            result["table"])
+
+    def test__render_durations_with_http(self):
+        stats = {"name": "total", "min": 2.0, "median": 2.5, "90%ile": 2.9,
+                 "95%ile": 2.95, "max": 3.0, "avg": 2.5, "success": "100.0%",
+                 "count": 1, "http_requests": 2, "http_latency": 0.1,
+                 "http_kb": 1.5, "http_retries": 0}
+        self.assertEqual(
+            {"cols": (plot.charts.MainStatsTable.columns
+                      + plot.charts.MainStatsTable.http_columns),
+             "rows": [["total", 2.0, 2.5, 2.9, 2.95, 3.0, 2.5, "100.0%", 1,
+                       2, 0.1, 1.5, 0]]},
+            plot._render_durations({"atomics": [], "total": stats}))
+
+    def test__render_durations_with_corrected_total(self):
+        stats = {"name": "total", "min": 2.0, "median": 2.5, "90%ile": 2.9,
+                 "95%ile": 2.95, "max": 3.0, "avg": 2.5, "success": "100.0%",
+                 "count": 2}
+        corrected = dict(stats, name="total (lag-corrected)", max=4.0)
+        self.assertEqual(
+            {"cols": plot.charts.MainStatsTable.columns,
+             "rows": [["total", 2.0, 2.5, 2.9, 2.95, 3.0, 2.5, "100.0%", 2],
+                      ["total (lag-corrected)", 2.0, 2.5, 2.9, 2.95, 4.0, 2.5,
+                       "100.0%", 2]]},
+            plot._render_durations({"atomics": [], "total": stats,
+                                    "corrected_total": corrected}))
+
+    def test__process_traces(self):
+        self.assertEqual([], plot._process_traces({}))
+
+        traces = [{"iteration": i, "duration": d, "error": i == 2,
+                   "trace_id": "trace-%d" % i,
+                   "url": "http://example.com/trace-%d" % i,
+                   "atomic_actions": [{"name": "foo",
+                                       "span_id": "span-%d" % i}]}
+                  for i, d in enumerate((1.11111, 3.33333, 2.22222), 1)]
+        with mock.patch(PLOT + "SLOWEST_TRACES_COUNT", 2):
+            result = plot._process_traces(
+                {"profiling_data": {"traces": traces}})
+        self.assertEqual(
+            [{"iteration": 2, "duration": 3.333, "error": True,
+              "trace_id": "trace-2", "url": "http://example.com/trace-2",
+              "atomic_actions": [{"name": "foo", "span_id": "span-2"}]},
+             {"iteration": 3, "duration": 2.222, "error": False,
+              "trace_id": "trace-3", "url": "http://example.com/trace-3",
+              "atomic_actions": [{"name": "foo", "span_id": "span-3"}]}],
+            result)
+
     @ddt.data(
         {"hooks": [], "expected": []},
         {"hooks": [
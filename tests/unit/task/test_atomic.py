@@ -28,8 +28,10 @@ class ActionTimerMixinTestCase(test.TestCase):
 
 class AtomicActionTestCase(test.TestCase):
 
-    @mock.patch("time.time", side_effect=[1, 3, 6, 10, 15, 21])
-    def test_action_timer_context(self, mock_time):
+    @mock.patch("rally.common.utils.perf_counter",
+                side_effect=[1, 3, 6, 10, 15, 21])
+    @mock.patch("time.time", side_effect=[1, 3, 6])
+    def test_action_timer_context(self, mock_time, mock_perf_counter):
         inst = atomic.ActionTimerMixin()
 
         with atomic.ActionTimer(inst, "test"):
@@ -50,8 +52,23 @@ class AtomicActionTestCase(test.TestCase):
         self.assertEqual(expected,
                          inst.atomic_actions())
 
-    @mock.patch("time.time", side_effect=[1, 3])
-    def test_action_timer_context_with_exception(self, mock_time):
+    @mock.patch("rally.task.atomic.tracing")
+    def test_action_timer_context_traced(self, mock_tracing):
+        inst = atomic.ActionTimerMixin()
+        mock_tracing.start_atomic_action.side_effect = [True, False]
+
+        with atomic.ActionTimer(inst, "test"):
+            with atomic.ActionTimer(inst, "some"):
+                pass
+
+        self.assertEqual([mock.call("test"), mock.call("some")],
+                         mock_tracing.start_atomic_action.call_args_list)
+        mock_tracing.stop_atomic_action.assert_called_once_with()
+
+    @mock.patch("rally.common.utils.perf_counter", side_effect=[1, 3])
+    @mock.patch("time.time", side_effect=[1])
+    def test_action_timer_context_with_exception(self, mock_time,
+                                                 mock_perf_counter):
         inst = atomic.ActionTimerMixin()
 
         class TestException(Exception):
@@ -67,8 +84,9 @@ class AtomicActionTestCase(test.TestCase):
                            "started_at": 1, "finished_at": 3}],
                          inst.atomic_actions())
 
-    @mock.patch("time.time", side_effect=[1, 3])
-    def test_action_timer_decorator(self, mock_time):
+    @mock.patch("rally.common.utils.perf_counter", side_effect=[1, 3])
+    @mock.patch("time.time", side_effect=[1])
+    def test_action_timer_decorator(self, mock_time, mock_perf_counter):
 
         class Some(atomic.ActionTimerMixin):
 
@@ -82,8 +100,10 @@ class AtomicActionTestCase(test.TestCase):
                            "started_at": 1, "finished_at": 3}],
                          inst.atomic_actions())
 
-    @mock.patch("time.time", side_effect=[1, 3])
-    def test_action_timer_decorator_with_exception(self, mock_time):
+    @mock.patch("rally.common.utils.perf_counter", side_effect=[1, 3])
+    @mock.patch("time.time", side_effect=[1])
+    def test_action_timer_decorator_with_exception(self, mock_time,
+                                                   mock_perf_counter):
 
         class TestException(Exception):
             pass
@@ -101,8 +121,11 @@ class AtomicActionTestCase(test.TestCase):
                          inst.atomic_actions())
 
     @mock.patch("rally.task.atomic.LOG.warning")
-    @mock.patch("time.time", side_effect=[1, 3, 1, 3])
+    @mock.patch("rally.common.utils.perf_counter",
+                side_effect=[1, 3, 1, 3])
+    @mock.patch("time.time", side_effect=[1, 1])
     def test_optional_action_timer_decorator(self, mock_time,
+                                             mock_perf_counter,
                                              mock_log_warning):
 
         class TestAtomicTimer(atomic.ActionTimerMixin):
@@ -147,3 +170,67 @@ class AtomicActionTestCase(test.TestCase):
              {"name": "bar", "started_at": 8, "finished_at": 11}])
         result = list(result.items())
         self.assertEqual(expected, result)
+
+    @staticmethod
+    def _make_response(method, url, status=200, elapsed=0.5, size="100"):
+        response = mock.Mock(status_code=status,
+                             headers={"Content-Length": size} if size else {})
+        response.request.method = method
+        response.request.url = url
+        response.elapsed.total_seconds.return_value = elapsed
+        return response
+
+    def test_http_response_hook(self):
+        inst = atomic.ActionTimerMixin()
+
+        atomic.http_response_hook(self._make_response("GET", "/foo"))
+        with atomic.ActionTimer(inst, "test"):
+            atomic.http_response_hook(
+                self._make_response("POST", "/foo", status=503))
+            atomic.http_response_hook(
+                self._make_response("POST", "/foo", elapsed=1.5))
+            with atomic.ActionTimer(inst, "some"):
+                atomic.http_response_hook(
+                    self._make_response("GET", "/foo", size=None))
+            atomic.http_response_hook(self._make_response("GET", "/foo"))
+        atomic.http_response_hook(self._make_response("GET", "/foo"))
+
+        actions = inst.atomic_actions()
+        self.assertEqual({"requests": 3, "bytes": 300, "retries": 1,
+                          "methods": {"POST": {"count": 2, "duration": 2.0},
+                                      "GET": {"count": 1, "duration": 0.5}}},
+                         actions[0]["http"])
+        self.assertEqual({"requests": 1, "bytes": 0, "retries": 0,
+                          "methods": {"GET": {"count": 1, "duration": 0.5}}},
+                         actions[0]["children"][0]["http"])
+        self.assertEqual([], atomic._get_actions_stack())
+
+    def test_merge_http_stats(self):
+        actions = [
+            {"name": "foo", "children": [
+                {"name": "bar", "children": [],
+                 "http": {"requests": 2, "bytes": 10, "retries": 1,
+                          "methods": {"GET": {"count": 2,
+                                              "duration": 1.0}}}}],
+             "http": {"requests": 1, "bytes": 5, "retries": 0,
+                      "methods": {"POST": {"count": 1, "duration": 2.0}}}},
+            {"name": "spam", "children": []}]
+        self.assertEqual(
+            {"requests": 3, "bytes": 15, "retries": 1,
+             "methods": {"GET": {"count": 2, "duration": 1.0},
+                         "POST": {"count": 1, "duration": 2.0}}},
+            atomic.merge_http_stats(actions))
+
+    def test_http_output(self):
+        self.assertEqual([], atomic.http_output([{"name": "foo",
+                                                  "children": []}]))
+        output = atomic.http_output([
+            {"name": "foo", "children": [],
+             "http": {"requests": 3, "bytes": 10, "retries": 1,
+                      "methods": {"POST": {"count": 1, "duration": 2.0},
+                                  "GET": {"count": 2, "duration": 1.0}}}}])
+        self.assertEqual(["HTTP requests", "HTTP latency"],
+                         [o["title"] for o in output])
+        self.assertEqual([["GET", 2], ["POST", 1], ["retries", 1]],
+                         output[0]["data"])
+        self.assertEqual([["GET", 0.5], ["POST", 2.0]], output[1]["data"])
@@ -0,0 +1,202 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import multiprocessing
+import os
+
+import mock
+
+from rally import exceptions
+from rally.plugins.common.scenarios.dummy import dummy  # noqa
+from rally.task import distributed
+from tests.unit import test
+
+
+DISTRIBUTED = "rally.task.distributed."
+
+
+def _serve_agent(conn):
+    """Run an agent in a separate process and report its address."""
+    with mock.patch(DISTRIBUTED + "objects.Worker") as mock_worker:
+        agent = distributed.Agent("127.0.0.1", 0, authkey="secret")
+        conn.send((agent.name, os.getpid()))
+        conn.close()
+        agent.serve(once=True)
+    mock_worker.assert_called_once_with(hostname=agent.name)
+    mock_worker.return_value.delete.assert_called_once_with()
+
+
+class DistributedTestCase(test.TestCase):
+
+    def setUp(self):
+        super(DistributedTestCase, self).setUp()
+        self.registered = collections.OrderedDict()
+
+        def register(worker=None, hostname=None):
+            w = mock.MagicMock()
+            w.__getitem__.side_effect = {"hostname": hostname}.__getitem__
+            w.delete.side_effect = lambda: self.registered.pop(hostname)
+            self.registered[hostname] = w
+            return w
+
+        patcher = mock.patch(DISTRIBUTED + "objects.Worker")
+        self.mock_worker = patcher.start()
+        self.mock_worker.side_effect = register
+        self.mock_worker.list.side_effect = (
+            lambda alive_within: list(self.registered.values()))
+        self.addCleanup(patcher.stop)
+
+    def _start_agents(self, count):
+        agents = {}
+        processes = []
+        for i in range(count):
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_serve_agent,
+                                              args=(writer,))
+            process.start()
+            self.addCleanup(process.join, 10)
+            self.addCleanup(process.terminate)
+            processes.append(process)
+            self.assertTrue(reader.poll(10))
+            name, pid = reader.recv()
+            agents[name] = pid
+            self.registered[name] = {"hostname": name}
+        return agents, processes
+
+    def test_authkey_is_required(self):
+        self.assertRaises(exceptions.DistributedLoadFailure,
+                          distributed.Coordinator)
+
+    def test_run(self):
+        agents, processes = self._start_agents(3)
+        self.assertEqual(
+            set(p.pid for p in processes), set(agents.values()))
+        self.assertNotIn(os.getpid(), agents.values())
+
+        coordinator = distributed.Coordinator(authkey="secret")
+        self.assertEqual(sorted(agents),
+                         sorted(coordinator.connect(3, timeout=10)))
+
+        results = []
+        events = []
+        coordinator.run(
+            "task-uuid", "Dummy.dummy", {"users": []},
+            {"sleep": 0}, [{"type": "serial", "times": t} for t in (3, 2, 2)],
+            on_results=results.append,
+            on_event=lambda **e: events.append(e))
+        coordinator.close()
+        for process in processes:
+            process.join(10)
+            self.assertEqual(0, process.exitcode)
+
+        self.assertEqual(7, sum(len(batch) for batch in results))
+        for batch in results:
+            for result in batch:
+                self.assertEqual([], result["error"])
+        self.assertEqual({name: {} for name in agents},
+                         coordinator.statistics)
+
+    def test_run_fails(self):
+        agents, processes = self._start_agents(1)
+        name = list(agents)[0]
+
+        coordinator = distributed.Coordinator(authkey="secret")
+        coordinator.connect(1, timeout=10)
+        e = self.assertRaises(
+            exceptions.DistributedLoadFailure, coordinator.run,
+            "task-uuid", "Dummy.dummy", {}, {},
+            [{"type": "unknown_runner"}], on_results=mock.Mock(),
+            on_event=mock.Mock())
+        coordinator.close()
+        processes[0].join(10)
+        self.assertEqual(0, processes[0].exitcode)
+        self.assertIn(name, "%s" % e)
+        self.assertIn("unknown_runner", "%s" % e)
+
+    @mock.patch(DISTRIBUTED + "time.sleep")
+    @mock.patch(DISTRIBUTED + "utils.monotonic")
+    def test_connect_timeout(self, mock_monotonic, mock_sleep):
+        mock_monotonic.side_effect = [0, 1, 2]
+        coordinator = distributed.Coordinator(authkey="secret")
+        self.assertRaises(exceptions.DistributedLoadFailure,
+                          coordinator.connect, 1, timeout=2)
+        mock_sleep.assert_called_once_with(1)
+
+    @mock.patch(DISTRIBUTED + "mp_connection.Client")
+    def test_connect_skips_unavailable_agents(self, mock_client):
+        self.registered["127.0.0.1:1"] = {"hostname": "127.0.0.1:1"}
+        self.registered["127.0.0.1:2"] = {"hostname": "127.0.0.1:2"}
+        mock_client.side_effect = [IOError("refused"), mock.Mock()]
+
+        coordinator = distributed.Coordinator(authkey="secret")
+        self.assertEqual(["127.0.0.1:2"], coordinator.connect(1, timeout=0))
+        mock_client.assert_has_calls([
+            mock.call(("127.0.0.1", 1), authkey=b"secret"),
+            mock.call(("127.0.0.1", 2), authkey=b"secret")])
+
+    def test_abort(self):
+        coordinator = distributed.Coordinator(authkey="secret")
+        conns = [mock.Mock(), mock.Mock()]
+        conns[0].send.side_effect = IOError
+        coordinator.agents.update({"a": conns[0], "b": conns[1]})
+
+        coordinator.abort()
+
+        for conn in conns:
+            conn.send.assert_called_once_with(("abort", None))
+
+    @mock.patch(DISTRIBUTED + "socket.gethostbyname")
+    def test__is_allowed_host(self, mock_gethostbyname):
+        mock_gethostbyname.side_effect = lambda host: {
+            "localhost": "127.0.0.1", "example.com": "10.0.0.1",
+            "0.0.0.0": "0.0.0.0"}[host]
+
+        self.assertTrue(distributed._is_allowed_host("localhost"))
+        self.assertFalse(distributed._is_allowed_host("example.com"))
+        self.assertFalse(distributed._is_allowed_host("0.0.0.0"))
+
+        mock_gethostbyname.side_effect = distributed.socket.error
+        self.assertFalse(distributed._is_allowed_host("unknown"))
+
+        distributed.CONF.set_override("trusted_network", True,
+                                      "distributed")
+        self.addCleanup(distributed.CONF.clear_override, "trusted_network",
+                        "distributed")
+        self.assertTrue(distributed._is_allowed_host("example.com"))
+
+    @mock.patch(DISTRIBUTED + "mp_connection.Listener")
+    def test_agent_on_untrusted_network(self, mock_listener):
+        self.assertRaises(exceptions.DistributedLoadFailure,
+                          distributed.Agent, "10.0.0.1", 0,
+                          authkey="secret")
+        self.assertFalse(mock_listener.called)
+
+        distributed.CONF.set_override("trusted_network", True,
+                                      "distributed")
+        self.addCleanup(distributed.CONF.clear_override, "trusted_network",
+                        "distributed")
+        mock_listener.return_value.address = ("10.0.0.1", 1234)
+        agent = distributed.Agent("10.0.0.1", 0, authkey="secret")
+        self.assertEqual("10.0.0.1:1234", agent.name)
+
+    @mock.patch(DISTRIBUTED + "mp_connection.Client")
+    def test_connect_skips_agents_on_untrusted_network(self, mock_client):
+        self.registered["10.0.0.1:1"] = {"hostname": "10.0.0.1:1"}
+        self.registered["127.0.0.1:2"] = {"hostname": "127.0.0.1:2"}
+
+        coordinator = distributed.Coordinator(authkey="secret")
+        self.assertEqual(["127.0.0.1:2"], coordinator.connect(1, timeout=0))
+        mock_client.assert_called_once_with(("127.0.0.1", 2),
+                                            authkey=b"secret")
@@ -18,6 +18,7 @@
 import collections
 import json
 import threading
+import time
 
 import mock
 
@@ -346,8 +347,44 @@ class TaskEngineTestCase(test.TestCase):
 
         eng._validate_workload.assert_called_once_with(
             workloads[0], credentials={"foo": {"admin": "admin",
-                                               "users": users}},
+                                               "users": users,
+                                               "lookup_cache": mock.ANY}},
             vtype="semantic")
+        credentials = eng._validate_workload.call_args[1]["credentials"]
+        self.assertIsInstance(credentials["foo"]["lookup_cache"],
+                              validation.LookupCache)
+
+    @mock.patch("rally.task.engine.TaskConfig")
+    def test__validate_config_semantic_helper_parallel(self,
+                                                       mock_task_config):
+        eng = engine.TaskEngine(mock.MagicMock(), mock.MagicMock(),
+                                mock.Mock())
+        workloads = [engine.Workload({"name": "name%s" % i,
+                                      "runner": "runner",
+                                      "args": "args"}, i)
+                     for i in range(5)]
+        errors = {
+            1: exceptions.InvalidTaskConfig(name="name1", pos=1, config="",
+                                            reason="foo"),
+            3: exceptions.InvalidTaskConfig(name="name3", pos=3, config="",
+                                            reason="bar")}
+
+        def validate_workload(workload, credentials, vtype):
+            if workload.pos in errors:
+                raise errors[workload.pos]
+
+        eng._validate_workload = mock.Mock(side_effect=validate_workload)
+        user_context = mock.MagicMock()
+        user_context.__enter__.return_value.context = {"users": []}
+
+        e = self.assertRaises(exceptions.InvalidTaskConfig,
+                              eng._validate_config_semantic_helper,
+                              "admin", user_context, workloads, "foo")
+        self.assertIs(errors[1], e)
+        self.assertEqual(5, eng._validate_workload.call_count)
+        caches = set(id(c[1]["credentials"]["foo"]["lookup_cache"])
+                     for c in eng._validate_workload.call_args_list)
+        self.assertEqual(1, len(caches))
 
     @mock.patch("rally.task.engine.scenario.Scenario.get")
     @mock.patch("rally.task.engine.context.Context")
@@ -629,6 +666,78 @@ class TaskEngineTestCase(test.TestCase):
         mock_scenario_get.assert_called_once_with(name)
 
 
+class WorkloadDataWriterTestCase(test.TestCase):
+
+    def _wait_for(self, predicate):
+        for i in range(200):
+            if predicate():
+                return
+            time.sleep(0.01)
+        self.fail("Timed out")
+
+    def test_write(self):
+        workload = mock.Mock(spec=objects.Workload)
+        writer = engine.WorkloadDataWriter(workload, chunk_size=2)
+        writer.start()
+        writer.add([{"duration": 1, "timestamp": 2},
+                    {"duration": 2, "timestamp": 1},
+                    {"duration": 3, "timestamp": 3}])
+        self._wait_for(lambda: workload.add_workload_data_chunks.called)
+        workload.add_workload_data_chunks.assert_called_once_with(
+            [(0, {"raw": [{"duration": 2, "timestamp": 1},
+                          {"duration": 1, "timestamp": 2}]})])
+
+        writer.close()
+
+        workload.add_workload_data_chunks.assert_called_with(
+            [(1, {"raw": [{"duration": 3, "timestamp": 3}]})])
+        self.assertEqual(2, writer.stats["chunks"])
+        self.assertEqual(2, writer.stats["transactions"])
+
+    def test_write_by_time(self):
+        workload = mock.Mock(spec=objects.Workload)
+        writer = engine.WorkloadDataWriter(workload, chunk_size=10,
+                                           flush_interval=0.01)
+        writer.start()
+        writer.add([{"duration": 1, "timestamp": 1}])
+        self._wait_for(lambda: workload.add_workload_data_chunks.called)
+        writer.close()
+
+        workload.add_workload_data_chunks.assert_called_once_with(
+            [(0, {"raw": [{"duration": 1, "timestamp": 1}]})])
+
+    def test_write_failed(self):
+        workload = mock.Mock(spec=objects.Workload)
+        workload.add_workload_data_chunks.side_effect = [Exception, None]
+        writer = engine.WorkloadDataWriter(workload, chunk_size=1)
+        writer.start()
+        writer.add([{"duration": 1, "timestamp": 1},
+                    {"duration": 2, "timestamp": 2}])
+        self._wait_for(lambda: workload.add_workload_data_chunks.called)
+        writer.add([{"duration": 3, "timestamp": 3}])
+
+        writer.close()
+
+        chunks = [(0, {"raw": [{"duration": 1, "timestamp": 1}]}),
+                  (1, {"raw": [{"duration": 2, "timestamp": 2}]})]
+        self.assertEqual(
+            [mock.call(chunks),
+             mock.call(chunks + [
+                 (2, {"raw": [{"duration": 3, "timestamp": 3}]})])],
+            workload.add_workload_data_chunks.call_args_list)
+        self.assertEqual(1, writer.stats["transactions"])
+
+    def test_add_blocked(self):
+        writer = engine.WorkloadDataWriter(mock.Mock(), chunk_size=1,
+                                           queue_size=1)
+        writer.add([{"duration": 1, "timestamp": 1}])
+        threading.Timer(0.05, writer._queue.get).start()
+        writer.add([{"duration": 2, "timestamp": 2}])
+
+        self.assertGreater(writer.stats["blocked_duration"], 0)
+        self.assertEqual(1, writer.stats["max_queue_size"])
+
+
 class ResultConsumerTestCase(test.TestCase):
 
     @mock.patch("rally.common.objects.Task.get_status")
@@ -661,9 +770,10 @@ class ResultConsumerTestCase(test.TestCase):
             mock.call({"duration": 1, "timestamp": 3}),
             mock.call({"duration": 2, "timestamp": 2})])
 
-        self.assertEqual([{"duration": 2, "timestamp": 2},
-                          {"duration": 1, "timestamp": 3}],
-                         consumer_obj.results)
+        workload.add_workload_data_chunks.assert_called_once_with(
+            [(0, {"raw": [{"duration": 2, "timestamp": 2},
+                          {"duration": 1, "timestamp": 3}]})])
+        self.assertEqual(1, consumer_obj.writer.stats["chunks"])
 
     @mock.patch("rally.task.hook.HookExecutor")
     @mock.patch("rally.task.engine.LOG")
@@ -685,6 +795,7 @@ class ResultConsumerTestCase(test.TestCase):
         subtask = mock.Mock(spec=objects.Subtask)
         workload = mock.Mock(spec=objects.Workload)
         runner = mock.MagicMock()
+        runner.statistics = {}
 
         results = []
         runner.result_queue = collections.deque(results)
@@ -693,7 +804,7 @@ class ResultConsumerTestCase(test.TestCase):
                 key, task, subtask, workload, runner, False):
             pass
 
-        self.assertFalse(workload.add_workload_data.called)
+        self.assertFalse(workload.add_workload_data_chunks.called)
         workload.set_results.assert_called_once_with(
             full_duration=1, sla_results=mock_sla_results, load_duration=0,
             start_time=None)
@@ -752,7 +863,8 @@ class ResultConsumerTestCase(test.TestCase):
             pass
 
         mock_sla_checker.assert_called_once_with(key["kw"])
-        mock_hook_executor.assert_called_once_with(key["kw"], task)
+        mock_hook_executor.assert_called_once_with(key["kw"], task,
+                                                   runner=runner)
         self.assertFalse(mock_hook_executor_instance.on_iteration.called)
         mocked_set_aborted = mock_sla_checker.return_value.set_aborted_manually
         mocked_set_aborted.assert_called_once_with()
@@ -816,6 +928,8 @@ class ResultConsumerTestCase(test.TestCase):
             self, mock_sla_checker, mock_result_consumer_wait_and_abort,
             mock_task_get_status, mock_conf):
         mock_conf.raw_result_chunk_size = 2
+        mock_conf.raw_result_flush_interval = 0
+        mock_conf.raw_result_queue_size = 10
         mock_sla_instance = mock.MagicMock()
         mock_sla_checker.return_value = mock_sla_instance
         mock_task_get_status.return_value = consts.TaskStatus.RUNNING
@@ -850,17 +964,20 @@ class ResultConsumerTestCase(test.TestCase):
             mock.call({"duration": 6, "timestamp": 2}),
             mock.call({"duration": 7, "timestamp": 1})])
 
-        self.assertEqual([{"duration": 7, "timestamp": 1}],
-                         consumer_obj.results)
-
-        workload.add_workload_data.assert_has_calls([
-            mock.call(0, {"raw": [{"duration": 2, "timestamp": 2},
-                                  {"duration": 1, "timestamp": 3}]}),
-            mock.call(1, {"raw": [{"duration": 4, "timestamp": 2},
-                                  {"duration": 3, "timestamp": 3}]}),
-            mock.call(2, {"raw": [{"duration": 6, "timestamp": 2},
-                                  {"duration": 5, "timestamp": 3}]}),
-            mock.call(3, {"raw": [{"duration": 7, "timestamp": 1}]})])
+        # NOTE(agent): the number of transactions depends on the
+        #   speed of the consumer, but the order of chunks does not.
+        self.assertEqual(
+            [(0, {"raw": [{"duration": 2, "timestamp": 2},
+                          {"duration": 1, "timestamp": 3}]}),
+             (1, {"raw": [{"duration": 4, "timestamp": 2},
+                          {"duration": 3, "timestamp": 3}]}),
+             (2, {"raw": [{"duration": 6, "timestamp": 2},
+                          {"duration": 5, "timestamp": 3}]}),
+             (3, {"raw": [{"duration": 7, "timestamp": 1}]})],
+            [chunk for call in
+             workload.add_workload_data_chunks.call_args_list
+             for chunk in call[0][0]])
+        self.assertEqual(4, consumer_obj.writer.stats["chunks"])
 
     @mock.patch("rally.task.engine.LOG")
     @mock.patch("rally.task.hook.HookExecutor")
@@ -883,6 +1000,7 @@ class ResultConsumerTestCase(test.TestCase):
         subtask = mock.Mock(spec=objects.Subtask)
         workload = mock.Mock(spec=objects.Workload)
         runner = mock.MagicMock()
+        runner.statistics = {}
         events = [
             {"type": "iteration", "value": 1},
             {"type": "iteration", "value": 2},
@@ -910,7 +1028,7 @@ class ResultConsumerTestCase(test.TestCase):
             mock.call(event_type="iteration", value=3)
         ])
 
-        self.assertFalse(workload.add_workload_data.called)
+        self.assertFalse(workload.add_workload_data_chunks.called)
         workload.set_results.assert_called_once_with(
             full_duration=1,
             load_duration=0,
@@ -918,6 +1036,36 @@ class ResultConsumerTestCase(test.TestCase):
             hooks_results=mock_hook_results,
             start_time=None)
 
+    @mock.patch("rally.task.engine.LOG")
+    @mock.patch("rally.task.engine.time.time")
+    @mock.patch("rally.common.objects.Task.get_status")
+    @mock.patch("rally.task.engine.ResultConsumer.wait_and_abort")
+    @mock.patch("rally.task.sla.SLAChecker")
+    def test_consume_results_with_context_execution(
+            self, mock_sla_checker, mock_result_consumer_wait_and_abort,
+            mock_task_get_status, mock_time, mock_log):
+        mock_time.side_effect = [0, 1]
+        mock_sla_results = mock_sla_checker.return_value.results.return_value
+        mock_task_get_status.return_value = consts.TaskStatus.RUNNING
+        key = {"kw": {"fake": 2}, "name": "fake", "pos": 0}
+        workload = mock.Mock(spec=objects.Workload)
+        runner = mock.MagicMock()
+        runner.result_queue = collections.deque()
+        runner.statistics = {"throughput": [1]}
+        context_obj = {}
+
+        with engine.ResultConsumer(key, mock.MagicMock(),
+                                   mock.Mock(spec=objects.Subtask), workload,
+                                   runner, False, context_obj=context_obj):
+            # contexts save their statistics while the consumer works
+            context_obj["context_execution"] = {"users@openstack": {}}
+
+        workload.set_results.assert_called_once_with(
+            full_duration=1, load_duration=0, sla_results=mock_sla_results,
+            start_time=None,
+            context_execution={"users@openstack": {}},
+            runner_statistics={"throughput": [1]})
+
     @mock.patch("rally.task.engine.threading.Thread")
     @mock.patch("rally.task.engine.threading.Event")
     @mock.patch("rally.common.objects.Task.get_status")
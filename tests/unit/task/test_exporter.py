@@ -41,7 +41,7 @@ class ExporterTestCase(test.TestCase):
 class TaskExporterTestCase(test.TestCase):
 
     def test_make(self):
-        reporter_cls = mock.Mock()
+        reporter_cls = mock.Mock(STREAMING=False)
 
         reporter_cls.return_value.generate.return_value = {}
         exporter.TaskExporter.make(reporter_cls, None, None, None)
@@ -92,3 +92,22 @@ class TaskExporterTestCase(test.TestCase):
         self.assertRaises(jsonschema.ValidationError,
                           exporter.TaskExporter.make,
                           reporter_cls, None, None, None)
+
+    def test_make_streaming(self):
+        reporter_cls = mock.Mock(STREAMING=True)
+
+        reporter_cls.return_value.generate.return_value = {
+            "files": {"/path/foo": iter(["con", "tent"])},
+            "open": "/path/foo", "print": iter(["foo"])}
+        report = exporter.TaskExporter.make(reporter_cls, None, None, None)
+        self.assertEqual(["con", "tent"], list(report["files"]["/path/foo"]))
+
+        reporter_cls.return_value.generate.return_value = {"files": []}
+        self.assertRaises(jsonschema.ValidationError,
+                          exporter.TaskExporter.make,
+                          reporter_cls, None, None, None)
+
+        reporter_cls.return_value.generate.return_value = {"open": []}
+        self.assertRaises(jsonschema.ValidationError,
+                          exporter.TaskExporter.make,
+                          reporter_cls, None, None, None)
@@ -118,6 +118,12 @@ class HookExecutorTestCase(test.TestCase):
                            "summary": {}}],
                          hook_executor.results())
 
+    def test_runner(self):
+        runner = mock.Mock()
+        hook_executor = hook.HookExecutor(self.conf, self.task, runner=runner)
+        for trigger_obj in hook_executor.triggers["iteration"]:
+            self.assertEqual(runner, trigger_obj.runner)
+
     @mock.patch("rally.task.hook.HookExecutor._timer_method")
     @mock.patch.object(DummyHook, "run", side_effect=Exception("My err msg"))
     @mock.patch("rally.common.utils.Timer", side_effect=fakes.FakeTimer)
@@ -81,6 +81,7 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
         expected_result = {
             "duration": fakes.FakeTimer().duration(),
             "timestamp": fakes.FakeTimer().timestamp(),
+            "cpu_duration": fakes.FakeTimer().cpu_duration(),
             "idle_duration": 0,
             "error": [],
             "output": {"additive": [], "complete": []},
@@ -97,6 +98,7 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
         expected_result = {
             "duration": fakes.FakeTimer().duration(),
             "timestamp": fakes.FakeTimer().timestamp(),
+            "cpu_duration": fakes.FakeTimer().cpu_duration(),
             "idle_duration": 0,
             "error": [],
             "output": {"additive": [{"chart_plugin": "FooPlugin",
@@ -120,6 +122,7 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
         expected_result = {
             "duration": fakes.FakeTimer().duration(),
             "timestamp": fakes.FakeTimer().timestamp(),
+            "cpu_duration": fakes.FakeTimer().cpu_duration(),
             "idle_duration": 0,
             "output": {"additive": [], "complete": []},
             "atomic_actions": []
@@ -128,6 +131,29 @@ class ScenarioRunnerHelpersTestCase(test.TestCase):
         self.assertEqual(expected_error[:2],
                          ["Exception", "Something went wrong"])
 
+    @mock.patch(BASE + "atomic.http_output")
+    @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
+    def test_run_scenario_once_with_http_output(self, mock_timer,
+                                                mock_http_output):
+        output = {"title": "HTTP requests", "chart_plugin": "StatsTable",
+                  "data": [["GET", 1]]}
+        mock_http_output.return_value = [output]
+        result = runner._run_scenario_once(
+            fakes.FakeScenario, "do_it", mock.MagicMock(), {},
+            mock.MagicMock())
+        self.assertEqual({"additive": [output], "complete": []},
+                         result["output"])
+
+    @mock.patch(BASE + "tracing.stop")
+    @mock.patch(BASE + "rutils.Timer", side_effect=fakes.FakeTimer)
+    def test_run_scenario_once_traced(self, mock_timer, mock_stop):
+        mock_stop.return_value = {"iteration": 1, "trace_id": "trace",
+                                  "atomic_actions": []}
+        result = runner._run_scenario_once(
+            fakes.FakeScenario, "do_it", mock.MagicMock(), {},
+            mock.MagicMock())
+        self.assertEqual(mock_stop.return_value, result["profiling"])
+
 
 @ddt.ddt
 class ScenarioRunnerTestCase(test.TestCase):
@@ -334,7 +360,7 @@ class ScenarioRunnerTestCase(test.TestCase):
         runner_ = self._get_runner(task={"uuid": "foo_uuid"})
         result = {"timestamp": 42}
         runner_._result_has_valid_schema = mock.Mock(return_value=True)
-        self.assertIsNone(runner_._send_result(result))
+        self.assertTrue(runner_._send_result(result))
         self.assertEqual([], runner_.result_batch)
         self.assertEqual(collections.deque([[result]]), runner_.result_queue)
 
@@ -343,7 +369,7 @@ class ScenarioRunnerTestCase(test.TestCase):
         runner_ = self._get_runner(task={"uuid": "foo_uuid"})
         result = {"timestamp": 42}
         runner_._result_has_valid_schema = mock.Mock(return_value=False)
-        self.assertIsNone(runner_._send_result(result))
+        self.assertFalse(runner_._send_result(result))
         runner_._result_has_valid_schema.assert_called_once_with(result)
         self.assertTrue(mock_log.warning.called)
         self.assertEqual([], runner_.result_batch)
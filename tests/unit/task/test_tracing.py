@@ -0,0 +1,168 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import ddt
+import mock
+from osprofiler.drivers import base
+from osprofiler import notifier
+from osprofiler import profiler
+from osprofiler import web
+
+from rally.task import tracing
+from tests.unit import test
+
+
+class InMemoryCollector(base.Driver):
+    """osprofiler driver which keeps notifications in memory."""
+
+    def __init__(self, connection_str, project=None, service=None,
+                 host=None):
+        super(InMemoryCollector, self).__init__(
+            connection_str, project=project, service=service, host=host)
+        self.notifications = []
+
+    @classmethod
+    def get_name(cls):
+        return "inmemory"
+
+    def notify(self, info, **kwargs):
+        data = dict(info, project=self.project, service=self.service)
+        self.notifications.append(data)
+
+    def get_report(self, base_id):
+        for n in self.notifications:
+            if n["base_id"] == base_id:
+                self._append_results(n["trace_id"], n["parent_id"],
+                                     n["name"], n["project"], n["service"],
+                                     n["info"]["host"], n["timestamp"], n)
+        return self._parse_results()
+
+
+@ddt.ddt
+class TracingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(TracingTestCase, self).setUp()
+        original_notifier = notifier.get()
+        self.addCleanup(notifier.set, original_notifier)
+        self.addCleanup(tracing.stop)
+        self.collector = notifier.create("inmemory://").__self__
+        self.collector.notifications = []
+
+    @ddt.data((1.0, list(range(1, 11))),
+              (0.5, [2, 4, 6, 8, 10]),
+              (0.25, [4, 8]),
+              (0.0, []))
+    @ddt.unpack
+    def test_is_sampled(self, rate, expected):
+        self.assertEqual(expected,
+                         [i for i in range(1, 11)
+                          if tracing.is_sampled(i, rate)])
+
+    def _call_service(self, headers):
+        """Emulate a cloud service which continues the trace."""
+        def service():
+            trace_info = web.utils.signed_unpack(
+                headers[web.X_TRACE_INFO], headers[web.X_TRACE_HMAC],
+                ["key"])
+            profiler.init("key", base_id=trace_info["base_id"],
+                          parent_id=trace_info["parent_id"])
+            profiler.start("wsgi", info={"path": "/servers"})
+            profiler.stop()
+
+        thread = threading.Thread(target=service)
+        thread.start()
+        thread.join()
+
+    def test_trace(self):
+        trace_id = tracing.start("key", 3,
+                                 connection_string="inmemory://")
+        self.assertEqual(trace_id, profiler.get().get_base_id())
+
+        self.assertTrue(tracing.start_atomic_action("foo"))
+        span_id = profiler.get().get_id()
+        self._call_service(web.get_trace_id_headers())
+        tracing.stop_atomic_action()
+
+        self.assertEqual({"iteration": 3, "trace_id": trace_id, "url": "",
+                          "atomic_actions": [{"name": "foo",
+                                              "span_id": span_id}]},
+                         tracing.stop())
+        # requests are not traced anymore
+        self.assertEqual({}, web.get_trace_id_headers())
+
+        report = self.collector.get_report(trace_id)
+        self.assertEqual(1, len(report["children"]))
+        action = report["children"][0]
+        self.assertEqual(span_id, action["trace_id"])
+        self.assertEqual("rally", action["info"]["name"])
+        self.assertEqual(
+            "foo", action["info"][
+                "meta.raw_payload.rally-atomic-action-start"][
+                "info"]["atomic_action"])
+        self.assertEqual(["wsgi"], [child["info"]["name"]
+                                    for child in action["children"]])
+
+    def test_stop_cleans_profiler(self):
+        local_ctx = getattr(profiler, "__local_ctx")
+        init = profiler.init
+
+        def init_once(hmac_key, **kwargs):
+            # newer releases of osprofiler keep the profiler of the thread
+            return profiler.get() or init(hmac_key, **kwargs)
+
+        def clean():
+            local_ctx.profiler = None
+
+        clean_mock = mock.patch.object(profiler, "clean", create=True,
+                                       side_effect=clean)
+        with mock.patch.object(profiler, "init", side_effect=init_once):
+            with clean_mock as mock_clean:
+                tracing.start("key", 1)
+                self.assertIsNotNone(profiler.get())
+                tracing.stop()
+
+        mock_clean.assert_called_once_with()
+        self.assertIsNone(profiler.get())
+        self.assertEqual({}, web.get_trace_id_headers())
+
+    def test_trace_without_collector(self):
+        trace_id = tracing.start("key", 3)
+        self.assertEqual(trace_id, profiler.get().get_base_id())
+
+        self.assertFalse(tracing.start_atomic_action("foo"))
+        headers = web.get_trace_id_headers()
+        self._call_service(headers)
+
+        self.assertEqual({"iteration": 3, "trace_id": trace_id, "url": "",
+                          "atomic_actions": []}, tracing.stop())
+        # spans of services refer to the trace itself
+        self.assertEqual(
+            trace_id, web.utils.signed_unpack(
+                headers[web.X_TRACE_INFO], headers[web.X_TRACE_HMAC],
+                ["key"])["parent_id"])
+        self.assertEqual([], self.collector.notifications)
+
+    def test_trace_url(self):
+        trace_id = tracing.start("key", 1,
+                                 trace_url="http://example.com/{trace_id}")
+        self.assertEqual("http://example.com/%s" % trace_id,
+                         tracing.stop()["url"])
+
+    def test_not_traced(self):
+        self.assertFalse(tracing.start_atomic_action("foo"))
+        self.assertIsNone(tracing.stop())
+        self.assertEqual([], self.collector.notifications)
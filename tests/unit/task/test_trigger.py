@@ -80,3 +80,11 @@ class TriggerTestCase(test.TestCase):
                 len(right_values),
              "summary": {hook_status: len(right_values)}},
             dummy_trigger.get_results())
+
+    def test_on_event_with_runner(self):
+        hook_cls = mock.MagicMock(__name__="fake")
+        dummy_trigger = DummyTrigger({"trigger": {"args": [1]}},
+                                     mock.MagicMock(), hook_cls)
+        dummy_trigger.runner = mock.Mock()
+        dummy_trigger.on_event("fake", 1)
+        self.assertEqual(dummy_trigger.runner, hook_cls.return_value.runner)
@@ -15,6 +15,8 @@
 
 import collections
 import datetime as dt
+import threading
+import time
 
 import ddt
 from jsonschema import exceptions as schema_exceptions
@@ -529,6 +531,151 @@ class WaitForStatusTestCase(test.TestCase):
                           update_resource=upd, timeout=2, id_attr="uuid")
 
 
+class StatusWatcherTestCase(test.TestCase):
+
+    def setUp(self):
+        super(StatusWatcherTestCase, self).setUp()
+        self.manager = fakes.FakeManager()
+        self.resources = [fakes.FakeResource(manager=self.manager,
+                                             status="BUILD")
+                          for i in range(20)]
+        for resource in self.resources:
+            self.manager._cache(resource)
+        # NOTE(agent): like clients, return new objects each time
+        self.list_resources = mock.Mock(side_effect=lambda ids: [
+            fakes.FakeResource(status=r.status, id=r.id)
+            for r in self.manager.list()])
+        self.watcher = utils.StatusWatcher(self.list_resources,
+                                           min_interval=0.01,
+                                           max_interval=0.04)
+
+    def test_get(self):
+        resource = self.resources[0]
+        self.assertEqual(resource.id, self.watcher.get(resource.id).id)
+        self.list_resources.assert_called_with([resource.id])
+
+        # the next call waits for the next round
+        rounds = self.watcher.rounds
+        self.assertEqual("BUILD", self.watcher.get(resource.id).status)
+        self.assertGreater(self.watcher.rounds, rounds)
+
+    def test_get_not_found(self):
+        resource = self.resources[0]
+        self.manager.delete(resource.id)
+        self.assertRaises(exceptions.GetResourceNotFound,
+                          self.watcher.get, resource.id)
+
+    def test_get_list_failure(self):
+        self.list_resources.side_effect = Exception("Oops")
+        self.assertRaises(exceptions.GetResourceFailure,
+                          self.watcher.get, self.resources[0].id)
+
+    def test_get_timeout(self):
+        # the list request hangs until the end of the test
+        hung = threading.Event()
+        self.addCleanup(hung.set)
+        self.list_resources.side_effect = lambda ids: hung.wait() and []
+
+        self.assertRaises(exceptions.TimeoutException,
+                          self.watcher.get, self.resources[0].id,
+                          timeout=0.05)
+
+    def test_get_with_dead_poller(self):
+        resource = self.resources[0]
+        self.watcher.get(resource.id)
+        poller = mock.Mock()
+        poller.is_alive.return_value = False
+        self.watcher._poller = poller
+
+        self.assertRaises(exceptions.GetResourceFailure,
+                          self.watcher.get, resource.id)
+        self.assertIsNone(self.watcher._poller)
+        # the poller is started again by the next call
+        self.assertEqual(resource.id, self.watcher.get(resource.id).id)
+
+    def test_interval_grows_while_statuses_are_not_changed(self):
+        resource = self.resources[0]
+        for i in range(4):
+            self.watcher.get(resource.id)
+        self.assertEqual(self.watcher.max_interval, self.watcher._interval)
+
+        # the round after the change is delayed to check the interval
+        self.watcher.min_interval = 5
+        resource.status = "ACTIVE"
+        while self.watcher.get(resource.id).status != "ACTIVE":
+            pass
+        self.assertEqual(5, self.watcher._interval)
+
+    def test_poller_stops_without_requests(self):
+        self.watcher.expire = 0.05
+        self.watcher.get(self.resources[0].id)
+        for i in range(100):
+            if self.watcher._poller is None:
+                break
+            time.sleep(0.01)
+        self.assertIsNone(self.watcher._poller)
+        self.assertEqual({}, self.watcher._watched)
+
+    def test_wait_for_status_of_concurrent_waiters(self):
+        results = []
+
+        def wait(resource):
+            results.append(utils.wait_for_status(
+                resource, ready_statuses=["ACTIVE"],
+                update_resource=utils.get_from_watcher(self.watcher),
+                timeout=10, check_interval=0.01))
+
+        waiters = [threading.Thread(target=wait, args=(r,))
+                   for r in self.resources]
+        for waiter in waiters:
+            waiter.start()
+        time.sleep(0.1)
+        for resource in self.resources:
+            resource.status = "ACTIVE"
+        for waiter in waiters:
+            waiter.join()
+
+        self.assertEqual(sorted(r.id for r in self.resources),
+                         sorted(r.id for r in results))
+        # statuses of all resources are refreshed by the same requests
+        self.assertEqual(self.watcher.rounds, self.list_resources.call_count)
+        self.assertLess(self.list_resources.call_count, 3 * len(waiters))
+
+    def test_get_from_watcher(self):
+        resource = self.resources[0]
+        get_from_watcher = utils.get_from_watcher(self.watcher)
+        self.assertEqual(resource.id, get_from_watcher(resource).id)
+
+        watcher = mock.Mock()
+        utils.get_from_watcher(watcher, timeout=10)(resource)
+        watcher.get.assert_called_once_with(resource.id, timeout=10)
+
+        resource.status = "ERROR"
+        while True:
+            try:
+                get_from_watcher(resource)
+            except exceptions.GetResourceErrorStatus:
+                break
+
+        resource.status = "DELETED"
+        while True:
+            try:
+                get_from_watcher(resource)
+            except exceptions.GetResourceNotFound:
+                break
+
+    def test_get_status_watcher(self):
+        list_resources = mock.Mock()
+        watcher = utils.get_status_watcher(("foo", "tenant"), list_resources,
+                                           min_interval=3)
+        self.assertIsInstance(watcher, utils.StatusWatcher)
+        self.assertEqual(3, watcher.min_interval)
+        self.assertIs(watcher, utils.get_status_watcher(("foo", "tenant"),
+                                                        mock.Mock()))
+        self.assertIsNot(watcher, utils.get_status_watcher(("foo", "other"),
+                                                           list_resources))
+
+
 @ddt.ddt
 class WrapperForAtomicActionsTestCase(test.TestCase):
 
@@ -317,7 +317,7 @@ class ValidatorsTestCase(test.TestCase):
         self.assertTrue(result[0].is_valid, result[0].msg)
         self.assertEqual(result[1], image)
 
-    @mock.patch(MODULE + "openstack_types.GlanceImage.transform",
+    @mock.patch("rally.plugins.openstack.types.GlanceImage.transform",
                 return_value="image_id")
     def test__get_validated_image(self, mock_glance_image_transform):
         clients = mock.MagicMock()
@@ -336,7 +336,7 @@ class ValidatorsTestCase(test.TestCase):
             clients=clients, resource_config="test")
         clients.glance().images.get.assert_called_with("image_id")
 
-    @mock.patch(MODULE + "openstack_types.GlanceImage.transform",
+    @mock.patch("rally.plugins.openstack.types.GlanceImage.transform",
                 side_effect=exceptions.InvalidScenarioArgument)
     def test__get_validated_image_transform_error(
             self, mock_glance_image_transform):
@@ -344,7 +344,7 @@ class ValidatorsTestCase(test.TestCase):
                                                  None, "a")
         self.assertFalse(result[0].is_valid, result[0].msg)
 
-    @mock.patch(MODULE + "openstack_types.GlanceImage.transform")
+    @mock.patch("rally.plugins.openstack.types.GlanceImage.transform")
     def test__get_validated_image_not_found(
             self, mock_glance_image_transform):
         clients = mock.MagicMock()
@@ -354,11 +354,29 @@ class ValidatorsTestCase(test.TestCase):
                                                  clients, "a")
         self.assertFalse(result[0].is_valid, result[0].msg)
 
+    @mock.patch("rally.plugins.openstack.types.GlanceImage.transform",
+                return_value="image_id")
+    def test__get_validated_image_with_lookup_cache(
+            self, mock_glance_image_transform):
+        clients = mock.MagicMock(credential="foo_credential")
+        clients.glance().images.get.return_value = {"size": 1}
+        credentials = {
+            "openstack": {"lookup_cache": common_validation.LookupCache()}}
+
+        for i in range(2):
+            result = validation._get_validated_image(
+                {"args": {"a": "test"}}, clients, "a",
+                credentials=credentials)
+            self.assertTrue(result[0].is_valid, result[0].msg)
+
+        # the second lookup is taken from the cache
+        clients.glance().images.get.assert_called_once_with("image_id")
+
     def test__get_validated_flavor_no_value_in_config(self):
         result = validation._get_validated_flavor({}, None, "non_existing")
         self.assertFalse(result[0].is_valid, result[0].msg)
 
-    @mock.patch(MODULE + "openstack_types.Flavor.transform",
+    @mock.patch("rally.plugins.openstack.types.Flavor.transform",
                 return_value="flavor_id")
     def test__get_validated_flavor(
             self, mock_flavor_transform):
@@ -373,7 +391,7 @@ class ValidatorsTestCase(test.TestCase):
             clients=clients, resource_config="test")
         clients.nova().flavors.get.assert_called_once_with(flavor="flavor_id")
 
-    @mock.patch(MODULE + "openstack_types.Flavor.transform",
+    @mock.patch("rally.plugins.openstack.types.Flavor.transform",
                 side_effect=exceptions.InvalidScenarioArgument)
     def test__get_validated_flavor_transform_error(
             self, mock_flavor_transform):
@@ -381,7 +399,7 @@ class ValidatorsTestCase(test.TestCase):
                                                   None, "a")
         self.assertFalse(result[0].is_valid, result[0].msg)
 
-    @mock.patch(MODULE + "openstack_types.Flavor.transform")
+    @mock.patch("rally.plugins.openstack.types.Flavor.transform")
     def test__get_validated_flavor_not_found(
             self, mock_flavor_transform):
         clients = mock.MagicMock()
@@ -390,7 +408,7 @@ class ValidatorsTestCase(test.TestCase):
                                                   clients, "a")
         self.assertFalse(result[0].is_valid, result[0].msg)
 
-    @mock.patch(MODULE + "openstack_types.Flavor.transform")
+    @mock.patch("rally.plugins.openstack.types.Flavor.transform")
     def test__get_validated_flavor_from_context(
             self, mock_flavor_transform):
         clients = mock.MagicMock()
@@ -407,7 +425,7 @@ class ValidatorsTestCase(test.TestCase):
         result = validation._get_validated_flavor(config, clients, "flavor")
         self.assertTrue(result[0].is_valid, result[0].msg)
 
-    @mock.patch(MODULE + "openstack_types.Flavor.transform")
+    @mock.patch("rally.plugins.openstack.types.Flavor.transform")
     def test__get_validated_flavor_from_context_failed(
             self, mock_flavor_transform):
         clients = mock.MagicMock()
@@ -430,6 +448,23 @@ class ValidatorsTestCase(test.TestCase):
         result = validation._get_validated_flavor(config, clients, "flavor")
         self.assertFalse(result[0].is_valid, result[0].msg)
 
+    @mock.patch("rally.plugins.openstack.types.Flavor.transform",
+                return_value="flavor_id")
+    def test_flavor_exists_with_lookup_cache(self, mock_flavor_transform):
+        clients = mock.MagicMock(credential="foo_credential")
+        credentials = {"lookup_cache": common_validation.LookupCache()}
+        deployment = mock.Mock()
+        deployment.get_credentials_for.return_value = credentials
+        validator = self._unwrap_validator(validation.flavor_exists, "a")
+
+        for i in range(2):
+            result = validator({"args": {"a": "test"}}, clients, deployment)
+            self.assertTrue(result.is_valid, result.msg)
+
+        deployment.get_credentials_for.assert_called_with("openstack")
+        # the second lookup is taken from the cache
+        clients.nova().flavors.get.assert_called_once_with(flavor="flavor_id")
+
     @ddt.data("nfS", "Cifs", "GLUSTERFS", "hdfs", "cephfs")
     def test_validate_share_proto_valid(self, share_proto):
         validator = self._unwrap_validator(validation.validate_share_proto)
@@ -449,7 +484,7 @@ class ValidatorsTestCase(test.TestCase):
 
     def test_flavor_exists(self):
         validator = self._unwrap_validator(validation.flavor_exists, "param")
-        result = validator({}, "clients", "deployment")
+        result = validator({}, "clients", mock.Mock())
         self.assertFalse(result.is_valid, result.msg)
 
     @mock.patch(
@@ -22,7 +22,9 @@ from oslo_config import fixture
 from oslotest import base
 
 from rally.common import db
+from rally import osclients
 from rally import plugins
+from rally.task import tracing
 from rally.task import utils as tutils
 from tests.unit import fakes
 
@@ -44,6 +46,8 @@ class TestCase(base.BaseTestCase):
     def setUp(self):
         super(TestCase, self).setUp()
         self.addCleanup(mock.patch.stopall)
+        self.addCleanup(osclients.invalidate_shared_cache)
+        self.addCleanup(tracing.stop)
         plugins.load()
 
     def _test_atomic_action_timer(self, atomic_actions, name):
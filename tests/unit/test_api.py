@@ -15,8 +15,14 @@
 
 """Test for api."""
 
+import collections
 import copy
+import datetime as dt
+import gzip
+import json
 import os
+import shutil
+import tempfile
 
 import ddt
 import jsonschema
@@ -24,6 +30,7 @@ import mock
 from oslo_config import cfg
 
 from rally import api
+from rally.common import db
 from rally.common import objects
 from rally import consts
 from rally import exceptions
@@ -419,6 +426,72 @@ class TaskAPITestCase(test.TestCase):
             self.task_uuid,
             status=expected_status)
 
+    def _make_workload(self, uuid, count, compaction=None):
+        statistics = {"compaction": compaction} if compaction else {}
+        return {"uuid": uuid, "total_iteration_count": count,
+                "statistics": statistics,
+                "data": [{"timestamp": i, "duration": 1}
+                         for i in range(count)]}
+
+    @mock.patch("rally.api.objects.Workload.compact_workload_data")
+    @mock.patch("rally.api.objects.Task.get")
+    @mock.patch("rally.api.objects.Task.list")
+    def test_compact(self, mock_task_list, mock_task_get,
+                     mock_workload_compact_workload_data):
+        old = dt.datetime.utcnow() - dt.timedelta(days=10)
+        mock_task_list.return_value = [
+            {"uuid": "t1", "status": consts.TaskStatus.FINISHED,
+             "created_at": old},
+            {"uuid": "t2", "status": consts.TaskStatus.RUNNING,
+             "created_at": old},
+            {"uuid": "t3", "status": consts.TaskStatus.CRASHED,
+             "created_at": dt.datetime.utcnow()},
+            {"uuid": "t4", "status": consts.TaskStatus.ABORTED,
+             "created_at": old}]
+        mock_task_get.side_effect = [
+            {"uuid": "t1", "subtasks": [
+                {"workloads": [self._make_workload("w1", 5),
+                               self._make_workload("w2", 2)]},
+                {"workloads": [self._make_workload(
+                    "w3", 3, compaction={"stored_iterations": 3,
+                                         "archive": "/a"})]}]},
+            {"uuid": "t4", "subtasks": [
+                {"workloads": [self._make_workload("w4", 1)]}]}]
+
+        self.assertEqual(
+            [{"uuid": "t1", "workloads": 2, "removed_iterations": 4}],
+            self.task_inst.compact(older_than=5, sample_size=2))
+
+        self.assertEqual([mock.call("t1", detailed=True, data="lazy"),
+                          mock.call("t4", detailed=True, data="lazy")],
+                         mock_task_get.call_args_list)
+        calls = mock_workload_compact_workload_data.call_args_list
+        self.assertEqual(["w1", "w3"], [c[0][0] for c in calls])
+        self.assertEqual([None, "/a"], [c[1]["archive"] for c in calls])
+        for call in calls:
+            raw = call[0][1]["raw"]
+            self.assertEqual(2, len(raw))
+            self.assertEqual(sorted(raw, key=lambda x: x["timestamp"]), raw)
+
+    @mock.patch("rally.api.objects.Workload.compact_workload_data")
+    def test__compact_workload_with_archive(
+            self, mock_workload_compact_workload_data):
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        workload = self._make_workload("w1", 5)
+
+        self.assertEqual(3, self.task_inst._compact_workload(
+            workload, 2, archive_dir=archive_dir))
+
+        archive = os.path.join(archive_dir, "w1.jsonl.gz")
+        self.assertEqual(["w1.jsonl.gz"], os.listdir(archive_dir))
+        with gzip.open(archive, "rb") as f:
+            self.assertEqual(workload["data"],
+                             [json.loads(line.decode("utf-8"))
+                              for line in f])
+        mock_workload_compact_workload_data.assert_called_once_with(
+            "w1", mock.ANY, archive=archive)
+
     @mock.patch("rally.api.texporter.TaskExporter")
     @mock.patch("rally.api.objects.Task.get")
     def test_export(self, mock_task_get, mock_task_exporter):
@@ -429,8 +502,10 @@ class TaskAPITestCase(test.TestCase):
         output_dest = mock.Mock()
 
         reporter = mock_task_exporter.get.return_value
+        reporter.STREAMING = False
+        mock_task_exporter.make.return_value = {"print": "report"}
 
-        self.assertEqual(mock_task_exporter.make.return_value,
+        self.assertEqual({"print": "report"},
                          self.task_inst.export(
                              tasks_uuids=task_id,
                              output_type=output_type,
@@ -442,9 +517,49 @@ class TaskAPITestCase(test.TestCase):
         mock_task_exporter.make.assert_called_once_with(
             reporter, [t.to_dict.return_value for t in tasks],
             output_dest, api=self.task_inst.api)
-        self.assertEqual([mock.call(u, detailed=True) for u in task_id],
+        self.assertEqual([mock.call(u, detailed=True, data="full")
+                          for u in task_id],
                          mock_task_get.call_args_list)
 
+    @mock.patch("rally.api.texporter.TaskExporter")
+    @mock.patch("rally.api.objects.Task.get")
+    def test__export_streaming(self, mock_task_get, mock_task_exporter):
+        task_id = ["uuid-1", "uuid-2"]
+        tasks = [mock.Mock(), mock.Mock()]
+        mock_task_get.side_effect = tasks
+
+        reporter = mock_task_exporter.get.return_value
+        reporter.STREAMING = True
+
+        self.assertEqual(mock_task_exporter.make.return_value,
+                         self.task_inst._export(tasks_uuids=task_id,
+                                                output_type="json",
+                                                output_dest=None))
+
+        mock_task_exporter.make.assert_called_once_with(
+            reporter, [t.to_dict.return_value for t in tasks],
+            None, api=self.task_inst.api)
+        self.assertEqual(
+            [mock.call(u, detailed=True, data="lazy") for u in task_id],
+            mock_task_get.call_args_list)
+
+    @mock.patch("rally.api._Task._export")
+    def test_export_streamed_report(self, mock___task__export):
+        mock___task__export.return_value = {
+            "print": iter(["[", "]"]),
+            "files": {"/a": iter(["<a>", "</a>"]), "/b": "b"},
+            "open": "file:///a"}
+
+        self.assertEqual(
+            {"print": "[]", "files": {"/a": "<a></a>", "/b": "b"},
+             "open": "file:///a"},
+            self.task_inst.export(tasks_uuids=["uuid"],
+                                  output_type="json-results",
+                                  output_dest="/a"))
+        mock___task__export.assert_called_once_with(
+            tasks_uuids=["uuid"], output_type="json-results",
+            output_dest="/a")
+
     @mock.patch("rally.api.objects.Task")
     def test_get_detailed(self, mock_task):
         mock_task.get.return_value = mock.Mock()
@@ -452,10 +567,21 @@ class TaskAPITestCase(test.TestCase):
         self.assertEqual(
             task.to_dict.return_value,
             self.task_inst.get(task_id="task_uuid", detailed=True))
-        mock_task.get.assert_called_once_with("task_uuid", detailed=True)
+        mock_task.get.assert_called_once_with("task_uuid", detailed=True,
+                                              data="full")
         self.assertFalse(task.extend_results.called)
         task.to_dict.assert_called_once_with()
 
+    @mock.patch("rally.api.objects.Task")
+    def test_get_detailed_without_data(self, mock_task):
+        task = mock_task.get.return_value
+        self.assertEqual(
+            task.to_dict.return_value,
+            self.task_inst.get(task_id="task_uuid", detailed=True,
+                               load_data=False))
+        mock_task.get.assert_called_once_with("task_uuid", detailed=True,
+                                              data=None)
+
     @mock.patch("rally.api.objects.Task")
     def test_list(self, mock_task):
         task = mock.Mock()
@@ -602,6 +728,39 @@ class TaskAPITestCase(test.TestCase):
                           tags=["tag"])
 
 
+class TaskAPIDBTestCase(test.DBTestCase):
+    def setUp(self):
+        super(TaskAPIDBTestCase, self).setUp()
+        mock_api = mock.Mock()
+        mock_api.endpoint_url = None
+        self.task_inst = api._Task(mock_api)
+
+    def test_get_with_context_execution(self):
+        deployment = db.deployment_create({})
+        task = db.task_create({"deployment_uuid": deployment["uuid"]})
+        subtask = db.subtask_create(task["uuid"], title="foo")
+        workload = db.workload_create(task["uuid"], subtask["uuid"],
+                                      name="foo", description="descr",
+                                      position=0, args={}, context={}, sla={},
+                                      hooks=[], runner={}, runner_type="foo")
+        context_execution = {"users@openstack": {
+            "setup": {"duration": 2.5, "actions": {
+                "create_user": {"count": 2, "failed": 0, "retries": 1,
+                                "started_at": 1.0, "finished_at": 2.0}}},
+            "cleanup": {"duration": 1.5, "actions": {}}}}
+        db.workload_set_results(workload_uuid=workload["uuid"],
+                                subtask_uuid=subtask["uuid"],
+                                task_uuid=task["uuid"],
+                                load_duration=1, full_duration=2,
+                                start_time=3, sla_results=[],
+                                context_execution=context_execution)
+
+        result = self.task_inst.get(task_id=task["uuid"], detailed=True)
+
+        workload = result["subtasks"][0]["workloads"][0]
+        self.assertEqual(context_execution, workload["context_execution"])
+
+
 class BaseDeploymentTestCase(test.TestCase):
     def setUp(self):
         super(BaseDeploymentTestCase, self).setUp()
@@ -1680,10 +1839,13 @@ class VerificationAPITestCase(test.TestCase):
 
         mock_verification_list.return_value = [mock.Mock()]
         self.assertEqual(
-            [i.to_dict() for i in mock_verification_list.return_value],
+            [i.to_dict.return_value
+             for i in mock_verification_list.return_value],
             self.verification_inst.list(
                 verifier_id=verifier_id, deployment_id=deployment_id,
                 tags=tags, status=status))
+        for i in mock_verification_list.return_value:
+            i.to_dict.assert_called_once_with(include_tests=False)
         mock_verification_list.assert_called_once_with(
             verifier_id, deployment_id=deployment_id, tags=tags,
             status=status)
@@ -1952,32 +2114,30 @@ class VerificationAPITestCase(test.TestCase):
                                 mock_verification_get,
                                 mock_verification_create,
                                 mock_start):
-        tests = {"test_1": {"status": "success"},
-                 "test_2": {"status": "fail"},
-                 "test_3": {"status": "fail"}}
-        mock_verification_get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+        failed_tests = collections.OrderedDict(
+            [("test_2", {"status": "fail"}), ("test_3", {"status": "fail"})])
+        verification = mock.Mock(uuid="uuid", verifier_uuid="v_uuid",
+                                 deployment_uuid="d_uuid")
+        verification.get_tests.return_value = failed_tests
+        mock_verification_get.return_value = verification
         self.verification_inst.return_value = mock.Mock()
         self.verification_inst.api.deployment.get.return_value = {
             "name": "deployment_name",
             "uuid": "deployment_uuid",
         }
-        expected_tests = [t for t, r in tests.items() if r["status"] == "fail"]
         self.verification_inst.rerun(verification_uuid="uuid", failed=True)
+        verification.get_tests.assert_called_once_with(status="fail")
         mock_start.assert_called_once_with(
             verifier_id="v_uuid", deployment_id="deployment_uuid",
-            load_list=expected_tests, tags=None)
+            load_list=["test_2", "test_3"], tags=None)
 
     @mock.patch("rally.api._Verification._get")
     def test_rerun_failed_tests_raise_exc(
             self, mock___verification__get):
-        tests = {"test_1": {"status": "success"},
-                 "test_2": {"status": "success"},
-                 "test_3": {"status": "skip"}}
-        mock___verification__get.return_value = mock.Mock(
-            uuid="uuid", verifier_uuid="v_uuid", deployment_uuid="d_uuid",
-            tests=tests)
+        verification = mock.Mock(uuid="uuid", verifier_uuid="v_uuid",
+                                 deployment_uuid="d_uuid")
+        verification.get_tests.return_value = {}
+        mock___verification__get.return_value = verification
 
         e = self.assertRaises(exceptions.RallyException,
                               self.verification_inst.rerun,
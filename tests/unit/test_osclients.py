@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 import ddt
 import mock
 from oslo_config import cfg
@@ -21,6 +23,7 @@ from rally import consts
 from rally import exceptions
 from rally import osclients
 from rally.plugins.openstack import credential as oscredential
+from rally.task import atomic
 from tests.unit import fakes
 from tests.unit import test
 
@@ -159,6 +162,73 @@ class CachedTestCase(test.TestCase):
         self.assertEqual({}, clients.cache)
 
 
+class SharedCacheTestCase(test.TestCase):
+
+    def setUp(self):
+        super(SharedCacheTestCase, self).setUp()
+        self.credential = oscredential.OpenStackCredential(
+            "http://auth_url/v2.0", "user", "pass", "tenant")
+
+    def test_clients_share_cache(self):
+        clients = osclients.Clients(self.credential)
+        self.assertIsInstance(clients.cache, osclients.ClientsCache)
+        self.assertIs(clients.cache,
+                      osclients.Clients(self.credential).cache)
+        self.assertIs(clients.cache, self.credential.clients().cache)
+
+        other = oscredential.OpenStackCredential(
+            "http://auth_url/v2.0", "user2", "pass", "tenant")
+        self.assertIsNot(clients.cache, osclients.Clients(other).cache)
+        self.assertIsNot(
+            clients.cache,
+            osclients.Clients(self.credential,
+                              api_info={"nova": {"version": "2.1"}}).cache)
+
+    def test_clients_do_not_share_explicit_cache(self):
+        cache = {}
+        clients = osclients.Clients(self.credential, cache=cache)
+        self.assertIs(cache, clients.cache)
+
+    def test_clients_do_not_share_cache_of_custom_credential(self):
+        self.assertIsNot(osclients.Clients(mock.MagicMock()).cache,
+                         osclients.Clients(mock.MagicMock()).cache)
+
+    @mock.patch("rally.osclients.os.getpid")
+    def test_shared_cache_per_process(self, mock_getpid):
+        mock_getpid.return_value = 1
+        cache = osclients.get_shared_cache(self.credential)
+        mock_getpid.return_value = 2
+        self.assertIsNot(cache, osclients.get_shared_cache(self.credential))
+
+    def test_invalidate_shared_cache(self):
+        other = oscredential.OpenStackCredential(
+            "http://auth_url/v2.0", "user2", "pass", "tenant")
+        cache = osclients.get_shared_cache(self.credential)
+        other_cache = osclients.get_shared_cache(other)
+
+        osclients.invalidate_shared_cache(self.credential)
+        self.assertIsNot(cache, osclients.get_shared_cache(self.credential))
+        self.assertIs(other_cache, osclients.get_shared_cache(other))
+
+        osclients.invalidate_shared_cache()
+        self.assertIsNot(other_cache, osclients.get_shared_cache(other))
+
+    def test_clients_cache_get_or_create(self):
+        cache = osclients.ClientsCache()
+        factory = mock.Mock(return_value="client")
+
+        threads = [threading.Thread(target=cache.get_or_create,
+                                    args=("key", factory))
+                   for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual({"key": "client"}, cache)
+        factory.assert_called_once_with()
+
+
 @ddt.ddt
 class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
 
@@ -260,6 +330,37 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
              mock.call(auth=self.ksa_identity_plugin, timeout=180.0,
                        verify=True)])
 
+    def test_keystone_get_session_with_pool_maxsize(self):
+        cfg.CONF.set_override("openstack_client_http_pool_maxsize", 42)
+        self.addCleanup(cfg.CONF.clear_override,
+                        "openstack_client_http_pool_maxsize")
+        self.set_up_keystone_mocks()
+        keystone = osclients.Keystone(self.credential, {"keystone": {
+            "version": "2"}}, {})
+
+        self.assertEqual((self.ksa_session.Session.return_value,
+                          self.ksa_identity_plugin),
+                         keystone.get_session())
+        http_session = self.ksa_session.Session.call_args[1]["session"]
+        adapter = http_session.get_adapter("https://auth_url")
+        self.assertEqual(42, adapter._pool_maxsize)
+
+    @ddt.data(True, False)
+    def test_keystone_get_session_with_http_stats(self, enabled):
+        cfg.CONF.set_override("openstack_client_http_stats", enabled)
+        self.addCleanup(cfg.CONF.clear_override,
+                        "openstack_client_http_stats")
+        self.set_up_keystone_mocks()
+        keystone = osclients.Keystone(self.credential, {"keystone": {
+            "version": "2"}}, {})
+        hooks = {"response": []}
+        self.ksa_session.Session.return_value.session.hooks = hooks
+
+        keystone.get_session()
+
+        self.assertEqual([atomic.http_response_hook] if enabled else [],
+                         hooks["response"])
+
     def test_keystone_property(self):
         keystone = osclients.Keystone(None, None, None)
         self.assertRaises(exceptions.RallyException, lambda: keystone.keystone)
@@ -269,18 +370,32 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
         session = mock.MagicMock()
         auth_plugin = mock.MagicMock()
         mock_keystone_get_session.return_value = (session, auth_plugin)
+        auth_ref = auth_plugin.get_access.return_value
+        auth_ref.will_expire_soon.return_value = False
         cache = {}
         keystone = osclients.Keystone(None, None, cache)
 
-        self.assertEqual(auth_plugin.get_access.return_value,
-                         keystone.auth_ref)
-        self.assertEqual(auth_plugin.get_access.return_value,
-                         cache["keystone_auth_ref"])
+        self.assertEqual(auth_ref, keystone.auth_ref)
+        self.assertEqual(auth_ref, cache["keystone_auth_ref"])
 
         # check that auth_ref was cached.
         keystone.auth_ref
         mock_keystone_get_session.assert_called_once_with()
 
+    @mock.patch("rally.osclients.Keystone.get_session")
+    def test_auth_ref_expired(self, mock_keystone_get_session):
+        session = mock.MagicMock()
+        auth_plugin = mock.MagicMock()
+        mock_keystone_get_session.return_value = (session, auth_plugin)
+        expired_ref = mock.Mock()
+        expired_ref.will_expire_soon.return_value = True
+        cache = {"keystone_auth_ref": expired_ref}
+        keystone = osclients.Keystone(None, None, cache)
+
+        self.assertEqual(auth_plugin.get_access.return_value,
+                         keystone.auth_ref)
+        auth_plugin.get_access.assert_called_once_with(session)
+
     @mock.patch("keystoneauth1.identity.base.BaseIdentityPlugin.get_access")
     def test_auth_ref_fails(self, mock_get_access):
         mock_get_access.side_effect = Exception